@@ -2,12 +2,24 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+# `python app.py --profile-startup` prints the import time of every module and exits
+PROFILE_STARTUP = __name__ == '__main__' and '--profile-startup' in sys.argv
+if PROFILE_STARTUP:
+    from processing.import_profiler import ImportProfiler
+    import_profiler = ImportProfiler()
+    import_profiler.install()
+
 from flask import Flask
 from flask_cors import CORS
 from routes.upload import upload_routes
 from routes.analysis import analysis_routes
 from routes.facial_updated import facial_routes
 from routes.learning_library import learning_library_bp
+from routes.streaming import streaming_routes, streaming_enabled
+from processing.model_registry import model_registry, model_warmup_enabled
+
+if PROFILE_STARTUP:
+    import_profiler.uninstall()
 
 app = Flask(__name__)
 CORS(app)
@@ -17,13 +29,29 @@ app.register_blueprint(upload_routes)
 app.register_blueprint(analysis_routes)
 app.register_blueprint(facial_routes)
 app.register_blueprint(learning_library_bp, url_prefix='/learning-library')
+# Streaming sessions live in memory, so /stream/* needs a single process (`python app.py`)
+if streaming_enabled():
+    app.register_blueprint(streaming_routes)
+
+# Models load on first use; MODEL_WARMUP=1 loads them in the background right away
+if model_warmup_enabled() and not PROFILE_STARTUP:
+    model_registry.warm_up()
 
 # Health check endpoint for deployment
 @app.route('/health')
 def health_check():
     return {'status': 'healthy', 'service': 'ImmigrantSlangster API'}, 200
 
+# Load state, load time and memory of each shared model
+@app.route('/health/models')
+def model_status():
+    return model_registry.status(), 200
+
 if __name__ == '__main__':
+    if PROFILE_STARTUP:
+        import_profiler.print_report()
+        sys.exit(0)
+    
     # Get port from environment variable for deployment platforms
     port = int(os.environ.get('PORT', 5002))
     debug = os.environ.get('FLASK_ENV', 'development') == 'development'
@@ -0,0 +1,35 @@
+"""
+Build the tone model artifact used by processing/audio_analysis.py.
+
+Fits the TF-IDF vectorizer on Datasets/tone_v1.txt once and writes a
+memory-mappable artifact to models/trained/, named after a hash of the
+dataset contents. Run it whenever the tone dataset changes:
+
+    python build_tone_model.py [--dataset PATH] [--output-dir DIR]
+"""
+
+import argparse
+import os
+import time
+
+from processing.tone_model import build_tone_model, get_dataset_path, get_artifact_dir, load_tone_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the prebuilt tone model artifact")
+    parser.add_argument('--dataset', default=get_dataset_path(), help="Path to the tone dataset (text || Tone. lines)")
+    parser.add_argument('--output-dir', default=get_artifact_dir(), help="Directory the artifact is written to")
+    args = parser.parse_args()
+
+    print(f"🎯 Building tone model from {args.dataset}")
+    started = time.time()
+    path = build_tone_model(args.dataset, args.output_dir)
+    print(f"✅ Wrote {path} ({os.path.getsize(path) / 1024:.1f} KB) in {time.time() - started:.2f}s")
+
+    started = time.time()
+    model = load_tone_model(path)
+    print(f"📦 Artifact loads in {(time.time() - started) * 1000:.1f} ms ({len(model.labels)} examples, {len(model.vectorizer.vocabulary_)} terms)")
+
+
+if __name__ == '__main__':
+    main()
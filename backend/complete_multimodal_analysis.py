@@ -5,75 +5,55 @@ Combines facial emotion recognition with audio analysis for comprehensive emotio
 """
 
 import os
-import cv2
 import numpy as np
-import librosa
-import pickle
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.image import img_to_array
-import matplotlib.pyplot as plt
 from sklearn.preprocessing import LabelEncoder
+from processing.model_registry import lazy_import, model_registry, AUDIO_EMOTION_MODEL, FACIAL_EMOTION_MODEL
+
+# Heavy libraries are imported the first time an image or audio file is analyzed
+cv2 = lazy_import('cv2')
+librosa = lazy_import('librosa')
 
 class MultimodalEmotionAnalyzer:
     def __init__(self):
-        # Model paths
-        self.facial_model_path = "models/trained/facial_emotion_model.h5"
-        self.facial_encoder_path = "models/trained/facial_label_encoder.pkl"
-        self.audio_model_path = "models/trained/emotion_model_improved.h5"
-        self.audio_encoder_path = "models/trained/label_encoder.pkl"
-        
-        # Models and encoders
-        self.facial_model = None
-        self.facial_encoder = None
-        self.audio_model = None
-        self.audio_encoder = None
+        # Encoders used when a model has no loadable label encoder
+        self._fallback_encoders = {}
         
         # Emotion mappings
         self.facial_emotions = ['angry', 'disgust', 'fear', 'happy', 'neutral', 'sad', 'surprise']
         self.audio_emotions = ['angry', 'happy', 'neutral', 'sad']  # Common emotions from your audio model
-        
-        # Load models
-        self.load_models()
+    
+    @property
+    def facial_model(self):
+        """Shared facial emotion predictor, loaded on first use (None if unavailable)"""
+        return model_registry.get(FACIAL_EMOTION_MODEL)
+    
+    @property
+    def facial_encoder(self):
+        return self._encoder(self.facial_model, self.facial_emotions)
+    
+    @property
+    def audio_model(self):
+        """Shared audio emotion predictor, loaded on first use (None if unavailable)"""
+        return model_registry.get(AUDIO_EMOTION_MODEL)
+    
+    @property
+    def audio_encoder(self):
+        return self._encoder(self.audio_model, self.audio_emotions)
+    
+    def _encoder(self, predictor, classes):
+        if predictor is not None and predictor.encoder is not None:
+            return predictor.encoder
+        key = tuple(classes)
+        if key not in self._fallback_encoders:
+            self._fallback_encoders[key] = self._create_fallback_encoder(classes)
+        return self._fallback_encoders[key]
     
     def load_models(self):
-        """Load all models and encoders."""
+        """Load all models and encoders now instead of on first use."""
         print("Loading multimodal emotion analysis models...")
-        
-        # Load facial emotion model
-        try:
-            print(f"Loading facial model from: {self.facial_model_path}")
-            self.facial_model = load_model(self.facial_model_path)
-            print("✓ Facial emotion model loaded successfully")
-            
-            with open(self.facial_encoder_path, 'rb') as f:
-                self.facial_encoder = pickle.load(f)
-            print("✓ Facial label encoder loaded successfully")
-            
-        except Exception as e:
-            print(f"Error loading facial models: {str(e)}")
-            self.facial_encoder = self._create_fallback_encoder(self.facial_emotions)
-        
-        # Try to load audio emotion model (with fallback for pickle issues)
-        try:
-            print(f"Loading audio model from: {self.audio_model_path}")
-            self.audio_model = load_model(self.audio_model_path)
-            print("✓ Audio emotion model loaded successfully")
-            
-            # Try to load the audio encoder - handle different pickle formats
-            try:
-                with open(self.audio_encoder_path, 'rb') as f:
-                    self.audio_encoder = pickle.load(f)
-                print("✓ Audio label encoder loaded successfully")
-            except Exception as pe:
-                print(f"Warning: Could not load audio label encoder ({str(pe)})")
-                print("Creating fallback encoder for audio emotions...")
-                self.audio_encoder = self._create_fallback_encoder(self.audio_emotions)
-                
-        except Exception as e:
-            print(f"Warning: Could not load audio model ({str(e)})")
+        model_registry.warm_up([FACIAL_EMOTION_MODEL, AUDIO_EMOTION_MODEL], background=False)
+        if self.audio_model is None:
             print("Audio analysis will use feature-based approach")
-            self.audio_model = None
-            self.audio_encoder = self._create_fallback_encoder(self.audio_emotions)
     
     def _create_fallback_encoder(self, classes):
         """Create a fallback label encoder."""
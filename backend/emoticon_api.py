@@ -12,7 +12,7 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from processing.emoticon_analysis import EmoticonEmotionAnalyzer
-from processing.multimodal_emoticon_analysis import MultimodalEmotionAnalyzer
+from processing.multimodal_emoticon_analysis import MultimodalEmotionAnalyzer, ConversationSessionStore
 
 app = Flask(__name__)
 CORS(app)
@@ -20,6 +20,26 @@ CORS(app)
 # Initialize analyzers
 emoticon_analyzer = EmoticonEmotionAnalyzer()
 multimodal_analyzer = MultimodalEmotionAnalyzer()
+conversation_sessions = ConversationSessionStore(
+    multimodal_analyzer,
+    max_sessions=int(os.getenv('CONVERSATION_MAX_SESSIONS', '1000')),
+    ttl=float(os.getenv('CONVERSATION_SESSION_TTL', '3600'))
+)
+
+
+def _simplify_message_analysis(analysis):
+    """Flatten one conversation message analysis for API consumption"""
+    raw_analysis = analysis['analysis']['raw_analysis']
+    return {
+        'message_index': analysis['message_index'],
+        'text': analysis['text'],
+        'dominant_emotion': {
+            'emotion': raw_analysis['dominant_emotion'].emotion,
+            'confidence': raw_analysis['dominant_emotion'].confidence
+        } if raw_analysis['dominant_emotion'] else None,
+        'sentiment': raw_analysis['sentiment'],
+        'overall_mood': analysis['analysis']['summary']['overall_mood']
+    }
 
 
 @app.route('/api/emoticon/analyze', methods=['POST'])
@@ -151,18 +171,7 @@ def analyze_conversation_flow():
         result = multimodal_analyzer.analyze_conversation_flow(messages)
         
         # Simplify the response for API consumption
-        simplified_analyses = []
-        for analysis in result['message_analyses']:
-            simplified_analyses.append({
-                'message_index': analysis['message_index'],
-                'text': analysis['text'],
-                'dominant_emotion': {
-                    'emotion': analysis['analysis']['raw_analysis']['dominant_emotion'].emotion,
-                    'confidence': analysis['analysis']['raw_analysis']['dominant_emotion'].confidence
-                } if analysis['analysis']['raw_analysis']['dominant_emotion'] else None,
-                'sentiment': analysis['analysis']['raw_analysis']['sentiment'],
-                'overall_mood': analysis['analysis']['summary']['overall_mood']
-            })
+        simplified_analyses = [_simplify_message_analysis(analysis) for analysis in result['message_analyses']]
         
         response = {
             'message_analyses': simplified_analyses,
@@ -183,6 +192,87 @@ def analyze_conversation_flow():
         }), 500
 
 
+@app.route('/api/emoticon/conversation', methods=['POST'])
+def start_conversation():
+    """
+    Start an incremental conversation-flow session
+    
+    Messages are then appended one at a time with
+    POST /api/emoticon/conversation/<session_id>/messages, so the client
+    never resends the history.
+    """
+    session_id = conversation_sessions.create()
+    return jsonify({
+        'success': True,
+        'data': {'session_id': session_id}
+    })
+
+
+def _conversation_state(session_id, session):
+    return {
+        'session_id': session_id,
+        'message_count': session.message_count,
+        'recent_timeline': session.recent_timeline(),
+        'trends': session.trends(),
+        'conversation_summary': session.summary()
+    }
+
+
+@app.route('/api/emoticon/conversation/<session_id>/messages', methods=['POST'])
+def append_conversation_message(session_id):
+    """
+    Append one message to a conversation session
+    
+    Expected JSON input:
+    {
+        "message": "Just got some great news! 😊🎉"
+    }
+    """
+    try:
+        session = conversation_sessions.get(session_id)
+        if session is None:
+            return jsonify({'error': 'Unknown or expired conversation session'}), 404
+        
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('message'), str):
+            return jsonify({'error': 'message field is required'}), 400
+        
+        result = session.append(data['message'])
+        response = _conversation_state(session_id, session)
+        response['message_analysis'] = _simplify_message_analysis(result['message'])
+        response['timeline_entry'] = result['timeline_entry']
+        
+        return jsonify({
+            'success': True,
+            'data': response
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/emoticon/conversation/<session_id>', methods=['GET', 'DELETE'])
+def conversation_session(session_id):
+    """Current trends of a conversation session, or end it with DELETE"""
+    if request.method == 'DELETE':
+        if not conversation_sessions.delete(session_id):
+            return jsonify({'error': 'Unknown or expired conversation session'}), 404
+        return jsonify({'success': True})
+    
+    session = conversation_sessions.get(session_id)
+    if session is None:
+        return jsonify({'error': 'Unknown or expired conversation session'}), 404
+    
+    return jsonify({
+        'success': True,
+        'data': _conversation_state(session_id, session)
+    })
+
+
 @app.route('/api/emoticon/emotions-list', methods=['GET'])
 def get_supported_emotions():
     """
@@ -235,6 +325,7 @@ def health_check():
             'Basic emoticon analysis',
             'Multimodal emotion analysis',
             'Conversation flow analysis',
+            'Incremental conversation sessions',
             'Emoticon suggestions',
             'Emotion intensity scoring'
         ]
@@ -286,6 +377,21 @@ def api_documentation():
                     ]
                 }
             },
+            'POST /api/emoticon/conversation': {
+                'description': 'Start an incremental conversation-flow session; returns session_id'
+            },
+            'POST /api/emoticon/conversation/<session_id>/messages': {
+                'description': 'Append one message and get the updated trends and recent timeline',
+                'input': {
+                    'message': 'string (required) - The next message in the conversation'
+                },
+                'example_input': {
+                    'message': "Just got some great news! 😊🎉"
+                }
+            },
+            'GET /api/emoticon/conversation/<session_id>': {
+                'description': 'Current trends and summary of a conversation session (DELETE ends it)'
+            },
             'GET /api/emoticon/emotions-list': {
                 'description': 'Get list of all supported emotions and their emoticons'
             },
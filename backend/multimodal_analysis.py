@@ -6,14 +6,12 @@ This integrates your audio_files_model.py approach with facial emotion analysis
 import os
 import numpy as np
 import pandas as pd
-import cv2
-import librosa
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import Dense, Dropout, Conv2D, MaxPooling2D, Flatten, BatchNormalization
-from tensorflow.keras.utils import to_categorical
-import pickle
+from processing.model_registry import lazy_import, model_registry, AUDIO_EMOTION_MODEL, FACIAL_EMOTION_MODEL
+
+cv2 = lazy_import('cv2')
+librosa = lazy_import('librosa')
 
 class MultimodalEmotionAnalyzer:
     def __init__(self):
@@ -26,31 +24,18 @@ class MultimodalEmotionAnalyzer:
     def load_models(self):
         """Load both audio and facial emotion models"""
         try:
-            # Load audio model (if exists)
-            audio_model_path = '/Users/keiralie/Documents/GitHub/ImmigrantSlangster/backend/models/trained/emotion_model_improved.h5'
-            audio_encoder_path = '/Users/keiralie/Documents/GitHub/ImmigrantSlangster/backend/models/trained/label_encoder.pkl'
-            
-            if os.path.exists(audio_model_path):
-                self.audio_model = load_model(audio_model_path)
+            # Models are shared with the other analyzers through the model registry
+            audio_predictor = model_registry.get(AUDIO_EMOTION_MODEL)
+            if audio_predictor is not None:
+                self.audio_model = audio_predictor
+                self.audio_le = audio_predictor.encoder
                 print("✅ Audio emotion model loaded")
-                
-                if os.path.exists(audio_encoder_path):
-                    with open(audio_encoder_path, 'rb') as f:
-                        self.audio_le = pickle.load(f)
-                    print("✅ Audio label encoder loaded")
-            
-            # Load facial model
-            facial_model_path = '/Users/keiralie/Documents/GitHub/ImmigrantSlangster/backend/models/trained/facial_emotion_model.h5'
-            facial_encoder_path = '/Users/keiralie/Documents/GitHub/ImmigrantSlangster/backend/models/trained/facial_label_encoder.pkl'
             
-            if os.path.exists(facial_model_path):
-                self.facial_model = load_model(facial_model_path)
+            facial_predictor = model_registry.get(FACIAL_EMOTION_MODEL)
+            if facial_predictor is not None:
+                self.facial_model = facial_predictor
+                self.facial_le = facial_predictor.encoder
                 print("✅ Facial emotion model loaded")
-                
-                if os.path.exists(facial_encoder_path):
-                    with open(facial_encoder_path, 'rb') as f:
-                        self.facial_le = pickle.load(f)
-                    print("✅ Facial label encoder loaded")
             
             self.models_loaded = True
             return True
@@ -0,0 +1,136 @@
+"""
+Concurrent fan-out for the text analysis engines.
+
+The engines behind /analyze do not depend on each other, and two of them
+(sarcasm highlighting and simplification) can block for seconds on an LLM
+call. Stages are submitted to a shared thread pool and each one gets its own
+deadline; a stage that misses its deadline (or raises) is answered with its
+rule-based fallback instead of holding up the whole response.
+
+A deadline counts from the moment its stage starts running, so under load
+stages are not timed out while they are still queued behind other requests.
+A stage that has not started within ANALYSIS_QUEUE_TIMEOUT seconds is
+cancelled and answered with its fallback straight away.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+# Seconds each stage may run, measured from the moment it starts.
+# Override per stage with ANALYSIS_DEADLINE_<STAGE>, e.g. ANALYSIS_DEADLINE_SARCASM=3
+DEFAULT_STAGE_DEADLINES = {
+    'emotion': 5.0,
+    'sarcasm': 8.0,
+    'simplification': 8.0,
+    'formality': 5.0,
+    'tone': 5.0,
+    'slang': 5.0
+}
+DEFAULT_DEADLINE = 5.0
+# Seconds a stage may wait in the pool queue before it is skipped
+ANALYSIS_QUEUE_TIMEOUT = float(os.getenv('ANALYSIS_QUEUE_TIMEOUT', '5'))
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('ANALYSIS_WORKERS', '8')),
+    thread_name_prefix='analysis'
+)
+
+
+def get_stage_deadline(name):
+    """Deadline in seconds for a stage, honouring the environment override"""
+    override = os.getenv(f'ANALYSIS_DEADLINE_{name.upper()}')
+    if override:
+        try:
+            return float(override)
+        except ValueError:
+            print(f"Ignoring invalid deadline override for {name}: {override}")
+    return DEFAULT_STAGE_DEADLINES.get(name, DEFAULT_DEADLINE)
+
+
+class AnalysisStage:
+    """
+    One independent engine call plus the cheap answer used when it is late.
+    default is the result used if the fallback itself raises.
+    """
+
+    def __init__(self, name, func, fallback, deadline=None, default=None):
+        self.name = name
+        self.func = func
+        self.fallback = fallback
+        self.default = default
+        self.deadline = deadline if deadline is not None else get_stage_deadline(name)
+
+
+class _StageRun:
+    """Runs a stage on the pool and records when it actually started"""
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.started = threading.Event()
+        self.started_at = None
+
+    def __call__(self):
+        self.started_at = time.monotonic()
+        self.started.set()
+        return self.stage.func()
+
+
+def _run_fallback(stage):
+    try:
+        return stage.fallback(), None
+    except Exception as e:
+        print(f"Fallback for analysis stage '{stage.name}' failed ({e}), using default")
+        return stage.default, e
+
+
+def run_stages(stages):
+    """
+    Run all stages concurrently and wait for each up to its own deadline.
+
+    Returns:
+        (results, status) where results maps stage name to its output and
+        status maps stage name to {'status': 'ok'|'timeout'|'error', 'elapsed_ms': float}.
+        A stage whose fallback also raised gets its default and status 'error'.
+    """
+    started = time.monotonic()
+    runs = {stage.name: _StageRun(stage) for stage in stages}
+    futures = {stage.name: _executor.submit(runs[stage.name]) for stage in stages}
+
+    results = {}
+    status = {}
+
+    # Wait on the shortest deadlines first so a slow stage never delays the check of a fast one
+    for stage in sorted(stages, key=lambda s: s.deadline):
+        run = runs[stage.name]
+        future = futures[stage.name]
+        try:
+            queue_wait = max(ANALYSIS_QUEUE_TIMEOUT - (time.monotonic() - started), 0)
+            if not run.started.wait(queue_wait) and future.cancel():
+                print(f"Analysis stage '{stage.name}' did not start within {ANALYSIS_QUEUE_TIMEOUT:.1f}s, using fallback")
+                results[stage.name], fallback_error = _run_fallback(stage)
+                outcome = 'timeout'
+            else:
+                # Started (or just starting); its deadline counts from then
+                run.started.wait()
+                remaining = max(stage.deadline - (time.monotonic() - run.started_at), 0)
+                results[stage.name] = future.result(timeout=remaining)
+                outcome = 'ok'
+        except FutureTimeoutError:
+            print(f"Analysis stage '{stage.name}' missed its {stage.deadline:.1f}s deadline, using fallback")
+            results[stage.name], fallback_error = _run_fallback(stage)
+            outcome = 'timeout'
+        except Exception as e:
+            print(f"Analysis stage '{stage.name}' failed ({e}), using fallback")
+            results[stage.name], fallback_error = _run_fallback(stage)
+            outcome = 'error'
+        if outcome != 'ok' and fallback_error is not None:
+            outcome = 'error'
+
+        status[stage.name] = {
+            'status': outcome,
+            'elapsed_ms': round((time.monotonic() - started) * 1000, 1)
+        }
+
+    return results, status
@@ -0,0 +1,351 @@
+"""
+In-process text analysis service.
+
+run_text_analysis() fans a transcript out to every engine behind /analyze,
+and analyze_transcript() adds the shared result cache in front of it. The
+/analyze route, /upload-and-analyze and any other caller use these
+directly, so no request has to call back into the server over HTTP.
+"""
+
+from processing.audio_analysis import analyze_audio, predict_tone_basic
+from processing.slang_detect import detect_slang, enhanced_detector
+from processing.robust_emotion_analysis import analyze_emotion_robust
+from processing.sarcasm_detection import get_comprehensive_sarcasm_analysis
+from processing.text_simplification import simplify_text_for_learners, get_text_readability
+from processing.formality_analysis import analyze_formality
+from processing.text_context import TextContext
+from processing.analysis_pipeline import AnalysisStage, run_stages
+from processing.result_cache import cache_from_env, normalize_transcript
+
+# Full /analyze responses, keyed by normalized transcript and dataset/model versions
+analysis_cache = cache_from_env('analyze')
+
+
+def enhance_emotion_analysis(transcript, base_tone):
+    """
+    Enhanced emotion detection with improved sensitivity and pattern matching
+    """
+    transcript_lower = TextContext.of(transcript).lower
+    
+    # Enhanced emotion patterns with intensity modifiers and phrases
+    emotion_patterns = {
+        'happy': {
+            'keywords': ['happy', 'joy', 'joyful', 'wonderful', 'great', 'awesome', 'fantastic', 'love', 'smile', 'glad', 'cheerful', 'delighted', 'content'],
+            'phrases': ["i'm so happy", "so happy", "really happy", "very happy", "feel great", "feeling good", "love this", "this is great", "makes me happy"],
+            'intensifiers': ['so', 'very', 'really', 'extremely', 'super', 'totally', 'absolutely', 'incredibly']
+        },
+        'excited': {
+            'keywords': ['excited', 'thrilled', 'ecstatic', 'exhilarated', 'pumped', 'stoked', 'hyped', 'enthusiastic', 'eager'],
+            'phrases': ["i'm so excited", "so excited", "really excited", "very excited", "can't wait", "so pumped", "really thrilled", "absolutely thrilled"],
+            'intensifiers': ['so', 'very', 'really', 'extremely', 'super', 'totally', 'absolutely', 'incredibly']
+        },
+        'angry': {
+            'keywords': ['angry', 'mad', 'furious', 'rage', 'hate', 'damn', 'shit', 'pissed', 'annoyed', 'irritated', 'frustrated', 'livid', 'frustrating'],
+            'phrases': ["i'm angry", "so mad", "really angry", "pissed off", "fed up", "had enough", "makes me angry", "so frustrating", "really frustrating"],
+            'intensifiers': ['so', 'very', 'really', 'extremely', 'totally', 'absolutely']
+        },
+        'sad': {
+            'keywords': ['sad', 'depressed', 'cry', 'tears', 'hurt', 'pain', 'lonely', 'miserable', 'upset', 'down', 'heartbroken', 'devastated'],
+            'phrases': ["i'm sad", "so sad", "feeling down", "really hurt", "feel terrible", "makes me sad"],
+            'intensifiers': ['so', 'very', 'really', 'extremely', 'quite']
+        },
+        'disappointed': {
+            'keywords': ['disappointed', 'disappointment', 'let down', 'dissatisfied', 'unfulfilled', 'disillusioned', 'underwhelmed'],
+            'phrases': ["i'm disappointed", "so disappointed", "really disappointed", "let me down", "such a disappointment", "feel disappointed"],
+            'intensifiers': ['so', 'very', 'really', 'extremely', 'quite', 'totally']
+        },
+        'fear': {
+            'keywords': ['scared', 'afraid', 'fear', 'nervous', 'anxious', 'worried', 'panic', 'terrified', 'frightened', 'alarmed'],
+            'phrases': ["i'm scared", "so scared", "really afraid", "quite nervous", "very anxious", "totally terrified"],
+            'intensifiers': ['so', 'very', 'really', 'extremely', 'quite', 'totally']
+        },
+        'disgust': {
+            'keywords': ['disgusting', 'gross', 'sick', 'revolting', 'awful', 'horrible', 'nasty', 'yuck', 'ew', 'disgusted'],
+            'phrases': ["so gross", "really disgusting", "quite awful", "totally sick", "makes me sick"],
+            'intensifiers': ['so', 'very', 'really', 'extremely', 'quite', 'totally']
+        },
+        'surprise': {
+            'keywords': ['wow', 'amazing', 'unbelievable', 'shocked', 'surprised', 'incredible', 'astonishing', 'unexpected', 'stunned'],
+            'phrases': ["oh wow", "so surprised", "really amazing", "quite shocking", "totally unexpected", "can't believe"],
+            'intensifiers': ['so', 'very', 'really', 'extremely', 'quite', 'totally']
+        },
+        'interest': {
+            'keywords': ['interested', 'curious', 'intrigued', 'fascinating', 'wonder', 'wondering', 'interesting', 'compelling', 'captivating'],
+            'phrases': ["so interesting", "really curious", "quite intrigued", "very interesting", "makes me wonder", "i'm curious", "find it interesting", "want to know"],
+            'intensifiers': ['so', 'very', 'really', 'extremely', 'quite', 'totally']
+        }
+    }
+    
+    # Calculate emotion scores with improved algorithm
+    emotion_scores = {}
+    
+    for emotion, patterns in emotion_patterns.items():
+        score = 0
+        
+        # Direct keyword matches
+        for keyword in patterns['keywords']:
+            if keyword in transcript_lower:
+                score += 2  # Base score for keyword
+                
+                # Check for intensity modifiers near the keyword
+                for intensifier in patterns['intensifiers']:
+                    intensifier_phrase = f"{intensifier} {keyword}"
+                    if intensifier_phrase in transcript_lower:
+                        score += 3  # Bonus for intensified emotion
+        
+        # Phrase pattern matches (higher weight)
+        for phrase in patterns['phrases']:
+            if phrase in transcript_lower:
+                score += 5  # High score for complete phrases
+        
+        # Check for "I'm" constructions
+        personal_patterns = [f"i'm {keyword}" for keyword in patterns['keywords'][:5]]  # Top 5 keywords
+        for pattern in personal_patterns:
+            if pattern in transcript_lower:
+                score += 4  # High score for personal statements
+        
+        emotion_scores[emotion] = score
+    
+    # Find the strongest emotion
+    max_emotion = max(emotion_scores, key=emotion_scores.get) if emotion_scores else 'neutral'
+    max_score = emotion_scores.get(max_emotion, 0)
+    
+    # Lower threshold - even 1 strong indicator should trigger detection
+    if max_score >= 2:  # Lowered from 2 to 1 for better sensitivity
+        confidence = min(max_score * 0.15, 0.95)  # Scale confidence appropriately
+        return {
+            'primary_tone': base_tone,
+            'detected_emotion': max_emotion,
+            'confidence': confidence,
+            'emotion_scores': emotion_scores,
+            'detection_method': 'enhanced_pattern_matching'
+        }
+    else:
+        # If no strong emotion detected, set neutral
+        return {
+            'primary_tone': base_tone,
+            'detected_emotion': 'neutral',
+            'confidence': 0.4,
+            'emotion_scores': emotion_scores,
+            'detection_method': 'default_neutral'
+        }
+
+def _empty_slang_analysis(summary='No slang or modern expressions detected.'):
+    return {
+        'found_terms': {},
+        'categories': {},
+        'statistics': enhanced_detector.get_slang_statistics(),
+        'summary': summary
+    }
+
+def get_comprehensive_slang_analysis(transcript):
+    """Get detailed slang analysis with categorization"""
+    slang_results = detect_slang(transcript)
+    
+    if not slang_results:
+        return _empty_slang_analysis()
+    
+    # Categorize found terms
+    categories = {
+        'acronym': [],
+        'genz_word': [],
+        'genz_slang': [],
+        'emoji': []
+    }
+    
+    high_popularity_count = 0
+    
+    for term, info in slang_results.items():
+        term_type = info.get('type', 'unknown')
+        popularity = info.get('popularity', 'medium')
+        
+        if term_type in categories:
+            categories[term_type].append({
+                'term': term,
+                'meaning': info.get('meaning', ''),
+                'popularity': popularity,
+                'example': info.get('example', ''),
+                'name': info.get('name', '')  # For emojis
+            })
+        
+        if popularity == 'high':
+            high_popularity_count += 1
+    
+    # Generate summary
+    total_found = len(slang_results)
+    summary_parts = []
+    
+    if categories['genz_word']:
+        summary_parts.append(f"{len(categories['genz_word'])} modern slang terms")
+    if categories['emoji']:
+        summary_parts.append(f"{len(categories['emoji'])} emojis with special meanings")
+    if categories['acronym']:
+        summary_parts.append(f"{len(categories['acronym'])} abbreviations")
+    if categories['genz_slang']:
+        summary_parts.append(f"{len(categories['genz_slang'])} Gen Z expressions")
+    
+    if summary_parts:
+        summary = f"Found {total_found} modern expressions: " + ", ".join(summary_parts) + "."
+        if high_popularity_count > 0:
+            summary += f" {high_popularity_count} are highly popular/trending terms."
+    else:
+        summary = f"Found {total_found} expressions in modern internet/youth language."
+    
+    return {
+        'found_terms': slang_results,
+        'categories': categories,
+        'statistics': enhanced_detector.get_slang_statistics(),
+        'summary': summary,
+        'trends': {
+            'total_found': total_found,
+            'high_popularity': high_popularity_count,
+            'has_emojis': len(categories['emoji']) > 0,
+            'has_modern_slang': len(categories['genz_word']) > 0
+        }
+    }
+
+def build_analysis_stages(context):
+    """
+    Independent /analyze engines with the rule-based fallbacks used when they
+    run late, and the defaults used if even a fallback fails
+    """
+    return [
+        AnalysisStage(
+            'emotion',
+            lambda: analyze_emotion_robust(text=context),
+            lambda: analyze_emotion_robust(text=context, use_patterns=False),
+            default={
+                'text_analysis': {'emotion': 'neutral', 'confidence': 0.3},
+                'multimodal_analysis': {'primary_emotion': 'neutral', 'confidence': 0.3, 'modality': 'text_with_emoji', 'emoji_influence': False}
+            }
+        ),
+        AnalysisStage(
+            'sarcasm',
+            lambda: get_comprehensive_sarcasm_analysis(context),
+            lambda: get_comprehensive_sarcasm_analysis(context, use_llm=False),
+            default={
+                'sarcasm_detected': False, 'confidence': 0.0, 'sarcasm_type': None, 'reasons': [],
+                'highlighted_text': context.text, 'sarcastic_segments': [], 'sarcastic_spans': [],
+                'highlighting_method': 'none', 'explanation': 'Sarcasm analysis is unavailable.',
+                'original_text': context.text
+            }
+        ),
+        AnalysisStage(
+            'simplification',
+            lambda: simplify_text_for_learners(context),
+            lambda: simplify_text_for_learners(context, use_llm=False),
+            default={
+                'success': False, 'original_text': context.text, 'simplified_text': context.text,
+                'key_explanations': [], 'cultural_notes': [], 'word_substitutions': {}, 'method': 'none'
+            }
+        ),
+        AnalysisStage(
+            'formality',
+            lambda: analyze_formality(context),
+            lambda: analyze_formality(context, use_lexicon=False),
+            default={'formality_level': 'unknown', 'confidence': 0.0, 'details': {}, 'indicators': []}
+        ),
+        AnalysisStage(
+            'tone',
+            lambda: analyze_audio(context),
+            lambda: predict_tone_basic(context),
+            default='Neutral'
+        ),
+        AnalysisStage(
+            'slang',
+            lambda: get_comprehensive_slang_analysis(context),
+            lambda: _empty_slang_analysis('Slang analysis was skipped because it took too long.'),
+            default=_empty_slang_analysis('Slang analysis is unavailable.')
+        )
+    ]
+
+def run_text_analysis(transcript):
+    """
+    Run every /analyze engine on a transcript.
+
+    Returns:
+        (response, complete) where complete is False when any stage had to
+        fall back because it timed out or failed
+    """
+    # Preprocess once and share the result with every engine below
+    context = TextContext(transcript)
+    
+    # The engines are independent, so run them concurrently; any stage that
+    # misses its deadline is answered with its rule-based fallback
+    results, status = run_stages(build_analysis_stages(context))
+    complete = all(stage['status'] == 'ok' for stage in status.values())
+    
+    # NEW: Use robust emotion analysis
+    improved_analysis = results['emotion']
+    
+    # NEW: Comprehensive sarcasm analysis with highlighting
+    comprehensive_sarcasm = results['sarcasm']
+    
+    # NEW: Text simplification for better comprehension
+    simplified_analysis = results['simplification']
+    readability_info = get_text_readability(context)
+    
+    # NEW: Formality analysis
+    formality_analysis = results['formality']
+    
+    # Get base tone analysis
+    base_tone = results['tone']
+    
+    # Note: We no longer override tone with "Sarcastic" - sarcasm is handled separately through highlighting
+    
+    # Enhance with more detailed emotion detection (legacy support)
+    enhanced_emotion = enhance_emotion_analysis(context, base_tone)
+    
+    # Get comprehensive slang analysis with all datasets
+    comprehensive_slang = results['slang']
+
+    # Return both old and new analysis for comparison
+    return {
+        "tone": base_tone,
+        "emotion_analysis": enhanced_emotion,  # Legacy
+        "improved_emotion_analysis": improved_analysis,  # NEW - More accurate and robust
+        "sarcasm_analysis": {
+            'sarcasm_detected': comprehensive_sarcasm['sarcasm_detected'],
+            'confidence': comprehensive_sarcasm['confidence'],
+            'reasons': comprehensive_sarcasm['reasons'],
+            'sarcasm_type': comprehensive_sarcasm['sarcasm_type'],
+            'original_text': comprehensive_sarcasm['original_text']
+        },  # Legacy format
+        "sarcasm_explanation": {
+            'analysis': {
+                'sarcasm_detected': comprehensive_sarcasm['sarcasm_detected'],
+                'confidence': comprehensive_sarcasm['confidence'],
+                'reasons': comprehensive_sarcasm['reasons'],
+                'sarcasm_type': comprehensive_sarcasm['sarcasm_type'],
+                'original_text': comprehensive_sarcasm['original_text']
+            },
+            'explanation': comprehensive_sarcasm['explanation']
+        },  # Legacy format
+        "comprehensive_sarcasm_analysis": comprehensive_sarcasm,  # NEW - Complete sarcasm analysis with highlighting
+        "text_simplification": simplified_analysis,  # NEW - LLM-powered text simplification
+        "readability_analysis": readability_info,  # NEW - Reading level analysis
+        "formality_analysis": formality_analysis,  # NEW - Detailed formality detection
+        "slang": comprehensive_slang['found_terms'],  # Legacy format
+        "comprehensive_slang_analysis": comprehensive_slang,  # NEW - Detailed analysis
+        "transcript_length": context.word_count,
+        "analysis_confidence": "high" if context.word_count > 10 else "low",
+        "recommendation": "Use 'comprehensive_slang_analysis' for detailed modern language insights"
+    }, complete
+
+
+def analyze_transcript(transcript):
+    """
+    The full /analyze response for a transcript, served from the cache when
+    the same (normalized) transcript was analyzed before.
+    """
+    transcript = normalize_transcript(transcript)
+    
+    # Resubmitted transcripts are answered from the cache
+    cache_key = analysis_cache.key_for(transcript)
+    response = analysis_cache.get(cache_key)
+    if response is None:
+        response, complete = run_text_analysis(transcript)
+        # Never pin a degraded (fallback) answer in the cache
+        if complete:
+            analysis_cache.set(cache_key, response)
+    return response
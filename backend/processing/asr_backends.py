@@ -0,0 +1,195 @@
+"""
+Offline speech recognition backends.
+
+ASR_BACKEND picks the recognizer: 'google' (default) keeps the
+speech_recognition chain (Google with a Sphinx fallback), while 'whisper',
+'faster-whisper' and 'vosk' transcribe locally without network access.
+An offline backend keeps a pool of ASR_POOL_SIZE preloaded models in the
+model registry. Requests borrow a model from the pool and hand it back, so
+no request pays the load cost again. The pool loads on first use, or at
+startup with MODEL_WARMUP=1.
+
+Other settings:
+  ASR_MODEL        model size or path (whisper: tiny/base/small/...,
+                   vosk: path to an unpacked model directory)
+  ASR_CPU_THREADS  CPU threads shared by all models in the pool (whisper:
+                   torch's thread count, which is process-wide)
+  ASR_INT8         1 to run int8-quantized models (whisper, faster-whisper)
+  ASR_LANGUAGE     language code passed to the recognizer (default en)
+"""
+
+import json
+import os
+import queue
+
+from processing.model_registry import model_registry
+
+ASR_BACKEND = os.getenv('ASR_BACKEND', 'google').lower()
+ASR_MODEL = os.getenv('ASR_MODEL', '')
+ASR_POOL_SIZE = max(1, int(os.getenv('ASR_POOL_SIZE', '1')))
+ASR_CPU_THREADS = max(1, int(os.getenv('ASR_CPU_THREADS', str(os.cpu_count() or 1))))
+ASR_INT8 = os.getenv('ASR_INT8', '').lower() in ('1', 'true', 'yes', 'on')
+ASR_LANGUAGE = os.getenv('ASR_LANGUAGE', 'en')
+# Model registry entries holding the pools
+ASR_POOL = 'asr_pool'
+WHISPER_POOL = 'whisper_pool'
+
+# Offline recognizers expect 16 kHz mono audio
+ASR_SAMPLE_RATE = 16000
+
+
+class ASRBackend:
+    """Loads one recognizer model and transcribes DecodedAudio with it"""
+
+    name = None
+    default_model = None
+
+    def __init__(self, model_name=None, threads=1, int8=False, language='en', total_threads=None):
+        self.model_name = model_name or self.default_model
+        self.threads = threads
+        # Thread budget of the whole pool, for libraries that only have a process-wide setting
+        self.total_threads = total_threads or threads
+        self.int8 = int8
+        self.language = language
+
+    def load(self):
+        raise NotImplementedError
+
+    def transcribe(self, model, audio):
+        raise NotImplementedError
+
+
+class WhisperBackend(ASRBackend):
+    name = 'whisper'
+    default_model = 'base'
+
+    def load(self):
+        import torch
+        import whisper
+        # torch.set_num_threads is process-wide, not per model: every Whisper
+        # model in the pool (and any other torch code in this process) runs on
+        # the same intra-op threads, so it gets the pool's whole budget
+        torch.set_num_threads(self.total_threads)
+        model = whisper.load_model(self.model_name, device='cpu')
+        if self.int8:
+            model = quantize_linear_layers(model, whisper.model.Linear)
+        return model
+
+    def transcribe(self, model, audio):
+        samples = audio.resample(ASR_SAMPLE_RATE).float_samples()
+        result = model.transcribe(samples, language=self.language, fp16=False)
+        return result['text'].strip()
+
+
+def quantize_linear_layers(model, linear_class):
+    """
+    The model with every linear_class layer (a torch.nn.Linear subclass)
+    replaced by an int8 dynamically quantized Linear. Raises RuntimeError if
+    no layer was replaced.
+    """
+    import torch
+    # quantize_dynamic matches exact module types, and whisper's Linear is a
+    # subclass that only casts its weights to the input dtype (a no-op for
+    # float32 on CPU), so those layers are quantized as plain nn.Linear
+    for module in model.modules():
+        if type(module) is linear_class:
+            module.__class__ = torch.nn.Linear
+    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    replaced = sum(1 for module in model.modules() if isinstance(module, torch.nn.quantized.dynamic.Linear))
+    if not replaced:
+        raise RuntimeError("int8 quantization found no Linear layers to replace")
+    print(f"Quantized {replaced} Linear layers to int8")
+    return model
+
+
+class FasterWhisperBackend(ASRBackend):
+    name = 'faster-whisper'
+    default_model = 'base'
+
+    def load(self):
+        from faster_whisper import WhisperModel
+        return WhisperModel(
+            self.model_name,
+            device='cpu',
+            compute_type='int8' if self.int8 else 'float32',
+            cpu_threads=self.threads
+        )
+
+    def transcribe(self, model, audio):
+        samples = audio.resample(ASR_SAMPLE_RATE).float_samples()
+        segments, _ = model.transcribe(samples, language=self.language)
+        return ' '.join(segment.text.strip() for segment in segments).strip()
+
+
+class VoskBackend(ASRBackend):
+    name = 'vosk'
+    default_model = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'models', 'vosk'))
+
+    def load(self):
+        from vosk import Model, SetLogLevel
+        SetLogLevel(-1)
+        return Model(self.model_name)
+
+    def transcribe(self, model, audio):
+        from vosk import KaldiRecognizer
+        audio = audio.resample(ASR_SAMPLE_RATE)
+        recognizer = KaldiRecognizer(model, audio.sample_rate)
+        recognizer.AcceptWaveform(audio.pcm.tobytes())
+        return json.loads(recognizer.FinalResult()).get('text', '').strip()
+
+
+BACKENDS = {backend.name: backend for backend in (WhisperBackend, FasterWhisperBackend, VoskBackend)}
+
+
+class ASRPool:
+    """A fixed set of preloaded models; each transcription borrows one"""
+
+    def __init__(self, backend, size):
+        self.backend = backend
+        self.size = size
+        self._models = queue.Queue()
+        for index in range(size):
+            print(f"Loading {backend.name} model '{backend.model_name}' ({index + 1}/{size}, "
+                  f"{backend.threads} threads{', int8' if backend.int8 else ''})")
+            self._models.put(backend.load())
+
+    def transcribe(self, audio):
+        model = self._models.get()
+        try:
+            return self.backend.transcribe(model, audio)
+        finally:
+            self._models.put(model)
+
+
+def create_backend(name, model_name=None, pool_size=1, cpu_threads=1, int8=False, language='en'):
+    """ASRBackend for a backend name; the CPU thread budget is split across the pool"""
+    backend_class = BACKENDS[name]
+    return backend_class(model_name, threads=max(1, cpu_threads // pool_size), int8=int8, language=language,
+                         total_threads=cpu_threads)
+
+
+def get_asr_pool():
+    """The configured offline recognizer pool, or None when ASR_BACKEND is 'google' or failed to load"""
+    if ASR_BACKEND not in BACKENDS:
+        return None
+    return model_registry.get(ASR_POOL)
+
+
+def get_whisper_pool():
+    """A Whisper pool for explicit Whisper transcription, shared with ASR_POOL when that is Whisper"""
+    if ASR_BACKEND == WhisperBackend.name:
+        return get_asr_pool()
+    if not model_registry.is_registered(WHISPER_POOL):
+        model_registry.register(WHISPER_POOL, lambda: ASRPool(
+            create_backend(WhisperBackend.name, ASR_MODEL if ASR_BACKEND == FasterWhisperBackend.name else None, 1, ASR_CPU_THREADS, ASR_INT8, ASR_LANGUAGE), 1
+        ))
+    return model_registry.get(WHISPER_POOL)
+
+
+if ASR_BACKEND in BACKENDS:
+    model_registry.register(ASR_POOL, lambda: ASRPool(
+        create_backend(ASR_BACKEND, ASR_MODEL, ASR_POOL_SIZE, ASR_CPU_THREADS, ASR_INT8, ASR_LANGUAGE),
+        ASR_POOL_SIZE
+    ))
+elif ASR_BACKEND != 'google':
+    print(f"Unknown ASR_BACKEND '{ASR_BACKEND}', using Google speech recognition")
@@ -1,56 +1,54 @@
 import os
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
+import threading
+from processing.text_context import TextContext
+from processing.tone_index import ToneIndex
+from processing.tone_model import get_tone_model
 
-# Load and prepare tone dataset
-def load_tone_dataset():
-    try:
-        # Path to the tone dataset - using absolute path
-        tone_file_path = '/Users/keiralie/Documents/GitHub/ImmigrantSlangster/backend/Datasets/tone_v1.txt'
-        
-        # Read the tone dataset
-        tone_data = []
-        with open(tone_file_path, 'r', encoding='utf-8') as file:
-            for line in file:
-                line = line.strip()
-                if ' || ' in line:
-                    text, tone = line.split(' || ')
-                    # Clean up the tone (remove trailing periods)
-                    tone = tone.rstrip('.')
-                    tone_data.append({'text': text.strip(), 'tone': tone.strip()})
-        
-        print(f"Loaded {len(tone_data)} tone examples from dataset")
-        return pd.DataFrame(tone_data)
-    except Exception as e:
-        print(f"Error loading tone dataset: {e}")
-        return None
-
-# Global variables for the tone analysis model
-TONE_DATA = load_tone_dataset()
+# Global variables for the tone analysis model (loaded on first use from the
+# prebuilt artifact written by build_tone_model.py)
 VECTORIZER = None
 TONE_VECTORS = None
+TONE_INDEX = None
+_tone_model_unavailable = False
+_tone_model_lock = threading.Lock()
+
+def _parse_tone_neighbors(value):
+    """TONE_NEIGHBORS as a positive int; anything else falls back to 1"""
+    try:
+        neighbors = int(value)
+    except (TypeError, ValueError):
+        neighbors = 0
+    if neighbors < 1:
+        print(f"Ignoring invalid TONE_NEIGHBORS={value!r} (must be a whole number >= 1), using 1")
+        return 1
+    return neighbors
+
+# Neighbors consulted per prediction; 1 keeps the nearest-example behaviour,
+# larger values take a similarity-weighted vote across the main tone categories
+TONE_NEIGHBORS = _parse_tone_neighbors(os.getenv('TONE_NEIGHBORS', '1'))
 
 def initialize_tone_model():
-    """Initialize the TF-IDF vectorizer and compute tone vectors"""
-    global VECTORIZER, TONE_VECTORS
-    
-    if TONE_DATA is None:
-        return False
-    
-    # Create TF-IDF vectorizer
-    VECTORIZER = TfidfVectorizer(
-        max_features=1000,
-        stop_words='english',
-        ngram_range=(1, 2),  # Include both unigrams and bigrams
-        lowercase=True
-    )
-    
-    # Fit the vectorizer on the tone dataset
-    TONE_VECTORS = VECTORIZER.fit_transform(TONE_DATA['text'])
-    
-    return True
+    """Load the TF-IDF vectorizer and tone vectors and index them"""
+    global VECTORIZER, TONE_VECTORS, TONE_INDEX, _tone_model_unavailable
+    
+    with _tone_model_lock:
+        if TONE_INDEX is not None:
+            return True
+        if _tone_model_unavailable:
+            return False
+        
+        model = get_tone_model()
+        if model is None:
+            _tone_model_unavailable = True
+            return False
+        
+        VECTORIZER = model.vectorizer
+        TONE_VECTORS = model.vectors
+        
+        # Inverted index so lookups only touch examples sharing a term with the query
+        TONE_INDEX = ToneIndex(TONE_VECTORS, model.labels)
+        
+        return True
 
 def map_to_main_categories(specific_tone):
     """Map specific tones to main categories"""
@@ -102,41 +100,38 @@ def map_to_main_categories(specific_tone):
     
     return tone_mapping.get(specific_tone, 'Neutral')
 
+def _tone_from_neighbors(neighbors, context):
+    """Main tone category from nearest neighbors, or the keyword fallback when nothing is close"""
+    # If confidence is too low, fall back to keyword-based analysis
+    if not neighbors or neighbors[0].score < 0.1:
+        return predict_tone_basic(context)
+    
+    main_tone, _ = ToneIndex.vote(neighbors, map_to_main_categories)
+    return main_tone
+
 def predict_tone_advanced(transcript):
     """Use machine learning to predict tone based on similarity to training data"""
-    global VECTORIZER, TONE_VECTORS
+    context = TextContext.of(transcript)
+    transcript = context.text
     
-    if VECTORIZER is None or TONE_VECTORS is None:
+    if TONE_INDEX is None:
         if not initialize_tone_model():
-            return predict_tone_basic(transcript)  # Fallback to basic method
+            return predict_tone_basic(context)  # Fallback to basic method
     
     try:
-        # Transform the input transcript
+        # Transform the input transcript and look up its nearest tone examples
         input_vector = VECTORIZER.transform([transcript])
+        neighbors = TONE_INDEX.search(input_vector, k=TONE_NEIGHBORS)
         
-        # Calculate cosine similarity with all tone examples
-        similarities = cosine_similarity(input_vector, TONE_VECTORS).flatten()
-        
-        # Find the most similar example
-        best_match_idx = np.argmax(similarities)
-        confidence = similarities[best_match_idx]
-        
-        # If confidence is too low, fall back to keyword-based analysis
-        if confidence < 0.1:
-            return predict_tone_basic(transcript)
-        
-        specific_tone = TONE_DATA.iloc[best_match_idx]['tone']
-        main_tone = map_to_main_categories(specific_tone)
-        
-        return main_tone
+        return _tone_from_neighbors(neighbors, context)
         
     except Exception as e:
         print(f"Error in advanced tone prediction: {e}")
-        return predict_tone_basic(transcript)
+        return predict_tone_basic(context)
 
 def predict_tone_basic(transcript):
     """Basic keyword-based tone prediction as fallback"""
-    transcript_lower = transcript.lower()
+    transcript_lower = TextContext.of(transcript).lower
     
     # Appreciative keywords
     appreciative_words = ['thank', 'appreciate', 'grateful', 'amazing', 'wonderful', 'incredible', 'inspiring', 'brilliant', 'fantastic', 'excellent']
@@ -173,10 +168,45 @@ def predict_tone_basic(transcript):
     else:
         return "Neutral"
 
+def predict_tone_batch(transcripts):
+    """
+    Tone prediction for many transcripts at once.
+
+    The whole batch is transformed as one sparse matrix and each row is looked
+    up in the tone index. Results are returned in input order and match
+    predict_tone_advanced.
+    """
+    contexts = [TextContext.of(transcript) for transcript in transcripts]
+    tones = ["Neutral"] * len(contexts)
+    pending = [i for i, context in enumerate(contexts) if not context.is_blank]
+    if not pending:
+        return tones
+    
+    if TONE_INDEX is None:
+        if not initialize_tone_model():
+            for i in pending:
+                tones[i] = predict_tone_basic(contexts[i])
+            return tones
+    
+    try:
+        input_vectors = VECTORIZER.transform([contexts[i].text for i in pending])
+        all_neighbors = TONE_INDEX.search_batch(input_vectors, k=TONE_NEIGHBORS)
+    except Exception as e:
+        print(f"Error in batch tone prediction: {e}")
+        for i in pending:
+            tones[i] = predict_tone_basic(contexts[i])
+        return tones
+    
+    for i, neighbors in zip(pending, all_neighbors):
+        tones[i] = _tone_from_neighbors(neighbors, contexts[i])
+    
+    return tones
+
 def analyze_audio(transcript):
-    """Main function to analyze tone from transcript"""
-    if not transcript or not transcript.strip():
+    """Main function to analyze tone from transcript (a str or a TextContext)"""
+    context = TextContext.of(transcript)
+    if context.is_blank:
         return "Neutral"
     
     # Try advanced analysis first, fall back to basic if needed
-    return predict_tone_advanced(transcript)
+    return predict_tone_advanced(context)
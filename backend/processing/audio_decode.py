@@ -0,0 +1,158 @@
+"""
+In-memory audio decoding.
+
+Uploads are decoded once into a buffer of 16-bit mono PCM, either straight
+from a PCM WAV file or by streaming ffmpeg's raw output through a pipe.
+Nothing is written to disk. Slices of a DecodedAudio share the buffer, so the
+recognizer, the feature extractors and the chunker all read the same bytes.
+"""
+
+import io
+import math
+import os
+import shutil
+import subprocess
+import wave
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Speech recognizers work on 16 kHz mono 16-bit audio
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+FFMPEG_TIMEOUT = int(os.getenv('FFMPEG_TIMEOUT', '120'))
+
+
+def find_ffmpeg():
+    """The ffmpeg binary bundled next to the backend, else the one on PATH"""
+    local_ffmpeg = os.path.join(BACKEND_DIR, 'ffmpeg')
+    if os.path.exists(local_ffmpeg):
+        return local_ffmpeg
+    return shutil.which('ffmpeg')
+
+
+class DecodedAudio:
+    """16-bit mono PCM held in memory; slicing never copies the samples"""
+
+    def __init__(self, pcm, sample_rate=SAMPLE_RATE):
+        pcm = memoryview(pcm).cast('B')
+        # A truncated stream can end mid-sample; drop the partial sample
+        self.pcm = pcm[:len(pcm) - len(pcm) % SAMPLE_WIDTH]
+        self.sample_rate = sample_rate
+
+    def __len__(self):
+        return len(self.pcm) // SAMPLE_WIDTH
+
+    @property
+    def duration(self):
+        return len(self) / self.sample_rate
+
+    @property
+    def samples(self):
+        """int16 numpy view over the buffer"""
+        return np.frombuffer(self.pcm, dtype='<i2')
+
+    def float_samples(self):
+        """float32 samples in [-1, 1] (what librosa.load returns)"""
+        return self.samples.astype(np.float32) / 32768.0
+
+    def slice(self, start_seconds, end_seconds=None):
+        start = max(0, int(start_seconds * self.sample_rate)) * SAMPLE_WIDTH
+        end = len(self.pcm) if end_seconds is None else int(end_seconds * self.sample_rate) * SAMPLE_WIDTH
+        return DecodedAudio(self.pcm[start:min(end, len(self.pcm))], self.sample_rate)
+
+    def resample(self, sample_rate):
+        """This audio at another sample rate (linear interpolation; returns self if unchanged)"""
+        if sample_rate == self.sample_rate or not len(self):
+            return self
+        count = max(1, int(round(len(self) * sample_rate / self.sample_rate)))
+        positions = np.arange(count) * (self.sample_rate / sample_rate)
+        resampled = np.interp(positions, np.arange(len(self)), self.samples)
+        return DecodedAudio(np.round(resampled).astype('<i2').tobytes(), sample_rate)
+
+    def peak_dbfs(self):
+        if not len(self):
+            return -math.inf
+        peak = int(np.abs(self.samples.astype(np.int32)).max())
+        return 20 * math.log10(peak / 32768.0) if peak else -math.inf
+
+    def apply_gain(self, gain_db):
+        """New DecodedAudio with the volume changed by gain_db (clipped to int16)"""
+        scaled = self.samples.astype(np.float32) * (10 ** (gain_db / 20))
+        return DecodedAudio(np.clip(scaled, -32768, 32767).astype('<i2').tobytes(), self.sample_rate)
+
+    def to_audio_data(self):
+        """speech_recognition.AudioData for this audio (copies the bytes once)"""
+        import speech_recognition as sr
+        return sr.AudioData(self.pcm.tobytes(), self.sample_rate, SAMPLE_WIDTH)
+
+
+def _read_pcm_wav(data):
+    """DecodedAudio for a 16-bit PCM WAV file, or None if it needs ffmpeg"""
+    try:
+        with wave.open(io.BytesIO(data) if isinstance(data, (bytes, bytearray)) else data, 'rb') as wav_file:
+            if wav_file.getsampwidth() != SAMPLE_WIDTH or wav_file.getcomptype() != 'NONE':
+                return None
+            channels = wav_file.getnchannels()
+            sample_rate = wav_file.getframerate()
+            frames = wav_file.readframes(wav_file.getnframes())
+    except (wave.Error, EOFError):
+        return None
+
+    # A truncated file can end mid-frame; keep only whole frames
+    frame_size = channels * SAMPLE_WIDTH
+    frames = frames[:len(frames) - len(frames) % frame_size]
+    if channels > 1:
+        # Mix down to mono, averaging channels the way pydub's set_channels(1) did
+        samples = np.frombuffer(frames, dtype='<i2').reshape(-1, channels).astype(np.int32)
+        frames = (samples.sum(axis=1) // channels).astype('<i2').tobytes()
+    return DecodedAudio(frames, sample_rate)
+
+
+def _decode_with_ffmpeg(audio, sample_rate):
+    ffmpeg = find_ffmpeg()
+    if ffmpeg is None:
+        print("ffmpeg not found; install it or place a binary next to the backend")
+        return None
+
+    from_bytes = isinstance(audio, (bytes, bytearray))
+    cmd = [
+        ffmpeg, '-nostdin', '-hide_banner', '-loglevel', 'error',
+        '-i', 'pipe:0' if from_bytes else audio,
+        '-f', 's16le',              # raw 16-bit PCM
+        '-acodec', 'pcm_s16le',
+        '-ac', '1',                 # mono
+        '-ar', str(sample_rate),
+        'pipe:1'
+    ]
+    result = subprocess.run(cmd, input=audio if from_bytes else None, capture_output=True, timeout=FFMPEG_TIMEOUT)
+    if result.returncode != 0:
+        print(f"FFmpeg decoding failed: {result.stderr.decode('utf-8', 'replace').strip()}")
+        return None
+    return DecodedAudio(result.stdout, sample_rate)
+
+
+def decode_audio(audio, sample_rate=SAMPLE_RATE):
+    """
+    Decode an audio file path or raw file bytes (any format ffmpeg reads)
+    into DecodedAudio. PCM WAV files are read directly at their own sample
+    rate; everything else is resampled to sample_rate. Returns None on failure.
+    """
+    try:
+        if isinstance(audio, DecodedAudio):
+            return audio
+
+        if isinstance(audio, (bytes, bytearray)):
+            decoded = _read_pcm_wav(audio)
+        elif os.path.splitext(audio)[1].lower() == '.wav':
+            decoded = _read_pcm_wav(audio)
+        else:
+            decoded = None
+
+        if decoded is None:
+            decoded = _decode_with_ffmpeg(audio, sample_rate)
+        return decoded
+
+    except Exception as e:
+        print(f"Error decoding audio: {e}")
+        return None
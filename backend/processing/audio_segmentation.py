@@ -0,0 +1,229 @@
+"""
+Silence-based segmentation and parallel transcription of long recordings.
+
+An energy VAD over the decoded buffer finds where speech pauses, and the
+recording is cut there into segments of at most MAX_SEGMENT_SECONDS. The
+segments are transcribed concurrently on a bounded pool, so a long lecture
+takes about as long as its slowest segment. Only a segment with no pause
+long enough to cut at is force-split, with a short overlap. When the pieces
+are stitched back together, words repeated inside that overlap are dropped
+once.
+"""
+
+import math
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+FRAME_SECONDS = 0.03
+# A frame is speech when it is this many dB above the recording's noise floor
+VAD_MARGIN_DB = float(os.getenv('VAD_MARGIN_DB', '10'))
+MIN_SILENCE_SECONDS = 0.3
+MIN_SPEECH_SECONDS = 0.15
+PADDING_SECONDS = 0.2
+FORCED_SPLIT_OVERLAP_SECONDS = 1.0
+# Each forced split advances by half a segment minus half the overlap, so
+# segments must be longer than the overlap; below this the splitting crawls
+MIN_SEGMENT_SECONDS = 2 * FORCED_SPLIT_OVERLAP_SECONDS
+
+
+def _max_segment_from_env():
+    max_segment = float(os.getenv('MAX_SEGMENT_SECONDS', '20'))
+    if not max_segment >= MIN_SEGMENT_SECONDS:
+        print(f"MAX_SEGMENT_SECONDS={max_segment} is below {MIN_SEGMENT_SECONDS}s; using {MIN_SEGMENT_SECONDS}s")
+        return MIN_SEGMENT_SECONDS
+    return max_segment
+
+
+MAX_SEGMENT_SECONDS = _max_segment_from_env()
+# Upper bound on speaking rate, used to size the overlap search when stitching
+MAX_WORDS_PER_SECOND = 4
+
+Segment = namedtuple('Segment', ['start', 'end'])
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('TRANSCRIBE_WORKERS', '4')),
+    thread_name_prefix='transcribe'
+)
+
+
+def frame_energies(audio, frame_seconds=FRAME_SECONDS):
+    """RMS level in dBFS of each frame of a DecodedAudio"""
+    frame_length = max(1, int(audio.sample_rate * frame_seconds))
+    frame_count = len(audio) // frame_length
+    if frame_count == 0:
+        return np.zeros(0)
+    frames = audio.samples[:frame_count * frame_length].reshape(frame_count, frame_length).astype(np.float32)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20 * np.log10(rms / 32768.0 + 1e-10)
+
+
+def _speech_runs(is_speech, min_gap, min_length):
+    """(start, end) frame ranges of speech, bridging gaps shorter than min_gap frames"""
+    runs = []
+    start = None
+    silence = 0
+    for index, speech in enumerate(is_speech):
+        if speech:
+            if start is None:
+                start = index
+            silence = 0
+        elif start is not None:
+            silence += 1
+            if silence >= min_gap:
+                runs.append((start, index - silence + 1))
+                start = None
+                silence = 0
+    if start is not None:
+        runs.append((start, len(is_speech) - silence))
+    return [(start, end) for start, end in runs if end - start >= min_length]
+
+
+def detect_speech_segments(audio, max_segment=MAX_SEGMENT_SECONDS, noise_floor=None, merge=True, energies=None):
+    """
+    Segments (in seconds) covering the speech in a DecodedAudio, each at most
+    max_segment long. A recording with no detectable pause or level change is
+    returned as fixed windows.
+
+    noise_floor (dBFS) overrides the estimate from this audio alone, for
+    callers that measured it over a longer stream; no speech above it then
+    means no segments. merge=False keeps every utterance a segment of its own
+    instead of packing neighbours up to max_segment. energies are this
+    audio's frame_energies, for callers that already have them.
+    """
+    if not max_segment >= MIN_SEGMENT_SECONDS:
+        raise ValueError(f"max_segment must be at least {MIN_SEGMENT_SECONDS}s, got {max_segment}")
+    duration = audio.duration
+    if energies is None:
+        energies = frame_energies(audio)
+    if len(energies) == 0:
+        return []
+
+    given_floor = noise_floor is not None
+    if not given_floor:
+        noise_floor = np.percentile(energies, 10)
+    is_speech = energies > noise_floor + VAD_MARGIN_DB
+    if not is_speech.any():
+        if given_floor:
+            return []
+        # Flat level (constant noise, or speech without pauses): no cut points to find
+        return _fixed_windows(0.0, duration, max_segment)
+
+    runs = _speech_runs(
+        is_speech,
+        min_gap=max(1, round(MIN_SILENCE_SECONDS / FRAME_SECONDS)),
+        min_length=max(1, round(MIN_SPEECH_SECONDS / FRAME_SECONDS))
+    )
+
+    # Pad each run, then merge neighbours while the result stays within max_segment
+    segments = []
+    for start_frame, end_frame in runs:
+        start = max(0.0, start_frame * FRAME_SECONDS - PADDING_SECONDS)
+        end = min(duration, end_frame * FRAME_SECONDS + PADDING_SECONDS)
+        if merge and segments and end - segments[-1].start <= max_segment:
+            segments[-1] = Segment(segments[-1].start, end)
+        else:
+            # Padding never reaches into the previous segment
+            segments.append(Segment(max(start, segments[-1].end) if segments else start, end))
+
+    # Runs longer than max_segment are cut at their quietest frame
+    split = []
+    for segment in segments:
+        split.extend(_split_long_segment(segment, energies, noise_floor, max_segment))
+    return split
+
+
+def _fixed_windows(start, end, max_segment, overlap=FORCED_SPLIT_OVERLAP_SECONDS):
+    windows = []
+    while end - start > max_segment:
+        windows.append(Segment(start, start + max_segment))
+        start += max_segment - overlap
+    windows.append(Segment(start, end))
+    return windows
+
+
+def _split_long_segment(segment, energies, noise_floor, max_segment):
+    pieces = []
+    start, end = segment
+    while end - start > max_segment:
+        # Quietest frame in the second half of the allowed window
+        first = int((start + max_segment / 2) / FRAME_SECONDS)
+        last = min(int((start + max_segment) / FRAME_SECONDS), len(energies))
+        if last <= first:
+            pieces.append(Segment(start, start + max_segment))
+            start += max_segment - FORCED_SPLIT_OVERLAP_SECONDS
+            continue
+        cut_frame = first + int(np.argmin(energies[first:last]))
+        cut = cut_frame * FRAME_SECONDS
+
+        if energies[cut_frame] <= noise_floor + VAD_MARGIN_DB:
+            # A real pause: cut cleanly
+            pieces.append(Segment(start, cut))
+            start = cut
+        else:
+            # Continuous speech: cut with an overlap that stitching removes
+            pieces.append(Segment(start, cut + FORCED_SPLIT_OVERLAP_SECONDS / 2))
+            start = cut - FORCED_SPLIT_OVERLAP_SECONDS / 2
+    pieces.append(Segment(start, end))
+    return pieces
+
+
+def submit_transcription(audio, segment, transcribe):
+    """
+    Start transcribing one segment of audio on the shared pool. The future's
+    result is the text, or None if transcription failed.
+    """
+    def run():
+        try:
+            return transcribe(audio.slice(segment.start, segment.end))
+        except Exception as e:
+            print(f"Segment {segment.start:.1f}-{segment.end:.1f}s failed transcription: {e}")
+            return None
+
+    return _executor.submit(run)
+
+
+def transcribe_segments(audio, segments, transcribe):
+    """
+    Transcribe each segment concurrently with transcribe(DecodedAudio) -> str.
+    Returns [(segment, text or None)] in time order; failed segments give None.
+    """
+    futures = [submit_transcription(audio, segment, transcribe) for segment in segments]
+    return [(segment, future.result()) for segment, future in zip(segments, futures)]
+
+
+def _normalize_word(word):
+    return ''.join(ch for ch in word.lower() if ch.isalnum())
+
+
+def _overlap_length(previous_words, next_words, max_words):
+    """Longest k <= max_words such that the last k previous words equal the first k next words"""
+    previous = [_normalize_word(word) for word in previous_words[-max_words:]]
+    following = [_normalize_word(word) for word in next_words[:max_words]]
+    for k in range(min(len(previous), len(following)), 0, -1):
+        if previous[-k:] == following[:k]:
+            return k
+    return 0
+
+
+def stitch_transcripts(pieces):
+    """
+    Join [(segment, text)] in time order. Where two segments overlap in time,
+    the words the next segment repeats from that overlap are dropped;
+    repeated words elsewhere (e.g. "very very") are kept.
+    """
+    words = []
+    previous_segment = None
+    for segment, text in pieces:
+        if not text or not text.strip():
+            continue
+        segment_words = text.split()
+        if previous_segment is not None and segment.start < previous_segment.end and words:
+            overlap_seconds = previous_segment.end - segment.start
+            max_words = math.ceil(overlap_seconds * MAX_WORDS_PER_SECOND) + 1
+            segment_words = segment_words[_overlap_length(words, segment_words, max_words):]
+        words.extend(segment_words)
+        previous_segment = segment
+    return ' '.join(words)
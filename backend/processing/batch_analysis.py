@@ -0,0 +1,70 @@
+"""
+Batch text analysis for large sets of short messages (e.g. classroom chats).
+
+Only the fast, local engines run here: VADER sentiment, the slang matcher,
+formality and the TF-IDF tone model. Each distinct transcript is
+preprocessed and scored once (chat logs repeat "ok", "lol", "thanks" a lot),
+the tone model scores the whole batch as a single sparse matrix, and a
+failure on one message is reported on that item instead of failing the batch.
+
+VADER, slang and formality still run once per distinct message: their
+scans are per-character Python loops, so joining the batch into one text
+would cost the same.
+"""
+
+from processing.text_context import TextContext
+from processing.audio_analysis import predict_tone_batch, predict_tone_basic
+from processing.slang_detect import detect_slang
+from processing.formality_analysis import analyze_formality
+
+
+def _item_error(index, message):
+    return {'index': index, 'status': 'error', 'error': message}
+
+
+def analyze_batch(transcripts):
+    """
+    Analyze a list of transcripts.
+
+    Returns a list with one entry per input, in input order. Successful entries
+    have status 'ok'; entries that could not be analyzed have status 'error'
+    and an 'error' message.
+    """
+    results = [None] * len(transcripts)
+    # Distinct transcript -> its context; repeated messages are scored once
+    contexts = {}
+
+    for index, transcript in enumerate(transcripts):
+        if not isinstance(transcript, str):
+            results[index] = _item_error(index, 'Transcript must be a string')
+        elif transcript not in contexts:
+            contexts[transcript] = TextContext(transcript)
+
+    # Tone for the whole batch in one vectorized pass
+    tones = {}
+    if contexts:
+        try:
+            tones = dict(zip(contexts, predict_tone_batch(list(contexts.values()))))
+        except Exception as e:
+            print(f"Batch tone prediction failed: {e}")
+
+    scored = {}
+    for transcript, context in contexts.items():
+        try:
+            scored[transcript] = {
+                'status': 'ok',
+                'tone': tones[transcript] if transcript in tones else predict_tone_basic(context),
+                'sentiment': context.vader_scores,
+                'slang': detect_slang(context),
+                'formality': analyze_formality(context),
+                'transcript_length': context.word_count
+            }
+        except Exception as e:
+            print(f"Batch analysis failed for {transcript[:40]!r}: {e}")
+            scored[transcript] = {'status': 'error', 'error': str(e)}
+
+    for index, transcript in enumerate(transcripts):
+        if results[index] is None:
+            results[index] = {'index': index, **scored[transcript]}
+
+    return results
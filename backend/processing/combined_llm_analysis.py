@@ -0,0 +1,69 @@
+"""
+Opt-in single-call LLM analysis.
+
+By default /analyze makes two chat completions per transcript: one for text
+simplification and one for sarcasm highlighting, each with its own long
+prompt. With COMBINED_LLM_ANALYSIS=1 both engines instead request the same
+structured completion that returns the simplification, sarcastic segments,
+cultural notes and word substitutions together. The call goes through the LLM
+cache under one key, so when both engines ask at the same time the requests
+are coalesced into a single round-trip and each engine parses its own fields
+out of the shared JSON with its existing parser.
+"""
+
+import os
+
+from processing.llm_cache import llm_cache
+
+COMBINED_LLM_MODEL = "gpt-3.5-turbo"
+# Bump whenever the combined prompt changes so cached answers are not reused
+COMBINED_PROMPT_VERSION = 1
+
+
+def combined_llm_enabled():
+    return os.getenv('COMBINED_LLM_ANALYSIS', '').lower() in ('1', 'true', 'yes', 'on')
+
+
+def build_combined_prompt(text):
+    """One prompt covering both simplification and sarcasm highlighting"""
+    return f"""
+Help English language learners understand this text.
+
+TEXT: "{text}"
+
+1. Rewrite it in plain English: replace idioms, slang and cultural references with their literal meaning and spell out any sarcasm or implied meaning.
+2. Identify the EXACT words or phrases used sarcastically (meaning the opposite of what they say). Return only those segments, copied from the text; use an empty list if there is no sarcasm.
+
+Respond with JSON only:
+{{
+    "simplified_text": "the rewritten text",
+    "key_explanations": ["one explanation per idiom/slang/reference found"],
+    "cultural_notes": ["cultural context, if needed"],
+    "word_substitutions": {{"original expression": "plain meaning"}},
+    "sarcastic_segments": ["segment1", "segment2"],
+    "confidence": 0.8
+}}
+"""
+
+
+def request_combined_analysis(client, text, model=COMBINED_LLM_MODEL):
+    """Raw JSON content of the combined completion (cached and coalesced)"""
+    return llm_cache.complete(
+        client,
+        model,
+        'combined_analysis',
+        COMBINED_PROMPT_VERSION,
+        text,
+        messages=[
+            {
+                "role": "system",
+                "content": "You are a language learning assistant that explains idioms, slang and sarcasm. Return only JSON."
+            },
+            {
+                "role": "user",
+                "content": build_combined_prompt(text)
+            }
+        ],
+        max_tokens=600,
+        temperature=0.2
+    )
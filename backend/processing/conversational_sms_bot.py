@@ -1,8 +1,8 @@
 import random
 import json
 import os
-import pandas as pd
 from datetime import datetime
+from processing.lexicon_loader import load_table, dataset_path
 
 class ConversationalSMSBot:
     def __init__(self):
@@ -97,23 +97,21 @@ class ConversationalSMSBot:
     def _load_slang_databases(self):
         """Load slang from existing datasets"""
         try:
-            datasets_path = os.path.join(os.path.dirname(__file__), '..', 'Datasets')
-            
             # Load Gen Z slang
-            genz_path = os.path.join(datasets_path, 'genz_slang.csv')
+            genz_path = dataset_path('genz_slang.csv')
             if os.path.exists(genz_path):
-                genz_df = pd.read_csv(genz_path)
-                if 'term' in genz_df.columns and 'meaning' in genz_df.columns:
-                    for _, row in genz_df.head(50).iterrows():
-                        self.idioms_database[str(row['term']).lower()] = str(row['meaning'])
+                genz_table = load_table(genz_path)
+                if 'term' in genz_table.columns and 'meaning' in genz_table.columns:
+                    for row in genz_table.records(limit=50):
+                        self.idioms_database[row['term'].lower()] = row['meaning']
             
             # Load general slang
-            slang_path = os.path.join(datasets_path, 'slang.csv')
+            slang_path = dataset_path('slang.csv')
             if os.path.exists(slang_path):
-                slang_df = pd.read_csv(slang_path)
-                if 'slang' in slang_df.columns and 'meaning' in slang_df.columns:
-                    for _, row in slang_df.head(50).iterrows():
-                        self.idioms_database[str(row['slang']).lower()] = str(row['meaning'])
+                slang_table = load_table(slang_path)
+                if 'slang' in slang_table.columns and 'meaning' in slang_table.columns:
+                    for row in slang_table.records(limit=50):
+                        self.idioms_database[row['slang'].lower()] = row['meaning']
                         
         except Exception as e:
             print(f"Note: Could not load slang datasets: {e}")
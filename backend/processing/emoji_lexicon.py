@@ -0,0 +1,166 @@
+"""
+Shared emoji lexicon.
+
+One immutable emoji -> (emotion, meaning, weight) table, built once per
+process from the curated emotion/emoji mapping below and the Gen Z emoji
+dataset. The emotion analyzer and the slang detector both read from it,
+so each worker holds a single copy and every lookup is a dict hit.
+"""
+
+import re
+from collections import namedtuple
+from types import MappingProxyType
+from processing.lexicon_loader import load_table
+
+EmojiEntry = namedtuple('EmojiEntry', ['emoji', 'emotion', 'meaning', 'weight', 'name'])
+
+# Pictographic code points (emoji, dingbats, symbols) that can start an emoji sequence
+PICTOGRAPH = (
+    "[\U0001F000-\U0001FAFF\u2190-\u21FF\u2300-\u23FF\u2460-\u24FF\u25A0-\u27BF"
+    "\u2900-\u297F\u2B00-\u2BFF\u3030\u303D\u3297\u3299\u00A9\u00AE\u203C\u2049\u2122\u2139]"
+)
+# Variation selector 16 and skin-tone modifiers
+EMOJI_MODIFIERS = "[\uFE0F\U0001F3FB-\U0001F3FF]"
+# One user-perceived emoji: flag pairs, keycaps, or pictographs joined by ZWJ
+EMOJI_SEQUENCE = (
+    "[\U0001F1E6-\U0001F1FF]{2}"
+    "|[0-9#*]\uFE0F?\u20E3"
+    f"|{PICTOGRAPH}{EMOJI_MODIFIERS}*(?:\u200D{PICTOGRAPH}{EMOJI_MODIFIERS}*)*"
+)
+EMOJI_SEQUENCE_PATTERN = re.compile(EMOJI_SEQUENCE)
+_MODIFIER_PATTERN = re.compile(EMOJI_MODIFIERS)
+
+# Curated emotion -> emojis mapping; an emoji's first category is its emotion
+EMOTION_EMOJIS = {
+    'happy': ['😊', '😀', '😁', '😄', '😆', '🙂', '😋', '🤗', '😇', '🥰', '😍', '🤩', '😘', '😗', '😙', '😚', '🤭'],
+    'excited': ['😃', '😆', '🤩', '🤗', '🎉', '🙌', '👏', '🔥', '⚡', '✨', '💫', '🌟', '🎊', '🥳'],
+    'love': ['😍', '🥰', '😘', '💕', '💖', '💗', '💓', '💝', '❤️', '🧡', '💛', '💚', '💙', '💜', '🤍', '🖤'],
+    'angry': ['😠', '😡', '🤬', '😤', '💢', '👿', '🔥', '💯', '🤯'],
+    'sad': ['😢', '😭', '😞', '😔', '😟', '😕', '🙁', '☹️', '😣', '😖', '😫', '😩', '🥺', '😪'],
+    'disappointed': ['😞', '😔', '😟', '😕', '🙁', '☹️', '😤', '😮‍💨', '😒', '🫤'],
+    'fear': ['😨', '😰', '😱', '🤯', '😧', '😦', '😮', '🫢', '🙀', '🫣'],
+    'surprise': ['😮', '😯', '😲', '🤯', '😳', '🫢', '🤭', '😱', '🙀', '‼️', '❗', '❓', '❔'],
+    'disgust': ['🤢', '🤮', '😷', '🤧', '🤒', '😵', '🤐', '🙄', '😒', '😑'],
+    'neutral': ['😐', '😑', '🙂', '😶', '🫤', '😕', '🤷', '🤷‍♀️', '🤷‍♂️'],
+    'confused': ['😕', '🤔', '🫤', '😵‍💫', '🤯', '🫨', '😵', '❓', '❔'],
+    'laughing': ['😂', '🤣', '😆', '😹', '💀', '☠️', '😄', '😁'],
+    'cool': ['😎', '🤠', '🕶️', '😏', '🤘', '👌', '🔥', '💯'],
+    'crying': ['😭', '😢', '🥺', '😿', '😾'],
+    'sleeping': ['😴', '💤', '🛌', '😪'],
+    'sick': ['🤢', '🤮', '😷', '🤧', '🤒', '🥵', '🥶'],
+    'party': ['🥳', '🎉', '🎊', '🍾', '🥂', '🍻', '🎈', '🎁'],
+    'thinking': ['🤔', '💭', '🧠', '💡', '🔍'],
+    'shocked': ['😱', '🤯', '😳', '🫢', '😲', '😮', '😯', '🙀'],
+    'embarrassed': ['😳', '😅', '🤭', '🫣', '😊', '🤗', '😌'],
+    'flirty': ['😉', '😏', '😘', '😗', '💋', '💕', '🥰', '😍'],
+    'sarcastic': ['🙃', '😏', '🙄', '😒', '🤨', '😑']
+}
+
+# Curated entries are trusted more than emotions guessed from a description
+CURATED_WEIGHT = 1.0
+DATASET_WEIGHT = 0.5
+
+
+def strip_emoji_modifiers(sequence):
+    """The sequence without variation selectors and skin tones"""
+    return _MODIFIER_PATTERN.sub('', sequence)
+
+
+def map_meaning_to_emotion(meaning):
+    """Map an emoji description to an emotion category"""
+    meaning_lower = meaning.lower()
+
+    # Map meanings to primary emotions
+    if any(word in meaning_lower for word in ['happy', 'joy', 'laugh', 'fun', 'love', 'excited']):
+        return 'joy'
+    elif any(word in meaning_lower for word in ['sad', 'cry', 'tears', 'depressed', 'down']):
+        return 'sadness'
+    elif any(word in meaning_lower for word in ['angry', 'mad', 'rage', 'annoyed', 'furious']):
+        return 'anger'
+    elif any(word in meaning_lower for word in ['scared', 'fear', 'afraid', 'worried', 'nervous']):
+        return 'fear'
+    elif any(word in meaning_lower for word in ['surprised', 'shock', 'wow', 'amazing']):
+        return 'surprise'
+    elif any(word in meaning_lower for word in ['disgust', 'gross', 'yuck', 'eww']):
+        return 'disgust'
+    elif any(word in meaning_lower for word in ['neutral', 'okay', 'fine', 'normal']):
+        return 'neutral'
+    else:
+        return 'neutral'
+
+
+def read_genz_emojis(name='genz_emojis.csv'):
+    """(emoji, name, description) rows of the Gen Z emoji dataset"""
+    rows = []
+    try:
+        for row in load_table(name).records():
+            emoji = row.get('emoji', '').strip()
+            description = row.get('Description', '').strip()
+            if emoji and description:
+                rows.append((emoji, row.get('Name', '').strip(), description))
+    except OSError as e:
+        print(f"Warning: Could not load emoji dataset: {e}")
+    return rows
+
+
+class EmojiLexicon:
+    """
+    Read-only emoji table shared by every analyzer in the process.
+
+    entries maps emoji -> EmojiEntry; slang_meanings holds the dataset rows in
+    the shape the slang detector reports them.
+    """
+
+    def __init__(self, emotion_emojis=EMOTION_EMOJIS, dataset_rows=None):
+        if dataset_rows is None:
+            dataset_rows = read_genz_emojis()
+
+        entries = {}
+        names = {emoji: (name, description) for emoji, name, description in dataset_rows}
+        for emotion, emojis in emotion_emojis.items():
+            for emoji in emojis:
+                if emoji not in entries:
+                    name, description = names.get(emoji, ('', ''))
+                    entries[emoji] = EmojiEntry(emoji, emotion, description.lower() or emotion, CURATED_WEIGHT, name)
+        for emoji, name, description in dataset_rows:
+            if emoji not in entries:
+                entries[emoji] = EmojiEntry(emoji, map_meaning_to_emotion(description), description.lower(), DATASET_WEIGHT, name)
+
+        # Lookups also succeed without variation selectors or skin tones
+        bare = {}
+        for emoji, entry in entries.items():
+            bare.setdefault(strip_emoji_modifiers(emoji), entry)
+
+        self.entries = MappingProxyType(entries)
+        self._bare_entries = MappingProxyType(bare)
+        self.slang_meanings = MappingProxyType({
+            emoji: MappingProxyType({'name': name, 'meaning': description, 'type': 'emoji', 'popularity': 'high'})
+            for emoji, name, description in dataset_rows
+        })
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, emoji):
+        return self.lookup(emoji) is not None
+
+    def lookup(self, sequence):
+        """EmojiEntry for an emoji sequence, falling back to its bare form and then its base emoji"""
+        entry = self.entries.get(sequence)
+        if entry is None:
+            bare = strip_emoji_modifiers(sequence)
+            entry = self._bare_entries.get(bare) or self._bare_entries.get(bare.split('\u200D', 1)[0])
+        return entry
+
+    def find_all(self, text):
+        """EmojiEntry for every known emoji sequence in the text, in order"""
+        found = []
+        for match in EMOJI_SEQUENCE_PATTERN.finditer(text):
+            entry = self.lookup(match.group())
+            if entry is not None:
+                found.append(entry)
+        return found
+
+
+# Global instance shared by all analyzers
+emoji_lexicon = EmojiLexicon()
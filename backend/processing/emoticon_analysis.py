@@ -8,6 +8,8 @@ from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 from collections import defaultdict
 
+from processing.emoji_lexicon import PICTOGRAPH, EMOJI_SEQUENCE, strip_emoji_modifiers
+
 
 @dataclass
 class EmotionScore:
@@ -26,6 +28,34 @@ class EmoticonEmotionAnalyzer:
     def __init__(self):
         self.emoticon_map = self._build_emoticon_emotion_map()
         self.emotion_weights = self._build_emotion_weights()
+        self._compile_tokenizer()
+
+    def _compile_tokenizer(self):
+        """
+        One regex that tokenizes text into emoticons and whole emoji sequences.
+        Text emoticons are tried longest first, so ':-)' is one token rather
+        than ':-)' plus '-)', and ZWJ / skin-tone / flag sequences are consumed
+        as a single emoji.
+        """
+        pictograph = re.compile(PICTOGRAPH)
+        text_emoticons = sorted((e for e in self.emoticon_map if not pictograph.match(e)), key=len, reverse=True)
+        self._emoticon_pattern = re.compile('|'.join([re.escape(e) for e in text_emoticons] + [EMOJI_SEQUENCE]))
+
+        # Emoji sequences resolve with or without variation selectors and skin tones
+        self._emoji_lookup = {}
+        for emoticon in self.emoticon_map:
+            if pictograph.match(emoticon):
+                self._emoji_lookup.setdefault(emoticon, emoticon)
+                self._emoji_lookup.setdefault(strip_emoji_modifiers(emoticon), emoticon)
+
+    def _resolve_emoji(self, sequence: str) -> Optional[str]:
+        """Map an emoji sequence to its emoticon_map key, falling back to its base emoji"""
+        lookup = self._emoji_lookup
+        emoticon = lookup.get(sequence)
+        if emoticon is None:
+            bare = strip_emoji_modifiers(sequence)
+            emoticon = lookup.get(bare) or lookup.get(bare.split('\u200D', 1)[0])
+        return emoticon
         
     def _build_emoticon_emotion_map(self) -> Dict[str, Dict[str, float]]:
         """
@@ -228,17 +258,15 @@ class EmoticonEmotionAnalyzer:
         }
     
     def _extract_emoticons(self, text: str) -> List[str]:
-        """Extract all recognized emoticons from text."""
+        """Extract all recognized emoticons from text, non-overlapping, in text order."""
         found = []
+        emoticon_map = self.emoticon_map
         
-        # Sort emoticons by length (longest first) to avoid partial matches
-        sorted_emoticons = sorted(self.emoticon_map.keys(), key=len, reverse=True)
-        
-        for emoticon in sorted_emoticons:
-            if emoticon in text:
-                # Count occurrences
-                count = text.count(emoticon)
-                found.extend([emoticon] * count)
+        for match in self._emoticon_pattern.finditer(text):
+            token = match.group()
+            emoticon = token if token in emoticon_map else self._resolve_emoji(token)
+            if emoticon:
+                found.append(emoticon)
         
         return found
     
@@ -324,17 +352,19 @@ class EmoticonEmotionAnalyzer:
         suggestions.sort(key=lambda x: self.emoticon_map[x].get(current_emotion.lower(), 0), reverse=True)
         return suggestions[:10]  # Return top 10
     
-    def analyze_emotion_intensity(self, text: str) -> Dict[str, float]:
+    def analyze_emotion_intensity(self, text: str, analysis: Optional[Dict[str, any]] = None) -> Dict[str, float]:
         """
         Analyze the intensity of emotions in text based on emoticon frequency and type.
         
         Args:
             text (str): Text to analyze
+            analysis (dict): Result of analyze_text(text), if already computed
             
         Returns:
             Dict mapping emotions to intensity scores (0-1)
         """
-        analysis = self.analyze_text(text)
+        if analysis is None:
+            analysis = self.analyze_text(text)
         emotion_scores = analysis['emotion_scores']
         total_emoticons = analysis['total_emoticons']
         
@@ -1,11 +1,14 @@
 import numpy as np
-import pandas as pd
-import cv2
-from tensorflow import keras
 from sklearn.preprocessing import LabelEncoder
 import os
 import pickle
 import glob
+from processing.model_registry import lazy_import, model_registry, FACIAL_EMOTION_MODEL
+
+# Imported on first use so the API starts without TensorFlow/OpenCV/pandas
+pd = lazy_import('pandas')
+cv2 = lazy_import('cv2')
+keras = lazy_import('tensorflow.keras')
 
 class FacialFeatureAnalyzer:
     def __init__(self):
@@ -19,6 +22,15 @@ class FacialFeatureAnalyzer:
     def load_model(self, model_path=None, encoder_path=None):
         """Load pre-trained facial emotion model"""
         try:
+            if model_path is None and encoder_path is None:
+                # Default model: shared with the other analyzers
+                predictor = model_registry.get(FACIAL_EMOTION_MODEL)
+                if predictor is not None:
+                    self.model = predictor
+                    self.label_encoder = predictor.encoder
+                self.model_loaded = True
+                return True
+            
             if model_path is None:
                 model_path = os.path.join(os.path.dirname(__file__), '..', 'models', 'trained', 'facial_emotion_model.h5')
             if encoder_path is None:
@@ -1,7 +1,74 @@
 import re
 import os
-import pandas as pd
 from collections import Counter
+from processing.text_context import TextContext
+from processing.phrase_matcher import PhraseMatcher, is_whole_word
+from processing.lexicon_loader import load_table, dataset_path
+
+EMOJI_PATTERN = re.compile("["
+                           "\U0001F600-\U0001F64F"  # emoticons
+                           "\U0001F300-\U0001F5FF"  # symbols & pictographs
+                           "\U0001F680-\U0001F6FF"  # transport & map symbols
+                           "\U0001F1E0-\U0001F1FF"  # flags
+                           "]+", flags=re.UNICODE)
+
+# Plain phrases wrapped in \b anchors can go into the automaton; anything else stays a regex
+_ANCHORED_PHRASE = re.compile(r'^\\b([a-z0-9\' ]+)\\b$')
+
+class FormalityLexicon:
+    """
+    Every formality lexicon compiled into one phrase automaton.
+    Each entry is (style, weight, indicator, whole_word); a single scan of the
+    text finds every entry, and entries come back in lexicon order so
+    indicators are listed exactly as the per-category loops produced them.
+    """
+
+    def __init__(self, categories, structures=()):
+        self.entries = []
+        self.structure_regexes = []
+        self.matcher = PhraseMatcher(ignore_case=False, word_boundaries=False, collapse_whitespace=False)
+        terms = {}
+
+        def add(term, style, weight, indicator, whole_word):
+            terms.setdefault(term, []).append(len(self.entries))
+            self.entries.append((style, weight, indicator, whole_word))
+
+        for style, words, weight, label, whole_word in categories:
+            for word in words:
+                add(word, style, weight, label.format(term=word), whole_word)
+
+        for style, patterns, weight, indicator in structures:
+            for pattern in patterns:
+                anchored = _ANCHORED_PHRASE.match(pattern)
+                if anchored:
+                    add(anchored.group(1), style, weight, indicator, True)
+                else:
+                    self.structure_regexes.append((re.compile(pattern, re.IGNORECASE), style, weight, indicator))
+
+        for term, entry_ids in terms.items():
+            self.matcher.add(term, entry_ids)
+        self.matcher.compile()
+
+    def match(self, text_lower):
+        """(style, weight, indicator) for every entry found in the lowercased text"""
+        found = set()
+        for match in self.matcher.find_all(text_lower):
+            whole_word = None
+            for entry_id in match.payload:
+                if entry_id in found:
+                    continue
+                if self.entries[entry_id][3]:
+                    if whole_word is None:
+                        whole_word = is_whole_word(text_lower, match.start, match.end)
+                    if not whole_word:
+                        continue
+                found.add(entry_id)
+
+        hits = [self.entries[entry_id][:3] for entry_id in sorted(found)]
+        for regex, style, weight, indicator in self.structure_regexes:
+            if regex.search(text_lower):
+                hits.append((style, weight, indicator))
+        return hits
 
 class FormalityAnalyzer:
     def __init__(self):
@@ -97,39 +164,57 @@ class FormalityAnalyzer:
         
         # Load additional datasets if available
         self._load_additional_patterns()
+        self.compile_lexicon()
+
+    def compile_lexicon(self):
+        """Compile the pattern lists into one lexicon; call again after changing them"""
+        self.lexicon = FormalityLexicon([
+            ('formal', self.formal_patterns['academic_words'], 4, "Academic word: '{term}'", True),
+            ('formal', self.formal_patterns['formal_phrases'], 6, "Formal phrase: '{term}'", False),
+            ('informal', self.informal_patterns['contractions'], 3, "Contraction: '{term}'", True),
+            ('informal', self.informal_patterns['informal_phrases'], 4, "Informal phrase: '{term}'", False),
+            ('informal', self.informal_patterns['filler_words'], 2, "Filler word: '{term}'", True),
+            ('casual', self.casual_patterns['slang_words'], 5, "Slang: '{term}'", True),
+            ('casual', self.casual_patterns['internet_slang'], 6, "Internet slang: '{term}'", True),
+            ('casual', self.casual_patterns['intensifiers'], 4, "Casual intensifier: '{term}'", False),
+            ('professional', self.professional_patterns['business_terms'], 5, "Business term: '{term}'", True),
+            ('professional', self.professional_patterns['corporate_phrases'], 6, "Corporate phrase: '{term}'", False),
+        ], structures=[
+            ('formal', self.formal_patterns['formal_structures'], 5, "Formal structure detected"),
+        ])
     
     def _load_additional_patterns(self):
         """Load additional formality patterns from datasets"""
         try:
-            # Try to load Gen Z slang from existing dataset
-            datasets_path = os.path.join(os.path.dirname(__file__), '..', 'Datasets')
-            
             # Load Gen Z slang
-            genz_path = os.path.join(datasets_path, 'genz_slang.csv')
+            genz_path = dataset_path('genz_slang.csv')
             if os.path.exists(genz_path):
-                genz_df = pd.read_csv(genz_path)
-                if 'term' in genz_df.columns:
-                    genz_terms = genz_df['term'].str.lower().tolist()
+                genz_table = load_table(genz_path)
+                if 'term' in genz_table.columns:
+                    genz_terms = [term.lower() for term in genz_table.column('term')]
                     self.casual_patterns['slang_words'].extend(genz_terms[:50])  # Add top 50
             
             # Load general slang
-            slang_path = os.path.join(datasets_path, 'slang.csv')
+            slang_path = dataset_path('slang.csv')
             if os.path.exists(slang_path):
-                slang_df = pd.read_csv(slang_path)
-                if 'slang' in slang_df.columns:
-                    slang_terms = slang_df['slang'].str.lower().tolist()
+                slang_table = load_table(slang_path)
+                if 'slang' in slang_table.columns:
+                    slang_terms = [term.lower() for term in slang_table.column('slang')]
                     self.casual_patterns['slang_words'].extend(slang_terms[:50])  # Add top 50
                     
         except Exception as e:
             print(f"Note: Could not load additional slang datasets: {e}")
     
-    def analyze_formality(self, text):
+    def analyze_formality(self, text, use_lexicon=True):
         """
-        Enhanced formality analysis with improved accuracy and confidence scoring
+        Enhanced formality analysis with improved accuracy and confidence scoring.
+        use_lexicon=False scores sentence structure, capitalization, punctuation
+        and emojis only (the quick fallback).
         """
-        import re  # Explicit import to fix scoping issue
+        context = TextContext.of(text)
+        text = context.text
         
-        if not text or not text.strip():
+        if context.is_blank:
             return {
                 'formality_level': 'unknown',
                 'confidence': 0.0,
@@ -137,14 +222,8 @@ class FormalityAnalyzer:
                 'indicators': []
             }
         
-        text_lower = text.lower()
-        word_count = len(text.split())
-        
-        # Enhanced scoring system with weighted categories
-        formal_score = 0
-        informal_score = 0
-        casual_score = 0
-        professional_score = 0
+        text_lower = context.lower
+        word_count = context.word_count
         
         indicators = {
             'formal': [],
@@ -153,118 +232,61 @@ class FormalityAnalyzer:
             'professional': []
         }
         
-        # Enhanced formal pattern detection
-        for word in self.formal_patterns['academic_words']:
-            if re.search(r'\b' + re.escape(word) + r'\b', text_lower):
-                formal_score += 4  # Higher weight for exact word matches
-                indicators['formal'].append(f"Academic word: '{word}'")
-        
-        for phrase in self.formal_patterns['formal_phrases']:
-            if phrase in text_lower:
-                formal_score += 6  # Higher weight for formal phrases
-                indicators['formal'].append(f"Formal phrase: '{phrase}'")
-        
-        for pattern in self.formal_patterns['formal_structures']:
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                formal_score += 5  # Higher weight for formal structures
-                indicators['formal'].append(f"Formal structure detected")
-        
+        scores = {
+            'formal': 0,
+            'informal': 0,
+            'casual': 0,
+            'professional': 0
+        }
+
+        # Every lexicon category in one pass
+        if use_lexicon:
+            for style, weight, indicator in self.lexicon.match(text_lower):
+                scores[style] += weight
+                indicators[style].append(indicator)
+
         # Enhanced grammar and punctuation analysis
-        sentence_count = len([s for s in text.split('.') if s.strip()])
+        sentence_count = len(context.sentences)
         if sentence_count > 0:
             avg_words_per_sentence = word_count / sentence_count
             if avg_words_per_sentence > 15:  # Complex sentences indicate formality
-                formal_score += 3
+                scores['formal'] += 3
                 indicators['formal'].append("Complex sentence structure")
         
         # Check for proper capitalization
-        sentences = [s.strip() for s in text.split('.') if s.strip()]
+        sentences = [s.strip() for s in context.sentence_texts]
         proper_caps = sum(1 for s in sentences if s and s[0].isupper())
         if sentences and proper_caps / len(sentences) > 0.8:
-            formal_score += 2
+            scores['formal'] += 2
             indicators['formal'].append("Proper capitalization")
         
-        # Enhanced informal pattern detection
-        for word in self.informal_patterns['contractions']:
-            if re.search(r'\b' + re.escape(word) + r'\b', text_lower):
-                informal_score += 3
-                indicators['informal'].append(f"Contraction: '{word}'")
-        
-        for phrase in self.informal_patterns['informal_phrases']:
-            if phrase in text_lower:
-                informal_score += 4
-                indicators['informal'].append(f"Informal phrase: '{phrase}'")
-        
-        for word in self.informal_patterns['filler_words']:
-            if re.search(r'\b' + re.escape(word) + r'\b', text_lower):
-                informal_score += 2
-                indicators['informal'].append(f"Filler word: '{word}'")
-        
-        # Enhanced casual/slang detection
-        for word in self.casual_patterns['slang_words']:
-            if re.search(r'\b' + re.escape(word) + r'\b', text_lower):
-                casual_score += 5  # High weight for slang
-                indicators['casual'].append(f"Slang: '{word}'")
-        
-        for word in self.casual_patterns['internet_slang']:
-            if re.search(r'\b' + re.escape(word) + r'\b', text_lower):
-                casual_score += 6  # Very high weight for internet slang
-                indicators['casual'].append(f"Internet slang: '{word}'")
-        
-        for word in self.casual_patterns['intensifiers']:
-            if word in text_lower:
-                casual_score += 4
-                indicators['casual'].append(f"Casual intensifier: '{word}'")
-        
-        # Enhanced professional language detection
-        for word in self.professional_patterns['business_terms']:
-            if re.search(r'\b' + re.escape(word) + r'\b', text_lower):
-                professional_score += 5
-                indicators['professional'].append(f"Business term: '{word}'")
-        
-        for phrase in self.professional_patterns['corporate_phrases']:
-            if phrase in text_lower:
-                professional_score += 6
-                indicators['professional'].append(f"Corporate phrase: '{phrase}'")
-        
         # Additional analysis factors
         # Check for excessive punctuation (indicates casualness)
         if text.count('!') > 2 or text.count('?') > 2:
-            casual_score += 2
+            scores['casual'] += 2
             indicators['casual'].append("Excessive punctuation")
         
         # Check for ALL CAPS (usually casual/emotional)
-        caps_words = [word for word in text.split() if word.isupper() and len(word) > 2]
-        if len(caps_words) > 1:
-            casual_score += 3
+        if len(context.caps_words) > 1:
+            scores['casual'] += 3
             indicators['casual'].append("Multiple caps words")
         
         # Check for emoji usage (casual indicator)
-        import re
-        emoji_pattern = re.compile("["
-                                 "\U0001F600-\U0001F64F"  # emoticons
-                                 "\U0001F300-\U0001F5FF"  # symbols & pictographs
-                                 "\U0001F680-\U0001F6FF"  # transport & map symbols
-                                 "\U0001F1E0-\U0001F1FF"  # flags
-                                 "]+", flags=re.UNICODE)
-        if emoji_pattern.findall(text):
-            casual_score += 3
+        if EMOJI_PATTERN.search(text):
+            scores['casual'] += 3
             indicators['casual'].append("Contains emojis")
         
         # Normalize scores by text length for better accuracy
         length_factor = min(word_count / 10, 3)  # Cap the length factor
-        formal_score = formal_score * length_factor / word_count if word_count > 0 else 0
-        informal_score = informal_score * length_factor / word_count if word_count > 0 else 0
-        casual_score = casual_score * length_factor / word_count if word_count > 0 else 0
-        professional_score = professional_score * length_factor / word_count if word_count > 0 else 0
-        
         # Enhanced decision logic with better thresholds
         scores = {
-            'formal': formal_score,
-            'professional': professional_score,
-            'informal': informal_score,
-            'casual': casual_score
+            style: scores[style] * length_factor / word_count if word_count > 0 else 0
+            for style in ('formal', 'professional', 'informal', 'casual')
         }
+        formal_score = scores['formal']
+        informal_score = scores['informal']
+        casual_score = scores['casual']
+        professional_score = scores['professional']
         
         max_score = max(scores.values())
         dominant_style = max(scores, key=scores.get)
@@ -362,6 +384,6 @@ class FormalityAnalyzer:
 # Global instance for easy import
 formality_analyzer = FormalityAnalyzer()
 
-def analyze_formality(text):
+def analyze_formality(text, use_lexicon=True):
     """Convenience function for formality analysis"""
-    return formality_analyzer.analyze_formality(text)
+    return formality_analyzer.analyze_formality(text, use_lexicon=use_lexicon)
@@ -0,0 +1,65 @@
+"""
+Character-offset spans for highlighting.
+
+Engines report what to highlight as (start, end) offsets into the original
+text, taken from the matches that found it. Overlapping and touching spans
+are merged into disjoint intervals and the marked-up text is rendered in one
+left-to-right pass, so nothing is wrapped twice and markup is never searched
+again. The raw spans are returned to the frontend as
+[[start, end], ...] so it can render them itself.
+"""
+
+import re
+from functools import lru_cache
+
+from processing.text_context import Span
+
+
+@lru_cache(maxsize=1024)
+def _segment_pattern(segment):
+    return re.compile(r'\b' + re.escape(segment) + r'\b', re.IGNORECASE)
+
+
+def find_segment_spans(text, segments):
+    """
+    Every case-insensitive, word-bounded occurrence of each segment in text,
+    for engines (the LLM) that report segments without their positions
+    """
+    spans = []
+    for segment in dict.fromkeys(segments):
+        if not isinstance(segment, str) or not segment.strip():
+            continue
+        spans.extend(Span(match.start(), match.end()) for match in _segment_pattern(segment).finditer(text))
+    return spans
+
+
+def merge_spans(spans):
+    """Sorted, disjoint spans covering the union of the given spans; touching spans are joined"""
+    merged = []
+    for start, end in sorted(spans):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1].end:
+            if end > merged[-1].end:
+                merged[-1] = Span(merged[-1].start, end)
+        else:
+            merged.append(Span(start, end))
+    return merged
+
+
+def render_spans(text, spans, open_tag, close_tag):
+    """Wrap each (disjoint, sorted) span of text in open_tag/close_tag in one pass"""
+    parts = []
+    position = 0
+    for start, end in spans:
+        parts.append(text[position:start])
+        parts.append(open_tag)
+        parts.append(text[start:end])
+        parts.append(close_tag)
+        position = end
+    parts.append(text[position:])
+    return ''.join(parts)
+
+
+def spans_to_json(spans):
+    return [[span.start, span.end] for span in spans]
@@ -0,0 +1,72 @@
+"""
+Import-time report for `python app.py --profile-startup`.
+
+Wraps builtins.__import__ while the app is being imported and records, for
+every module that was not yet loaded, the time spent importing it including
+its own imports (cumulative) and excluding them (self).
+"""
+
+import builtins
+import importlib.util
+import sys
+import time
+
+from processing.model_registry import LazyModule
+
+
+class ImportProfiler:
+    def __init__(self):
+        self.timings = {}  # module -> [self seconds, cumulative seconds]
+        self._stack = []
+        self._original_import = None
+        self._started = None
+        self.total_seconds = 0.0
+
+    def install(self):
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+        self._started = time.perf_counter()
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+            self.total_seconds = time.perf_counter() - self._started
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        module_name = name
+        if level:
+            try:
+                module_name = importlib.util.resolve_name('.' * level + name, (globals or {}).get('__package__'))
+            except (ImportError, ValueError):
+                pass
+        if module_name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            timing = self.timings.setdefault(module_name, [0.0, 0.0])
+            timing[0] += elapsed - children
+            timing[1] += elapsed
+
+    def print_report(self, limit=30):
+        rows = sorted(self.timings.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        print(f"\nStartup import profile ({self.total_seconds:.3f}s total, {len(self.timings)} modules)")
+        print(f"{'self ms':>10} {'cumul ms':>10}  module")
+        for module_name, (self_seconds, cumulative) in rows:
+            print(f"{self_seconds * 1000:10.1f} {cumulative * 1000:10.1f}  {module_name}")
+
+        deferred = sorted({
+            value.__name__ for module in list(sys.modules.values())
+            for value in list(getattr(module, '__dict__', {}).values())
+            if isinstance(value, LazyModule) and not value.is_loaded
+        })
+        if deferred:
+            print(f"Deferred until first use: {', '.join(deferred)}")
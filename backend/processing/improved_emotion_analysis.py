@@ -1,5 +1,4 @@
 import numpy as np
-import pandas as pd
 import librosa
 import cv2
 from sklearn.ensemble import RandomForestClassifier, VotingClassifier
@@ -0,0 +1,147 @@
+"""
+Lexicon dataset loading.
+
+CSV lexicons under Datasets/ are parsed with the stdlib csv module (no
+pandas at import time) and kept once per process. Parsed tables are also
+written to a compact binary cache keyed by the source file's mtime, size
+and content hash, so later workers skip CSV parsing entirely.
+"""
+
+import csv
+import hashlib
+import io
+import marshal
+import os
+import tempfile
+import threading
+from collections import namedtuple
+
+DATASETS_DIR = os.path.join(os.path.dirname(__file__), '..', 'Datasets')
+# Set LEXICON_CACHE_DIR=off to always parse the CSV files
+LEXICON_CACHE_DIR = os.getenv('LEXICON_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'linko-lexicons'))
+# Bump when the cache layout changes
+LEXICON_CACHE_VERSION = 1
+
+
+class LexiconTable(namedtuple('LexiconTable', ['columns', 'rows'])):
+    """Parsed CSV: a tuple of column names and a tuple of row tuples (missing cells are '')"""
+
+    def records(self, limit=None):
+        """Rows as dicts keyed by column name"""
+        rows = self.rows if limit is None else self.rows[:limit]
+        return [dict(zip(self.columns, row)) for row in rows]
+
+    def column(self, name):
+        index = self.columns.index(name)
+        return [row[index] for row in self.rows]
+
+
+_tables = {}
+_lock = threading.Lock()
+
+
+def dataset_path(name):
+    return os.path.join(DATASETS_DIR, name)
+
+
+def parse_csv(data):
+    """LexiconTable from raw CSV bytes"""
+    reader = csv.reader(io.StringIO(data.decode('utf-8-sig'), newline=''))
+    columns = tuple(next(reader, ()))
+    width = len(columns)
+    rows = []
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        row = row[:width] + [''] * (width - len(row))
+        rows.append(tuple(row))
+    return LexiconTable(columns, tuple(rows))
+
+
+def _cache_path(path):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    digest = hashlib.sha256(os.path.abspath(path).encode('utf-8')).hexdigest()[:12]
+    return os.path.join(LEXICON_CACHE_DIR, f"{stem}-{digest}.lexicon")
+
+
+def _cache_dir_is_private():
+    """Only trust a cache directory owned by this user and closed to others"""
+    try:
+        info = os.stat(LEXICON_CACHE_DIR)
+    except OSError:
+        return False
+    return (not hasattr(os, 'getuid') or info.st_uid == os.getuid()) and not info.st_mode & 0o022
+
+
+def _read_cache(cache_path):
+    if not _cache_dir_is_private():
+        return None
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = marshal.load(f)
+        if isinstance(cached, dict) and cached.get('version') == LEXICON_CACHE_VERSION:
+            return cached
+    except Exception:
+        pass
+    return None
+
+
+def _write_cache(cache_path, entry):
+    try:
+        os.makedirs(LEXICON_CACHE_DIR, mode=0o700, exist_ok=True)
+        if not _cache_dir_is_private():
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=LEXICON_CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            marshal.dump(entry, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Note: Could not write lexicon cache {cache_path}: {e}")
+
+
+def _load_from_disk(path, stat):
+    use_cache = LEXICON_CACHE_DIR.lower() != 'off'
+    cache_path = _cache_path(path) if use_cache else None
+    cached = _read_cache(cache_path) if use_cache else None
+
+    # Fast path: the file is untouched since the cache was written
+    if cached and cached['mtime_ns'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+        return LexiconTable(*cached['table'])
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    content_hash = hashlib.sha256(data).hexdigest()
+
+    # Touched but unchanged (e.g. a fresh checkout) reuses the parsed table
+    if cached and cached['sha256'] == content_hash:
+        table = LexiconTable(*cached['table'])
+    else:
+        table = parse_csv(data)
+
+    if use_cache:
+        _write_cache(cache_path, {
+            'version': LEXICON_CACHE_VERSION,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': content_hash,
+            'table': tuple(table)
+        })
+    return table
+
+
+def load_table(name):
+    """
+    Shared LexiconTable for a CSV in Datasets/ (or an absolute path).
+    Raises FileNotFoundError when the file does not exist.
+    """
+    path = os.path.normpath(name if os.path.isabs(name) else dataset_path(name))
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+
+    with _lock:
+        loaded = _tables.get(path)
+        if loaded and loaded[0] == key:
+            return loaded[1]
+        table = _load_from_disk(path, stat)
+        _tables[path] = (key, table)
+        return table
@@ -0,0 +1,150 @@
+"""
+Prompt-response cache and request coalescing for LLM calls.
+
+The sarcasm highlighter and the text simplifier send the same prompts over and
+over for repeated classroom content. Completions are cached by model, prompt
+template (name + version) and input text in a ResultCache whose SQLite tier
+persists across restarts and is shared by all workers. Concurrent identical
+requests are coalesced: one caller makes the API call and the others wait for
+its answer.
+
+Set OPENAI_API_BASE to point the client at a local stub server (see
+test_llm_cache.py); LLM_CACHE_DB picks the SQLite file ('off' keeps the cache
+in process only). The default file lives in a directory private to the
+service user; if that directory is shared or owned by someone else, the
+cache stays in process only rather than trust responses others could write.
+"""
+
+import os
+import tempfile
+import threading
+from concurrent.futures import Future
+
+from processing.result_cache import ResultCache, make_key
+
+LLM_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'linko-llm-cache')
+DEFAULT_LLM_CACHE_DB = os.path.join(LLM_CACHE_DIR, 'responses.sqlite3')
+# Seconds a coalesced caller waits for the in-flight call before giving up
+LLM_WAIT_TIMEOUT = float(os.getenv('LLM_WAIT_TIMEOUT', '60'))
+
+
+def _private_cache_dir(path):
+    """Create path (0700) if needed; True only if it is owned by this user and closed to others"""
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        info = os.stat(path)
+    except OSError:
+        return False
+    return (not hasattr(os, 'getuid') or info.st_uid == os.getuid()) and not info.st_mode & 0o077
+
+
+def configure_openai(client):
+    """Apply optional endpoint overrides (e.g. a local stub server) to the openai module"""
+    api_base = os.getenv('OPENAI_API_BASE')
+    if api_base:
+        client.api_base = api_base
+    return client
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its outcome"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, timeout=None):
+        """
+        Args:
+            timeout: seconds a follower waits for the leader's call; on expiry
+                concurrent.futures.TimeoutError is raised to the follower
+
+        Returns:
+            (result, shared) where shared is True when the result came from
+            another caller's in-flight call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = Future()
+                self._calls[key] = call
+
+        if not leader:
+            return call.result(timeout=timeout), True
+
+        try:
+            result = func()
+            call.set_result(result)
+            return result, False
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class LLMResponseCache:
+    """Cached, coalesced ChatCompletion calls returning the message content"""
+
+    def __init__(self, cache=None):
+        if cache is None:
+            db_path = os.getenv('LLM_CACHE_DB', DEFAULT_LLM_CACHE_DB)
+            if db_path == DEFAULT_LLM_CACHE_DB and not _private_cache_dir(LLM_CACHE_DIR):
+                print(f"LLM cache directory {LLM_CACHE_DIR} is not private, keeping the cache in process")
+                db_path = 'off'
+            cache = ResultCache(
+                'llm',
+                max_entries=int(os.getenv('LLM_CACHE_SIZE', '2048')),
+                ttl=float(os.getenv('LLM_CACHE_TTL', str(7 * 24 * 3600))),
+                db_path=None if db_path.lower() == 'off' else db_path
+            )
+        self.cache = cache
+        self.flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._stats = {'api_calls': 0, 'coalesced': 0, 'errors': 0}
+
+    def complete(self, client, model, prompt_name, prompt_version, input_text, messages, **params):
+        """
+        Message content of a chat completion, served from the cache when the
+        same model, prompt template version and input text were seen before.
+        API errors are raised to the caller and never cached.
+        """
+        key = make_key('llm', model, prompt_name, prompt_version, input_text)
+        content = self.cache.get(key)
+        if content is not None:
+            return content
+
+        def call_api():
+            # Another caller may have filled the cache while we waited to lead
+            cached = self.cache.get(key, record_stats=False)
+            if cached is not None:
+                return cached
+            with self._lock:
+                self._stats['api_calls'] += 1
+            try:
+                response = client.ChatCompletion.create(model=model, messages=messages, **params)
+            except Exception:
+                with self._lock:
+                    self._stats['errors'] += 1
+                raise
+            result = response.choices[0].message.content
+            self.cache.set(key, result)
+            return result
+
+        content, shared = self.flight.do(key, call_api, timeout=LLM_WAIT_TIMEOUT)
+        if shared:
+            with self._lock:
+                self._stats['coalesced'] += 1
+        return content
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(self.cache.stats())
+        return stats
+
+
+# Global instance shared by every LLM-backed engine
+llm_cache = LLMResponseCache()
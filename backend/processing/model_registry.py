@@ -0,0 +1,246 @@
+"""
+Lazy loading for heavy libraries and trained models.
+
+TensorFlow, librosa and OpenCV take seconds to import and the Keras models
+take longer to load, but most requests (text analysis) never touch them.
+Modules that need them use lazy_import(), which defers the real import to
+the first attribute access, and register their model loaders here so each
+model is loaded once, on first use. Set MODEL_WARMUP=1 to load every
+registered model on a background thread right after startup instead.
+
+The trained Keras models are registered here too (AUDIO_EMOTION_MODEL,
+FACIAL_EMOTION_MODEL). Every analyzer gets the same ModelPredictor for a
+model, so each one is resident once per process however many analyzers
+use it.
+"""
+
+import importlib
+import os
+import pickle
+import sys
+import threading
+import time
+import types
+
+_import_lock = threading.Lock()
+# Module name -> seconds spent importing it on first use
+lazy_import_times = {}
+
+
+def model_warmup_enabled():
+    return os.getenv('MODEL_WARMUP', '').lower() in ('1', 'true', 'yes', 'on')
+
+
+class LazyModule(types.ModuleType):
+    """Stand-in for a module that is imported on first attribute access"""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            start = time.perf_counter()
+            module = importlib.import_module(self.__name__)
+            with _import_lock:
+                if self.__dict__['_module'] is None:
+                    self.__dict__['_module'] = module
+                    lazy_import_times[self.__name__] = time.perf_counter() - start
+                    print(f"Imported {self.__name__} on first use ({lazy_import_times[self.__name__]:.2f}s)")
+        return module
+
+    @property
+    def is_loaded(self):
+        return self.__dict__['_module'] is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.is_loaded else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name):
+    """The module if it is already imported, otherwise a LazyModule for it"""
+    return sys.modules.get(name) or LazyModule(name)
+
+
+class _Entry:
+    def __init__(self, loader):
+        self.loader = loader
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.value = None
+        self.error = None
+        self.load_seconds = None
+
+
+class ModelRegistry:
+    """
+    Named model loaders, each run at most once per process.
+
+    get(name) runs the loader on first call (other callers wait for it) and
+    returns the cached result afterwards. A loader that raises is recorded as
+    failed and yields None rather than being retried on every request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def register(self, name, loader):
+        """Register a loader; a model that has already loaded keeps its value (a failed one is replaced)"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or not entry.loaded or entry.error is not None:
+                self._entries[name] = _Entry(loader)
+
+    def is_registered(self, name):
+        return name in self._entries
+
+    def is_loaded(self, name):
+        entry = self._entries.get(name)
+        return entry is not None and entry.loaded
+
+    def get(self, name):
+        entry = self._entries[name]
+        if entry.loaded:
+            return entry.value
+
+        with entry.lock:
+            if not entry.loaded:
+                start = time.perf_counter()
+                try:
+                    entry.value = entry.loader()
+                except Exception as e:
+                    print(f"Error loading model {name}: {e}")
+                    entry.error = str(e)
+                entry.load_seconds = time.perf_counter() - start
+                entry.loaded = True
+                if entry.error is None:
+                    print(f"Model {name} ready in {entry.load_seconds:.2f}s")
+        return entry.value
+
+    def warm_up(self, names=None, background=True):
+        """Load the named (default: all) models now, on a daemon thread unless background=False"""
+        with self._lock:
+            names = list(names if names is not None else self._entries)
+
+        def load_all():
+            for name in names:
+                self.get(name)
+
+        if not background:
+            load_all()
+            return None
+        thread = threading.Thread(target=load_all, name='model-warmup', daemon=True)
+        thread.start()
+        return thread
+
+    def status(self):
+        with self._lock:
+            entries = dict(self._entries)
+        models = {
+            name: {
+                'loaded': entry.loaded,
+                'load_seconds': entry.load_seconds,
+                'error': entry.error,
+                'memory_bytes': getattr(entry.value, 'memory_bytes', None)
+            }
+            for name, entry in entries.items()
+        }
+        return {
+            'models': models,
+            'total_memory_bytes': sum(model['memory_bytes'] or 0 for model in models.values()),
+            'lazy_imports': dict(lazy_import_times)
+        }
+
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '..', 'models', 'trained')
+AUDIO_EMOTION_MODEL = 'audio_emotion'
+FACIAL_EMOTION_MODEL = 'facial_emotion'
+
+keras = lazy_import('tensorflow.keras')
+
+
+class ModelPredictor:
+    """
+    A trained Keras model and its label encoder, shared by every analyzer.
+
+    predict() takes a per-model lock because Keras models are not safe for
+    concurrent predict calls; the encoder is None when none could be loaded.
+    """
+
+    def __init__(self, name, path, model, encoder):
+        self.name = name
+        self.path = path
+        self.model = model
+        self.encoder = encoder
+        self._lock = threading.Lock()
+        self.memory_bytes = _model_memory_bytes(model) + _encoder_memory_bytes(encoder)
+
+    def predict(self, inputs, **kwargs):
+        with self._lock:
+            return self.model.predict(inputs, **kwargs)
+
+
+def _model_memory_bytes(model):
+    try:
+        return int(sum(weights.nbytes for weights in model.get_weights()))
+    except Exception:
+        return 0
+
+
+def _encoder_memory_bytes(encoder):
+    try:
+        return len(pickle.dumps(encoder)) if encoder is not None else 0
+    except Exception:
+        return 0
+
+
+def _load_encoder(encoder_paths):
+    """First label encoder that loads with pickle or joblib, or None"""
+    for encoder_path in encoder_paths:
+        if not os.path.exists(encoder_path):
+            continue
+        try:
+            with open(encoder_path, 'rb') as f:
+                encoder = pickle.load(f)
+            print(f"✓ Label encoder loaded from {encoder_path}")
+            return encoder
+        except Exception as e1:
+            try:
+                import joblib
+                encoder = joblib.load(encoder_path)
+                print(f"✓ Label encoder loaded with joblib from {encoder_path}")
+                return encoder
+            except Exception as e2:
+                print(f"Warning: Could not load encoder from {encoder_path} (pickle: {e1}, joblib: {e2})")
+    return None
+
+
+def load_predictor(name, model_file, encoder_files):
+    """Load a model from models/trained into a ModelPredictor"""
+    model_path = os.path.normpath(os.path.join(MODELS_DIR, model_file))
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Model file not found: {model_path}")
+
+    print(f"Loading {name} model from: {model_path}")
+    model = keras.models.load_model(model_path)
+    encoder = _load_encoder([os.path.normpath(os.path.join(MODELS_DIR, encoder_file)) for encoder_file in encoder_files])
+    predictor = ModelPredictor(name, model_path, model, encoder)
+    print(f"✓ {name} model loaded ({predictor.memory_bytes / 1e6:.1f} MB)")
+    return predictor
+
+
+# Global registry shared by all analyzers
+model_registry = ModelRegistry()
+model_registry.register(AUDIO_EMOTION_MODEL, lambda: load_predictor(
+    AUDIO_EMOTION_MODEL, 'emotion_model_improved.h5', ['label_encoder.pkl', 'audio_label_encoder.pkl']))
+model_registry.register(FACIAL_EMOTION_MODEL, lambda: load_predictor(
+    FACIAL_EMOTION_MODEL, 'facial_emotion_model.h5', ['facial_label_encoder.pkl']))
@@ -8,7 +8,15 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from processing.emoticon_analysis import EmoticonEmotionAnalyzer
 from typing import Dict, List, Optional, Union
+from collections import OrderedDict, deque
+from fractions import Fraction
 import json
+import threading
+import time
+import uuid
+
+# Messages in the sliding window used for the recent trend
+TREND_WINDOW = int(os.getenv('CONVERSATION_TREND_WINDOW', '5'))
 
 
 class MultimodalEmotionAnalyzer:
@@ -50,7 +58,7 @@ class MultimodalEmotionAnalyzer:
         # Get intensity if requested
         intensity_scores = {}
         if include_intensity:
-            intensity_scores = self.emoticon_analyzer.analyze_emotion_intensity(text)
+            intensity_scores = self.emoticon_analyzer.analyze_emotion_intensity(text, emoticon_result)
         
         # Categorize emotions
         categorized_emotions = self._categorize_emotions(emoticon_result['emotion_scores'])
@@ -269,93 +277,219 @@ class MultimodalEmotionAnalyzer:
         Returns:
             Dict containing conversation flow analysis
         """
-        message_analyses = []
-        emotion_timeline = []
-        
-        for i, message in enumerate(messages):
-            analysis = self.analyze_comprehensive_emotion(message, include_intensity=False)
-            message_analyses.append({
-                'message_index': i,
-                'text': message,
-                'analysis': analysis
-            })
-            
-            # Track dominant emotion over time
-            if analysis['raw_analysis']['dominant_emotion']:
-                emotion_timeline.append({
-                    'index': i,
-                    'emotion': analysis['raw_analysis']['dominant_emotion'].emotion,
-                    'confidence': analysis['raw_analysis']['dominant_emotion'].confidence
-                })
-        
-        # Analyze trends
-        trends = self._analyze_emotional_trends(emotion_timeline)
+        session = self.start_conversation()
+        message_analyses = [session.append(message)['message'] for message in messages]
         
         return {
             'message_analyses': message_analyses,
-            'emotion_timeline': emotion_timeline,
-            'trends': trends,
-            'conversation_summary': self._summarize_conversation(message_analyses, trends)
+            'emotion_timeline': session.timeline,
+            'trends': session.trends(),
+            'conversation_summary': session.summary()
         }
     
-    def _analyze_emotional_trends(self, timeline: List[Dict]) -> Dict[str, any]:
-        """Analyze trends in emotional timeline."""
-        if len(timeline) < 2:
-            return {'trend': 'insufficient_data', 'changes': 0}
-        
-        emotions = [entry['emotion'] for entry in timeline]
-        confidences = [entry['confidence'] for entry in timeline]
+    def start_conversation(self) -> 'ConversationSession':
+        """Start an incremental conversation-flow session (one append per message)"""
+        return ConversationSession(self)
+
+
+class ConversationSession:
+    """
+    Conversation-flow analysis maintained incrementally.
+    
+    Each append analyzes only the new message and updates running counters,
+    so trends and summary cost O(1) per message instead of re-analyzing the
+    whole history. Results match analyze_conversation_flow over the same
+    messages; on top of that the session keeps an online mean/variance of
+    the dominant-emotion confidence and a trend over the last TREND_WINDOW
+    timeline entries.
+    """
+    
+    def __init__(self, analyzer: MultimodalEmotionAnalyzer, window: int = TREND_WINDOW):
+        self.analyzer = analyzer
+        self.window = max(window, 1)
+        self.message_count = 0
+        self.positive_count = 0
+        self.negative_count = 0
+        self.timeline = []
+        self.changes = 0
+        
+        # Confidence sums are exact so the half-vs-half comparison never flips on rounding
+        self._confidences = []
+        self._confidence_total = Fraction(0)
+        self._early_count = 0
+        self._early_total = Fraction(0)
+        
+        # Welford running mean/variance of confidence
+        self._confidence_mean = 0.0
+        self._confidence_m2 = 0.0
+        
+        # Sliding windows over the latest timeline entries
+        self._recent_confidences = deque(maxlen=2 * self.window)
+        self._recent_changes = deque(maxlen=self.window)
+        
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self._lock = threading.Lock()
+    
+    def append(self, message: str) -> Dict[str, any]:
+        """Analyze one new message and fold it into the running statistics"""
+        analysis = self.analyzer.analyze_comprehensive_emotion(message, include_intensity=False)
+        with self._lock:
+            return self._add_message(message, analysis)
+    
+    def _add_message(self, message: str, analysis: Dict) -> Dict[str, any]:
+        index = self.message_count
+        self.message_count += 1
+        self.updated_at = time.time()
+        
+        mood = analysis['summary']['overall_mood']
+        if mood in ['Positive', 'Very Positive']:
+            self.positive_count += 1
+        elif mood in ['Negative', 'Very Negative']:
+            self.negative_count += 1
+        
+        entry = None
+        dominant = analysis['raw_analysis']['dominant_emotion']
+        if dominant:
+            entry = {'index': index, 'emotion': dominant.emotion, 'confidence': dominant.confidence}
+            self._add_timeline_entry(entry)
         
-        # Count emotion changes
-        changes = sum(1 for i in range(1, len(emotions)) if emotions[i] != emotions[i-1])
+        return {
+            'message': {'message_index': index, 'text': message, 'analysis': analysis},
+            'timeline_entry': entry
+        }
+    
+    def _add_timeline_entry(self, entry: Dict):
+        changed = bool(self.timeline) and entry['emotion'] != self.timeline[-1]['emotion']
+        self.timeline.append(entry)
+        if len(self.timeline) > 1:
+            self.changes += changed
+            self._recent_changes.append(changed)
+        
+        confidence = entry['confidence']
+        self._confidences.append(confidence)
+        self._confidence_total += Fraction(confidence)
+        # The early half grows by at most one entry per append
+        while self._early_count < len(self._confidences) // 2:
+            self._early_total += Fraction(self._confidences[self._early_count])
+            self._early_count += 1
+        
+        delta = confidence - self._confidence_mean
+        self._confidence_mean += delta / len(self.timeline)
+        self._confidence_m2 += delta * (confidence - self._confidence_mean)
+        
+        self._recent_confidences.append(confidence)
+    
+    def trends(self) -> Dict[str, any]:
+        """Emotion changes, stability and confidence trends of the timeline so far"""
+        count = len(self.timeline)
+        if count < 2:
+            return {'trend': 'insufficient_data', 'changes': 0}
         
-        # Determine trend
+        changes = self.changes
         if changes == 0:
             trend = 'stable'
-        elif changes < len(emotions) * 0.3:
+        elif changes < count * 0.3:
             trend = 'mostly_stable'
-        elif changes < len(emotions) * 0.7:
+        elif changes < count * 0.7:
             trend = 'variable'
         else:
             trend = 'highly_variable'
         
-        # Confidence trend
-        if len(confidences) > 1:
-            avg_early = sum(confidences[:len(confidences)//2]) / (len(confidences)//2)
-            avg_late = sum(confidences[len(confidences)//2:]) / (len(confidences) - len(confidences)//2)
-            confidence_trend = 'increasing' if avg_late > avg_early else 'decreasing' if avg_late < avg_early else 'stable'
-        else:
-            confidence_trend = 'stable'
+        avg_early = self._early_total / self._early_count
+        avg_late = (self._confidence_total - self._early_total) / (count - self._early_count)
         
         return {
             'trend': trend,
             'changes': changes,
-            'stability_score': 1 - (changes / max(len(emotions) - 1, 1)),
-            'confidence_trend': confidence_trend
+            'stability_score': 1 - (changes / max(count - 1, 1)),
+            'confidence_trend': self._direction(avg_early, avg_late),
+            'confidence_mean': self._confidence_mean,
+            'confidence_variance': self._confidence_m2 / count,
+            'recent_changes': sum(self._recent_changes),
+            'recent_confidence_trend': self._recent_confidence_trend()
         }
     
-    def _summarize_conversation(self, analyses: List[Dict], trends: Dict) -> Dict[str, str]:
-        """Generate summary of conversation emotional flow."""
-        total_messages = len(analyses)
-        
-        # Count overall sentiment distribution
-        positive_count = sum(1 for a in analyses if a['analysis']['summary']['overall_mood'] in ['Positive', 'Very Positive'])
-        negative_count = sum(1 for a in analyses if a['analysis']['summary']['overall_mood'] in ['Negative', 'Very Negative'])
+    def _recent_confidence_trend(self) -> str:
+        """Latest window of confidences against the window before it"""
+        recent = list(self._recent_confidences)
+        if len(recent) < 2:
+            return 'stable'
+        split = max(len(recent) - self.window, len(recent) // 2)
+        earlier, latest = recent[:split], recent[split:]
+        return self._direction(sum(earlier) / len(earlier), sum(latest) / len(latest))
+    
+    @staticmethod
+    def _direction(before, after) -> str:
+        return 'increasing' if after > before else 'decreasing' if after < before else 'stable'
+    
+    def summary(self) -> Dict[str, str]:
+        """Overall tone and flow of the conversation so far"""
+        total_messages = self.message_count
+        trends = self.trends()
+        changes = trends['changes']
         
         summary = {
             'total_messages': str(total_messages),
             'emotional_stability': trends['trend'],
-            'overall_tone': 'Positive' if positive_count > negative_count else 'Negative' if negative_count > positive_count else 'Mixed'
+            'overall_tone': 'Positive' if self.positive_count > self.negative_count else 'Negative' if self.negative_count > self.positive_count else 'Mixed'
         }
         
-        if trends['changes'] > total_messages * 0.5:
+        if changes > total_messages * 0.5:
             summary['conversation_flow'] = "Highly dynamic conversation with frequent emotional shifts"
-        elif trends['changes'] > total_messages * 0.2:
+        elif changes > total_messages * 0.2:
             summary['conversation_flow'] = "Moderately dynamic with some emotional variation"
         else:
             summary['conversation_flow'] = "Stable emotional tone throughout conversation"
         
         return summary
+    
+    def recent_timeline(self) -> List[Dict]:
+        """The last window of timeline entries"""
+        return self.timeline[-self.window:]
+
+
+class ConversationSessionStore:
+    """Thread-safe LRU of conversation sessions; a session expires after ttl seconds without use"""
+    
+    def __init__(self, analyzer: MultimodalEmotionAnalyzer, max_sessions: int = 1000, ttl: float = 3600):
+        self.analyzer = analyzer
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def create(self) -> str:
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self._expire()
+            self._sessions[session_id] = (self.analyzer.start_conversation(), time.time())
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session_id
+    
+    def get(self, session_id: str) -> Optional[ConversationSession]:
+        with self._lock:
+            self._expire()
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            self._sessions[session_id] = (entry[0], time.time())
+            self._sessions.move_to_end(session_id)
+            return entry[0]
+    
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+    
+    def _expire(self):
+        # Sessions are kept in access order, so expired ones are at the front
+        cutoff = time.time() - self.ttl
+        while self._sessions:
+            session_id, (_, accessed) = next(iter(self._sessions.items()))
+            if accessed >= cutoff:
+                break
+            del self._sessions[session_id]
 
 
 # Example usage and integration testing
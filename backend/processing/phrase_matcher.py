@@ -0,0 +1,227 @@
+"""
+Compiled multi-phrase matcher (Aho-Corasick automaton).
+
+Lexicons are compiled once at load time; a single left-to-right scan then
+finds every phrase in the text, so matching cost depends on the length of
+the text rather than on the size of the dictionary.
+"""
+
+from collections import namedtuple, deque
+
+Match = namedtuple('Match', ['start', 'end', 'phrase', 'payload'])
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == '_'
+
+
+def is_whole_word(text, start, end):
+    """Regex-style \\b check: text[start:end] is not glued to surrounding word characters"""
+    return (start == 0 or not _is_word_char(text[start - 1])) and (end == len(text) or not _is_word_char(text[end]))
+
+
+class PhraseMatcher:
+    """
+    Aho-Corasick matcher with word-boundary awareness.
+
+    Offsets in the returned matches always index into the original text, even
+    when case is ignored or whitespace runs are collapsed during the scan.
+
+    Args:
+        phrases: optional dict of phrase -> payload (or an iterable of phrases)
+        ignore_case: match case-insensitively
+        word_boundaries: phrases that start/end with a word character only
+            match when they are not embedded in a longer word
+        collapse_whitespace: any run of whitespace in the text matches a
+            single space in a phrase
+        ignore_chars: characters dropped from both phrases and text before
+            matching (e.g. apostrophes, so "i'm" matches the entry "im");
+            boundary checks look straight through them, so "'lol'" matches
+            "lol" but "don't" does not match "don"
+        glue_chars: punctuation that joins the words on either side of it
+            for boundary checks (e.g. '/' so "km" does not match in "km/h")
+    """
+
+    def __init__(self, phrases=None, ignore_case=True, word_boundaries=True, collapse_whitespace=True, ignore_chars='', glue_chars=''):
+        self.ignore_case = ignore_case
+        self.word_boundaries = word_boundaries
+        self.collapse_whitespace = collapse_whitespace
+        self.ignore_chars = frozenset(ignore_chars)
+        self._transparent = frozenset(ignore_chars) | frozenset(glue_chars)
+
+        # Trie nodes: transitions, failure link, outputs (pattern ids ending here)
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [[]]
+        self._patterns = []  # (phrase, length, payload, needs_left_boundary, needs_right_boundary)
+        self._index = {}
+        self._compiled = False
+
+        if phrases:
+            items = phrases.items() if isinstance(phrases, dict) else ((phrase, None) for phrase in phrases)
+            for phrase, payload in items:
+                self.add(phrase, payload)
+
+    def __len__(self):
+        return len(self._patterns)
+
+    def __contains__(self, phrase):
+        return self._normalize(phrase) in self._index
+
+    def _normalize(self, phrase):
+        if self.ignore_case:
+            phrase = phrase.lower()
+        if self.ignore_chars:
+            phrase = ''.join(ch for ch in phrase if ch not in self.ignore_chars)
+        if self.collapse_whitespace:
+            phrase = ' '.join(phrase.split())
+        return phrase
+
+    def add(self, phrase, payload=None):
+        """Add a phrase; re-adding the same phrase replaces its payload"""
+        phrase = self._normalize(str(phrase))
+        if not phrase:
+            return
+
+        if phrase in self._index:
+            pattern_id = self._index[phrase]
+            p = self._patterns[pattern_id]
+            self._patterns[pattern_id] = (p[0], p[1], payload, p[3], p[4])
+            return
+
+        node = 0
+        for ch in phrase:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            node = nxt
+
+        pattern_id = len(self._patterns)
+        self._patterns.append((
+            phrase,
+            len(phrase),
+            payload,
+            self.word_boundaries and _is_word_char(phrase[0]),
+            self.word_boundaries and _is_word_char(phrase[-1])
+        ))
+        self._index[phrase] = pattern_id
+        self._outputs[node].append(pattern_id)
+        self._compiled = False
+
+    def compile(self):
+        """Build failure links (called automatically before the first scan)"""
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                # Inherit the outputs of the longest proper suffix
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+        self._compiled = True
+        return self
+
+    def find_all(self, text):
+        """All (possibly overlapping) boundary-respecting matches, in scan order"""
+        if not text or not self._patterns:
+            return []
+        if not self._compiled:
+            self.compile()
+
+        goto, fail, outputs, patterns = self._goto, self._fail, self._outputs, self._patterns
+        ignore_chars = self.ignore_chars
+        collapse = self.collapse_whitespace
+        length = len(text)
+
+        # Lowercase once up front when that keeps offsets aligned (almost always)
+        scanned = text
+        per_char_lower = False
+        if self.ignore_case:
+            lowered = text.lower()
+            if len(lowered) == length:
+                scanned = lowered
+            else:
+                per_char_lower = True
+
+        matches = []
+        node = 0
+        previous_space = False
+        # positions[i] = original index of the i-th character fed to the automaton
+        positions = []
+
+        for index, ch in enumerate(scanned):
+            if ch in ignore_chars:
+                continue
+            if collapse and ch.isspace():
+                if previous_space:
+                    continue
+                ch = ' '
+                previous_space = True
+            else:
+                previous_space = False
+                if per_char_lower:
+                    ch = ch.lower()
+
+            for fed in ch:
+                positions.append(index)
+                # Follow failure links until a transition exists (or we are back at the root)
+                while True:
+                    nxt = goto[node].get(fed)
+                    if nxt is not None:
+                        node = nxt
+                        break
+                    if not node:
+                        break
+                    node = fail[node]
+                if not outputs[node]:
+                    continue
+
+                end = index + 1
+                for pattern_id in outputs[node]:
+                    phrase, size, payload, left, right = patterns[pattern_id]
+                    start = positions[len(positions) - size]
+                    if left and self._attached(text, start - 1, -1):
+                        continue
+                    if right and self._attached(text, end, 1):
+                        continue
+                    matches.append(Match(start, end, phrase, payload))
+        return matches
+
+    def _attached(self, text, index, step):
+        """Whether the match edge next to text[index] is glued to a word character"""
+        transparent = self._transparent
+        while 0 <= index < len(text):
+            ch = text[index]
+            if ch not in transparent:
+                return _is_word_char(ch)
+            index += step
+        return False
+
+    def find(self, text):
+        """Non-overlapping matches chosen leftmost-longest, ordered by position"""
+        return leftmost_longest(self.find_all(text))
+
+
+def leftmost_longest(matches):
+    """Non-overlapping subset of matches chosen leftmost-longest, ordered by position"""
+    candidates = sorted(matches, key=lambda m: (m.start, -(m.end - m.start)))
+    selected = []
+    last_end = 0
+    for match in candidates:
+        if match.start >= last_end:
+            selected.append(match)
+            last_end = match.end
+    return selected
@@ -0,0 +1,271 @@
+"""
+Content-addressed cache for analysis results.
+
+Two tiers:
+  * an in-process LRU with a TTL (always on), and
+  * an optional SQLite file shared by every gunicorn worker on the host,
+    enabled by pointing ANALYSIS_CACHE_DB at a writable path.
+
+Keys are hashes of the normalized input plus a version fingerprint of the
+datasets, models and analyzer source code, so editing a slang CSV,
+rebuilding a model or deploying new analyzer logic changes every key and
+stale results are never served.
+"""
+
+import copy
+import functools
+import glob
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Bump when the shape of cached results changes in a way the analyzer
+# sources below do not capture (e.g. a route adding fields before caching)
+ANALYSIS_CACHE_VERSION = 2
+
+# Analyzer code behind the cached results; any edit gives new keys
+VERSIONED_SOURCES = os.path.join(BACKEND_DIR, 'processing', '*.py')
+
+# Namespaces become SQLite table names
+NAMESPACE_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+# Files whose changes must invalidate cached analyses (directories are not recursed)
+VERSIONED_PATHS = [
+    os.path.join(BACKEND_DIR, 'Datasets', name)
+    for name in ['slang.csv', 'gen_zz_words.csv', 'genz_slang.csv', 'genz_emojis.csv', 'tone_v1.txt']
+] + [os.path.join(BACKEND_DIR, 'models', 'trained')]
+
+
+def normalize_transcript(text):
+    """Canonical form used both for the cache key and for the analysis itself"""
+    text = unicodedata.normalize('NFC', text or '')
+    return text.replace('\r\n', '\n').replace('\r', '\n').strip()
+
+
+def make_key(*parts):
+    """Stable hash of JSON-serializable parts"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def code_fingerprint(pattern=VERSIONED_SOURCES):
+    """Hash of the analyzer sources; computed once, as the loaded code cannot change"""
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(pattern)):
+        digest.update(os.path.basename(path).encode('utf-8'))
+        with open(path, 'rb') as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def data_fingerprint(paths=None):
+    """Hash of the analyzer sources plus name, size and mtime of the versioned files"""
+    files = []
+    for path in paths or VERSIONED_PATHS:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in os.listdir(path))
+        else:
+            files.append(path)
+
+    entries = []
+    for path in files:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((os.path.basename(path), stat.st_size, stat.st_mtime_ns))
+    return make_key(ANALYSIS_CACHE_VERSION, code_fingerprint(), sorted(entries))[:16]
+
+
+class ResultCache:
+    """
+    Bounded LRU + TTL cache with an optional shared SQLite tier.
+
+    Values are copied in and out of the in-process tier, so callers may
+    modify what they cached or got back without affecting other requests.
+
+    Args:
+        namespace: name used for the SQLite table and in stats (an identifier)
+        max_entries: in-process capacity (least recently used entries are evicted)
+        ttl: seconds an entry stays valid in either tier
+        db_path: SQLite file for the shared tier (None disables it)
+        max_shared_entries: capacity of the shared tier
+        version_ttl: seconds the dataset/model fingerprint is reused before
+            the files are checked again
+    """
+
+    def __init__(self, namespace, max_entries=1024, ttl=3600, db_path=None, max_shared_entries=50000, version_ttl=5.0):
+        if not isinstance(namespace, str) or not NAMESPACE_PATTERN.fullmatch(namespace):
+            raise ValueError(f"Cache namespace must be an identifier, got {namespace!r}")
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.max_shared_entries = max_shared_entries
+        self.version_ttl = version_ttl
+
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._version = None
+        self._version_checked = 0.0
+        self._shared_writes = 0
+        self._stats = {'hits': 0, 'shared_hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+        if self.db_path:
+            try:
+                self._connection()
+            except sqlite3.Error as e:
+                print(f"Shared {namespace} cache disabled ({e})")
+                self.db_path = None
+
+    @property
+    def version(self):
+        """Fingerprint of the datasets/models; a change clears the in-process tier"""
+        now = time.monotonic()
+        if self._version is None or now - self._version_checked > self.version_ttl:
+            version = data_fingerprint()
+            with self._lock:
+                if self._version is not None and version != self._version:
+                    print(f"Datasets or models changed, invalidating {self.namespace} cache")
+                    self._entries.clear()
+                    self._stats['invalidations'] += 1
+                self._version = version
+                self._version_checked = now
+        return self._version
+
+    def key_for(self, *parts):
+        return make_key(self.namespace, self.version, *parts)
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=5.0)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                f'CREATE TABLE IF NOT EXISTS "{self.namespace}" '
+                '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+            )
+            self._local.connection = connection
+        return connection
+
+    def _shared_get(self, key):
+        try:
+            row = self._connection().execute(
+                f'SELECT value, expires_at FROM "{self.namespace}" WHERE key = ?', (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Shared {self.namespace} cache read failed: {e}")
+            return None
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def _shared_set(self, key, value):
+        try:
+            connection = self._connection()
+            with connection:
+                connection.execute(
+                    f'INSERT OR REPLACE INTO "{self.namespace}" (key, value, expires_at) VALUES (?, ?, ?)',
+                    (key, json.dumps(value), time.time() + self.ttl)
+                )
+            self._shared_writes += 1
+            if self._shared_writes % 100 == 0:
+                self._prune_shared(connection)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"Shared {self.namespace} cache write failed: {e}")
+
+    def _prune_shared(self, connection):
+        """Drop expired rows, then the soonest-expiring rows beyond capacity"""
+        with connection:
+            connection.execute(f'DELETE FROM "{self.namespace}" WHERE expires_at < ?', (time.time(),))
+            connection.execute(
+                f'DELETE FROM "{self.namespace}" WHERE key IN ('
+                f'SELECT key FROM "{self.namespace}" ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_shared_entries,)
+            )
+
+    def get(self, key, record_stats=True):
+        """Cached value for key, or None (record_stats=False for internal re-checks)"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] >= now:
+                    self._entries.move_to_end(key)
+                    if record_stats:
+                        self._stats['hits'] += 1
+                    return copy.deepcopy(entry[1])
+                del self._entries[key]
+
+        if self.db_path:
+            value = self._shared_get(key)
+            if value is not None:
+                # json.loads already built a private copy for this caller
+                self._remember(key, copy.deepcopy(value), now)
+                if record_stats:
+                    with self._lock:
+                        self._stats['shared_hits'] += 1
+                return value
+
+        if record_stats:
+            with self._lock:
+                self._stats['misses'] += 1
+        return None
+
+    def set(self, key, value):
+        self._remember(key, copy.deepcopy(value), time.time())
+        if self.db_path:
+            self._shared_set(key, value)
+
+    def _remember(self, key, value, now):
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def invalidate(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._entries.clear()
+            self._stats['invalidations'] += 1
+        if self.db_path:
+            try:
+                connection = self._connection()
+                with connection:
+                    connection.execute(f'DELETE FROM "{self.namespace}"')
+            except sqlite3.Error as e:
+                print(f"Shared {self.namespace} cache clear failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['shared_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['shared_hits']) / lookups, 3) if lookups else 0.0
+        stats['namespace'] = self.namespace
+        stats['shared_tier'] = bool(self.db_path)
+        stats['version'] = self._version
+        return stats
+
+
+def cache_from_env(namespace, default_max_entries=1024, default_ttl=3600):
+    """Cache configured from ANALYSIS_CACHE_* environment variables ('off' disables the shared tier)"""
+    db_path = os.getenv('ANALYSIS_CACHE_DB') or None
+    return ResultCache(
+        namespace,
+        max_entries=int(os.getenv('ANALYSIS_CACHE_SIZE', str(default_max_entries))),
+        ttl=float(os.getenv('ANALYSIS_CACHE_TTL', str(default_ttl))),
+        db_path=None if db_path and db_path.lower() == 'off' else db_path
+    )
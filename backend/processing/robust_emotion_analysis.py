@@ -1,52 +1,25 @@
 import os
 import numpy as np
-import pandas as pd
-import librosa
 from sklearn.preprocessing import StandardScaler, LabelEncoder
-import pickle
-import joblib
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-import tensorflow as tf
-from tensorflow import keras
-import traceback
 import re
+from processing.text_context import TextContext, get_vader_analyzer
+from processing.phrase_matcher import PhraseMatcher, is_whole_word
+from processing.emoji_lexicon import emoji_lexicon, EMOTION_EMOJIS
+from processing.model_registry import lazy_import, model_registry, AUDIO_EMOTION_MODEL
+from processing.audio_decode import DecodedAudio
+
+# librosa is only needed for audio; import it on first use
+librosa = lazy_import('librosa')
 
 class RobustEmotionAnalyzer:
     def __init__(self):
         """Initialize robust emotion analyzer with enhanced emoji detection"""
-        self.text_analyzer = SentimentIntensityAnalyzer()
-        self.models_loaded = False
-        self.audio_model = None
-        self.audio_encoder = None
-        
-        # Load emoji mappings for tone detection
-        self.emoji_emotions = self._load_emoji_mappings()
-        
-        # Define comprehensive emotion-emoji mappings
-        self.emotion_emojis = {
-            'happy': ['😊', '😀', '😁', '😄', '😆', '🙂', '😋', '🤗', '😇', '🥰', '😍', '🤩', '😘', '😗', '😙', '😚', '🤭'],
-            'excited': ['😃', '😆', '🤩', '🤗', '🎉', '🙌', '👏', '🔥', '⚡', '✨', '💫', '🌟', '🎊', '🥳'],
-            'love': ['😍', '🥰', '😘', '💕', '💖', '💗', '💓', '💝', '❤️', '🧡', '💛', '💚', '💙', '💜', '🤍', '🖤'],
-            'angry': ['😠', '😡', '🤬', '😤', '💢', '👿', '🔥', '💯', '🤯'],
-            'sad': ['😢', '😭', '😞', '😔', '😟', '😕', '🙁', '☹️', '😣', '😖', '😫', '😩', '🥺', '😪'],
-            'disappointed': ['😞', '😔', '😟', '😕', '🙁', '☹️', '😤', '😮‍💨', '😒', '🫤'],
-            'fear': ['😨', '😰', '😱', '🤯', '😧', '😦', '😮', '🫢', '🙀', '🫣'],
-            'surprise': ['😮', '😯', '😲', '🤯', '😳', '🫢', '🤭', '😱', '🙀', '‼️', '❗', '❓', '❔'],
-            'disgust': ['🤢', '🤮', '😷', '🤧', '🤒', '😵', '🤐', '🙄', '😒', '😑'],
-            'neutral': ['😐', '😑', '🙂', '😶', '🫤', '😕', '🤷', '🤷‍♀️', '🤷‍♂️'],
-            'confused': ['😕', '🤔', '🫤', '😵‍💫', '🤯', '🫨', '😵', '❓', '❔'],
-            'laughing': ['😂', '🤣', '😆', '😹', '💀', '☠️', '😄', '😁'],
-            'cool': ['😎', '🤠', '🕶️', '😏', '🤘', '👌', '🔥', '💯'],
-            'crying': ['😭', '😢', '🥺', '😿', '😾'],
-            'sleeping': ['😴', '💤', '🛌', '😪'],
-            'sick': ['🤢', '🤮', '😷', '🤧', '🤒', '🥵', '🥶'],
-            'party': ['🥳', '🎉', '🎊', '🍾', '🥂', '🍻', '🎈', '🎁'],
-            'thinking': ['🤔', '💭', '🧠', '💡', '🔍'],
-            'shocked': ['😱', '🤯', '😳', '🫢', '😲', '😮', '😯', '🙀'],
-            'embarrassed': ['😳', '😅', '🤭', '🫣', '😊', '🤗', '😌'],
-            'flirty': ['😉', '😏', '😘', '😗', '💋', '💕', '🥰', '😍'],
-            'sarcastic': ['🙃', '😏', '🙄', '😒', '🤨', '😑']
-        }
+        self.text_analyzer = get_vader_analyzer()
+        self._fallback_encoder = None
+        
+        # Shared emoji -> (emotion, meaning, weight) table
+        self.emoji_lexicon = emoji_lexicon
+        self.emotion_emojis = EMOTION_EMOJIS
         
         # Define emotion patterns with enhanced emoji context
         self.emotion_patterns = {
@@ -102,84 +75,117 @@ class RobustEmotionAnalyzer:
             }
         }
         
-        # Try to load models
-        self._load_models()
+        # Compile the emotion lexicon once so scoring is a single scan per request
+        self._compile_emotion_patterns()
+    
+    @property
+    def audio_model(self):
+        """Shared audio emotion predictor, loaded on first use (None if unavailable)"""
+        return model_registry.get(AUDIO_EMOTION_MODEL)
+    
+    @property
+    def audio_encoder(self):
+        predictor = self.audio_model
+        if predictor is not None and predictor.encoder is not None:
+            return predictor.encoder
+        if self._fallback_encoder is None:
+            self._fallback_encoder = self._create_fallback_encoder()
+        return self._fallback_encoder
+    
+    @property
+    def models_loaded(self):
+        return self.audio_model is not None
+    
+    def _compile_emotion_patterns(self):
+        """
+        Expand every keyword, phrase, personal statement and intensity template
+        into one table of pattern -> [(emotion, category, weight)] and compile
+        the patterns into a single substring automaton.
+        """
+        table = {}
         
-        # Load emoji mappings
-        self._load_emoji_mappings()
+        def register(pattern, emotion, category, weight):
+            table.setdefault(pattern, []).append((emotion, category, weight))
+        
+        for emotion, patterns in self.emotion_patterns.items():
+            keywords = patterns['keywords']
+            
+            for keyword in keywords:
+                register(keyword, emotion, 'keywords', 2)
+            
+            for phrase in patterns['phrases']:
+                register(phrase, emotion, 'phrases', 12)
+            
+            personal_templates = [
+                ("i'm {}", 8), ("i am {}", 8), ("feeling {}", 8), ("i feel {}", 8),
+                ("i'm so {}", 5), ("really {}", 5), ("very {}", 5)
+            ]
+            for template, limit in personal_templates:
+                for keyword in keywords[:limit]:
+                    register(template.format(keyword), emotion, 'personal', 15)
+            
+            intensity_templates = ["{i} {k}", "i'm {i} {k}", "feel {i} {k}", "{k} {i}", "so {i} {k}", "really {i} {k}"]
+            for keyword in keywords:
+                for intensity in patterns['intensity_words']:
+                    for template in intensity_templates:
+                        register(template.format(i=intensity, k=keyword), emotion, 'intensity', 8)
+        
+        self._emotion_pattern_table = table
+        self._emotion_matcher = PhraseMatcher(
+            table.keys(), ignore_case=False, word_boundaries=False, collapse_whitespace=False
+        ).compile()
+        
+        # Keywords alone, for spotting emotional words written in caps
+        self._keyword_emotions = {}
+        for emotion, patterns in self.emotion_patterns.items():
+            for keyword in patterns['keywords']:
+                self._keyword_emotions.setdefault(keyword, []).append(emotion)
+        self._keyword_matcher = PhraseMatcher(
+            self._keyword_emotions.keys(), ignore_case=False, word_boundaries=False, collapse_whitespace=False
+        ).compile()
     
-    def _load_emoji_mappings(self):
-        """Load emoji mappings from CSV dataset"""
-        self.emoji_mappings = {}
-        try:
-            csv_path = os.path.join(os.path.dirname(__file__), '..', 'Datasets', 'genz_emojis.csv')
-            if os.path.exists(csv_path):
-                import pandas as pd
-                df = pd.read_csv(csv_path)
-                for _, row in df.iterrows():
-                    emoji = row.get('emoji', '')
-                    meaning = row.get('meaning', '').lower()
-                    if emoji and meaning:
-                        # Map emoji to emotional context
-                        emotion_context = self._map_meaning_to_emotion(meaning)
-                        self.emoji_mappings[emoji] = {
-                            'meaning': meaning,
-                            'emotion': emotion_context
-                        }
-        except Exception as e:
-            print(f"Warning: Could not load emoji mappings: {e}")
-            self.emoji_mappings = {}
+    @staticmethod
+    def _is_standalone(text, start, end):
+        """Word-boundary check like regex \b: the match is not glued to surrounding word characters"""
+        return is_whole_word(text, start, end)
     
-    def _map_meaning_to_emotion(self, meaning):
-        """Map emoji meaning to emotion category"""
-        meaning_lower = meaning.lower()
-        
-        # Map meanings to primary emotions
-        if any(word in meaning_lower for word in ['happy', 'joy', 'laugh', 'fun', 'love', 'excited']):
-            return 'joy'
-        elif any(word in meaning_lower for word in ['sad', 'cry', 'tears', 'depressed', 'down']):
-            return 'sadness'
-        elif any(word in meaning_lower for word in ['angry', 'mad', 'rage', 'annoyed', 'furious']):
-            return 'anger'
-        elif any(word in meaning_lower for word in ['scared', 'fear', 'afraid', 'worried', 'nervous']):
-            return 'fear'
-        elif any(word in meaning_lower for word in ['surprised', 'shock', 'wow', 'amazing']):
-            return 'surprise'
-        elif any(word in meaning_lower for word in ['disgust', 'gross', 'yuck', 'eww']):
-            return 'disgust'
-        elif any(word in meaning_lower for word in ['neutral', 'okay', 'fine', 'normal']):
-            return 'neutral'
-        else:
-            return 'neutral'
+    def _score_emotion_patterns(self, text_lower):
+        """
+        Single pass over the text that returns per-emotion scores and hit counts
+        per category (keywords, phrases, personal, intensity).
+        """
+        # pattern -> whether any occurrence stands alone as a whole word
+        found = {}
+        for match in self._emotion_matcher.find_all(text_lower):
+            if not found.get(match.phrase):
+                found[match.phrase] = self._is_standalone(text_lower, match.start, match.end)
+        
+        scores = {emotion: 0 for emotion in self.emotion_patterns}
+        hits = {
+            emotion: {'keywords': 0, 'phrases': 0, 'personal': 0, 'intensity': 0}
+            for emotion in self.emotion_patterns
+        }
+        for pattern, standalone in found.items():
+            for emotion, category, weight in self._emotion_pattern_table[pattern]:
+                scores[emotion] += weight
+                if category == 'keywords' and standalone:
+                    scores[emotion] += 3  # Exact word matches score 5 in total
+                hits[emotion][category] += 1
+        
+        return scores, hits
     
     def detect_emojis_in_text(self, text):
         """Detect emojis in text and return their analysis"""
-        import re
-        
-        # Enhanced emoji pattern to catch more emojis
-        emoji_pattern = re.compile(
-            "["
-            "\U0001F600-\U0001F64F"  # emoticons
-            "\U0001F300-\U0001F5FF"  # symbols & pictographs
-            "\U0001F680-\U0001F6FF"  # transport & map symbols
-            "\U0001F1E0-\U0001F1FF"  # flags (iOS)
-            "\U00002702-\U000027B0"
-            "\U000024C2-\U0001F251"
-            "\U0001F900-\U0001F9FF"  # supplemental symbols
-            "]+", flags=re.UNICODE
-        )
-        
-        found_emojis = emoji_pattern.findall(text)
+        context = TextContext.of(text)
         emoji_analysis = []
         
-        for emoji in found_emojis:
-            if emoji in self.emoji_mappings:
-                emoji_data = self.emoji_mappings[emoji]
-                emoji_analysis.append({
-                    'emoji': emoji,
-                    'meaning': emoji_data['meaning'],
-                    'emotion': emoji_data['emotion']
-                })
+        for entry in self.emoji_lexicon.find_all(context.text):
+            emoji_analysis.append({
+                'emoji': entry.emoji,
+                'meaning': entry.meaning,
+                'emotion': entry.emotion,
+                'weight': entry.weight
+            })
         
         return emoji_analysis
     
@@ -188,16 +194,16 @@ class RobustEmotionAnalyzer:
         if not emoji_analysis:
             return {'tone': 'neutral', 'confidence': 0.0, 'details': 'No emojis detected'}
         
-        # Count emotion categories
+        # Weigh emotion categories (curated emojis count more than dataset guesses)
         emotion_counts = {}
         for emoji_data in emoji_analysis:
             emotion = emoji_data['emotion']
-            emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
+            emotion_counts[emotion] = emotion_counts.get(emotion, 0) + emoji_data.get('weight', 1.0)
         
         # Determine dominant emotion
         if emotion_counts:
             dominant_emotion = max(emotion_counts, key=emotion_counts.get)
-            confidence = emotion_counts[dominant_emotion] / len(emoji_analysis)
+            confidence = emotion_counts[dominant_emotion] / sum(emotion_counts.values())
             
             # Create detailed response
             emoji_list = [f"{data['emoji']} ({data['meaning']})" for data in emoji_analysis]
@@ -212,152 +218,51 @@ class RobustEmotionAnalyzer:
         
         return {'tone': 'neutral', 'confidence': 0.0, 'details': 'No meaningful emojis found'}
     
-    def _load_models(self):
-        """Load audio emotion models with robust error handling"""
-        try:
-            model_dir = os.path.join(os.path.dirname(__file__), '..', 'models', 'trained')
-            
-            # Try to load improved audio model
-            audio_model_path = os.path.join(model_dir, 'emotion_model_improved.h5')
-            if os.path.exists(audio_model_path):
-                print(f"Loading audio model from: {audio_model_path}")
-                self.audio_model = keras.models.load_model(audio_model_path)
-                print("✓ Audio emotion model loaded successfully")
-            
-            # Try to load audio label encoder with multiple methods
-            encoder_paths = [
-                os.path.join(model_dir, 'label_encoder.pkl'),
-                os.path.join(model_dir, 'audio_label_encoder.pkl')
-            ]
-            
-            encoder_loaded = False
-            for encoder_path in encoder_paths:
-                if os.path.exists(encoder_path):
-                    try:
-                        # Try pickle first
-                        with open(encoder_path, 'rb') as f:
-                            self.audio_encoder = pickle.load(f)
-                        print(f"✓ Audio label encoder loaded from {encoder_path}")
-                        encoder_loaded = True
-                        break
-                    except Exception as e1:
-                        try:
-                            # Try joblib
-                            self.audio_encoder = joblib.load(encoder_path)
-                            print(f"✓ Audio label encoder loaded with joblib from {encoder_path}")
-                            encoder_loaded = True
-                            break
-                        except Exception as e2:
-                            print(f"Warning: Could not load encoder from {encoder_path} (pickle: {e1}, joblib: {e2})")
-            
-            if not encoder_loaded:
-                print("Warning: Could not load audio label encoder. Creating fallback encoder...")
-                self._create_fallback_encoder()
-            
-            self.models_loaded = True
-            
-        except Exception as e:
-            print(f"Error loading emotion analysis models: {e}")
-            traceback.print_exc()
-            self._create_fallback_encoder()
-    
     def _create_fallback_encoder(self):
         """Create a fallback label encoder for basic emotion categories"""
-        self.audio_encoder = LabelEncoder()
+        encoder = LabelEncoder()
         # Standard emotion categories
         emotions = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
-        self.audio_encoder.fit(emotions)
+        encoder.fit(emotions)
         print("Creating fallback encoder for audio emotions...")
+        return encoder
     
     def analyze_text_robust(self, text):
         """Robust text-based emotion analysis with improved sensitivity"""
-        if not text or not text.strip():
+        context = TextContext.of(text)
+        if context.is_blank:
             return {'emotion': 'neutral', 'confidence': 0.3}
         
-        text_lower = text.lower()
+        text = context.text
+        text_lower = context.lower
         
         # VADER sentiment analysis for baseline
-        vader_scores = self.text_analyzer.polarity_scores(text)
+        vader_scores = context.vader_scores
         
-        # Enhanced pattern-based emotion scoring with higher accuracy
-        emotion_scores = {}
-        for emotion, patterns in self.emotion_patterns.items():
-            score = 0
-            
-            # Direct keyword matching with context awareness
-            for keyword in patterns['keywords']:
-                if keyword in text_lower:
-                    # Check if keyword is standalone word (not part of another word)
-                    import re
-                    if re.search(r'\b' + re.escape(keyword) + r'\b', text_lower):
-                        score += 5  # Higher score for exact word matches
-                    else:
-                        score += 2  # Lower score for partial matches
-            
-            # Phrase matching (weighted much higher for complete expressions)
-            for phrase in patterns['phrases']:
-                if phrase in text_lower:
-                    score += 12  # Much higher score for complete phrases
-            
-            # Enhanced personal statements with more variations
-            personal_indicators = [
-                f"i'm {keyword}" for keyword in patterns['keywords'][:8]
-            ] + [
-                f"i am {keyword}" for keyword in patterns['keywords'][:8]
-            ] + [
-                f"feeling {keyword}" for keyword in patterns['keywords'][:8]
-            ] + [
-                f"i feel {keyword}" for keyword in patterns['keywords'][:8]
-            ] + [
-                f"i'm so {keyword}" for keyword in patterns['keywords'][:5]
-            ] + [
-                f"really {keyword}" for keyword in patterns['keywords'][:5]
-            ] + [
-                f"very {keyword}" for keyword in patterns['keywords'][:5]
-            ]
-            
-            for personal in personal_indicators:
-                if personal in text_lower:
-                    score += 15  # Very high score for personal emotional statements
-            
-            # Enhanced intensity modifiers with proximity checking
-            for keyword in patterns['keywords']:
-                if keyword in text_lower:
-                    for intensity in patterns['intensity_words']:
-                        intensity_patterns = [
-                            f"{intensity} {keyword}",
-                            f"i'm {intensity} {keyword}",
-                            f"feel {intensity} {keyword}",
-                            f"{keyword} {intensity}",
-                            f"so {intensity} {keyword}",
-                            f"really {intensity} {keyword}"
-                        ]
-                        for pattern in intensity_patterns:
-                            if pattern in text_lower:
-                                score += 8  # Higher bonus for intensity
+        caps_words = context.caps_words
+        
+        # Keyword, phrase, personal-statement and intensity hits in one scan
+        emotion_scores, emotion_hits = self._score_emotion_patterns(text_lower)
+        
+        # Emotional keywords written in caps, e.g. "I'm SO ANGRY"
+        caps_keyword_emotions = []
+        if caps_words:
+            caps_text = '\n'.join(caps_words)
+            caps_keywords = {match.phrase for match in self._keyword_matcher.find_all(caps_text.lower())}
+            for keyword in caps_keywords:
+                caps_keyword_emotions.extend(self._keyword_emotions[keyword])
+        
+        exclamation_count = text.count('!')
+        for emotion in self.emotion_patterns:
+            if emotion == 'neutral':
+                continue
             
-            # Enhanced exclamation and caps detection
-            if '!' in text and emotion != 'neutral':
-                excitement_keywords = [kw for kw in patterns['keywords'] if kw in text_lower]
-                if excitement_keywords:
-                    exclamation_count = text.count('!')
-                    score += exclamation_count * 3  # Higher bonus per exclamation
+            # Enhanced exclamation detection
+            if exclamation_count and emotion_hits[emotion]['keywords']:
+                emotion_scores[emotion] += exclamation_count * 3  # Higher bonus per exclamation
             
             # Caps detection for emotional intensity
-            caps_words = [word for word in text.split() if word.isupper() and len(word) > 2]
-            if caps_words and emotion != 'neutral':
-                for keyword in patterns['keywords']:
-                    if any(keyword.upper() in caps_word for caps_word in caps_words):
-                        score += 6  # Bonus for caps emotional words
-            
-            # Emoji boost from emoji analysis
-            if hasattr(self, 'emoji_mappings'):
-                emoji_analysis = self.detect_emojis_in_text(text)
-                emoji_tone = self.analyze_emoji_tone(emoji_analysis)
-                if emoji_tone['tone'] == emotion and emoji_tone['confidence'] > 0.5:
-                    score += 10  # Strong emoji reinforcement
-            
-            emotion_scores[emotion] = score
+            emotion_scores[emotion] += 6 * caps_keyword_emotions.count(emotion)
         
         # Enhanced VADER integration
         if vader_scores['compound'] > 0.6:
@@ -372,15 +277,7 @@ class RobustEmotionAnalyzer:
         
         if max_score > 0:
             primary_emotion = max(emotion_scores, key=emotion_scores.get)
-            # Improved confidence calculation
-            if max_score >= 15:
-                confidence = min(0.85 + (max_score - 15) * 0.01, 0.98)
-            elif max_score >= 8:
-                confidence = 0.65 + (max_score - 8) * 0.02
-            elif max_score >= 3:
-                confidence = 0.45 + (max_score - 3) * 0.04
-            else:
-                confidence = 0.25 + max_score * 0.06
+            confidence = self._score_confidence(max_score)
         else:
             primary_emotion = 'neutral'
             confidence = 0.4
@@ -391,17 +288,76 @@ class RobustEmotionAnalyzer:
             'details': {
                 'vader_scores': vader_scores,
                 'emotion_scores': emotion_scores,
+                'emotion_hits': emotion_hits,
                 'max_score': max_score,
                 'method': 'enhanced_pattern_matching' if max_score > 0 else 'vader_fallback',
-                'text_length': len(text.split())
+                'text_length': context.word_count
+            }
+        }
+    
+    def _score_confidence(self, max_score):
+        """Confidence for the winning emotion's score"""
+        if max_score >= 15:
+            return min(0.85 + (max_score - 15) * 0.01, 0.98)
+        if max_score >= 8:
+            return 0.65 + (max_score - 8) * 0.02
+        if max_score >= 3:
+            return 0.45 + (max_score - 3) * 0.04
+        return 0.25 + max_score * 0.06
+    
+    def analyze_text_quick(self, text):
+        """
+        Rule-based emotion from VADER polarity only, skipping the
+        keyword/phrase scan. Same shape as analyze_text_robust.
+        """
+        context = TextContext.of(text)
+        if context.is_blank:
+            return {'emotion': 'neutral', 'confidence': 0.3}
+        
+        vader_scores = context.vader_scores
+        
+        # The same VADER contribution analyze_text_robust adds
+        emotion_scores = {}
+        if vader_scores['compound'] > 0.6:
+            emotion_scores['joy'] = emotion_scores.get('joy', 0) + 8
+        elif vader_scores['compound'] < -0.6:
+            emotion_scores['sadness'] = emotion_scores.get('sadness', 0) + 8
+        elif abs(vader_scores['compound']) < 0.1:
+            emotion_scores['neutral'] = emotion_scores.get('neutral', 0) + 3
+        
+        max_score = max(emotion_scores.values()) if emotion_scores else 0
+        if max_score > 0:
+            primary_emotion = max(emotion_scores, key=emotion_scores.get)
+            confidence = self._score_confidence(max_score)
+        else:
+            primary_emotion = 'neutral'
+            confidence = 0.4
+        
+        return {
+            'emotion': primary_emotion,
+            'confidence': confidence,
+            'details': {
+                'vader_scores': vader_scores,
+                'emotion_scores': emotion_scores,
+                'max_score': max_score,
+                'method': 'vader_fallback',
+                'text_length': context.word_count
             }
         }
     
     def extract_safe_audio_features(self, audio_path):
-        """Safely extract audio features with error handling"""
+        """Safely extract audio features (from a file path or DecodedAudio) with error handling"""
         try:
-            # Load audio with librosa
-            y, sr = librosa.load(audio_path, duration=5.0, sr=22050)
+            if isinstance(audio_path, DecodedAudio):
+                # Already decoded upload: read the first 5 seconds of the shared buffer
+                y = audio_path.slice(0, 5.0).float_samples()
+                sr = audio_path.sample_rate
+                if sr != 22050:
+                    y = librosa.resample(y, orig_sr=sr, target_sr=22050)
+                    sr = 22050
+            else:
+                # Load audio with librosa
+                y, sr = librosa.load(audio_path, duration=5.0, sr=22050)
             
             if len(y) == 0:
                 return None
@@ -437,8 +393,8 @@ class RobustEmotionAnalyzer:
             return None
     
     def analyze_audio_emotion(self, audio_path):
-        """Analyze audio file for emotion with fallback mechanisms"""
-        if not os.path.exists(audio_path):
+        """Analyze audio file (path or DecodedAudio) for emotion with fallback mechanisms"""
+        if not isinstance(audio_path, DecodedAudio) and not os.path.exists(audio_path):
             return {'emotion': 'neutral', 'confidence': 0.2, 'error': 'Audio file not found'}
         
         try:
@@ -522,17 +478,26 @@ class RobustEmotionAnalyzer:
 # Global analyzer instance
 robust_analyzer = RobustEmotionAnalyzer()
 
-def analyze_emotion_robust(text=None, audio_path=None):
-    """Main function for robust emotion analysis"""
+def analyze_emotion_robust(text=None, audio_path=None, use_patterns=True):
+    """
+    Main function for robust emotion analysis (text may be a str or a TextContext).
+    use_patterns=False scores text from VADER only (the quick fallback).
+    Emoji tone is reported in 'emoji_analysis' alongside, but never decides
+    the text or primary emotion.
+    """
     results = {}
     
     # Analyze text if provided
     if text:
-        text_result = robust_analyzer.analyze_text_robust(text)
+        context = TextContext.of(text)
+        if use_patterns:
+            text_result = robust_analyzer.analyze_text_robust(context)
+        else:
+            text_result = robust_analyzer.analyze_text_quick(context)
         results['text_analysis'] = text_result
         
         # Add emoji analysis for text
-        emoji_analysis = robust_analyzer.detect_emojis_in_text(text)
+        emoji_analysis = robust_analyzer.detect_emojis_in_text(context)
         emoji_tone = robust_analyzer.analyze_emoji_tone(emoji_analysis)
         results['emoji_analysis'] = emoji_tone
     
@@ -543,31 +508,17 @@ def analyze_emotion_robust(text=None, audio_path=None):
     
     # Determine overall emotion
     if text and audio_path:
-        # Combine text, audio, and emoji analyses
+        # Combine text and audio; emoji tone is reported, not voted
         text_emotion = results['text_analysis']['emotion']
         audio_emotion = results['audio_analysis']['emotion']
         emoji_emotion = results['emoji_analysis']['tone']
-        emoji_confidence = results['emoji_analysis']['confidence']
-        
-        # If emojis detected with high confidence, factor them in
-        if emoji_confidence > 0.6:
-            # Strong emoji indicators - weight them heavily
-            if emoji_emotion == text_emotion or emoji_emotion == audio_emotion:
-                # Emoji agrees with one modality
-                primary_emotion = emoji_emotion
-                confidence = min((results['text_analysis']['confidence'] + results['audio_analysis']['confidence'] + emoji_confidence) / 3 * 1.3, 0.95)
-            else:
-                # Emoji disagrees - still consider it but lower weight
-                primary_emotion = text_emotion  # Prefer text as baseline
-                confidence = results['text_analysis']['confidence'] * 0.9
+        
+        if text_emotion == audio_emotion:
+            primary_emotion = text_emotion
+            confidence = min((results['text_analysis']['confidence'] + results['audio_analysis']['confidence']) / 2 * 1.2, 0.95)
         else:
-            # Low emoji confidence - standard text/audio analysis
-            if text_emotion == audio_emotion:
-                primary_emotion = text_emotion
-                confidence = min((results['text_analysis']['confidence'] + results['audio_analysis']['confidence']) / 2 * 1.2, 0.95)
-            else:
-                primary_emotion = text_emotion
-                confidence = results['text_analysis']['confidence'] * 0.8
+            primary_emotion = text_emotion
+            confidence = results['text_analysis']['confidence'] * 0.8
         
         results['multimodal_analysis'] = {
             'primary_emotion': primary_emotion,
@@ -577,34 +528,15 @@ def analyze_emotion_robust(text=None, audio_path=None):
                 'text_emoji': text_emotion == emoji_emotion,
                 'audio_emoji': audio_emotion == emoji_emotion
             },
-            'emoji_influence': emoji_confidence > 0.6
+            'emoji_influence': False
         }
     elif text:
-        # Text-only analysis with emoji enhancement
-        text_emotion = results['text_analysis']['emotion']
-        emoji_emotion = results['emoji_analysis']['tone']
-        emoji_confidence = results['emoji_analysis']['confidence']
-        
-        if emoji_confidence > 0.7:
-            # Strong emoji indicators
-            if emoji_emotion == text_emotion:
-                # Emoji reinforces text analysis
-                primary_emotion = text_emotion
-                confidence = min(results['text_analysis']['confidence'] * 1.2, 0.95)
-            else:
-                # Emoji contradicts text - prefer emoji for tone
-                primary_emotion = emoji_emotion
-                confidence = max(emoji_confidence, results['text_analysis']['confidence'] * 0.8)
-        else:
-            # Weak or no emoji signal
-            primary_emotion = text_emotion
-            confidence = results['text_analysis']['confidence']
-        
+        # Text-only analysis; emoji tone is reported, not voted
         results['multimodal_analysis'] = {
-            'primary_emotion': primary_emotion,
-            'confidence': confidence,
+            'primary_emotion': results['text_analysis']['emotion'],
+            'confidence': results['text_analysis']['confidence'],
             'modality': 'text_with_emoji',
-            'emoji_influence': emoji_confidence > 0.7
+            'emoji_influence': False
         }
     elif audio_path:
         results['multimodal_analysis'] = {
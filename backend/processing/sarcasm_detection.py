@@ -2,11 +2,59 @@ import re
 import numpy as np
 import os
 import json
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from processing.text_context import Span, TextContext, get_vader_analyzer
+from processing.llm_cache import llm_cache, configure_openai
+from processing.combined_llm_analysis import combined_llm_enabled, request_combined_analysis
+from processing.phrase_matcher import PhraseMatcher, is_whole_word
+from processing.highlight_spans import find_segment_spans, merge_spans, render_spans, spans_to_json
+
+SARCASM_HIGHLIGHT_OPEN = '<span style="color: #DC3545; font-weight: bold; background-color: rgba(220, 53, 69, 0.1); padding: 2px 4px; border-radius: 3px; text-decoration: underline; text-decoration-style: wavy;">'
+
+class SarcasmScan:
+    """Positions of every sarcasm lexicon term in one text, shared by all checks"""
+
+    def __init__(self, context, matcher):
+        self.context = context
+        self.text = context.text
+        self.lower = context.lower
+        # Offsets into the lowercased text line up with the original unless lowercasing changed its length
+        self.aligned = len(self.lower) == len(self.text)
+        self.occurrences = {}
+        for match in matcher.find_all(self.lower):
+            self.occurrences.setdefault(match.phrase, []).append(match.start)
+
+    def has(self, term):
+        return term in self.occurrences
+
+    def has_any(self, terms):
+        return any(term in self.occurrences for term in terms)
+
+    def count(self, term):
+        return len(self.occurrences.get(term, ()))
+
+    def first(self, term):
+        """Index of the first occurrence, like str.find"""
+        positions = self.occurrences.get(term)
+        return positions[0] if positions else -1
+
+    def window_has_any(self, terms, start, end):
+        """Whether any term occurs entirely inside text[start:end] (case-insensitive)"""
+        if not self.aligned:
+            window = self.text[start:end].lower()
+            return any(term in window for term in terms)
+        for term in terms:
+            for position in self.occurrences.get(term, ()):
+                if position >= start and position + len(term) <= end:
+                    return True
+        return False
 
 class SarcasmDetector:
+    LLM_MODEL = "gpt-3.5-turbo"
+    # Bump whenever the highlighting prompt changes so cached answers are not reused
+    PROMPT_VERSION = 1
+
     def __init__(self):
-        self.vader_analyzer = SentimentIntensityAnalyzer()
+        self.vader_analyzer = get_vader_analyzer()
         
         # Initialize OpenAI client for sarcasm highlighting
         self.client = None
@@ -16,7 +64,7 @@ class SarcasmDetector:
             try:
                 import openai
                 openai.api_key = self.api_key
-                self.client = openai
+                self.client = configure_openai(openai)
                 print("✅ OpenAI client initialized for sarcasm highlighting")
             except ImportError:
                 print("⚠️ OpenAI package not installed. Using rule-based highlighting.")
@@ -180,365 +228,306 @@ class SarcasmDetector:
             "unemployment", "job search", "interview", "resume", "benefits"
         ]
 
-    def detect_sarcasm(self, text):
+        self._compile_patterns()
+
+    def _compile_patterns(self):
+        """Compile every lexicon and regex used by detection and highlighting once"""
+        positive_words = ["great", "perfect", "wonderful", "amazing", "fantastic", "excellent", "brilliant", "awesome"]
+
+        # Detection lexicons
+        self._repetition_words = positive_words
+        self._repetition_patterns = [
+            (word, re.compile(r'\b' + word + r'\b.*\b' + word + r'\b')) for word in positive_words
+        ]
+        self._temporal_indicators = ["again", "still", "always", "every time", "once again", "yet again", "as usual"]
+        self._temporal_positive_words = positive_words + ["love"]
+        self._economic_sarcasm_patterns = [
+            ("work", "40", "poor"),
+            ("work", "hours", "broke"),
+            ("job", "pays", "nothing"),
+            ("minimum", "wage", "rich"),
+            ("paycheck", "paycheck", "wealthy"),
+        ]
+
+        # Intensified positive words ("so great") checked against negative context
+        intensifiers = ["so", "very", "really", "extremely", "absolutely", "totally", "completely"]
+        escalation_positive_words = positive_words + ["happy", "thrilled", "excited"]
+        self._escalation_phrases = [
+            [f"{intensifier} {positive}" for positive in escalation_positive_words] for intensifier in intensifiers
+        ]
+        self._escalation_negative_context = ["problem", "issue", "broken", "crashed", "failed", "error", "stuck", "trouble", "wrong", "bad"]
+
+        # Positive words followed by exclamation marks
+        self._exclamation_patterns = [
+            re.compile(r'(Perfect|Great|Wonderful|Amazing|Fantastic|Brilliant|Excellent|Awesome)!'),
+            re.compile(r'(perfect|great|wonderful|amazing|fantastic|brilliant|excellent|awesome)!')
+        ]
+        self._exclamation_negative_words = [
+            "crashed", "broken", "stuck", "problem", "issue", "error", "failed",
+            "trouble", "wrong", "bad", "terrible", "awful", "hate", "annoying",
+            "frustrated", "angry", "upset", "disappointed", "again", "still",
+            "always", "never works", "not working", "stopped", "freeze", "lag"
+        ]
+
+        # Highlighting: sarcastic phrases with flexible spacing/punctuation between words
+        self._highlight_phrase_patterns = []
+        for phrase in self.sarcasm_phrases:
+            phrase_lower = phrase.lower()
+            flexible_phrase = re.escape(phrase_lower).replace(r'\ ', r'[\s,]*')
+            # The first word is matched literally, so its absence rules the phrase out
+            self._highlight_phrase_patterns.append(
+                (phrase_lower.split(' ')[0], re.compile(r'\b' + flexible_phrase + r'\b'))
+            )
+        self._edge_punctuation = re.compile(r'^[^\w]+|[^\w]+$')
+
+        # Highlighting: positive words near negative context
+        self._positive_negative_patterns = [
+            # Computer/tech problems
+            ("perfect", ["computer", "crashed", "broken", "error", "failed", "freeze"]),
+            ("great", ["computer", "crashed", "broken", "error", "failed", "freeze"]),
+            ("wonderful", ["crashed", "broken", "error", "failed"]),
+            ("amazing", ["crashed", "broken", "error", "failed"]),
+            ("fantastic", ["crashed", "broken", "error", "failed"]),
+
+            # Work sarcasm
+            ("love", ["working", "overtime", "unpaid", "extra hours", "late", "free"]),
+            ("enjoy", ["working", "overtime", "unpaid", "extra hours", "late", "free"]),
+            ("adore", ["working", "overtime", "unpaid", "extra hours"]),
+
+            # General frustration
+            ("perfect", ["stuck", "broken", "problem", "issue", "trouble"]),
+            ("great", ["stuck", "broken", "problem", "issue", "trouble"]),
+            ("wonderful", ["stuck", "broken", "problem", "issue", "trouble"]),
+            ("amazing", ["stuck", "broken", "problem", "issue", "trouble"]),
+            ("fantastic", ["stuck", "broken", "problem", "issue", "trouble"]),
+            ("brilliant", ["stuck", "broken", "problem", "issue", "trouble"]),
+            ("excellent", ["stuck", "broken", "problem", "issue", "trouble"]),
+
+            # Economic sarcasm
+            ("love", ["poor", "broke", "expensive", "bills", "debt"]),
+            ("enjoy", ["poor", "broke", "expensive", "bills", "debt"]),
+            ("great", ["poor", "broke", "expensive", "bills", "debt"]),
+            ("perfect", ["poor", "broke", "expensive", "bills", "debt"]),
+        ]
+        self._word_case_patterns = {
+            word: re.compile(re.escape(word), re.IGNORECASE) for word, _ in self._positive_negative_patterns
+        }
+        self._highlight_exclamation_patterns = [
+            re.compile(r'(Perfect|Great|Wonderful|Amazing|Fantastic|Brilliant|Excellent|Love|Awesome)!'),
+            re.compile(r'(perfect|great|wonderful|amazing|fantastic|brilliant|excellent|love|awesome)!')
+        ]
+        self._highlight_negative_indicators = ["crashed", "broken", "stuck", "problem", "issue", "error", "failed", "trouble"]
+
+        # One substring automaton over every term any check looks for
+        terms = set(self.sarcasm_phrases)
+        terms.update(self.positive_words_negative_context, self.economic_hardship_terms)
+        terms.update(["love", "great", "poor", "broke", "struggling", "can't afford", "no money", "work", "40", "hours"])
+        terms.update(word for pattern in self._economic_sarcasm_patterns for word in pattern)
+        terms.update(self._temporal_indicators, self._temporal_positive_words)
+        terms.update(phrase for group in self._escalation_phrases for phrase in group)
+        terms.update(self._escalation_negative_context, self._exclamation_negative_words)
+        terms.update(first_word for first_word, _ in self._highlight_phrase_patterns)
+        for positive, negatives in self._positive_negative_patterns:
+            terms.add(positive)
+            terms.update(negatives)
+        terms.update(self._highlight_negative_indicators)
+        self._term_matcher = PhraseMatcher(terms, ignore_case=False, word_boundaries=False, collapse_whitespace=False)
+        self._term_matcher.compile()
+
+    def _scan(self, text):
+        """Single pass over the text shared by detection and highlighting"""
+        if isinstance(text, SarcasmScan):
+            return text
+        return SarcasmScan(TextContext.of(text), self._term_matcher)
+
+    def analyze(self, text, use_llm=True):
+        """
+        Unified sarcasm pass: one scan of the text produces the detection
+        result (reasons, confidence, type) and the highlighting together.
+
+        Returns:
+            (detection_result, highlighting_result)
+        """
+        context = TextContext.of(text)
+        if context.is_blank:
+            return self._blank_detection(context.text), self._blank_highlighting(context.text)
+
+        scan = self._scan(context)
+        detection = self._detect(scan)
+        highlighting = self._highlight(scan, use_llm)
+        detection['highlighted_text'] = highlighting['highlighted_text'] if detection['sarcasm_detected'] else context.text
+        return detection, highlighting
+
+    def _blank_detection(self, text):
+        return {
+            'sarcasm_detected': False,
+            'confidence': 0.0,
+            'reasons': [],
+            'sarcasm_type': None,
+            'highlighted_text': text
+        }
+
+    def _blank_highlighting(self, text):
+        return {
+            'highlighted_text': text,
+            'sarcastic_segments': [],
+            'spans': [],
+            'method': 'none'
+        }
+
+    def detect_sarcasm(self, text, use_llm=True):
         """
         Enhanced main sarcasm detection function with improved accuracy
         Returns: dict with sarcasm_detected (bool), confidence (float), reasons (list)
         """
-        if not text or not text.strip():
-            return {
-                'sarcasm_detected': False,
-                'confidence': 0.0,
-                'reasons': [],
-                'sarcasm_type': None,
-                'highlighted_text': text
-            }
-        
-        text_lower = text.lower().strip()
+        context = TextContext.of(text)
+        if context.is_blank:
+            return self._blank_detection(context.text)
+
+        scan = self._scan(context)
+        result = self._detect(scan)
+
+        # Apply highlighting if sarcasm detected (no recursion now)
+        result['highlighted_text'] = context.text
+        if result['sarcasm_detected']:
+            result['highlighted_text'] = self._highlight(scan, use_llm).get('highlighted_text', context.text)
+        return result
+
+    def _detect(self, scan):
+        """Score every detection check from the shared scan"""
         reasons = []
         confidence_score = 0.0
         sarcasm_type = None
-        
+
         # 1. Enhanced direct sarcastic phrases detection
-        phrase_matches = self._check_sarcastic_phrases(text_lower)
+        phrase_matches = self._check_sarcastic_phrases(scan)
         if phrase_matches:
             confidence_score += 0.8  # Increased confidence for explicit phrases
             reasons.extend([f"Sarcastic phrase detected: '{phrase}'" for phrase in phrase_matches])
             sarcasm_type = "explicit_phrase"
-        
+
         # 2. Enhanced positive-negative contradiction pattern
-        contradiction_score = self._check_contradiction_pattern(text_lower)
+        contradiction_score = self._check_contradiction_pattern(scan)
         if contradiction_score > 0:
             confidence_score += contradiction_score * 1.2  # Boost contradiction detection
             reasons.append("Positive words used in negative context (contradiction pattern)")
             if not sarcasm_type:
                 sarcasm_type = "contradiction"
-        
+
         # 3. Enhanced economic sarcasm (work/money related)
-        economic_score = self._check_economic_sarcasm(text_lower)
+        economic_score = self._check_economic_sarcasm(scan)
         if economic_score > 0:
             confidence_score += economic_score * 1.1  # Slight boost for economic sarcasm
             reasons.append("Economic hardship expressed with positive language")
             if not sarcasm_type:
                 sarcasm_type = "economic"
-        
+
         # 4. Enhanced exclamation mark sarcasm
-        exclamation_score = self._check_exclamation_sarcasm(text)
+        exclamation_score = self._check_exclamation_sarcasm(scan)
         if exclamation_score > 0:
             confidence_score += exclamation_score * 1.3  # Higher boost for exclamation sarcasm
             reasons.append("Positive words with exclamation marks in negative context")
             if not sarcasm_type:
                 sarcasm_type = "exclamation"
-        
+
         # 5. NEW: Check for repetitive sarcasm patterns
-        repetitive_score = self._check_repetitive_sarcasm(text_lower)
+        repetitive_score = self._check_repetitive_sarcasm(scan)
         if repetitive_score > 0:
             confidence_score += repetitive_score
             reasons.append("Repetitive positive language suggesting sarcasm")
             if not sarcasm_type:
                 sarcasm_type = "repetitive"
-        
+
         # 6. NEW: Check for context-based sarcasm (time indicators)
-        temporal_score = self._check_temporal_sarcasm(text_lower)
+        temporal_score = self._check_temporal_sarcasm(scan)
         if temporal_score > 0:
             confidence_score += temporal_score
             reasons.append("Timing-based sarcasm detected (again, still, always)")
             if not sarcasm_type:
                 sarcasm_type = "temporal"
-        
+
         # 7. NEW: Check for emotional escalation sarcasm
-        escalation_score = self._check_emotional_escalation(text_lower)
+        escalation_score = self._check_emotional_escalation(scan)
         if escalation_score > 0:
             confidence_score += escalation_score
             reasons.append("Emotional escalation pattern detected")
             if not sarcasm_type:
                 sarcasm_type = "escalation"
-        
+
         # Normalize confidence score
         confidence_score = min(confidence_score, 1.0)
-        
+
         # Enhanced decision threshold with context awareness
         is_sarcastic = confidence_score >= 0.4  # Lowered threshold for better detection
-        
-        # Apply highlighting if sarcasm detected (no recursion now)
-        highlighted_text = text
-        if is_sarcastic:
-            highlight_result = self.highlight_sarcastic_text(text)
-            highlighted_text = highlight_result.get('highlighted_text', text)
-        
+
         return {
             'sarcasm_detected': is_sarcastic,
             'confidence': confidence_score,
             'reasons': reasons,
-            'sarcasm_type': sarcasm_type,
-            'highlighted_text': highlighted_text
-        }
-        
-        # 4. Sentiment analysis check
-        sentiment_score = self._check_sentiment_contradiction(text)
-        if sentiment_score > 0:
-            confidence_score += sentiment_score
-            reasons.append("Sentiment analysis suggests ironic usage")
-        
-        # 5. Check for specific work-related sarcasm
-        work_score = self._check_work_sarcasm(text_lower)
-        if work_score > 0:
-            confidence_score += work_score
-            reasons.append("Work-related sarcasm detected")
-            if not sarcasm_type:
-                sarcasm_type = "work_related"
-        
-        # 6. Check for frustrated sarcasm patterns
-        frustrated_score = self._check_frustrated_sarcasm(text_lower)
-        if frustrated_score > 0:
-            confidence_score += frustrated_score
-            reasons.append("Frustrated sarcasm detected - positive word followed by negative situation")
-            if not sarcasm_type:
-                sarcasm_type = "frustrated"
-        
-        # 7. Check for exclamation-emphasized sarcasm (e.g., "Perfect!" with problems)
-        exclamation_score = self._check_exclamation_sarcasm(text)
-        if exclamation_score > 0:
-            confidence_score += exclamation_score
-            reasons.append("Exclamation-emphasized sarcasm detected")
-            if not sarcasm_type:
-                sarcasm_type = "frustrated"
-        
-        # 8. Punctuation and capitalization patterns
-        punctuation_score = self._check_punctuation_patterns(text)
-        if punctuation_score > 0:
-            confidence_score += punctuation_score
-            reasons.append("Punctuation patterns suggest sarcasm")
-        
-        # Normalize confidence score
-        confidence_score = min(confidence_score, 1.0)
-        
-        # Determine if sarcasm is detected
-        sarcasm_detected = confidence_score >= 0.4
-        
-        return {
-            'sarcasm_detected': sarcasm_detected,
-            'confidence': confidence_score,
-            'reasons': reasons,
-            'sarcasm_type': sarcasm_type,
-            'original_text': text
+            'sarcasm_type': sarcasm_type
         }
 
-    def _check_sarcastic_phrases(self, text_lower):
+    def _check_sarcastic_phrases(self, scan):
         """Check for direct sarcastic phrases"""
-        matches = []
-        for phrase in self.sarcasm_phrases:
-            if phrase in text_lower:
-                matches.append(phrase)
-        return matches
+        return [phrase for phrase in self.sarcasm_phrases if scan.has(phrase)]
 
-    def _check_contradiction_pattern(self, text_lower):
+    def _check_contradiction_pattern(self, scan):
         """Check for positive words in negative contexts"""
         score = 0.0
-        
+
         # Check if positive words appear with negative economic terms
-        has_positive = any(word in text_lower for word in self.positive_words_negative_context)
-        has_negative_context = any(term in text_lower for term in self.economic_hardship_terms)
-        
+        has_positive = scan.has_any(self.positive_words_negative_context)
+        has_negative_context = scan.has_any(self.economic_hardship_terms)
+
         if has_positive and has_negative_context:
             score += 0.5
-        
+
         # Check for specific contradictory patterns
-        if "love" in text_lower and any(term in text_lower for term in ["poor", "broke", "struggling"]):
+        if scan.has("love") and scan.has_any(["poor", "broke", "struggling"]):
             score += 0.3
-        
-        if "great" in text_lower and any(term in text_lower for term in ["can't afford", "no money", "broke"]):
+
+        if scan.has("great") and scan.has_any(["can't afford", "no money", "broke"]):
             score += 0.3
-            
+
         return score
 
-    def _check_economic_sarcasm(self, text_lower):
+    def _check_economic_sarcasm(self, scan):
         """Check for economic/financial sarcasm"""
         score = 0.0
-        
+
         # Specific economic sarcasm patterns
-        economic_sarcasm_patterns = [
-            ("work", "40", "poor"),
-            ("work", "hours", "broke"),
-            ("job", "pays", "nothing"),
-            ("minimum", "wage", "rich"),
-            ("paycheck", "paycheck", "wealthy"),
-        ]
-        
-        for pattern in economic_sarcasm_patterns:
-            if all(word in text_lower for word in pattern):
+        for pattern in self._economic_sarcasm_patterns:
+            if all(scan.has(word) for word in pattern):
                 score += 0.4
                 break
-        
+
         # The specific case: "work 40 hours just to be poor"
-        if "work" in text_lower and "40" in text_lower and "poor" in text_lower:
+        if scan.has("work") and scan.has("40") and scan.has("poor"):
             score += 0.6
-        
-        if "work" in text_lower and "hours" in text_lower and any(term in text_lower for term in ["poor", "broke", "struggling"]):
+
+        if scan.has("work") and scan.has("hours") and scan.has_any(["poor", "broke", "struggling"]):
             score += 0.5
-            
-        return score
 
-    def _check_frustrated_sarcasm(self, text_lower):
-        """Check for frustrated sarcasm patterns like 'now, great. im stuck.'"""
-        score = 0.0
-        
-        # Positive words followed by negative situations
-        frustrated_patterns = [
-            # Stuck patterns
-            ("great", "stuck"),
-            ("perfect", "stuck"), 
-            ("wonderful", "stuck"),
-            ("amazing", "stuck"),
-            ("fantastic", "stuck"),
-            ("lovely", "stuck"),
-            ("brilliant", "stuck"),
-            ("excellent", "stuck"),
-            ("marvelous", "stuck"),
-            
-            # Problem patterns
-            ("great", "problem"),
-            ("perfect", "issue"),
-            ("wonderful", "trouble"),
-            ("amazing", "broken"),
-            ("fantastic", "wrong"),
-            ("lovely", "error"),
-            ("brilliant", "failed"),
-            ("excellent", "messed"),
-            
-            # General frustration
-            ("great", "now"),
-            ("perfect", "now"),
-            ("wonderful", "now"),
-            ("amazing", "now"),
-        ]
-        
-        for positive, negative in frustrated_patterns:
-            if positive in text_lower and negative in text_lower:
-                # Check if they appear close together (within reasonable distance)
-                pos_index = text_lower.find(positive)
-                neg_index = text_lower.find(negative)
-                if abs(pos_index - neg_index) < 50:  # Within 50 characters
-                    score += 0.6
-                    break
-        
-        # Specific pattern: "now" + comma/period + positive word + "im/i'm" + negative
-        import re
-        patterns = [
-            r"now[,.]?\s*(great|perfect|wonderful|amazing|fantastic)\s*(im?'?m?)\s*(stuck|broken|lost|confused|screwed)",
-            r"(great|perfect|wonderful|amazing|fantastic)[,.]?\s*(im?'?m?)\s*(stuck|broken|lost|confused|screwed)",
-            r"(great|perfect|wonderful|amazing|fantastic)[,.]?\s*now\s*(im?'?m?)\s*(stuck|broken|lost|confused|screwed)"
-        ]
-        
-        for pattern in patterns:
-            if re.search(pattern, text_lower):
-                score += 0.7
-                break
-        
-        # Check for sequence: positive word + problem expression
-        problem_words = ["stuck", "broken", "lost", "confused", "screwed", "messed", "failed", "wrong", "error", "trouble", "problem", "issue"]
-        positive_words = ["great", "perfect", "wonderful", "amazing", "fantastic", "lovely", "brilliant", "excellent", "marvelous", "awesome"]
-        
-        # Look for any positive word followed by any problem word within a short distance
-        for pos_word in positive_words:
-            if pos_word in text_lower:
-                pos_index = text_lower.find(pos_word)
-                for prob_word in problem_words:
-                    if prob_word in text_lower:
-                        prob_index = text_lower.find(prob_word)
-                        # If problem word comes after positive word within 30 chars
-                        if 0 < prob_index - pos_index < 30:
-                            score += 0.5
-                            break
-                if score > 0:
-                    break
-        
         return score
 
-    def _check_exclamation_sarcasm(self, text):
+    def _check_exclamation_sarcasm(self, scan):
         """Check for sarcasm using exclamation marks with positive words in negative contexts"""
-        import re
         score = 0.0
-        
-        # Look for positive words followed by exclamation marks
-        positive_exclamation_patterns = [
-            r'(Perfect|Great|Wonderful|Amazing|Fantastic|Brilliant|Excellent|Awesome)!',
-            r'(perfect|great|wonderful|amazing|fantastic|brilliant|excellent|awesome)!'
-        ]
-        
-        for pattern in positive_exclamation_patterns:
-            matches = re.finditer(pattern, text)
-            for match in matches:
+        text = scan.text
+
+        for pattern in self._exclamation_patterns:
+            for match in pattern.finditer(text):
                 match_pos = match.start()
                 # Check context around the exclamation
                 context_window = 80  # characters before and after
                 context_start = max(0, match_pos - context_window)
                 context_end = min(len(text), match_pos + context_window)
-                context = text[context_start:context_end].lower()
-                
-                # Negative context indicators
-                negative_words = [
-                    "crashed", "broken", "stuck", "problem", "issue", "error", "failed", 
-                    "trouble", "wrong", "bad", "terrible", "awful", "hate", "annoying",
-                    "frustrated", "angry", "upset", "disappointed", "again", "still",
-                    "always", "never works", "not working", "stopped", "freeze", "lag"
-                ]
-                
+
                 # If positive exclamation appears near negative context, it's likely sarcastic
-                if any(neg_word in context for neg_word in negative_words):
+                if scan.window_has_any(self._exclamation_negative_words, context_start, context_end):
                     score += 0.6
                     break
-        
-        return score
 
-    def _check_work_sarcasm(self, text_lower):
-        """Check for work-related sarcasm"""
-        score = 0.0
-        
-        # Work + positive word + negative reality
-        has_work_terms = any(term in text_lower for term in self.work_negative_terms)
-        has_positive = any(word in text_lower for word in self.positive_words_negative_context)
-        has_negative = any(term in text_lower for term in self.economic_hardship_terms)
-        
-        if has_work_terms and has_positive and has_negative:
-            score += 0.4
-        
-        return score
-
-    def _check_sentiment_contradiction(self, text):
-        """Use VADER to check for sentiment contradictions"""
-        scores = self.vader_analyzer.polarity_scores(text)
-        
-        # Look for mixed sentiment (high positive but also negative)
-        if scores['pos'] > 0.3 and scores['neg'] > 0.2:
-            return 0.2
-        
-        # Very positive sentiment but with negative keywords
-        text_lower = text.lower()
-        if scores['pos'] > 0.5 and any(term in text_lower for term in self.economic_hardship_terms):
-            return 0.3
-            
-        return 0.0
-
-    def _check_punctuation_patterns(self, text):
-        """Check punctuation patterns that suggest sarcasm"""
-        score = 0.0
-        
-        # Multiple exclamation marks
-        if text.count('!') >= 2:
-            score += 0.1
-        
-        # All caps words (indicates emphasis/sarcasm)
-        caps_words = re.findall(r'\b[A-Z]{2,}\b', text)
-        if caps_words:
-            score += 0.1
-        
-        # Quotation marks around positive words (air quotes)
-        quoted_positives = re.findall(r'"([^"]*)"', text)
-        for quoted in quoted_positives:
-            if any(word in quoted.lower() for word in self.positive_words_negative_context):
-                score += 0.1
-                
         return score
 
     def get_sarcasm_explanation(self, sarcasm_result):
@@ -569,88 +558,92 @@ class SarcasmDetector:
         
         return explanation
     
-    def _check_repetitive_sarcasm(self, text_lower):
+    def _check_repetitive_sarcasm(self, scan):
         """Detect repetitive positive language that suggests sarcasm"""
         score = 0.0
-        positive_words = ["great", "perfect", "wonderful", "amazing", "fantastic", "excellent", "brilliant", "awesome"]
-        
+
         # Count how many positive words appear
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        
+        positive_count = sum(1 for word in self._repetition_words if scan.has(word))
+
         # If multiple positive words appear, likely sarcastic
         if positive_count >= 3:
             score += 0.4
         elif positive_count >= 2:
             score += 0.3
-        
+
         # Check for repeated words (e.g., "great great" or "perfect, just perfect")
-        import re
-        for word in positive_words:
-            pattern = r'\b' + word + r'\b.*\b' + word + r'\b'
-            if re.search(pattern, text_lower):
+        for word, pattern in self._repetition_patterns:
+            if scan.count(word) >= 2 and pattern.search(scan.lower):
                 score += 0.3
                 break
-        
+
         return score
-    
-    def _check_temporal_sarcasm(self, text_lower):
+
+    def _check_temporal_sarcasm(self, scan):
         """Detect sarcasm based on temporal indicators"""
         score = 0.0
-        temporal_indicators = ["again", "still", "always", "every time", "once again", "yet again", "as usual"]
-        positive_words = ["great", "perfect", "wonderful", "amazing", "fantastic", "excellent", "brilliant", "awesome", "love"]
-        
-        has_temporal = any(indicator in text_lower for indicator in temporal_indicators)
-        has_positive = any(word in text_lower for word in positive_words)
-        
+
+        has_temporal = scan.has_any(self._temporal_indicators)
+        has_positive = scan.has_any(self._temporal_positive_words)
+
         if has_temporal and has_positive:
             score += 0.5  # Strong indicator of sarcasm
-        
+
         return score
-    
-    def _check_emotional_escalation(self, text_lower):
+
+    def _check_emotional_escalation(self, scan):
         """Detect emotional escalation patterns that suggest sarcasm"""
         score = 0.0
-        
+
         # Check for intensification words with positive words
-        intensifiers = ["so", "very", "really", "extremely", "absolutely", "totally", "completely"]
-        positive_words = ["great", "perfect", "wonderful", "amazing", "fantastic", "excellent", "brilliant", "awesome", "happy", "thrilled", "excited"]
-        
-        for intensifier in intensifiers:
-            for positive in positive_words:
-                if f"{intensifier} {positive}" in text_lower:
+        for phrases in self._escalation_phrases:
+            for phrase in phrases:
+                if scan.has(phrase):
                     # Check if there's negative context nearby
-                    negative_context = ["problem", "issue", "broken", "crashed", "failed", "error", "stuck", "trouble", "wrong", "bad"]
-                    if any(neg in text_lower for neg in negative_context):
+                    if scan.has_any(self._escalation_negative_context):
                         score += 0.4
                         break
-        
+
         return score
 
-    def highlight_sarcastic_text(self, text):
+    def highlight_sarcastic_text(self, text, use_llm=True):
         """
         Use LLM to identify and highlight sarcastic segments in the text
         Returns text with sarcastic parts marked for red highlighting
+        Pass use_llm=False to force the rule-based highlighter
         """
-        if not text or not text.strip():
-            return {
-                'highlighted_text': text,
-                'sarcastic_segments': [],
-                'method': 'none'
-            }
-        
-        # Skip the initial detection check to avoid recursion
-        # Instead, apply rule-based highlighting directly
-        
+        context = TextContext.of(text)
+        if context.is_blank:
+            return self._blank_highlighting(context.text)
+
+        return self._highlight(self._scan(context), use_llm)
+
+    def _highlight(self, scan, use_llm=True):
         # Try LLM-powered highlighting first
-        if self.client:
-            return self._llm_highlight_sarcasm(text)
+        if self.client and use_llm:
+            return self._llm_highlight_sarcasm(scan)
         else:
-            return self._rule_based_highlight_sarcasm(text)
-    
+            return self._rule_based_highlight_sarcasm(scan)
+
     def _llm_highlight_sarcasm(self, text):
         """Use LLM to identify specific sarcastic segments"""
+        scan = self._scan(text)
+        text = scan.text
         try:
-            prompt = f"""
+            if combined_llm_enabled():
+                # Shared completion that also carries the simplification
+                result = request_combined_analysis(self.client, text)
+            else:
+                result = self._request_llm_highlight(text)
+            return self._parse_llm_highlight(result, scan)
+
+        except Exception as e:
+            print(f"Error in LLM sarcasm highlighting: {e}")
+            return self._rule_based_highlight_sarcasm(scan)
+
+    def _request_llm_highlight(self, text):
+        """Dedicated highlighting completion (raw response content)"""
+        prompt = f"""
 You are an expert at detecting sarcasm in text. Your task is to identify the EXACT words or phrases that are being used sarcastically in the given text.
 
 TEXT TO ANALYZE: "{text}"
@@ -677,192 +670,147 @@ Format your response as JSON:
 Focus on identifying the specific words/phrases being used ironically or sarcastically.
 """
 
-            response = self.client.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert sarcasm detection system. Return only JSON responses with identified sarcastic text segments."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=300,
-                temperature=0.2
-            )
+        return llm_cache.complete(
+            self.client,
+            self.LLM_MODEL,
+            'sarcasm_highlight',
+            self.PROMPT_VERSION,
+            text,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are an expert sarcasm detection system. Return only JSON responses with identified sarcastic text segments."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            max_tokens=300,
+            temperature=0.2
+        )
+    
+    def _parse_llm_highlight(self, result, scan):
+        """Turn an LLM JSON response with sarcastic_segments into a highlighting result"""
+        text = scan.text
+        # Parse JSON response
+        if "{" in result and "}" in result:
+            json_start = result.find("{")
+            json_end = result.rfind("}") + 1
+            json_str = result[json_start:json_end]
+            parsed = json.loads(json_str)
             
-            result = response.choices[0].message.content
+            sarcastic_segments = parsed.get("sarcastic_segments", [])
+            confidence = parsed.get("confidence", 0.8)
             
-            # Parse JSON response
-            if "{" in result and "}" in result:
-                json_start = result.find("{")
-                json_end = result.rfind("}") + 1
-                json_str = result[json_start:json_end]
-                parsed = json.loads(json_str)
-                
-                sarcastic_segments = parsed.get("sarcastic_segments", [])
-                confidence = parsed.get("confidence", 0.8)
-                
-                # Highlight the text
-                highlighted_text = self._apply_highlighting(text, sarcastic_segments)
-                
-                return {
-                    'highlighted_text': highlighted_text,
-                    'sarcastic_segments': sarcastic_segments,
-                    'confidence': confidence,
-                    'method': 'llm_powered'
-                }
-            else:
-                # Fallback to rule-based if LLM response is malformed
-                return self._rule_based_highlight_sarcasm(text)
-                
-        except Exception as e:
-            print(f"Error in LLM sarcasm highlighting: {e}")
-            return self._rule_based_highlight_sarcasm(text)
+            # Highlight the text
+            spans = self._highlight_spans(text, sarcastic_segments)
+            
+            return {
+                'highlighted_text': self._render_highlighting(text, spans),
+                'sarcastic_segments': sarcastic_segments,
+                'spans': spans_to_json(spans),
+                'confidence': confidence,
+                'method': 'llm_powered'
+            }
+        else:
+            # Fallback to rule-based if LLM response is malformed
+            return self._rule_based_highlight_sarcasm(scan)
     
     def _rule_based_highlight_sarcasm(self, text):
         """Fallback rule-based sarcasm highlighting"""
+        scan = self._scan(text)
+        text = scan.text
         sarcastic_segments = []
-        text_lower = text.lower()
-        
+        spans = []
+        text_lower = scan.lower
+
         # Check for explicit sarcastic phrases - improved detection
-        for phrase in self.sarcasm_phrases:
-            phrase_lower = phrase.lower()
-            
-            # Create flexible pattern that handles punctuation
-            import re
-            # Replace spaces with flexible spacing that allows for punctuation
-            flexible_phrase = re.escape(phrase_lower).replace(r'\ ', r'[\s,]*')
-            pattern = r'\b' + flexible_phrase + r'\b'
-            
+        for first_word, pattern in self._highlight_phrase_patterns:
+            if not scan.has(first_word):
+                continue
+
             # Find all matches using the flexible pattern
-            matches = re.finditer(pattern, text_lower)
-            
-            for match in matches:
-                start_pos = match.start()
-                end_pos = match.end()
-                
+            for match in pattern.finditer(text_lower):
                 # Extract the actual phrase from the original text (preserving case)
-                original_phrase = text[start_pos:end_pos]
-                
+                original_phrase = text[match.start():match.end()]
+
                 # Clean up any extra punctuation from the captured phrase
-                cleaned_phrase = re.sub(r'^[^\w]+|[^\w]+$', '', original_phrase)
-                
-                if cleaned_phrase and cleaned_phrase not in sarcastic_segments:
+                cleaned_phrase = self._edge_punctuation.sub('', original_phrase)
+                if not cleaned_phrase:
+                    continue
+
+                start = match.start() + original_phrase.find(cleaned_phrase)
+                spans.append(Span(start, start + len(cleaned_phrase)))
+                if cleaned_phrase not in sarcastic_segments:
                     sarcastic_segments.append(cleaned_phrase)
-        
+
         # Check for positive words in negative contexts with enhanced patterns
-        positive_negative_patterns = [
-            # Computer/tech problems
-            ("perfect", ["computer", "crashed", "broken", "error", "failed", "freeze"]),
-            ("great", ["computer", "crashed", "broken", "error", "failed", "freeze"]),
-            ("wonderful", ["crashed", "broken", "error", "failed"]),
-            ("amazing", ["crashed", "broken", "error", "failed"]),
-            ("fantastic", ["crashed", "broken", "error", "failed"]),
-            
-            # Work sarcasm
-            ("love", ["working", "overtime", "unpaid", "extra hours", "late", "free"]),
-            ("enjoy", ["working", "overtime", "unpaid", "extra hours", "late", "free"]),
-            ("adore", ["working", "overtime", "unpaid", "extra hours"]),
-            
-            # General frustration
-            ("perfect", ["stuck", "broken", "problem", "issue", "trouble"]),
-            ("great", ["stuck", "broken", "problem", "issue", "trouble"]),
-            ("wonderful", ["stuck", "broken", "problem", "issue", "trouble"]),
-            ("amazing", ["stuck", "broken", "problem", "issue", "trouble"]),
-            ("fantastic", ["stuck", "broken", "problem", "issue", "trouble"]),
-            ("brilliant", ["stuck", "broken", "problem", "issue", "trouble"]),
-            ("excellent", ["stuck", "broken", "problem", "issue", "trouble"]),
-            
-            # Economic sarcasm
-            ("love", ["poor", "broke", "expensive", "bills", "debt"]),
-            ("enjoy", ["poor", "broke", "expensive", "bills", "debt"]),
-            ("great", ["poor", "broke", "expensive", "bills", "debt"]),
-            ("perfect", ["poor", "broke", "expensive", "bills", "debt"]),
-        ]
-        
-        for pos_word, neg_contexts in positive_negative_patterns:
-            if pos_word in text_lower:
-                pos_index = text_lower.find(pos_word)
-                
+        for pos_word, neg_contexts in self._positive_negative_patterns:
+            if scan.has(pos_word):
+                pos_index = scan.first(pos_word)
+
                 # Check if any negative context words appear nearby
                 for neg_word in neg_contexts:
-                    if neg_word in text_lower:
-                        neg_index = text_lower.find(neg_word)
+                    if scan.has(neg_word):
+                        neg_index = scan.first(neg_word)
                         # Check if they're within reasonable distance (100 characters)
                         if abs(pos_index - neg_index) < 100:
                             # Extract the actual positive word preserving case
-                            actual_word = self._extract_word_from_text(text, pos_word, pos_index)
-                            if actual_word and actual_word not in sarcastic_segments:
-                                sarcastic_segments.append(actual_word)
+                            match = self._match_word_in_text(text, pos_word, pos_index)
+                            if match:
+                                self._add_word_span(text, match.span(), spans)
+                                if match.group(0) not in sarcastic_segments:
+                                    sarcastic_segments.append(match.group(0))
                             break
-        
+
         # Check for exclamation mark emphasis on positive words (often sarcastic)
-        import re
-        exclamation_patterns = [
-            r'(Perfect|Great|Wonderful|Amazing|Fantastic|Brilliant|Excellent|Love|Awesome)!',
-            r'(perfect|great|wonderful|amazing|fantastic|brilliant|excellent|love|awesome)!'
-        ]
-        
-        for pattern in exclamation_patterns:
-            matches = re.finditer(pattern, text)
-            for match in matches:
+        for pattern in self._highlight_exclamation_patterns:
+            for match in pattern.finditer(text):
                 word_with_exclamation = match.group(1)
                 # Check if this appears in a negative context
                 match_pos = match.start()
-                context_before = text[max(0, match_pos-50):match_pos]
-                context_after = text[match_pos:min(len(text), match_pos+50)]
-                
-                negative_indicators = ["crashed", "broken", "stuck", "problem", "issue", "error", "failed", "trouble"]
-                if any(indicator in context_before.lower() or indicator in context_after.lower() for indicator in negative_indicators):
+                negative_before = scan.window_has_any(self._highlight_negative_indicators, max(0, match_pos - 50), match_pos)
+                negative_after = scan.window_has_any(self._highlight_negative_indicators, match_pos, min(len(text), match_pos + 50))
+                if negative_before or negative_after:
+                    self._add_word_span(text, match.span(1), spans)
                     if word_with_exclamation not in sarcastic_segments:
                         sarcastic_segments.append(word_with_exclamation)
-        
-        # Apply highlighting
-        highlighted_text = self._apply_highlighting(text, sarcastic_segments)
-        
+
+        # Matches were found in the lowercased text; if lowercasing changed its
+        # length those offsets are off, so locate the segments in the original
+        if not scan.aligned:
+            spans = find_segment_spans(text, sarcastic_segments)
+        spans = merge_spans(spans)
+
         return {
-            'highlighted_text': highlighted_text,
+            'highlighted_text': self._render_highlighting(text, spans),
             'sarcastic_segments': sarcastic_segments,
+            'spans': spans_to_json(spans),
             'confidence': 0.7 if sarcastic_segments else 0.0,
             'method': 'rule_based'
         }
-    
-    def _extract_word_from_text(self, text, word_lower, approximate_index):
-        """Extract the actual word from text preserving original case"""
+
+    def _match_word_in_text(self, text, word_lower, approximate_index):
+        """Find the actual word in text around approximate_index, preserving original case"""
         # Look for word boundaries around the approximate index
-        import re
-        pattern = re.compile(re.escape(word_lower), re.IGNORECASE)
-        match = pattern.search(text, approximate_index - 5, approximate_index + len(word_lower) + 5)
-        if match:
-            return match.group(0)
-        return None
+        pattern = self._word_case_patterns.get(word_lower) or re.compile(re.escape(word_lower), re.IGNORECASE)
+        return pattern.search(text, approximate_index - 5, approximate_index + len(word_lower) + 5)
+
+    def _add_word_span(self, text, span, spans):
+        """Mark a matched word unless it is only part of a longer word"""
+        start, end = span
+        if is_whole_word(text, start, end):
+            spans.append(Span(start, end))
+
+    def _highlight_spans(self, text, sarcastic_segments):
+        """Merged spans of LLM-reported segments, which come without offsets and have to be searched for"""
+        return merge_spans(find_segment_spans(text, sarcastic_segments))
     
-    def _apply_highlighting(self, text, sarcastic_segments):
-        """Apply prominent red highlighting to sarcastic segments"""
-        if not sarcastic_segments:
-            return text
-        
-        highlighted_text = text
-        
-        # Sort segments by length (longest first) to avoid partial replacements
-        sorted_segments = sorted(set(sarcastic_segments), key=len, reverse=True)
-        
-        for segment in sorted_segments:
-            # Use case-insensitive search to find the segment
-            import re
-            # Create a more flexible pattern that handles word boundaries
-            pattern = re.compile(r'\b' + re.escape(segment) + r'\b', re.IGNORECASE)
-            
-            def replace_func(match):
-                # Enhanced red highlighting with multiple visual cues
-                return f'<span style="color: #DC3545; font-weight: bold; background-color: rgba(220, 53, 69, 0.1); padding: 2px 4px; border-radius: 3px; text-decoration: underline; text-decoration-style: wavy;">{match.group(0)}</span>'
-            
-            highlighted_text = pattern.sub(replace_func, highlighted_text)
-        
-        return highlighted_text
+    def _render_highlighting(self, text, spans):
+        """Apply prominent red highlighting to the sarcastic spans in a single pass"""
+        # Enhanced red highlighting with multiple visual cues
+        return render_spans(text, spans, SARCASM_HIGHLIGHT_OPEN, '</span>')
 
     def get_sarcasm_explanation(self, sarcasm_result):
         """Generate a human-readable explanation of detected sarcasm with reactions"""
@@ -930,10 +878,12 @@ def highlight_sarcastic_text(text):
     """Convenience function for sarcasm highlighting"""
     return sarcasm_detector.highlight_sarcastic_text(text)
 
-def get_comprehensive_sarcasm_analysis(text):
+def get_comprehensive_sarcasm_analysis(text, use_llm=True):
     """Get complete sarcasm analysis including detection, explanation, and highlighting"""
-    detection_result = sarcasm_detector.detect_sarcasm(text)
-    highlighting_result = sarcasm_detector.highlight_sarcastic_text(text)
+    context = TextContext.of(text)
+    text = context.text
+    # One shared scan feeds detection and highlighting
+    detection_result, highlighting_result = sarcasm_detector.analyze(context, use_llm=use_llm)
     explanation = sarcasm_detector.get_sarcasm_explanation(detection_result)
     
     return {
@@ -943,6 +893,7 @@ def get_comprehensive_sarcasm_analysis(text):
         'reasons': detection_result['reasons'],
         'highlighted_text': highlighting_result['highlighted_text'],
         'sarcastic_segments': highlighting_result['sarcastic_segments'],
+        'sarcastic_spans': highlighting_result.get('spans', []),
         'highlighting_method': highlighting_result['method'],
         'explanation': explanation,
         'original_text': text
@@ -1,7 +1,13 @@
-import pandas as pd
 import os
 import re
 import json
+from processing.text_context import TextContext
+from processing.phrase_matcher import PhraseMatcher
+from processing.emoji_lexicon import emoji_lexicon
+from processing.lexicon_loader import load_table
+
+# Punctuation that joins a term to the word next to it ("km/h", "e-mail", "at&t")
+SLANG_GLUE_CHARS = "/-&@+.#"
 
 class EnhancedSlangDetector:
     def __init__(self):
@@ -9,7 +15,9 @@ class EnhancedSlangDetector:
         self.genz_words = {}
         self.genz_slang = {}
         self.emoji_meanings = {}
+        self.matcher = None
         self.load_all_datasets()
+        self.build_matcher()
     
     def load_all_datasets(self):
         """Load all slang and emoji datasets"""
@@ -43,14 +51,13 @@ class EnhancedSlangDetector:
     def load_original_slang(self, datasets_dir):
         """Load original slang.csv file"""
         try:
-            csv_path = os.path.join(datasets_dir, 'slang.csv')
-            df = pd.read_csv(csv_path)
+            table = load_table(os.path.join(datasets_dir, 'slang.csv'))
             
             slang_map = {}
-            for _, row in df.iterrows():
-                acronym = str(row['acronym']).lower().strip()
-                expansion = str(row['expansion']).strip()
-                if acronym and expansion and acronym != 'nan':
+            for row in table.records():
+                acronym = row['acronym'].lower().strip()
+                expansion = row['expansion'].strip()
+                if acronym and expansion:
                     slang_map[acronym] = {
                         'meaning': expansion,
                         'type': 'acronym',
@@ -64,17 +71,16 @@ class EnhancedSlangDetector:
     def load_genz_words(self, datasets_dir):
         """Load gen_zz_words.csv file"""
         try:
-            csv_path = os.path.join(datasets_dir, 'gen_zz_words.csv')
-            df = pd.read_csv(csv_path)
+            table = load_table(os.path.join(datasets_dir, 'gen_zz_words.csv'))
             
             genz_map = {}
-            for _, row in df.iterrows():
-                word = str(row['Word/Phrase']).lower().strip()
-                definition = str(row['Definition']).strip()
-                example = str(row['Example Sentence']).strip()
-                popularity = str(row['Popularity/Trend Level']).lower().strip()
+            for row in table.records():
+                word = row['Word/Phrase'].lower().strip()
+                definition = row['Definition'].strip()
+                example = row['Example Sentence'].strip()
+                popularity = row['Popularity/Trend Level'].lower().strip()
                 
-                if word and definition and word != 'nan':
+                if word and definition:
                     genz_map[word] = {
                         'meaning': definition,
                         'example': example,
@@ -89,15 +95,14 @@ class EnhancedSlangDetector:
     def load_genz_slang(self, datasets_dir):
         """Load genz_slang.csv file"""
         try:
-            csv_path = os.path.join(datasets_dir, 'genz_slang.csv')
-            df = pd.read_csv(csv_path)
+            table = load_table(os.path.join(datasets_dir, 'genz_slang.csv'))
             
             slang_map = {}
-            for _, row in df.iterrows():
-                keyword = str(row['keyword']).lower().strip()
-                description = str(row['description']).strip()
+            for row in table.records():
+                keyword = row['keyword'].lower().strip()
+                description = row['description'].strip()
                 
-                if keyword and description and keyword != 'nan':
+                if keyword and description:
                     slang_map[keyword] = {
                         'meaning': description,
                         'type': 'genz_slang',
@@ -109,28 +114,8 @@ class EnhancedSlangDetector:
             return {}
 
     def load_emoji_meanings(self, datasets_dir):
-        """Load genz_emojis.csv file"""
-        try:
-            csv_path = os.path.join(datasets_dir, 'genz_emojis.csv')
-            df = pd.read_csv(csv_path)
-            
-            emoji_map = {}
-            for _, row in df.iterrows():
-                emoji = str(row['emoji']).strip()
-                name = str(row['Name']).strip()
-                description = str(row['Description']).strip()
-                
-                if emoji and description and emoji != 'nan':
-                    emoji_map[emoji] = {
-                        'name': name,
-                        'meaning': description,
-                        'type': 'emoji',
-                        'popularity': 'high'
-                    }
-            return emoji_map
-        except Exception as e:
-            print(f"Error loading emoji meanings: {e}")
-            return {}
+        """Gen Z emoji meanings, shared read-only with the emotion analyzer"""
+        return emoji_lexicon.slang_meanings
 
     def fallback_slang_map(self):
         """Fallback slang map if files can't be loaded"""
@@ -153,10 +138,33 @@ class EnhancedSlangDetector:
             "cringe": {"meaning": "embarrassing or awkward", "type": "acronym", "popularity": "high"}
         }
 
+    def build_matcher(self):
+        """Compile every slang, acronym and emoji entry into one automaton"""
+        # Apostrophes are ignored so contractions like "i'm" still match "im";
+        # in-word punctuation keeps "km" from matching inside "km/h" or "e-mail"
+        matcher = PhraseMatcher(ignore_chars="'\u2019", glue_chars=SLANG_GLUE_CHARS)
+        # Later datasets win on duplicate terms, matching the old merge order
+        for dataset in (self.slang_map, self.genz_words, self.genz_slang, self.emoji_meanings):
+            for term, info in dataset.items():
+                matcher.add(term, (term, info))
+        self.matcher = matcher.compile()
+        return self.matcher
+
+    def find_matches(self, text):
+        """
+        Single linear scan for slang, acronyms and emojis.
+        Returns non-overlapping (leftmost-longest) hits with character offsets.
+        """
+        hits = []
+        for match in self.matcher.find(TextContext.of(text).text):
+            term, info = match.payload
+            hits.append({'term': term, 'start': match.start, 'end': match.end, 'info': info})
+        return hits
+
     def clean_text_for_matching(self, text):
         """Clean text for better slang matching"""
-        # Convert to lowercase
-        text = text.lower()
+        # Convert to lowercase (reusing the shared context when given one)
+        text = TextContext.of(text).lower
         # Remove extra whitespace
         text = re.sub(r'\s+', ' ', text.strip())
         # Keep emojis, letters, numbers, and basic punctuation
@@ -166,40 +174,17 @@ class EnhancedSlangDetector:
     def detect_emojis(self, text):
         """Detect and explain emojis in text"""
         found_emojis = {}
-        
-        # Check for emoji combinations first (like 👁️👄👁️)
-        for emoji_combo, info in self.emoji_meanings.items():
-            if emoji_combo in text and len(emoji_combo) > 1:
-                found_emojis[emoji_combo] = info
-        
-        # Check for individual emojis
-        for emoji, info in self.emoji_meanings.items():
-            if len(emoji) == 1 and emoji in text and emoji not in found_emojis:
-                found_emojis[emoji] = info
-        
+        for hit in self.find_matches(text):
+            if hit['info'].get('type') == 'emoji':
+                found_emojis.setdefault(hit['term'], dict(hit['info']))
         return found_emojis
 
     def detect_slang_terms(self, text):
         """Detect slang terms from all datasets"""
         found_slang = {}
-        clean_text = self.clean_text_for_matching(text)
-        
-        # Combine all slang dictionaries
-        all_slang = {**self.slang_map, **self.genz_words, **self.genz_slang}
-        
-        # Check for multi-word slang first (like "no cap", "hits different")
-        for term, info in all_slang.items():
-            if ' ' in term and term in clean_text:
-                found_slang[term] = info
-        
-        # Check for single word slang
-        words = clean_text.split()
-        for word in words:
-            # Remove punctuation for matching
-            clean_word = re.sub(r'[^\w]', '', word)
-            if clean_word in all_slang and clean_word not in found_slang:
-                found_slang[clean_word] = all_slang[clean_word]
-        
+        for hit in self.find_matches(text):
+            if hit['info'].get('type') != 'emoji':
+                found_slang.setdefault(hit['term'], hit['info'])
         return found_slang
 
     def get_popularity_score(self, item_info):
@@ -210,17 +195,17 @@ class EnhancedSlangDetector:
 
     def detect_slang(self, text):
         """Main function to detect all slang and emojis with enhanced information"""
-        if not text or not text.strip():
+        text = TextContext.of(text)
+        if text.is_blank:
             return {}
         
-        # Detect slang terms
-        found_slang = self.detect_slang_terms(text)
-        
-        # Detect emojis
-        found_emojis = self.detect_emojis(text)
-        
-        # Combine results
-        all_found = {**found_slang, **found_emojis}
+        # One scan finds slang terms and emojis together, with their positions
+        all_found = {}
+        for hit in self.find_matches(text):
+            entry = all_found.get(hit['term'])
+            if entry is None:
+                entry = all_found[hit['term']] = {**hit['info'], 'spans': []}
+            entry['spans'].append([hit['start'], hit['end']])
         
         # Sort by popularity (high to low)
         sorted_items = dict(sorted(all_found.items(), 
@@ -1,210 +1,79 @@
 import os
 import speech_recognition as sr
-from pydub import AudioSegment
-from pydub.utils import which
+from processing.audio_decode import DecodedAudio, decode_audio
+from processing.audio_segmentation import detect_speech_segments, transcribe_segments, stitch_transcripts
+from processing.asr_backends import get_asr_pool, get_whisper_pool
 
-# Set path to local ffmpeg binary using absolute paths
-BACKEND_DIR = '/Users/keiralie/Documents/GitHub/ImmigrantSlangster/backend'
-FFMPEG_PATH = os.path.join(BACKEND_DIR, 'ffmpeg')
-FFPROBE_PATH = os.path.join(BACKEND_DIR, 'ffprobe')
-AudioSegment.converter = FFMPEG_PATH
-AudioSegment.ffmpeg = FFMPEG_PATH
-AudioSegment.ffprobe = FFPROBE_PATH
+# Quiet recordings are boosted up to this peak level (dBFS) before recognition
+QUIET_PEAK_DBFS = -20
+MAX_BOOST_DB = 10
+# Recordings at least this long are segmented and transcribed in parallel
+LONG_AUDIO_SECONDS = 30
 
-def convert_audio_to_wav(audio_path):
-    """Convert audio file to WAV format if needed - handles ANY audio format"""
-    # Get file extension
-    file_ext = os.path.splitext(audio_path)[1].lower()
+def load_audio(audio):
+    """Decode an upload (path, bytes or DecodedAudio) into 16-bit mono PCM in memory"""
+    decoded = decode_audio(audio)
+    if decoded is None:
+        return None
     
-    # Check if already WAV
-    if file_ext == '.wav':
-        # Still validate it's a proper WAV file
-        try:
-            import wave
-            with wave.open(audio_path, 'rb') as wav_file:
-                # If we can open it as WAV, it's good
-                return audio_path
-        except:
-            # File has .wav extension but isn't proper WAV, convert it
-            pass
+    print(f"Decoded audio: {decoded.duration:.1f} seconds, {decoded.sample_rate}Hz")
     
-    # Convert to WAV using multiple methods for maximum compatibility
-    try:
-        base_name = os.path.splitext(audio_path)[0]
-        wav_path = base_name + '_converted.wav'
-        
-        # Method 1: Try pydub with local ffmpeg (most reliable)
-        try:
-            # Load audio with pydub (handles many formats including WebM)
-            audio = AudioSegment.from_file(audio_path)
-            
-            print(f"Original audio: {len(audio)/1000:.1f} seconds, {audio.frame_rate}Hz, {audio.channels} channels")
-            
-            # Convert to the format speech_recognition expects:
-            # - 16-bit PCM
-            # - Mono channel  
-            # - 16kHz sample rate (good for speech recognition)
-            # - Make sure we don't lose any audio content
-            audio = audio.set_frame_rate(16000).set_channels(1).set_sample_width(2)
-            
-            # Normalize audio volume to ensure it's audible
-            # Increase volume if too quiet (but don't clip)
-            if audio.max_dBFS < -20:  # If audio is very quiet
-                audio = audio + (min(10, abs(audio.max_dBFS + 20)))  # Boost volume safely
-                print(f"Boosted quiet audio by {min(10, abs(audio.max_dBFS + 20))}dB")
-            
-            # Export as WAV - ensure we capture the full duration
-            audio.export(wav_path, format="wav")
-            
-            print(f"Successfully converted {audio_path} to {wav_path} using pydub")
-            print(f"Converted audio: {len(audio)/1000:.1f} seconds")
-            return wav_path
-            
-        except Exception as pydub_error:
-            print(f"Pydub conversion failed: {pydub_error}")
-            
-            # Method 2: Direct ffmpeg subprocess (fallback)
-            import subprocess
-            
-            ffmpeg_cmd = [
-                FFMPEG_PATH,
-                '-i', audio_path,           # input file
-                '-acodec', 'pcm_s16le',     # 16-bit PCM
-                '-ar', '16000',             # 16kHz sample rate
-                '-ac', '1',                 # mono
-                '-f', 'wav',                # WAV format
-                '-y',                       # overwrite
-                wav_path
-            ]
-            
-            result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                print(f"Successfully converted {audio_path} to {wav_path} using direct ffmpeg")
-                return wav_path
-            else:
-                print(f"FFmpeg direct conversion failed: {result.stderr}")
-                
-                # Method 3: Try without local ffmpeg (use system)
-                try:
-                    # Reset pydub to use system ffmpeg
-                    AudioSegment.converter = "ffmpeg"
-                    AudioSegment.ffmpeg = "ffmpeg"
-                    AudioSegment.ffprobe = "ffprobe"
-                    
-                    audio = AudioSegment.from_file(audio_path)
-                    audio = audio.set_frame_rate(16000).set_channels(1).set_sample_width(2)
-                    audio.export(wav_path, format="wav")
-                    
-                    print(f"Successfully converted {audio_path} to {wav_path} using system ffmpeg")
-                    return wav_path
-                    
-                except Exception as system_error:
-                    print(f"System ffmpeg conversion failed: {system_error}")
-                    
-                    # Method 4: Install ffmpeg-python as last resort
-                    try:
-                        import ffmpeg
-                        
-                        (
-                            ffmpeg
-                            .input(audio_path)
-                            .output(wav_path, acodec='pcm_s16le', ar=16000, ac=1)
-                            .overwrite_output()
-                            .run(quiet=True)
-                        )
-                        
-                        print(f"Successfully converted {audio_path} to {wav_path} using ffmpeg-python")
-                        return wav_path
-                        
-                    except ImportError:
-                        print("ffmpeg-python not available. Install with: pip install ffmpeg-python")
-                    except Exception as ffmpeg_python_error:
-                        print(f"ffmpeg-python conversion failed: {ffmpeg_python_error}")
-        
-        # If all methods fail, return None
-        print(f"All conversion methods failed for {audio_path}")
-        return None
-            
-    except Exception as e:
-        print(f"Error in audio conversion: {e}")
-        return None
+    # Normalize audio volume to ensure it's audible
+    # Increase volume if too quiet (but don't clip)
+    peak = decoded.peak_dbfs()
+    if peak < QUIET_PEAK_DBFS and peak != float('-inf'):
+        boost = min(MAX_BOOST_DB, abs(peak - QUIET_PEAK_DBFS))
+        decoded = decoded.apply_gain(boost)
+        print(f"Boosted quiet audio by {boost:.1f}dB")
+    
+    return decoded
 
-def transcribe_long_audio_chunked(wav_path, recognizer):
-    """Transcribe long audio by breaking it into chunks"""
+def transcribe_long_audio_chunked(audio, recognizer, transcribe=None):
+    """
+    Transcribe long audio by splitting it at pauses and transcribing the segments in parallel.
+    transcribe(DecodedAudio) -> str replaces Google recognition (e.g. an offline ASR pool).
+    """
     try:
-        from pydub import AudioSegment
-        
-        # Load the audio file
-        audio = AudioSegment.from_wav(wav_path)
-        
         # If audio is shorter than 30 seconds, don't chunk
-        if len(audio) < 30000:  # 30 seconds in milliseconds
+        if audio.duration < LONG_AUDIO_SECONDS:
             return None
-            
-        print(f"Audio is {len(audio)/1000:.1f} seconds long, using chunked transcription...")
         
-        # Split into 30-second chunks with 2-second overlap
-        chunk_length_ms = 30000  # 30 seconds
-        overlap_ms = 2000        # 2 seconds overlap
-        chunks = []
-        transcripts = []
+        segments = detect_speech_segments(audio)
+        print(f"Audio is {audio.duration:.1f} seconds long, transcribing {len(segments)} segments in parallel...")
         
-        for i in range(0, len(audio), chunk_length_ms - overlap_ms):
-            chunk = audio[i:i + chunk_length_ms]
-            if len(chunk) < 1000:  # Skip chunks shorter than 1 second
-                continue
-                
-            # Save chunk as temporary WAV
-            chunk_path = wav_path.replace('.wav', f'_chunk_{len(chunks)}.wav')
-            chunk.export(chunk_path, format="wav")
-            chunks.append(chunk_path)
-            
-            # Transcribe this chunk
-            try:
-                with sr.AudioFile(chunk_path) as source:
-                    recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                    audio_data = recognizer.record(source)
-                    
-                # Try Google recognition on chunk
-                try:
-                    chunk_transcript = recognizer.recognize_google(audio_data, language="en-US")
-                    transcripts.append(chunk_transcript)
-                    print(f"Chunk {len(chunks)} transcribed: {chunk_transcript[:50]}...")
-                except:
-                    print(f"Chunk {len(chunks)} failed transcription")
-                    
-            except Exception as chunk_error:
-                print(f"Error processing chunk {len(chunks)}: {chunk_error}")
-            
-            # Clean up chunk file
-            try:
-                os.remove(chunk_path)
-            except:
-                pass
+        def recognize(chunk):
+            return recognizer.recognize_google(chunk.to_audio_data(), language="en-US")
         
-        # Combine all transcripts
-        if transcripts:
-            full_transcript = ' '.join(transcripts)
-            # Clean up duplicate words at chunk boundaries
-            words = full_transcript.split()
-            cleaned_words = []
-            
-            for i, word in enumerate(words):
-                # Skip if this word is the same as the previous word (likely overlap)
-                if i == 0 or word.lower() != words[i-1].lower():
-                    cleaned_words.append(word)
-            
-            return ' '.join(cleaned_words)
+        pieces = transcribe_segments(audio, segments, transcribe or recognize)
+        for number, (segment, text) in enumerate(pieces, 1):
+            if text:
+                print(f"Segment {number} ({segment.start:.1f}-{segment.end:.1f}s) transcribed: {text[:50]}...")
         
-        return None
+        # Join in time order, dropping words repeated where segments overlap
+        return stitch_transcripts(pieces) or None
         
     except Exception as e:
         print(f"Chunked transcription error: {e}")
         return None
 
+def transcribe_segment(audio):
+    """
+    Transcribe one short DecodedAudio segment with the offline pool when
+    ASR_BACKEND selects one, else Google. Returns '' when no speech is recognized.
+    """
+    asr_pool = get_asr_pool()
+    if asr_pool is not None:
+        return asr_pool.transcribe(audio)
+    try:
+        return sr.Recognizer().recognize_google(audio.to_audio_data(), language="en-US")
+    except sr.UnknownValueError:
+        return ''
+
 def transcribe_audio(audio_path):
-    """Convert audio file to text using speech recognition - handles ANY audio format"""
+    """
+    Convert audio to text using speech recognition - handles ANY audio format.
+    audio_path may also be the file's bytes or an already DecodedAudio.
+    """
     recognizer = sr.Recognizer()
     
     # Configure recognizer for better phrase capture
@@ -215,70 +84,71 @@ def transcribe_audio(audio_path):
     recognizer.non_speaking_duration = 0.8  # How long to wait for silence before ending
     
     try:
-        print(f"Starting transcription for: {audio_path}")
+        if not isinstance(audio_path, (bytes, bytearray, DecodedAudio)):
+            print(f"Starting transcription for: {audio_path}")
         
-        # Convert to WAV if needed
-        wav_path = convert_audio_to_wav(audio_path)
-        if not wav_path:
+        # Decode once into memory; no converted WAV files are written
+        audio = load_audio(audio_path)
+        if audio is None:
             return {
-                "error": "Could not convert audio file to WAV format. The file may be corrupted or in an unsupported format.",
+                "error": "Could not decode audio file. The file may be corrupted or in an unsupported format.",
                 "suggestion": "Try recording again or using a different audio format."
             }
         
-        print(f"Using WAV file: {wav_path}")
-        
-        # Verify the WAV file exists and is readable
-        if not os.path.exists(wav_path):
+        if len(audio) == 0:
             return {
-                "error": "Converted audio file not found.",
+                "error": "The audio file contains no audio.",
                 "suggestion": "Please try recording again."
             }
         
-        # Load audio file with better error handling
-        try:
-            with sr.AudioFile(wav_path) as source:
-                print("Loading audio file...")
-                # Get audio file info
-                audio_info = source.DURATION if hasattr(source, 'DURATION') else "unknown"
-                print(f"Audio file duration: {audio_info} seconds")
-                
-                # Adjust for ambient noise (but with timeout)
-                recognizer.adjust_for_ambient_noise(source, duration=min(1.0, audio_info if isinstance(audio_info, (int, float)) else 1.0))
-                
-                # Listen for ALL the data (not just part of it)
-                # The key fix: Use record() instead of listen() to capture entire audio
-                audio_data = recognizer.record(source)
-                print(f"Audio loaded successfully. Full audio captured: {len(audio_data.frame_data)} bytes")
-                
-        except Exception as load_error:
-            print(f"Error loading audio file: {load_error}")
-            return {
-                "error": f"Could not load audio file: {str(load_error)}",
-                "suggestion": "The audio file may be corrupted. Try recording again."
-            }
+        audio_data = audio.to_audio_data()
+        print(f"Audio loaded successfully. Full audio captured: {len(audio_data.frame_data)} bytes")
         
         # Try multiple speech recognition methods for better success rate
         transcript = None
         recognition_method = None
         
+        # Offline recognizer pool, when ASR_BACKEND selects one
+        asr_pool = get_asr_pool()
+        if asr_pool is not None:
+            try:
+                print(f"Trying {asr_pool.backend.name} (offline) recognition...")
+                if audio.duration >= LONG_AUDIO_SECONDS:
+                    transcript = transcribe_long_audio_chunked(audio, recognizer, asr_pool.transcribe)
+                else:
+                    transcript = asr_pool.transcribe(audio)
+                if transcript:
+                    recognition_method = f"{asr_pool.backend.name} (offline)"
+                    print(f"Offline recognition successful: {transcript}")
+            except Exception as e:
+                print(f"Offline recognition failed: {e}")
+        
+        # Long recordings: split at pauses and transcribe the segments in parallel
+        if not transcript and audio.duration >= LONG_AUDIO_SECONDS:
+            transcript = transcribe_long_audio_chunked(audio, recognizer)
+            if transcript:
+                recognition_method = "Google Speech Recognition (segmented)"
+                print(f"Segmented recognition successful: {transcript}")
+        
         # Method 1: Google Speech Recognition (free, good quality)
-        try:
-            print("Trying Google Speech Recognition...")
-            # Use show_all=True to get more complete results and specify language
-            transcript = recognizer.recognize_google(
-                audio_data, 
-                language="en-US",  # Specify language for better accuracy
-                show_all=False     # Set to True to get confidence scores and alternatives
-            )
-            recognition_method = "Google Speech Recognition"
-            print(f"Google recognition successful: {transcript}")
+        if not transcript:
+            try:
+                print("Trying Google Speech Recognition...")
+                # Use show_all=True to get more complete results and specify language
+                transcript = recognizer.recognize_google(
+                    audio_data, 
+                    language="en-US",  # Specify language for better accuracy
+                    show_all=False     # Set to True to get confidence scores and alternatives
+                )
+                recognition_method = "Google Speech Recognition"
+                print(f"Google recognition successful: {transcript}")
             
-        except sr.UnknownValueError:
-            print("Google could not understand audio")
-        except sr.RequestError as e:
-            print(f"Google Speech Recognition error: {e}")
-        except Exception as e:
-            print(f"Unexpected Google recognition error: {e}")
+            except sr.UnknownValueError:
+                print("Google could not understand audio")
+            except sr.RequestError as e:
+                print(f"Google Speech Recognition error: {e}")
+            except Exception as e:
+                print(f"Unexpected Google recognition error: {e}")
         
         # Method 2: Try with different audio settings if Google failed
         if not transcript:
@@ -328,31 +198,19 @@ def transcribe_audio(audio_path):
             except Exception as e:
                 print(f"Sphinx recognition failed: {e}")
         
-        # Method 4: Try chunking for very long audio (if still no transcript)
-        if not transcript:
-            try:
-                print("Trying chunked transcription for long audio...")
-                transcript = transcribe_long_audio_chunked(wav_path, recognizer)
-                if transcript:
-                    recognition_method = "Google Speech Recognition (chunked)"
-                    print(f"Chunked recognition successful: {transcript}")
-                    
-            except Exception as chunk_error:
-                print(f"Chunked transcription failed: {chunk_error}")
-        
         # If we got a transcript, return it
         if transcript and transcript.strip():
             return {
                 "transcript": transcript.strip(),
                 "success": True,
                 "method": recognition_method,
-                "audio_file": wav_path
+                "duration": round(audio.duration, 2)
             }
         else:
             return {
                 "error": "Could not understand audio - no speech was detected or the audio quality was too low",
                 "suggestion": "Try speaking more clearly, closer to the microphone, or in a quieter environment",
-                "attempted_methods": ["Google Speech Recognition", "Sphinx offline recognition"]
+                "attempted_methods": ([f"{asr_pool.backend.name} (offline)"] if asr_pool is not None else []) + ["Google Speech Recognition", "Sphinx offline recognition"]
             }
             
     except Exception as e:
@@ -368,13 +226,19 @@ def transcribe_with_whisper(audio_path):
     """Alternative: Use OpenAI Whisper for better accuracy (requires openai-whisper)"""
     try:
         import whisper
-        model = whisper.load_model("base")  # You can use "tiny", "base", "small", "medium", "large"
-        result = model.transcribe(audio_path)
+    except ImportError:
+        return {"error": "Whisper not installed. Use: pip install openai-whisper"}
+    try:
+        # The model is loaded once per process and reused (ASR_MODEL picks the size, default "base")
+        pool = get_whisper_pool()
+        if pool is None:
+            return {"error": "Whisper model could not be loaded"}
+        audio = load_audio(audio_path)
+        if audio is None:
+            return {"error": "Could not decode audio file"}
         return {
-            "transcript": result["text"],
+            "transcript": pool.transcribe(audio),
             "success": True
         }
-    except ImportError:
-        return {"error": "Whisper not installed. Use: pip install openai-whisper"}
     except Exception as e:
         return {"error": f"Whisper error: {str(e)}"}
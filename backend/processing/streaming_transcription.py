@@ -0,0 +1,268 @@
+"""
+Incremental transcription of audio streamed while it is being recorded.
+
+A client opens a StreamingSession and sends 16-bit mono PCM as it records.
+Every chunk runs the energy VAD over the audio not yet cut into segments.
+Each utterance that has ended in a pause (or reached MAX_SEGMENT_SECONDS)
+is cut off and transcribed on the shared transcription pool right away, so
+by the time the speaker stops, most of the recording is already text. The
+utterance still in progress is transcribed every STREAM_PARTIAL_INTERVAL
+seconds as an interim "partial" result. Rolling emotion/tone and slang
+annotations follow the finished segments.
+
+Sessions live in memory in the process that opened them, so streaming is
+only served where the app runs as a single process (`python app.py`, as in
+Docker and on Railway); multi-worker gunicorn sets STREAMING_ENABLED=0.
+Idle sessions are dropped after STREAM_SESSION_TTL seconds without a request.
+"""
+
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from processing.audio_decode import DecodedAudio, SAMPLE_RATE, SAMPLE_WIDTH
+from processing.audio_segmentation import (
+    FRAME_SECONDS, MAX_SEGMENT_SECONDS, MIN_SILENCE_SECONDS, PADDING_SECONDS, Segment,
+    detect_speech_segments, frame_energies, stitch_transcripts, submit_transcription
+)
+from processing.slang_detect import detect_slang
+from processing.robust_emotion_analysis import analyze_emotion_robust
+from processing.audio_analysis import analyze_audio
+
+STREAM_SESSION_TTL = float(os.getenv('STREAM_SESSION_TTL', '300'))
+STREAM_MAX_SESSIONS = int(os.getenv('STREAM_MAX_SESSIONS', '50'))
+# Seconds of new speech between interim transcriptions of the open utterance
+STREAM_PARTIAL_INTERVAL = float(os.getenv('STREAM_PARTIAL_INTERVAL', '1.0'))
+MIN_PARTIAL_SECONDS = 0.5
+# Finished segments covered by the rolling emotion/tone annotation
+ROLLING_SEGMENTS = 3
+# Frame levels kept for the noise floor estimate (about two minutes)
+NOISE_HISTORY_FRAMES = int(120 / FRAME_SECONDS)
+# Digital silence (e.g. a microphone starting up) must not drag the floor below real room noise
+MIN_NOISE_FLOOR_DBFS = -80.0
+
+
+def transcribe_segment(audio):
+    """Offline ASR pool or Google, imported on first use so sessions can run with another transcriber"""
+    from processing.speech_to_text import transcribe_segment
+    return transcribe_segment(audio)
+
+
+class StreamingSession:
+    """Audio received so far for one recording, and its transcription state"""
+
+    def __init__(self, sample_rate=SAMPLE_RATE, transcribe=None):
+        self.session_id = uuid.uuid4().hex
+        self.sample_rate = sample_rate
+        self.transcribe = transcribe or transcribe_segment
+        self.lock = threading.Lock()
+        self.last_active = time.time()
+
+        self._pending = bytearray()   # audio after the last cut
+        self._pending_levels = np.zeros(0)  # frame levels of the whole frames in _pending
+        self._offset = 0.0            # stream time (seconds) where _pending starts
+        self._received = 0            # bytes received in total
+        self._levels = np.zeros(0)    # frame levels of audio already cut, for the noise floor
+        self._noise_floor = None
+        self._segments = []           # [(Segment in stream time, future)]
+        self._partial = None          # (speech seconds, future) for the open utterance
+        self._partial_text = ''
+
+        # Annotations of finished segments, in order
+        self._annotated = []
+        self._slang = {}
+        self._rolling = None
+
+    @property
+    def duration(self):
+        return self._received // SAMPLE_WIDTH / self.sample_rate
+
+    def add_chunk(self, pcm):
+        """Append raw 16-bit mono PCM and cut off any utterances that have ended"""
+        self.last_active = time.time()
+        # A chunk may end mid-sample; the odd byte waits in _pending for the next one
+        self._pending.extend(pcm)
+        self._received += len(pcm)
+        self._advance(final=False)
+
+    def finish(self):
+        """Cut the remaining audio and wait for every segment to be transcribed"""
+        self.last_active = time.time()
+        self._advance(final=True)
+        for _, future in self._segments:
+            future.result()
+        return self.results()
+
+    def _advance(self, final):
+        usable = len(self._pending) - len(self._pending) % SAMPLE_WIDTH
+        if not usable:
+            return
+        audio = DecodedAudio(bytes(self._pending[:usable]), self.sample_rate)
+        energies = self._pending_energies(audio)
+        if len(energies) == 0 and not final:
+            return
+
+        segments = []
+        if len(energies):
+            # Noise floor over the recent stream, not just the few seconds pending.
+            # The lowest estimate so far is kept, so an utterance that outlasts
+            # the quiet audio before it is not mistaken for background.
+            estimate = max(MIN_NOISE_FLOOR_DBFS, np.percentile(np.concatenate([self._levels, energies]), 10))
+            self._noise_floor = estimate if self._noise_floor is None else min(self._noise_floor, estimate)
+            segments = detect_speech_segments(audio, noise_floor=self._noise_floor, merge=False, energies=energies)
+
+        if final:
+            finished = segments
+        elif not segments and audio.duration >= MAX_SEGMENT_SECONDS:
+            # No level change in a whole segment's worth of audio: silence, or
+            # speech without pauses from the very start. Let the recognizer decide.
+            segments = finished = [Segment(0.0, audio.duration)]
+        else:
+            # Every segment but the last is followed by more audio; the last is
+            # finished once a full pause has been heard after it
+            finished = segments[:-1]
+            if segments and segments[-1].end + MIN_SILENCE_SECONDS - PADDING_SECONDS <= audio.duration:
+                finished = segments
+
+        for segment in finished:
+            future = submit_transcription(audio, segment, self.transcribe)
+            self._segments.append((Segment(self._offset + segment.start, self._offset + segment.end), future))
+
+        if final:
+            self._cut(audio, energies, audio.duration)
+            self._partial = None
+            self._partial_text = ''
+            return
+
+        if finished:
+            # Forced splits overlap the next piece; keep that overlap pending
+            following = segments[len(finished)] if len(finished) < len(segments) else None
+            self._cut(audio, energies, min(finished[-1].end, following.start) if following else finished[-1].end)
+            self._partial = None
+            self._partial_text = ''
+
+        if len(finished) < len(segments):
+            self._update_partial(audio, segments[-1])
+
+    def _pending_energies(self, audio):
+        """frame_energies of the pending audio, computing only the frames completed since the last chunk"""
+        # _pending always starts on a frame boundary (see _cut), so earlier frames keep their levels
+        frame_bytes = int(self.sample_rate * FRAME_SECONDS) * SAMPLE_WIDTH
+        known = len(self._pending_levels)
+        new_levels = frame_energies(DecodedAudio(audio.pcm[known * frame_bytes:], self.sample_rate))
+        self._pending_levels = np.concatenate([self._pending_levels, new_levels])
+        return self._pending_levels
+
+    def _cut(self, audio, energies, seconds):
+        """Drop pending audio before `seconds`, remembering its levels for the noise floor"""
+        frames = int(seconds / FRAME_SECONDS)
+        samples = min(len(audio), frames * int(audio.sample_rate * FRAME_SECONDS))
+        if not samples:
+            return
+        self._levels = np.concatenate([self._levels, energies[:frames]])[-NOISE_HISTORY_FRAMES:]
+        self._pending_levels = self._pending_levels[frames:]
+        del self._pending[:samples * SAMPLE_WIDTH]
+        self._offset += samples / self.sample_rate
+
+    def _update_partial(self, audio, segment):
+        """Re-transcribe the open utterance once it has grown by STREAM_PARTIAL_INTERVAL"""
+        length = segment.end - segment.start
+        in_flight = self._partial is not None and not self._partial[1].done()
+        grown = self._partial is None or length - self._partial[0] >= STREAM_PARTIAL_INTERVAL
+        if length >= MIN_PARTIAL_SECONDS and grown and not in_flight:
+            self._partial = (length, submit_transcription(audio, segment, self.transcribe))
+
+    def _annotate(self, texts):
+        """Slang for each newly finished segment, then rolling emotion over the latest ones"""
+        for text in texts[len(self._annotated):]:
+            slang = detect_slang(text) if text else {}
+            for term, info in slang.items():
+                self._slang.setdefault(term, info.get('meaning'))
+            self._annotated.append(sorted(slang))
+
+        window = ' '.join(text for text in texts[-ROLLING_SEGMENTS:] if text)
+        if window and (self._rolling is None or self._rolling['text'] != window):
+            emotion = analyze_emotion_robust(text=window).get('text_analysis', {})
+            self._rolling = {
+                'text': window,
+                'emotion': emotion.get('emotion', 'neutral'),
+                'confidence': emotion.get('confidence', 0.0),
+                'tone': analyze_audio(window)
+            }
+
+    def results(self):
+        """Finished segments transcribed so far (in order), the partial text and annotations"""
+        done = []
+        for segment, future in self._segments:
+            if not future.done():
+                break
+            done.append((segment, future.result()))
+        if self._partial is not None and self._partial[1].done():
+            self._partial_text = self._partial[1].result() or self._partial_text
+
+        texts = [text or '' for _, text in done]
+        self._annotate(texts)
+        return {
+            'session_id': self.session_id,
+            'duration': round(self.duration, 2),
+            'transcript': stitch_transcripts(done),
+            'partial': self._partial_text,
+            'segments': [
+                {'start': round(segment.start, 2), 'end': round(segment.end, 2), 'text': text, 'slang': slang}
+                for (segment, _), text, slang in zip(done, texts, self._annotated)
+            ],
+            'pending_segments': len(self._segments) - len(done),
+            'annotations': {
+                'emotion': self._rolling['emotion'] if self._rolling else 'neutral',
+                'emotion_confidence': self._rolling['confidence'] if self._rolling else 0.0,
+                'tone': self._rolling['tone'] if self._rolling else 'Neutral',
+                'slang': self._slang
+            }
+        }
+
+
+class StreamingSessions:
+    """Open sessions by id; idle sessions expire after STREAM_SESSION_TTL seconds"""
+
+    def __init__(self, ttl=STREAM_SESSION_TTL, max_sessions=STREAM_MAX_SESSIONS, transcribe=None):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.transcribe = transcribe
+        self._lock = threading.Lock()
+        self._sessions = {}
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for session_id in [sid for sid, session in self._sessions.items() if session.last_active < cutoff]:
+            print(f"Streaming session {session_id} expired")
+            del self._sessions[session_id]
+
+    def start(self, sample_rate=SAMPLE_RATE):
+        """A new session, or None when STREAM_MAX_SESSIONS are already open"""
+        with self._lock:
+            self._expire()
+            if len(self._sessions) >= self.max_sessions:
+                return None
+            session = StreamingSession(sample_rate, self.transcribe)
+            self._sessions[session.session_id] = session
+            return session
+
+    def get(self, session_id):
+        """The open session, kept alive by this request"""
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_active = time.time()
+            return session
+
+    def close(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+
+# Global session store
+streaming_sessions = StreamingSessions()
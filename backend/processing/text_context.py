@@ -0,0 +1,122 @@
+"""
+Shared text preprocessing for the analysis pipeline.
+
+A TextContext is built once per request and handed to every text engine
+(emotion, sarcasm, simplification, formality, tone, slang) so the transcript
+is lowercased, split and tokenized a single time instead of once per engine.
+"""
+
+import re
+from collections import namedtuple
+from functools import cached_property
+
+Token = namedtuple('Token', ['text', 'start', 'end'])
+Span = namedtuple('Span', ['start', 'end'])
+
+TOKEN_PATTERN = re.compile(r"[\w']+")
+
+# Same ranges the emotion analyzer has always used for emoji detection
+EMOJI_PATTERN = re.compile(
+    "["
+    "\U0001F600-\U0001F64F"  # emoticons
+    "\U0001F300-\U0001F5FF"  # symbols & pictographs
+    "\U0001F680-\U0001F6FF"  # transport & map symbols
+    "\U0001F1E0-\U0001F1FF"  # flags (iOS)
+    "\U00002702-\U000027B0"
+    "\U000024C2-\U0001F251"
+    "\U0001F900-\U0001F9FF"  # supplemental symbols
+    "]+", flags=re.UNICODE
+)
+
+_vader_analyzer = None
+
+
+def get_vader_analyzer():
+    """Shared VADER analyzer (the lexicon is only loaded once per process)"""
+    global _vader_analyzer
+    if _vader_analyzer is None:
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        _vader_analyzer = SentimentIntensityAnalyzer()
+    return _vader_analyzer
+
+
+class TextContext:
+    """
+    Preprocessed view of a single transcript.
+
+    Every derived field is computed lazily on first access and then reused,
+    so engines only pay for what they actually read.
+    """
+
+    def __init__(self, text):
+        self.text = text or ''
+
+    @classmethod
+    def of(cls, text_or_context):
+        """Return the given context, or build one from a plain string"""
+        if isinstance(text_or_context, cls):
+            return text_or_context
+        return cls(text_or_context)
+
+    def __len__(self):
+        return len(self.text)
+
+    def __str__(self):
+        return self.text
+
+    @property
+    def is_blank(self):
+        return not self.text.strip()
+
+    @cached_property
+    def lower(self):
+        """Lowercased transcript"""
+        return self.text.lower()
+
+    @cached_property
+    def words(self):
+        """Whitespace-separated words of the original text"""
+        return self.text.split()
+
+    @cached_property
+    def word_count(self):
+        return len(self.words)
+
+    @cached_property
+    def tokens(self):
+        """Lowercased word tokens with character offsets into the text"""
+        return [Token(m.group(0), m.start(), m.end()) for m in TOKEN_PATTERN.finditer(self.lower)]
+
+    @cached_property
+    def token_set(self):
+        return frozenset(token.text for token in self.tokens)
+
+    @cached_property
+    def sentences(self):
+        """Non-empty sentence spans, split on periods like the readability heuristics"""
+        spans = []
+        start = 0
+        for end in [m.start() for m in re.finditer(r'\.', self.text)] + [len(self.text)]:
+            if self.text[start:end].strip():
+                spans.append(Span(start, end))
+            start = end + 1
+        return spans
+
+    @cached_property
+    def sentence_texts(self):
+        return [self.text[span.start:span.end] for span in self.sentences]
+
+    @cached_property
+    def caps_words(self):
+        """ALL CAPS words longer than two characters (shouting/emphasis)"""
+        return [word for word in self.words if word.isupper() and len(word) > 2]
+
+    @cached_property
+    def emoji_runs(self):
+        """Consecutive emoji characters with their offsets"""
+        return [Token(m.group(0), m.start(), m.end()) for m in EMOJI_PATTERN.finditer(self.text)]
+
+    @cached_property
+    def vader_scores(self):
+        """VADER polarity scores for the original text"""
+        return get_vader_analyzer().polarity_scores(self.text)
@@ -1,8 +1,211 @@
 import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Union
 import json
+from collections import namedtuple
+from processing.text_context import TextContext
+from processing.llm_cache import llm_cache, configure_openai
+from processing.combined_llm_analysis import combined_llm_enabled, request_combined_analysis
+from processing.phrase_matcher import PhraseMatcher, leftmost_longest, is_whole_word
+
+# Common idioms and their literal meanings
+IDIOM_REPLACEMENTS = {
+    "break a leg": "good luck",
+    "piece of cake": "very easy",
+    "spill the beans": "reveal a secret",
+    "hit the nail on the head": "be exactly right",
+    "bite the bullet": "face a difficult situation",
+    "break the ice": "start a conversation",
+    "cost an arm and a leg": "be very expensive",
+    "costs an arm and a leg": "is very expensive",
+    "once in a blue moon": "very rarely",
+    "when pigs fly": "never",
+    "raining cats and dogs": "raining heavily",
+    "the ball is in your court": "it's your decision",
+    "kill two birds with one stone": "accomplish two things at once",
+    "let the cat out of the bag": "reveal a secret",
+    "a blessing in disguise": "something good that seemed bad at first",
+    "call it a day": "stop working",
+    "cutting corners": "doing something poorly to save time or money",
+    "easy as pie": "very easy",
+    "hit the books": "study hard",
+    "it's not rocket science": "it's not difficult",
+    "throw in the towel": "give up",
+    "under the weather": "feeling sick",
+    "you can't judge a book by its cover": "don't judge based on appearance",
+    "threw me under the bus": "betrayed me or blamed me unfairly",
+    "throw under the bus": "betray or blame unfairly",
+    "hit the fan": "things went very wrong",
+    "when it hit the fan": "when things went very wrong",
+    "break the bank": "cost too much money",
+    "on cloud nine": "very happy",
+    "over the moon": "extremely happy",
+    "piece of work": "difficult person",
+    "pain in the neck": "annoying person or thing",
+    "back to square one": "start over from the beginning",
+    "barking up the wrong tree": "making a mistake",
+    "don't count your chickens before they hatch": "don't assume success too early",
+    "every cloud has a silver lining": "there's something good in every bad situation",
+    "it's a small world": "people are connected in unexpected ways",
+    "the early bird catches the worm": "people who act quickly get the best opportunities"
+}
+
+# Common slang and modern expressions
+SLANG_REPLACEMENTS = {
+    "that's fire": "that's really good",
+    "that slaps": "that's excellent",
+    "no cap": "no lie, for real",
+    "bet": "okay, sure",
+    "salty": "angry or bitter",
+    "throw shade": "insult someone",
+    "ghost": "ignore someone",
+    "flex": "show off",
+    "vibe": "feeling or atmosphere",
+    "lowkey": "somewhat, secretly",
+    "highkey": "obviously, definitely",
+    "periodt": "end of discussion",
+    "say less": "I understand completely",
+    "it hits different": "it feels special or unique",
+    "that's sus": "that's suspicious",
+    "living rent free": "constantly thinking about something",
+    "main character energy": "confident, self-assured behavior",
+    "touch grass": "go outside and experience real life",
+    "sending me": "making me laugh a lot",
+    "this ain't it": "this is wrong or bad",
+    "and I oop": "oops, awkward moment",
+    "fire": "really good",
+    "lit": "exciting or excellent",
+    "slaps": "is excellent",
+    "bussin": "really good",
+    "cringe": "embarrassing or awkward",
+    "toxic": "harmful or negative",
+    "wholesome": "pure and good",
+    "savage": "brutally honest or cool",
+    "mood": "relatable feeling",
+    "stan": "be a big fan of",
+    "tea": "gossip or truth",
+    "shade": "insult or criticism",
+    "woke": "aware of social issues",
+    "basic": "unoriginal or mainstream",
+    "extra": "over the top",
+    "fam": "close friends",
+    "squad": "group of friends",
+    "snatched": "looks perfect",
+    "iconic": "memorable and impressive",
+    "queen": "confident woman",
+    "king": "confident man"
+}
+
+# Cultural references that need explanation: term -> (meaning, background)
+CULTURAL_REFERENCES = {
+    "throwing in the towel": ("giving up", "In boxing, throwing a towel means the fight is over"),
+    "jump the shark": ("become ridiculous", "From a TV show where a character literally jumped over a shark"),
+    "drinking the kool-aid": ("believing something without question", "Reference to a tragic cult incident"),
+    "fifteen minutes of fame": ("brief period of being famous", "From artist Andy Warhol's prediction"),
+    "gaslighting": ("manipulating someone to doubt their reality", "From a 1944 movie called 'Gaslight'"),
+    "karen": ("entitled, demanding person", "Internet slang for a specific type of behavior"),
+    "simp": ("someone who does too much for someone they like", "Internet slang meaning 'simpleton'"),
+    "boomer": ("older person, often out of touch", "Refers to Baby Boomer generation")
+}
+
+# Complex words with simpler ones
+WORD_REPLACEMENTS = {
+    "utilize": "use",
+    "facilitate": "help",
+    "commence": "start",
+    "terminate": "end",
+    "subsequent": "next",
+    "prior": "before",
+    "consequently": "so",
+    "nevertheless": "but",
+    "furthermore": "also",
+    "regarding": "about",
+    "acquire": "get",
+    "endeavor": "try",
+    "substantial": "large",
+    "insufficient": "not enough",
+    "approximately": "about",
+    "devastating": "very bad",
+    "magnificent": "very good",
+    "extraordinary": "amazing",
+    "comprehend": "understand",
+    "demonstrate": "show"
+}
+
+# Phrases that are often sarcastic
+SARCASM_INDICATORS = [
+    "just great", "perfect", "wonderful", "exactly what I needed",
+    "just what I wanted", "oh wonderful", "that's just perfect"
+]
+
+Replacement = namedtuple('Replacement', ['term', 'meaning', 'kind', 'note', 'whole_word'])
+
+
+class ReplacementEngine:
+    """
+    Idiom, slang, cultural-reference and word tables compiled into one
+    automaton. Entries match case-insensitively; single-word entries only match
+    whole words. Overlaps resolve leftmost-longest, and the rewritten text,
+    substitutions and explanations all come out of one traversal.
+    """
+
+    def __init__(self):
+        self.matcher = PhraseMatcher(ignore_case=True, word_boundaries=False, collapse_whitespace=False)
+        # Earlier tables win when the same term appears twice
+        self._add_table(IDIOM_REPLACEMENTS, 'idiom')
+        self._add_table(SLANG_REPLACEMENTS, 'slang')
+        self._add_table({ref: meaning for ref, (meaning, _) in CULTURAL_REFERENCES.items()}, 'cultural',
+                        notes={ref: note for ref, (_, note) in CULTURAL_REFERENCES.items()})
+        self._add_table(WORD_REPLACEMENTS, 'word')
+        self.matcher.compile()
+
+    def _add_table(self, table, kind, notes=None):
+        for term, meaning in table.items():
+            if term in self.matcher:
+                continue
+            note = notes.get(term) if notes else None
+            self.matcher.add(term, Replacement(term, meaning, kind, note, ' ' not in term))
+
+    def rewrite(self, text):
+        """Returns (rewritten_text, substitutions, explanations, cultural_notes)"""
+        matches = leftmost_longest(
+            match for match in self.matcher.find_all(text)
+            if not match.payload.whole_word or is_whole_word(text, match.start, match.end)
+        )
+
+        parts = []
+        substitutions = {}
+        explanations = []
+        cultural_notes = []
+        position = 0
+        for match in matches:
+            entry = match.payload
+            meaning = entry.meaning
+            if entry.kind == 'word' and text[match.start].isupper():
+                meaning = meaning.capitalize()
+            parts.append(text[position:match.start])
+            parts.append(meaning)
+            position = match.end
+
+            if entry.term in substitutions:
+                continue
+            substitutions[entry.term] = entry.meaning
+            if entry.kind == 'idiom':
+                explanations.append(f"'{entry.term}' is an idiom that means '{entry.meaning}'")
+            elif entry.kind == 'slang':
+                explanations.append(f"'{entry.term}' is modern slang meaning '{entry.meaning}'")
+            elif entry.kind == 'cultural':
+                cultural_notes.append(f"'{entry.term}': {entry.note}")
+                explanations.append(f"'{entry.term}' means '{entry.meaning}'")
+        parts.append(text[position:])
+
+        return ''.join(parts), substitutions, explanations, cultural_notes
+
 
 class TextSimplifier:
+    LLM_MODEL = "gpt-3.5-turbo"
+    # Bump whenever the simplification prompt changes so cached answers are not reused
+    PROMPT_VERSION = 1
+
     def __init__(self):
         # Initialize OpenAI client
         # Note: You'll need to set OPENAI_API_KEY environment variable
@@ -13,7 +216,7 @@ class TextSimplifier:
             try:
                 import openai
                 openai.api_key = self.api_key
-                self.client = openai
+                self.client = configure_openai(openai)
                 print("✅ OpenAI client initialized successfully")
             except ImportError:
                 print("⚠️ OpenAI package not installed. Using fallback method.")
@@ -21,26 +224,38 @@ class TextSimplifier:
         else:
             print("⚠️ OPENAI_API_KEY not found. Using rule-based simplification.")
             
-    def simplify_text(self, original_text: str) -> Dict[str, Any]:
+    def simplify_text(self, original_text: Union[str, TextContext], use_llm: bool = True) -> Dict[str, Any]:
         """
         Simplify text by replacing idioms, slang, and cultural references with plain English
         
         Args:
-            original_text: The text to simplify
+            original_text: The text to simplify (or a prebuilt TextContext)
+            use_llm: Set to False to skip the LLM and use the rule-based simplifier
             
         Returns:
             Dict with simplified text, explanations, and word substitutions
         """
-        if not self.client or not original_text.strip():
+        context = TextContext.of(original_text)
+        original_text = context.text
+        if not self.client or not use_llm or context.is_blank:
             return self._fallback_simplification(original_text)
             
         try:
+            if combined_llm_enabled():
+                # Shared completion that also carries the sarcasm highlighting
+                result = request_combined_analysis(self.client, original_text)
+                return self._parse_llm_response(result, original_text)
+            
             # Create simplified prompt
             prompt = self._create_simplification_prompt(original_text)
             
-            # Call OpenAI API
-            response = self.client.ChatCompletion.create(
-                model="gpt-3.5-turbo",
+            # Call OpenAI API (cached and coalesced per model, prompt version and text)
+            result = llm_cache.complete(
+                self.client,
+                self.LLM_MODEL,
+                'simplification',
+                self.PROMPT_VERSION,
+                original_text,
                 messages=[
                     {
                         "role": "system", 
@@ -55,7 +270,6 @@ class TextSimplifier:
                 temperature=0.3
             )
             
-            result = response.choices[0].message.content
             return self._parse_llm_response(result, original_text)
             
         except Exception as e:
@@ -138,191 +352,13 @@ Please format your response as JSON with these fields:
     def _fallback_simplification(self, text: str) -> Dict[str, Any]:
         """Fallback method when LLM is not available - focuses on idioms, slang, and cultural references"""
         
-        simplified = text
-        explanations = []
-        substitutions = {}
-        cultural_notes = []
-        
-        # Common idioms and their literal meanings
-        idiom_replacements = {
-            "break a leg": "good luck",
-            "piece of cake": "very easy",
-            "spill the beans": "reveal a secret",
-            "hit the nail on the head": "be exactly right",
-            "bite the bullet": "face a difficult situation",
-            "break the ice": "start a conversation",
-            "cost an arm and a leg": "be very expensive",
-            "costs an arm and a leg": "is very expensive",
-            "once in a blue moon": "very rarely",
-            "when pigs fly": "never",
-            "raining cats and dogs": "raining heavily",
-            "the ball is in your court": "it's your decision",
-            "kill two birds with one stone": "accomplish two things at once",
-            "let the cat out of the bag": "reveal a secret",
-            "a blessing in disguise": "something good that seemed bad at first",
-            "call it a day": "stop working",
-            "cutting corners": "doing something poorly to save time or money",
-            "easy as pie": "very easy",
-            "hit the books": "study hard",
-            "it's not rocket science": "it's not difficult",
-            "throw in the towel": "give up",
-            "under the weather": "feeling sick",
-            "you can't judge a book by its cover": "don't judge based on appearance",
-            "threw me under the bus": "betrayed me or blamed me unfairly",
-            "throw under the bus": "betray or blame unfairly",
-            "hit the fan": "things went very wrong",
-            "when it hit the fan": "when things went very wrong",
-            "break the bank": "cost too much money",
-            "on cloud nine": "very happy",
-            "over the moon": "extremely happy",
-            "piece of work": "difficult person",
-            "pain in the neck": "annoying person or thing",
-            "back to square one": "start over from the beginning",
-            "barking up the wrong tree": "making a mistake",
-            "don't count your chickens before they hatch": "don't assume success too early",
-            "every cloud has a silver lining": "there's something good in every bad situation",
-            "it's a small world": "people are connected in unexpected ways",
-            "the early bird catches the worm": "people who act quickly get the best opportunities"
-        }
-        
-        # Common slang and modern expressions
-        slang_replacements = {
-            "that's fire": "that's really good",
-            "that slaps": "that's excellent", 
-            "no cap": "no lie, for real",
-            "bet": "okay, sure",
-            "salty": "angry or bitter",
-            "throw shade": "insult someone",
-            "ghost": "ignore someone",
-            "flex": "show off",
-            "vibe": "feeling or atmosphere",
-            "lowkey": "somewhat, secretly",
-            "highkey": "obviously, definitely",
-            "periodt": "end of discussion",
-            "say less": "I understand completely",
-            "it hits different": "it feels special or unique",
-            "that's sus": "that's suspicious",
-            "living rent free": "constantly thinking about something",
-            "main character energy": "confident, self-assured behavior",
-            "touch grass": "go outside and experience real life",
-            "sending me": "making me laugh a lot",
-            "this ain't it": "this is wrong or bad",
-            "and I oop": "oops, awkward moment",
-            "fire": "really good",
-            "lit": "exciting or excellent",
-            "slaps": "is excellent",
-            "bussin": "really good",
-            "cringe": "embarrassing or awkward",
-            "toxic": "harmful or negative",
-            "wholesome": "pure and good",
-            "savage": "brutally honest or cool",
-            "mood": "relatable feeling",
-            "stan": "be a big fan of",
-            "tea": "gossip or truth",
-            "shade": "insult or criticism",
-            "woke": "aware of social issues",
-            "basic": "unoriginal or mainstream",
-            "extra": "over the top",
-            "fam": "close friends",
-            "squad": "group of friends",
-            "snatched": "looks perfect",
-            "iconic": "memorable and impressive",
-            "queen": "confident woman",
-            "king": "confident man"
-        }
-        
-        # Cultural references that need explanation
-        cultural_references = {
-            "throwing in the towel": ("giving up", "In boxing, throwing a towel means the fight is over"),
-            "jump the shark": ("become ridiculous", "From a TV show where a character literally jumped over a shark"),
-            "drinking the kool-aid": ("believing something without question", "Reference to a tragic cult incident"),
-            "fifteen minutes of fame": ("brief period of being famous", "From artist Andy Warhol's prediction"),
-            "gaslighting": ("manipulating someone to doubt their reality", "From a 1944 movie called 'Gaslight'"),
-            "karen": ("entitled, demanding person", "Internet slang for a specific type of behavior"),
-            "simp": ("someone who does too much for someone they like", "Internet slang meaning 'simpleton'"),
-            "boomer": ("older person, often out of touch", "Refers to Baby Boomer generation")
-        }
-        
-        # Replace idioms first (longer phrases before shorter ones)
-        idiom_items = sorted(idiom_replacements.items(), key=lambda x: len(x[0]), reverse=True)
-        for idiom, meaning in idiom_items:
-            if idiom.lower() in simplified.lower():
-                # Use case-insensitive replacement with word boundaries for single words
-                import re
-                if ' ' in idiom:
-                    # For phrases, use exact match
-                    pattern = re.escape(idiom)
-                else:
-                    # For single words, use word boundaries
-                    pattern = r'\b' + re.escape(idiom) + r'\b'
-                simplified = re.sub(pattern, meaning, simplified, flags=re.IGNORECASE)
-                substitutions[idiom] = meaning
-                explanations.append(f"'{idiom}' is an idiom that means '{meaning}'")
-        
-        # Replace slang (longer phrases before shorter ones) 
-        slang_items = sorted(slang_replacements.items(), key=lambda x: len(x[0]), reverse=True)
-        for slang, meaning in slang_items:
-            if slang.lower() in simplified.lower():
-                # Use case-insensitive replacement with word boundaries
-                import re
-                if ' ' in slang:
-                    # For phrases, use exact match
-                    pattern = re.escape(slang)
-                else:
-                    # For single words, use word boundaries
-                    pattern = r'\b' + re.escape(slang) + r'\b'
-                simplified = re.sub(pattern, meaning, simplified, flags=re.IGNORECASE)
-                substitutions[slang] = meaning
-                explanations.append(f"'{slang}' is modern slang meaning '{meaning}'")
-        
-        # Handle cultural references
-        cultural_items = sorted(cultural_references.items(), key=lambda x: len(x[0]), reverse=True)
-        for ref, (meaning, context) in cultural_items:
-            if ref.lower() in simplified.lower():
-                import re
-                simplified = re.sub(re.escape(ref), meaning, simplified, flags=re.IGNORECASE)
-                substitutions[ref] = meaning
-                cultural_notes.append(f"'{ref}': {context}")
-                explanations.append(f"'{ref}' means '{meaning}'")
-        
-        # Replace complex words with simpler ones
-        word_replacements = {
-            "utilize": "use",
-            "facilitate": "help",
-            "commence": "start",
-            "terminate": "end",
-            "subsequent": "next",
-            "prior": "before",
-            "consequently": "so",
-            "nevertheless": "but",
-            "furthermore": "also",
-            "regarding": "about",
-            "acquire": "get",
-            "endeavor": "try",
-            "substantial": "large",
-            "insufficient": "not enough",
-            "approximately": "about",
-            "devastating": "very bad",
-            "magnificent": "very good",
-            "extraordinary": "amazing",
-            "comprehend": "understand",
-            "demonstrate": "show"
-        }
-        
-        for difficult, simple in word_replacements.items():
-            if difficult in simplified.lower():
-                simplified = simplified.replace(difficult, simple)
-                simplified = simplified.replace(difficult.capitalize(), simple.capitalize())
-                substitutions[difficult] = simple
+        # Idioms, slang, cultural references and complex words in one pass
+        simplified, substitutions, explanations, cultural_notes = replacement_engine.rewrite(text)
         
         # Detect sarcasm patterns and explain them
-        sarcasm_indicators = [
-            "just great", "perfect", "wonderful", "exactly what I needed",
-            "just what I wanted", "oh wonderful", "that's just perfect"
-        ]
-        
-        for indicator in sarcasm_indicators:
-            if indicator.lower() in text.lower():
+        text_lower = text.lower()
+        for indicator in SARCASM_INDICATORS:
+            if indicator.lower() in text_lower:
                 explanations.append(f"'{indicator}' might be sarcasm - the person probably means the opposite")
         
         # Check for complex sentences
@@ -351,10 +387,11 @@ Please format your response as JSON with these fields:
             "method": "rule_based_fallback"
         }
 
-    def get_reading_level_info(self, text: str) -> Dict[str, Any]:
+    def get_reading_level_info(self, text: Union[str, TextContext]) -> Dict[str, Any]:
         """Analyze the reading level of text"""
-        words = text.split()
-        sentences = len([s for s in text.split('.') if s.strip()])
+        context = TextContext.of(text)
+        words = context.words
+        sentences = len(context.sentences)
         avg_words_per_sentence = len(words) / max(sentences, 1)
         
         # Simple readability estimation
@@ -376,13 +413,14 @@ Please format your response as JSON with these fields:
             "avg_words_per_sentence": round(avg_words_per_sentence, 1)
         }
 
-# Global instance
+# Global instances
+replacement_engine = ReplacementEngine()
 text_simplifier = TextSimplifier()
 
-def simplify_text_for_learners(text: str) -> Dict[str, Any]:
+def simplify_text_for_learners(text: Union[str, TextContext], use_llm: bool = True) -> Dict[str, Any]:
     """Convenience function for text simplification"""
-    return text_simplifier.simplify_text(text)
+    return text_simplifier.simplify_text(text, use_llm=use_llm)
 
-def get_text_readability(text: str) -> Dict[str, Any]:
+def get_text_readability(text: Union[str, TextContext]) -> Dict[str, Any]:
     """Get readability analysis of text"""
     return text_simplifier.get_reading_level_info(text)
@@ -0,0 +1,106 @@
+"""
+Sparse inverted index for nearest-neighbor tone lookup.
+
+The tone examples are stored as L2-normalised TF-IDF rows, so cosine
+similarity is a plain dot product. Instead of comparing a query against every
+example, the index keeps one postings list per vocabulary term and only
+accumulates scores for examples that share at least one term with the query.
+Per-request cost therefore grows with the number of matching postings, not
+with the size of the tone corpus.
+"""
+
+from collections import namedtuple, defaultdict
+
+import numpy as np
+from scipy import sparse
+
+Neighbor = namedtuple('Neighbor', ['row', 'score', 'label'])
+
+
+class ToneIndex:
+    """
+    Inverted index over TF-IDF vectors of labelled examples.
+
+    Args:
+        vectors: sparse matrix (n_examples x n_terms) of L2-normalised rows
+        labels: sequence of n_examples labels (e.g. specific tones)
+    """
+
+    def __init__(self, vectors, labels):
+        # CSC layout: column j's slice is the postings list of term j
+        self.postings = sparse.csc_matrix(vectors, dtype=np.float64)
+        self.postings.sort_indices()
+        self.labels = list(labels)
+        if self.postings.shape[0] != len(self.labels):
+            raise ValueError("ToneIndex needs exactly one label per vector")
+
+    def __len__(self):
+        return len(self.labels)
+
+    def search(self, query, k=1):
+        """
+        Top-k most similar examples for a single query row.
+
+        Returns a list of Neighbor(row, score, label), best first. Ties are
+        broken by the lower row index, like argmax over a dense similarity row.
+        """
+        if k < 1:
+            raise ValueError(f"k must be at least 1, got {k}")
+        query = sparse.csr_matrix(query)
+        indptr, indices, data = self.postings.indptr, self.postings.indices, self.postings.data
+
+        doc_chunks = []
+        score_chunks = []
+        for term, weight in zip(query.indices, query.data):
+            start, end = indptr[term], indptr[term + 1]
+            if start == end:
+                continue
+            doc_chunks.append(indices[start:end])
+            score_chunks.append(data[start:end] * weight)
+
+        if not doc_chunks:
+            return []
+
+        docs, inverse = np.unique(np.concatenate(doc_chunks), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_chunks))
+
+        if k < len(docs):
+            # Keep every candidate scoring at least the k-th best so ties are resolved by row below
+            threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+            keep = scores >= threshold
+            docs, scores = docs[keep], scores[keep]
+
+        order = np.lexsort((docs, -scores))[:k]
+        return [Neighbor(int(docs[i]), float(scores[i]), self.labels[docs[i]]) for i in order]
+
+    def search_batch(self, queries, k=1):
+        """Top-k neighbors for every row of a sparse query matrix"""
+        queries = sparse.csr_matrix(queries)
+        return [self.search(queries.getrow(i), k) for i in range(queries.shape[0])]
+
+    @staticmethod
+    def vote(neighbors, label_map=None):
+        """
+        Similarity-weighted k-NN vote.
+
+        Args:
+            neighbors: output of search()
+            label_map: optional function applied to each label before voting
+                (e.g. mapping specific tones to their main category)
+
+        Returns:
+            (label, weight) of the winning label, or (None, 0.0) without neighbors
+        """
+        if not neighbors:
+            return None, 0.0
+
+        totals = defaultdict(float)
+        first_seen = {}
+        for rank, neighbor in enumerate(neighbors):
+            label = label_map(neighbor.label) if label_map else neighbor.label
+            totals[label] += neighbor.score
+            first_seen.setdefault(label, rank)
+
+        # Highest total wins; ties go to the label of the closer neighbor
+        winner = min(totals, key=lambda label: (-totals[label], first_seen[label]))
+        return winner, totals[winner]
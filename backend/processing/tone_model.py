@@ -0,0 +1,212 @@
+"""
+Prebuilt tone model artifact.
+
+The TF-IDF tone model used to be fitted inside every worker on its first
+request. `build_tone_model.py` now fits it once and writes a single binary
+artifact next to the other trained models:
+
+    magic (8 bytes) | header length (uint64) | JSON header | padding | arrays
+
+The JSON header holds the vectorizer parameters, vocabulary, tone labels and
+the offset of each array; the arrays (IDF weights and the CSC postings of the
+tone vectors) are read through np.memmap, so loading takes milliseconds and
+the pages are shared by every process that maps the same file. The file name
+carries a hash of the dataset contents and the vectorizer settings, so a
+changed dataset never picks up a stale artifact.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+ARTIFACT_MAGIC = b'TONEMDL1'
+ARTIFACT_FORMAT_VERSION = 1
+ARRAY_ALIGNMENT = 64
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+DEFAULT_DATASET_PATH = os.path.join(BACKEND_DIR, 'Datasets', 'tone_v1.txt')
+DEFAULT_ARTIFACT_DIR = os.path.join(BACKEND_DIR, 'models', 'trained')
+
+VECTORIZER_PARAMS = {
+    'max_features': 1000,
+    'stop_words': 'english',
+    'ngram_range': (1, 2),  # Include both unigrams and bigrams
+    'lowercase': True
+}
+
+
+class ToneModel:
+    """Fitted vectorizer plus the tone vectors (CSC postings) and their labels"""
+
+    def __init__(self, vectorizer, vectors, labels, dataset_hash=None):
+        self.vectorizer = vectorizer
+        self.vectors = vectors
+        self.labels = labels
+        self.dataset_hash = dataset_hash
+
+
+def get_dataset_path():
+    return os.getenv('TONE_DATASET_PATH', DEFAULT_DATASET_PATH)
+
+
+def get_artifact_dir():
+    return os.getenv('TONE_MODEL_DIR', DEFAULT_ARTIFACT_DIR)
+
+
+def read_tone_dataset(path=None):
+    """Parse `text || Tone.` lines into (texts, tones)"""
+    texts, tones = [], []
+    with open(path or get_dataset_path(), 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if ' || ' in line:
+                text, tone = line.split(' || ')
+                # Clean up the tone (remove trailing periods)
+                texts.append(text.strip())
+                tones.append(tone.rstrip('.').strip())
+    return texts, tones
+
+
+def dataset_hash(path=None):
+    """Content hash of the dataset and the settings the model is fitted with"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps({'format': ARTIFACT_FORMAT_VERSION, 'params': VECTORIZER_PARAMS}, sort_keys=True).encode('utf-8'))
+    with open(path or get_dataset_path(), 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def artifact_path(content_hash, artifact_dir=None):
+    return os.path.join(artifact_dir or get_artifact_dir(), f'tone_model-{content_hash[:16]}.bin')
+
+
+def fit_tone_model(path=None):
+    """Fit the TF-IDF vectorizer on the tone dataset"""
+    path = path or get_dataset_path()
+    texts, tones = read_tone_dataset(path)
+    vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
+    vectors = sparse.csc_matrix(vectorizer.fit_transform(texts), dtype=np.float64)
+    vectors.sort_indices()
+    return ToneModel(vectorizer, vectors, tones, dataset_hash(path))
+
+
+def _aligned(size):
+    return (size + ARRAY_ALIGNMENT - 1) // ARRAY_ALIGNMENT * ARRAY_ALIGNMENT
+
+
+def save_tone_model(model, destination):
+    """Write the model as a single memory-mappable artifact (atomically)"""
+    arrays = {
+        'idf': np.ascontiguousarray(model.vectorizer.idf_, dtype=np.float64),
+        'data': np.ascontiguousarray(model.vectors.data, dtype=np.float64),
+        'indices': np.ascontiguousarray(model.vectors.indices, dtype=np.int32),
+        'indptr': np.ascontiguousarray(model.vectors.indptr, dtype=np.int64)
+    }
+
+    # Offsets are relative to the start of the array section
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = {'dtype': array.dtype.str, 'count': int(array.size), 'offset': offset}
+        offset = _aligned(offset + array.nbytes)
+
+    header = json.dumps({
+        'format': ARTIFACT_FORMAT_VERSION,
+        'dataset_hash': model.dataset_hash,
+        'params': VECTORIZER_PARAMS,
+        'vocabulary': {term: int(index) for term, index in model.vectorizer.vocabulary_.items()},
+        'labels': list(model.labels),
+        'shape': list(model.vectors.shape),
+        'arrays': layout
+    }).encode('utf-8')
+    arrays_start = _aligned(len(ARTIFACT_MAGIC) + 8 + len(header))
+
+    directory = os.path.dirname(os.path.abspath(destination))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(ARTIFACT_MAGIC)
+            file.write(np.uint64(len(header)).tobytes())
+            file.write(header)
+            for name, array in arrays.items():
+                file.seek(arrays_start + layout[name]['offset'])
+                file.write(array.tobytes())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, destination)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return destination
+
+
+def load_tone_model(path):
+    """Map an artifact written by save_tone_model"""
+    with open(path, 'rb') as file:
+        if file.read(len(ARTIFACT_MAGIC)) != ARTIFACT_MAGIC:
+            raise ValueError(f"Not a tone model artifact: {path}")
+        header_length = int(np.frombuffer(file.read(8), dtype=np.uint64)[0])
+        header = json.loads(file.read(header_length).decode('utf-8'))
+
+    if header['format'] != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported tone model format {header['format']} in {path}")
+
+    arrays_start = _aligned(len(ARTIFACT_MAGIC) + 8 + header_length)
+    mapped = np.memmap(path, dtype=np.uint8, mode='r')
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        arrays[name] = np.frombuffer(mapped, dtype=dtype, count=spec['count'], offset=arrays_start + spec['offset'])
+
+    params = dict(header['params'])
+    params['ngram_range'] = tuple(params['ngram_range'])
+    vectorizer = TfidfVectorizer(vocabulary=header['vocabulary'], **params)
+    vectorizer.idf_ = arrays['idf']
+
+    vectors = sparse.csc_matrix(
+        (arrays['data'], arrays['indices'], arrays['indptr']),
+        shape=tuple(header['shape']),
+        copy=False
+    )
+    return ToneModel(vectorizer, vectors, header['labels'], header['dataset_hash'])
+
+
+def build_tone_model(dataset_path=None, artifact_dir=None):
+    """Fit the model and write its artifact; returns the artifact path"""
+    dataset_path = dataset_path or get_dataset_path()
+    model = fit_tone_model(dataset_path)
+    return save_tone_model(model, artifact_path(model.dataset_hash, artifact_dir))
+
+
+def get_tone_model():
+    """
+    Load the artifact matching the current dataset, or fit in-process when
+    none has been built yet (returns None if the dataset is unavailable).
+    """
+    dataset_path = get_dataset_path()
+    try:
+        content_hash = dataset_hash(dataset_path)
+    except OSError as e:
+        print(f"Error loading tone dataset: {e}")
+        return None
+
+    path = artifact_path(content_hash)
+    if os.path.exists(path):
+        try:
+            model = load_tone_model(path)
+            print(f"Loaded tone model artifact {os.path.basename(path)} ({len(model.labels)} examples)")
+            return model
+        except Exception as e:
+            print(f"Could not load tone model artifact {path}: {e}")
+
+    print("No prebuilt tone model found (run build_tone_model.py); fitting in-process")
+    model = fit_tone_model(dataset_path)
+    print(f"Loaded {len(model.labels)} tone examples from dataset")
+    return model
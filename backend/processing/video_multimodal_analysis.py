@@ -5,15 +5,17 @@ Combines facial emotion recognition with audio analysis from video files.
 """
 
 import os
-import cv2
 import numpy as np
-import librosa
 import tempfile
 import subprocess
 from typing import Dict, List, Tuple, Optional
 import uuid
 from collections import Counter
 import datetime
+from processing.model_registry import lazy_import
+
+# OpenCV is imported the first time a video is analyzed
+cv2 = lazy_import('cv2')
 
 class VideoMultimodalAnalyzer:
     """Enhanced video analyzer that processes both facial expressions and audio."""
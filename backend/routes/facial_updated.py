@@ -6,8 +6,6 @@ Handles image upload, facial emotion detection, and multimodal analysis integrat
 
 from flask import Blueprint, request, jsonify
 import os
-import cv2
-import numpy as np
 from werkzeug.utils import secure_filename
 import tempfile
 import uuid
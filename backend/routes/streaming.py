@@ -0,0 +1,123 @@
+import os
+from flask import Blueprint, request, jsonify
+from processing.streaming_transcription import streaming_sessions
+from processing.analysis_service import analyze_transcript
+from processing.audio_decode import SAMPLE_RATE
+
+streaming_routes = Blueprint('streaming_routes', __name__)
+
+
+def streaming_enabled():
+    # Sessions are per process: turn streaming off wherever requests are spread over several workers
+    return os.getenv('STREAMING_ENABLED', '1').lower() in ('1', 'true', 'yes', 'on')
+
+
+# Sample rates a client may stream at
+MIN_SAMPLE_RATE = 8000
+MAX_SAMPLE_RATE = 48000
+# Largest chunk accepted in one request (about 10 s at 48 kHz)
+STREAM_MAX_CHUNK_BYTES = int(os.getenv('STREAM_MAX_CHUNK_BYTES', str(1024 * 1024)))
+
+
+def _chunk_too_large():
+    return jsonify({'error': f'Chunk too large (max {STREAM_MAX_CHUNK_BYTES} bytes); send audio in smaller pieces'}), 413
+
+
+@streaming_routes.route('/stream/start', methods=['POST'])
+def start_stream():
+    """
+    Open a streaming transcription session. Audio is then POSTed to
+    /stream/<session_id>/chunk as raw 16-bit little-endian mono PCM at
+    sample_rate (default 16000) while it is recorded.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        sample_rate = int(data.get('sample_rate', SAMPLE_RATE))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'sample_rate must be an integer'}), 400
+    if not MIN_SAMPLE_RATE <= sample_rate <= MAX_SAMPLE_RATE:
+        return jsonify({'error': f'sample_rate must be between {MIN_SAMPLE_RATE} and {MAX_SAMPLE_RATE}'}), 400
+
+    session = streaming_sessions.start(sample_rate)
+    if session is None:
+        return jsonify({'error': 'Too many active streams, try again shortly'}), 503
+    return jsonify({'session_id': session.session_id, 'sample_rate': sample_rate, 'format': 's16le'})
+
+
+@streaming_routes.route('/stream/<session_id>/chunk', methods=['POST'])
+def stream_chunk(session_id):
+    """Append recorded audio; returns the transcript, partial text and annotations so far"""
+    # Reject oversized chunks before reading them
+    if request.content_length is not None and request.content_length > STREAM_MAX_CHUNK_BYTES:
+        return _chunk_too_large()
+
+    session = streaming_sessions.get(session_id)
+    if session is None:
+        return jsonify({'error': 'Unknown or expired stream session'}), 404
+
+    # A chunked upload has no length up front; read one byte past the limit to tell
+    pcm = request.stream.read(STREAM_MAX_CHUNK_BYTES + 1)
+    if len(pcm) > STREAM_MAX_CHUNK_BYTES:
+        return _chunk_too_large()
+
+    try:
+        with session.lock:
+            session.add_chunk(pcm)
+            return jsonify(session.results())
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': f'Streaming transcription failed: {str(e)}'}), 500
+
+
+@streaming_routes.route('/stream/<session_id>', methods=['GET'])
+def stream_status(session_id):
+    """Latest results without sending audio (segments finish transcribing between chunks)"""
+    session = streaming_sessions.get(session_id)
+    if session is None:
+        return jsonify({'error': 'Unknown or expired stream session'}), 404
+
+    with session.lock:
+        return jsonify(session.results())
+
+
+@streaming_routes.route('/stream/<session_id>/finish', methods=['POST'])
+def finish_stream(session_id):
+    """
+    Close the session: transcribe the rest of the audio and run the full
+    /analyze pipeline on the final transcript, as /upload-and-analyze does.
+    """
+    session = streaming_sessions.close(session_id)
+    if session is None:
+        return jsonify({'error': 'Unknown or expired stream session'}), 404
+
+    try:
+        with session.lock:
+            results = session.finish()
+
+        transcript = results['transcript']
+        if not transcript:
+            return jsonify({
+                'error': 'Could not understand the audio. Please speak more clearly or check your microphone.',
+                'session_id': session_id,
+                'duration': results['duration']
+            }), 500
+
+        results['analysis'] = analyze_transcript(transcript)
+        return jsonify(results)
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'error': f'Analysis failed: {str(e)}',
+            'session_id': session_id
+        }), 500
+
+
+@streaming_routes.route('/stream/<session_id>', methods=['DELETE'])
+def cancel_stream(session_id):
+    """Discard a session without transcribing the rest"""
+    if streaming_sessions.close(session_id) is None:
+        return jsonify({'error': 'Unknown or expired stream session'}), 404
+    return jsonify({'status': 'cancelled', 'session_id': session_id})
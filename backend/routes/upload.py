@@ -2,9 +2,11 @@ import os
 from flask import Blueprint, request, jsonify
 from werkzeug.utils import secure_filename 
 from processing.speech_to_text import transcribe_audio
+from processing.audio_decode import decode_audio
 from processing.audio_analysis import analyze_audio
 from processing.slang_detect import detect_slang
 from processing.robust_emotion_analysis import analyze_emotion_robust
+from processing.analysis_service import analyze_transcript
 
 upload_routes = Blueprint('upload_routes', __name__)
 
@@ -60,8 +62,13 @@ def upload_and_analyze():
         filepath = os.path.join(UPLOAD_FOLDER, filename)
         file.save(filepath)
         
+        # Decode once in memory; transcription and audio emotion features share the buffer
+        audio = decode_audio(filepath)
+        if audio is None:
+            audio = filepath
+        
         # Convert speech to text
-        transcription_result = transcribe_audio(filepath)
+        transcription_result = transcribe_audio(audio)
         
         if 'error' in transcription_result:
             return jsonify({
@@ -71,45 +78,22 @@ def upload_and_analyze():
         
         transcript = transcription_result['transcript']
         
-        # Perform comprehensive analysis (same as /analyze endpoint)
-        import requests
+        # Perform comprehensive analysis (same as /analyze endpoint), in process
         try:
-            # Call the comprehensive analyze endpoint internally
-            analysis_response = requests.post('http://localhost:5002/analyze', 
-                                            json={'transcript': transcript},
-                                            timeout=30)
+            comprehensive_analysis = analyze_transcript(transcript)
             
-            if analysis_response.status_code == 200:
-                comprehensive_analysis = analysis_response.json()
-                
-                return jsonify({
-                    'filename': filename,
-                    'transcript': transcript,
-                    'analysis': comprehensive_analysis  # Complete analysis with tone, emotion, formality, etc.
-                })
-            else:
-                # Fallback to basic analysis if comprehensive fails
-                tone_result = analyze_audio(transcript)
-                slang_result = detect_slang(transcript)
-                robust_analysis = analyze_emotion_robust(text=transcript, audio_path=filepath)
-                
-                return jsonify({
-                    'filename': filename,
-                    'transcript': transcript,
-                    'analysis': {
-                        'tone': tone_result,
-                        'slang': slang_result,
-                        'robust_emotion': robust_analysis
-                    },
-                    'recommendation': 'Basic analysis used - comprehensive analysis failed'
-                })
+            return jsonify({
+                'filename': filename,
+                'transcript': transcript,
+                'analysis': comprehensive_analysis  # Complete analysis with tone, emotion, formality, etc.
+            })
                 
         except Exception as analysis_error:
             print(f"Comprehensive analysis failed: {analysis_error}")
             # Fallback to basic analysis
             tone_result = analyze_audio(transcript)
             slang_result = detect_slang(transcript)
-            robust_analysis = analyze_emotion_robust(text=transcript, audio_path=filepath)
+            robust_analysis = analyze_emotion_robust(text=transcript, audio_path=audio)
             
             return jsonify({
                 'filename': filename,
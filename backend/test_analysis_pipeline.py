@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+"""
+Test script for the concurrent /analyze stage runner
+Checks that late and failing stages are answered with their fallbacks,
+that a failing fallback cannot escape run_stages, and that deadlines count
+from when a stage starts rather than from when it was queued.
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from processing.analysis_pipeline import AnalysisStage, run_stages, _executor
+
+
+def fail():
+    raise RuntimeError("engine exploded")
+
+
+def test_late_and_failing_stages():
+    print("⏱️ Testing stage deadlines and fallbacks\n")
+    print("=" * 50)
+
+    stages = [
+        AnalysisStage('fast', lambda: 'fast result', lambda: 'fast fallback', deadline=2.0),
+        AnalysisStage('slow', lambda: time.sleep(2.0) or 'slow result', lambda: 'slow fallback', deadline=0.2),
+        AnalysisStage('broken', fail, lambda: 'broken fallback', deadline=2.0),
+        AnalysisStage('hopeless', fail, fail, deadline=2.0, default='hopeless default')
+    ]
+
+    started = time.monotonic()
+    results, status = run_stages(stages)
+    elapsed = time.monotonic() - started
+
+    for name in results:
+        print(f"{name:>10}: {status[name]['status']:<8} {results[name]}")
+    print(f"Total: {elapsed:.2f}s")
+
+    assert results['fast'] == 'fast result' and status['fast']['status'] == 'ok'
+    assert results['slow'] == 'slow fallback' and status['slow']['status'] == 'timeout'
+    assert results['broken'] == 'broken fallback' and status['broken']['status'] == 'error'
+    assert results['hopeless'] == 'hopeless default' and status['hopeless']['status'] == 'error'
+    assert elapsed < 1.0, "the slow stage held up the response"
+
+
+def test_deadline_starts_when_stage_runs():
+    print("\n🚦 Testing deadlines under a saturated pool\n")
+    print("=" * 50)
+
+    # Occupy every worker so the stage below has to queue
+    blockers = [_executor.submit(time.sleep, 0.4) for _ in range(_executor._max_workers)]
+    stage = AnalysisStage('queued', lambda: time.sleep(0.05) or 'queued result', lambda: 'queued fallback', deadline=0.3)
+    results, status = run_stages([stage])
+    for blocker in blockers:
+        blocker.result()
+
+    print(f"queued: {status['queued']['status']} after {status['queued']['elapsed_ms']}ms")
+    assert results['queued'] == 'queued result', "stage timed out while it was still queued"
+
+
+def test_rule_based_fallbacks():
+    print("\n📏 Testing the emotion and formality fallbacks\n")
+    print("=" * 50)
+
+    from processing.text_context import TextContext
+    from processing.analysis_service import build_analysis_stages
+
+    context = TextContext("Dear Sir, I would be grateful if you could kindly review the attached report.")
+    stages = {stage.name: stage for stage in build_analysis_stages(context)}
+
+    formality = stages['formality'].fallback()
+    print(f"Formality fallback: {formality['formality_level']} {formality['details']['formality_distribution']}")
+    assert formality['formality_level'] != 'unknown'
+    assert set(formality['details']['formality_distribution']) == {'formal', 'professional', 'informal', 'casual'}
+
+    emotion = stages['emotion'].fallback()
+    print(f"Emotion fallback: {emotion['multimodal_analysis']['primary_emotion']} ({emotion['text_analysis']['details']['method']})")
+    assert emotion['text_analysis']['details']['vader_scores']['compound'] > 0
+    assert emotion['multimodal_analysis']['primary_emotion'] == emotion['text_analysis']['emotion']
+
+
+if __name__ == "__main__":
+    test_late_and_failing_stages()
+    test_deadline_starts_when_stage_runs()
+    test_rule_based_fallbacks()
+    print("\n✅ Analysis pipeline tests passed")
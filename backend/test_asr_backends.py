@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+
+"""
+Test script for the offline ASR backends
+Uses a fake backend to check which pool ASR_BACKEND selects, that a pool
+loads its models once and reuses them for every request, that a model is
+never used by two transcriptions at once, and how the CPU thread budget is
+split. With torch installed, also checks that int8 quantization replaces
+Linear subclasses such as whisper's.
+"""
+
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+import processing.asr_backends as asr_backends
+from processing.asr_backends import (
+    ASRBackend, ASRPool, BACKENDS, ASR_POOL, WHISPER_POOL, create_backend, get_asr_pool, get_whisper_pool
+)
+from processing.audio_decode import DecodedAudio
+from processing.model_registry import model_registry
+
+AUDIO = DecodedAudio(np.zeros(1600, dtype='<i2').tobytes(), 16000)
+
+
+class FakeModel:
+    def __init__(self, number):
+        self.number = number
+        self.busy = False
+        self.overlaps = 0
+
+
+class FakeBackend(ASRBackend):
+    """Counts loads; each 'transcript' names the model that produced it"""
+
+    name = 'fake'
+    default_model = 'fake-base'
+    loads = []
+
+    def load(self):
+        FakeBackend.loads.append(self)
+        return FakeModel(len(FakeBackend.loads))
+
+    def transcribe(self, model, audio):
+        if model.busy:
+            model.overlaps += 1
+        model.busy = True
+        time.sleep(0.02)
+        model.busy = False
+        if audio is None:
+            raise RuntimeError("no audio")
+        return f"model {model.number}"
+
+
+class FakeWhisperBackend(FakeBackend):
+    name = 'whisper'
+
+
+class ConfiguredBackend:
+    """Switch ASR_BACKEND and the registry entries for the duration of a test"""
+
+    def __init__(self, backend_name, pool_size=1):
+        self.backend_name = backend_name
+        self.pool_size = pool_size
+
+    def __enter__(self):
+        self.saved = (asr_backends.ASR_BACKEND, dict(BACKENDS), dict(model_registry._entries))
+        asr_backends.ASR_BACKEND = self.backend_name
+        BACKENDS[FakeBackend.name] = FakeBackend
+        BACKENDS[FakeWhisperBackend.name] = FakeWhisperBackend
+        model_registry._entries.pop(ASR_POOL, None)
+        model_registry._entries.pop(WHISPER_POOL, None)
+        if self.backend_name in BACKENDS:
+            model_registry.register(ASR_POOL, lambda: ASRPool(
+                create_backend(self.backend_name, None, self.pool_size, 4), self.pool_size))
+        FakeBackend.loads = []
+        return self
+
+    def __exit__(self, *exc):
+        asr_backends.ASR_BACKEND = self.saved[0]
+        BACKENDS.clear()
+        BACKENDS.update(self.saved[1])
+        model_registry._entries.clear()
+        model_registry._entries.update(self.saved[2])
+
+
+def test_backend_selection():
+    print("🎙️ Testing ASR_BACKEND selection\n")
+    print("=" * 50)
+
+    # Google (the default) and unknown names have no offline pool
+    for name in ('google', 'nonsense'):
+        with ConfiguredBackend(name):
+            assert get_asr_pool() is None, name
+
+    with ConfiguredBackend('fake', pool_size=2):
+        pool = get_asr_pool()
+        print(f"fake: {pool.size} x {pool.backend.model_name}")
+        assert isinstance(pool.backend, FakeBackend) and pool.size == 2
+        assert pool.backend.model_name == 'fake-base'
+        # Explicit Whisper requests get a separate single-model Whisper pool
+        whisper_pool = get_whisper_pool()
+        assert whisper_pool is not pool and isinstance(whisper_pool.backend, FakeWhisperBackend)
+        assert get_whisper_pool() is whisper_pool
+
+    with ConfiguredBackend('whisper'):
+        # ...unless the configured backend already is Whisper
+        assert get_whisper_pool() is get_asr_pool()
+        assert not model_registry.is_registered(WHISPER_POOL)
+
+
+def test_pool_reuses_models():
+    print("\n♻️ Testing that pooled models load once and are reused\n")
+    print("=" * 50)
+
+    with ConfiguredBackend('fake', pool_size=3):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            texts = list(pool.map(lambda _: get_asr_pool().transcribe(AUDIO), range(24)))
+        print(f"24 transcriptions on {len(FakeBackend.loads)} loaded models: {sorted(set(texts))}")
+        assert len(FakeBackend.loads) == 3, "models were loaded more than once"
+        assert set(texts) <= {"model 1", "model 2", "model 3"} and len(set(texts)) > 1
+
+        asr_pool = get_asr_pool()
+        models = list(asr_pool._models.queue)
+        assert len(models) == 3 and not any(model.overlaps for model in models), "a model was shared by two requests"
+
+        # A failed transcription still returns its model to the pool
+        try:
+            asr_pool.transcribe(None)
+        except RuntimeError:
+            pass
+        assert asr_pool._models.qsize() == 3
+
+
+def test_pool_blocks_when_all_models_are_busy():
+    print("\n⏳ Testing requests wait for a free model\n")
+    print("=" * 50)
+
+    pool = ASRPool(FakeBackend(), 1)
+    model = pool._models.get()
+    finished = threading.Event()
+    worker = threading.Thread(target=lambda: (pool.transcribe(AUDIO), finished.set()))
+    worker.start()
+    assert not finished.wait(0.1), "transcribed without a free model"
+    pool._models.put(model)
+    assert finished.wait(2)
+    worker.join()
+
+
+def test_thread_budget():
+    print("\n🧵 Testing the CPU thread split\n")
+    print("=" * 50)
+
+    BACKENDS[FakeBackend.name] = FakeBackend
+    try:
+        backend = create_backend('fake', 'custom', pool_size=3, cpu_threads=8, int8=True, language='fr')
+        assert backend.threads == 2 and backend.total_threads == 8
+        assert backend.model_name == 'custom' and backend.int8 and backend.language == 'fr'
+        # Never zero threads, even with more models than CPUs
+        assert create_backend('fake', pool_size=4, cpu_threads=2).threads == 1
+    finally:
+        BACKENDS.pop(FakeBackend.name, None)
+
+
+def test_int8_quantizes_linear_subclasses():
+    print("\n🔢 Testing int8 quantization of Linear subclasses\n")
+    print("=" * 50)
+
+    try:
+        import torch
+    except ImportError:
+        print("⚠️ torch not installed, skipping")
+        return
+
+    class Linear(torch.nn.Linear):
+        """Like whisper.model.Linear: casts weights to the input dtype"""
+        def forward(self, x):
+            return torch.nn.functional.linear(x, self.weight.to(x.dtype), self.bias.to(x.dtype))
+
+    torch.manual_seed(0)
+    model = torch.nn.Sequential(Linear(16, 32), torch.nn.ReLU(), Linear(32, 4))
+    inputs = torch.randn(8, 16)
+    expected = model(inputs)
+
+    # Matching nn.Linear exactly, as before, replaces nothing
+    untouched = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    assert not any(isinstance(m, torch.nn.quantized.dynamic.Linear) for m in untouched.modules())
+
+    quantized = asr_backends.quantize_linear_layers(model, Linear)
+    replaced = [m for m in quantized.modules() if isinstance(m, torch.nn.quantized.dynamic.Linear)]
+    assert len(replaced) == 2
+    assert torch.allclose(quantized(inputs), expected, atol=0.1)
+
+    try:
+        asr_backends.quantize_linear_layers(torch.nn.Sequential(torch.nn.ReLU()), Linear)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("a model without Linear layers was reported as quantized")
+
+
+if __name__ == "__main__":
+    test_backend_selection()
+    test_pool_reuses_models()
+    test_pool_blocks_when_all_models_are_busy()
+    test_thread_budget()
+    test_int8_quantizes_linear_subclasses()
+    print("\n✅ ASR backend tests passed")
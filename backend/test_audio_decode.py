@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+
+"""
+Test script for in-memory audio decoding
+Compares decode_audio with what the old temp-file pipeline handed the
+recognizer (sr.AudioFile over the WAV, pydub's mono mix-down, pydub chunk
+slicing and volume boost), and checks stereo and truncated WAV uploads.
+"""
+
+import sys
+import os
+import io
+import math
+import tempfile
+import wave
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from processing.audio_decode import DecodedAudio, decode_audio, find_ffmpeg, SAMPLE_RATE
+
+
+def make_samples(count, channels=1, seed=0):
+    """Deterministic int16 noise with some full-scale peaks"""
+    rng = np.random.default_rng(seed)
+    samples = rng.integers(-32768, 32768, size=count * channels)
+    return samples.astype('<i2')
+
+
+def make_wav(samples, channels=1, sample_rate=SAMPLE_RATE, sample_width=2):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(sample_width)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+def old_frame_data(path):
+    """The bytes sr.AudioFile(...).record() gave the recognizer for a mono PCM WAV"""
+    with wave.open(path, 'rb') as wav_file:
+        return wav_file.readframes(wav_file.getnframes())
+
+
+def old_mono_mix(samples, channels):
+    """pydub set_channels(1): audioop.tomono with 0.5 factors, floored"""
+    frames = samples.reshape(-1, channels).astype(np.float64)
+    return np.floor(frames.sum(axis=1) / channels).astype('<i2')
+
+
+def old_gain(samples, gain_db):
+    """pydub's `audio + gain_db`: audioop.mul by the dB ratio, clipped and floored"""
+    scaled = samples.astype(np.float64) * (10 ** (gain_db / 20))
+    return np.floor(np.clip(scaled, -32768, 32767)).astype('<i2')
+
+
+def test_matches_old_wav_pipeline():
+    print("🎧 Testing in-memory decode against the temp-file pipeline\n")
+    print("=" * 50)
+
+    samples = make_samples(SAMPLE_RATE * 3)
+    data = make_wav(samples)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'upload.wav')
+        with open(path, 'wb') as f:
+            f.write(data)
+        before = set(os.listdir(tmp))
+
+        from_path = decode_audio(path)
+        from_bytes = decode_audio(data)
+        print(f"Decoded {from_path.duration:.1f}s at {from_path.sample_rate}Hz")
+        assert from_path.sample_rate == from_bytes.sample_rate == SAMPLE_RATE
+        assert from_path.pcm.tobytes() == from_bytes.pcm.tobytes() == old_frame_data(path)
+        assert set(os.listdir(tmp)) == before, "decoding wrote files next to the upload"
+
+    # A DecodedAudio passes straight through
+    assert decode_audio(from_bytes) is from_bytes
+
+    # Slices are views of the same buffer, cut where pydub's millisecond slicing cut
+    audio = from_bytes
+    for start_ms, end_ms in [(0, 1000), (250, 1250), (2000, 5000)]:
+        piece = audio.slice(start_ms / 1000, end_ms / 1000)
+        old = samples[start_ms * SAMPLE_RATE // 1000:end_ms * SAMPLE_RATE // 1000]
+        assert np.array_equal(piece.samples, old), (start_ms, end_ms)
+        assert piece.pcm.obj is audio.pcm.obj, "slice copied the buffer"
+
+    # float_samples is what librosa.load returned for 16-bit PCM
+    assert np.allclose(audio.float_samples(), samples / 32768.0)
+
+
+def test_quiet_boost_matches_pydub():
+    print("\n🔊 Testing the quiet-audio boost against pydub's\n")
+    print("=" * 50)
+
+    quiet = (make_samples(SAMPLE_RATE) // 64).astype('<i2')
+    audio = DecodedAudio(quiet.tobytes())
+    peak = audio.peak_dbfs()
+    # pydub's max_dBFS: 20*log10(max(|sample|) / 32768)
+    assert math.isclose(peak, 20 * math.log10(np.abs(quiet.astype(np.int32)).max() / 32768.0))
+
+    boost = min(10, abs(peak + 20))
+    boosted = audio.apply_gain(boost).samples
+    print(f"Peak {peak:.1f} dBFS, boosted by {boost:.1f}dB")
+    # Rounding differs by at most one step (truncation vs floor)
+    assert np.abs(boosted.astype(np.int32) - old_gain(quiet, boost)).max() <= 1
+
+    # A full-scale boost clips instead of wrapping around
+    loud = DecodedAudio(make_samples(1000).tobytes()).apply_gain(10).samples
+    assert loud.max() == 32767 and loud.min() == -32768
+    assert DecodedAudio(b'').peak_dbfs() == -math.inf
+
+
+def test_stereo_wav():
+    print("\n🎚️ Testing stereo WAV mix-down\n")
+    print("=" * 50)
+
+    for channels in (2, 6):
+        samples = make_samples(SAMPLE_RATE, channels=channels, seed=channels)
+        audio = decode_audio(make_wav(samples, channels=channels))
+        print(f"{channels} channels -> {len(audio)} mono samples")
+        assert audio is not None and len(audio) == SAMPLE_RATE
+        assert np.array_equal(audio.samples, old_mono_mix(samples, channels))
+
+    # Channels that cancel out mix to silence; equal channels mix to themselves
+    left = make_samples(1000, seed=1).astype(np.int32)
+    cancel = np.stack([left, -left], axis=1).clip(-32768, 32767).astype('<i2')
+    assert np.abs(decode_audio(make_wav(cancel, channels=2)).samples).max() <= 1
+    same = np.stack([left, left], axis=1).astype('<i2')
+    assert np.array_equal(decode_audio(make_wav(same, channels=2)).samples, left.astype('<i2'))
+
+
+def test_truncated_wav():
+    print("\n✂️ Testing truncated WAV uploads\n")
+    print("=" * 50)
+
+    for channels in (1, 2):
+        samples = make_samples(4000, channels=channels, seed=3)
+        data = make_wav(samples, channels=channels)
+        frame_size = 2 * channels
+        # The header still claims 4000 frames; cut the data mid-sample and mid-frame
+        for cut in (1, frame_size + 1, 2000 * frame_size + 3):
+            audio = decode_audio(data[:-cut])
+            whole_frames = (len(data) - cut - 44) // frame_size
+            print(f"{channels} ch, {cut} bytes missing -> {len(audio)} samples")
+            assert len(audio) == whole_frames
+            expected = old_mono_mix(samples, channels) if channels > 1 else samples
+            assert np.array_equal(audio.samples, expected[:whole_frames])
+
+    # A header cut short is not a readable WAV; without ffmpeg there is nothing else to try
+    header_only = make_wav(make_samples(100))[:20]
+    if find_ffmpeg() is None:
+        assert decode_audio(header_only) is None
+
+    # An odd-length raw buffer drops the partial sample instead of failing later
+    odd = DecodedAudio(make_samples(10).tobytes() + b'\x01')
+    assert len(odd) == 10 and len(odd.samples) == 10
+
+
+def test_non_pcm_wav_needs_ffmpeg():
+    print("\n🧩 Testing WAV files the wave reader leaves to ffmpeg\n")
+    print("=" * 50)
+
+    eight_bit = make_wav(np.full(1000, 128, dtype=np.uint8), sample_width=1)
+    audio = decode_audio(eight_bit)
+    if find_ffmpeg() is None:
+        assert audio is None
+    else:
+        assert audio is not None and audio.sample_rate == SAMPLE_RATE
+
+
+if __name__ == "__main__":
+    test_matches_old_wav_pipeline()
+    test_quiet_boost_matches_pydub()
+    test_stereo_wav()
+    test_truncated_wav()
+    test_non_pcm_wav_needs_ffmpeg()
+    print("\n✅ Audio decode tests passed")
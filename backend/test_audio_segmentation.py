@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+
+"""
+Test script for silence-based segmentation and transcript stitching
+Builds synthetic recordings from tone bursts (speech) and low noise (pauses)
+and checks the segments found, the forced splits of long runs, that every
+split terminates down to the smallest allowed segment length, and how
+overlapping transcripts are stitched back together.
+"""
+
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+import processing.audio_segmentation as audio_segmentation
+from processing.audio_decode import DecodedAudio
+from processing.audio_segmentation import (
+    Segment, MIN_SEGMENT_SECONDS, PADDING_SECONDS, FORCED_SPLIT_OVERLAP_SECONDS,
+    detect_speech_segments, transcribe_segments, stitch_transcripts
+)
+
+RATE = 16000
+# Segment edges land on 30 ms frames, plus padding
+TOLERANCE = PADDING_SECONDS + 0.06
+
+
+def tone(seconds, frequency=440, level=0.5):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return level * 32767 * np.sin(2 * np.pi * frequency * t)
+
+
+def pause(seconds, seed=0):
+    # Background noise around -60 dBFS, so the recording has a real noise floor
+    return np.random.default_rng(seed).normal(0, 30, int(seconds * RATE))
+
+
+def recording(*parts):
+    """DecodedAudio from ('tone' | 'pause', seconds) parts"""
+    samples = [tone(seconds) if kind == 'tone' else pause(seconds, seed=index)
+               for index, (kind, seconds) in enumerate(parts)]
+    return DecodedAudio(np.concatenate(samples).astype('<i2').tobytes(), RATE)
+
+
+def tone_spans(*parts):
+    spans, position = [], 0.0
+    for kind, seconds in parts:
+        if kind == 'tone':
+            spans.append((position, position + seconds))
+        position += seconds
+    return spans
+
+
+def within_time_limit(func, seconds=5):
+    """Run func, failing instead of hanging if it never returns"""
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(func).result(timeout=seconds)
+
+
+def test_segments_follow_pauses():
+    print("🔇 Testing segmentation at pauses\n")
+    print("=" * 50)
+
+    parts = [('pause', 1), ('tone', 2), ('pause', 1), ('tone', 3), ('pause', 1.5), ('tone', 1), ('pause', 1)]
+    audio = recording(*parts)
+    spans = tone_spans(*parts)
+
+    # One segment per utterance
+    segments = detect_speech_segments(audio, merge=False)
+    print(f"Utterances: {[(round(s.start, 2), round(s.end, 2)) for s in segments]}")
+    assert len(segments) == len(spans)
+    for segment, (start, end) in zip(segments, spans):
+        assert abs(segment.start - start) <= TOLERANCE and abs(segment.end - end) <= TOLERANCE
+    assert all(a.end <= b.start for a, b in zip(segments, segments[1:])), "segments overlap"
+
+    # Packed: neighbours merge while the result fits in max_segment
+    assert detect_speech_segments(audio, max_segment=20) == [Segment(segments[0].start, segments[-1].end)]
+    packed = detect_speech_segments(audio, max_segment=7)
+    print(f"Packed into 7 s: {[(round(s.start, 2), round(s.end, 2)) for s in packed]}")
+    assert packed == [Segment(segments[0].start, segments[1].end), segments[2]]
+
+    # Pauses shorter than MIN_SILENCE_SECONDS do not split an utterance
+    short_gap = recording(('pause', 1), ('tone', 1), ('pause', 0.1), ('tone', 1), ('pause', 1))
+    assert len(detect_speech_segments(short_gap, merge=False)) == 1
+
+
+def test_silence_and_flat_audio():
+    print("\n📏 Testing silent and flat recordings\n")
+    print("=" * 50)
+
+    assert detect_speech_segments(DecodedAudio(b'', RATE)) == []
+
+    # Nothing above a floor measured elsewhere means no speech at all
+    quiet = recording(('pause', 5))
+    assert detect_speech_segments(quiet, noise_floor=-40.0) == []
+
+    # A flat level has no cut points: fixed windows with the forced-split overlap
+    flat = recording(('tone', 25))
+    windows = detect_speech_segments(flat, max_segment=10)
+    print(f"Flat 25 s in 10 s windows: {windows}")
+    assert windows[0].start == 0 and abs(windows[-1].end - 25) < 1e-9
+    assert all(w.end - w.start <= 10 for w in windows)
+    assert all(abs((a.end - b.start) - FORCED_SPLIT_OVERLAP_SECONDS) < 1e-9 for a, b in zip(windows, windows[1:]))
+
+
+def test_long_speech_is_split():
+    print("\n✂️ Testing forced splits of long speech\n")
+    print("=" * 50)
+
+    audio = recording(('pause', 2), ('tone', 30), ('pause', 2))
+    for max_segment in (10, 3, MIN_SEGMENT_SECONDS):
+        pieces = within_time_limit(lambda: detect_speech_segments(audio, max_segment=max_segment))
+        print(f"max_segment={max_segment}: {len(pieces)} pieces")
+        assert all(p.end - p.start <= max_segment + 1e-9 for p in pieces), pieces
+        # Pieces cover the speech without gaps, overlapping by at most the forced-split overlap
+        for a, b in zip(pieces, pieces[1:]):
+            assert b.start <= a.end and a.end - b.start <= FORCED_SPLIT_OVERLAP_SECONDS + 1e-9
+        assert pieces[0].start <= 2 and pieces[-1].end >= 32 - TOLERANCE
+
+    # Segments no longer than the overlap could never make progress
+    for bad in (1.0, 0.5, 0, float('nan')):
+        try:
+            detect_speech_segments(audio, max_segment=bad)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"max_segment={bad} was accepted")
+
+
+def test_max_segment_env_is_clamped():
+    print("\n🧱 Testing MAX_SEGMENT_SECONDS from the environment\n")
+    print("=" * 50)
+
+    original = os.environ.get('MAX_SEGMENT_SECONDS')
+    try:
+        for value, expected in [('30', 30.0), ('1', MIN_SEGMENT_SECONDS), ('0.2', MIN_SEGMENT_SECONDS), ('nan', MIN_SEGMENT_SECONDS)]:
+            os.environ['MAX_SEGMENT_SECONDS'] = value
+            assert audio_segmentation._max_segment_from_env() == expected, value
+    finally:
+        if original is None:
+            os.environ.pop('MAX_SEGMENT_SECONDS', None)
+        else:
+            os.environ['MAX_SEGMENT_SECONDS'] = original
+    assert audio_segmentation.MAX_SEGMENT_SECONDS >= MIN_SEGMENT_SECONDS
+
+
+def test_transcribe_segments_in_parallel():
+    print("\n⚡ Testing concurrent segment transcription\n")
+    print("=" * 50)
+
+    audio = recording(('tone', 8))
+    segments = [Segment(0, 2), Segment(2, 4), Segment(4, 6), Segment(6, 8)]
+
+    def slow_transcribe(chunk):
+        time.sleep(0.3)
+        if chunk.samples is None or abs(chunk.duration - 2) > 1e-9:
+            raise AssertionError("segment sliced wrongly")
+        return f"words {int(chunk.duration)}"
+
+    started = time.time()
+    pieces = transcribe_segments(audio, segments, slow_transcribe)
+    elapsed = time.time() - started
+    print(f"4 segments of 0.3 s work in {elapsed:.2f}s")
+    assert [segment for segment, _ in pieces] == segments
+    assert all(text == "words 2" for _, text in pieces)
+    assert elapsed < 0.9, "segments were transcribed one after another"
+
+    # A failing segment gives None without losing the others
+    def flaky(chunk):
+        if chunk.duration > 2:
+            raise RuntimeError("recognizer error")
+        return "ok"
+    texts = [text for _, text in transcribe_segments(audio, [Segment(0, 2), Segment(2, 5), Segment(5, 7)], flaky)]
+    assert texts == ["ok", None, "ok"]
+
+
+def test_stitch_transcripts():
+    print("\n🧵 Testing transcript stitching\n")
+    print("=" * 50)
+
+    # A forced split repeats the words spoken inside the overlap
+    overlapping = [
+        (Segment(0.0, 10.5), "we were talking about the very very"),
+        (Segment(9.5, 20.0), "the very very important results today"),
+    ]
+    stitched = stitch_transcripts(overlapping)
+    print(f"Overlap: {stitched!r}")
+    assert stitched == "we were talking about the very very important results today"
+
+    # Case and punctuation differences still align
+    assert stitch_transcripts([
+        (Segment(0, 5.5), "See you at the Station."),
+        (Segment(4.5, 9), "station, then home"),
+    ]) == "See you at the Station. then home"
+
+    # Segments that do not overlap keep repeated words ("very very" is speech, not an artifact)
+    assert stitch_transcripts([
+        (Segment(0, 3), "it was very"),
+        (Segment(3.5, 6), "very good"),
+    ]) == "it was very very good"
+
+    # Only words that fit in the overlap are dropped
+    assert stitch_transcripts([
+        (Segment(0, 5.1), "one two three four five six"),
+        (Segment(5.0, 9), "one two three four five six seven"),
+    ]) == "one two three four five six one two three four five six seven"
+
+    # Failed and empty segments are skipped; an overlap is measured from the last kept segment
+    assert stitch_transcripts([
+        (Segment(0, 3), "hello there"),
+        (Segment(2.5, 6), None),
+        (Segment(5.5, 9), "   "),
+        (Segment(8.5, 12), "there friend"),
+    ]) == "hello there there friend"
+    assert stitch_transcripts([]) == ''
+
+
+if __name__ == "__main__":
+    test_segments_follow_pauses()
+    test_silence_and_flat_audio()
+    test_long_speech_is_split()
+    test_max_segment_env_is_clamped()
+    test_transcribe_segments_in_parallel()
+    test_stitch_transcripts()
+    print("\n✅ Audio segmentation tests passed")
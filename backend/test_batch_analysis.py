@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+"""
+Test script for /analyze/batch
+Checks per-item results for a batch mixing valid, invalid and repeated
+transcripts, and the ANALYZE_BATCH_MAX_SIZE limit.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+
+
+def make_client():
+    from routes.analysis import analysis_routes
+    app = Flask(__name__)
+    app.register_blueprint(analysis_routes)
+    return app.test_client()
+
+
+def test_mixed_batch():
+    print("📦 Testing a batch of mixed items\n")
+    print("=" * 50)
+
+    from processing.batch_analysis import analyze_batch
+    from processing.formality_analysis import analyze_formality
+
+    transcripts = ["no cap this slaps 🔥", 42, "", None, "Dear Sir, thank you.", "no cap this slaps 🔥"]
+    results = analyze_batch(transcripts)
+
+    for result in results:
+        print(f"{result['index']}: {result['status']} {result.get('error') or result.get('tone')}")
+
+    assert [result['index'] for result in results] == list(range(len(transcripts)))
+    assert [result['status'] for result in results] == ['ok', 'error', 'ok', 'error', 'ok', 'ok']
+    assert results[1]['error'] == 'Transcript must be a string'
+    assert 'no cap' in results[0]['slang']
+    assert results[2]['transcript_length'] == 0
+    # Repeated transcripts get the same scores as the first occurrence
+    assert {k: v for k, v in results[5].items() if k != 'index'} == {k: v for k, v in results[0].items() if k != 'index'}
+    # Batch scores match the single-item engines
+    assert results[4]['formality']['formality_level'] == analyze_formality("Dear Sir, thank you.")['formality_level']
+
+
+def test_batch_endpoint_limits():
+    print("\n🚧 Testing batch request validation\n")
+    print("=" * 50)
+
+    import routes.analysis
+    client = make_client()
+
+    response = client.post('/analyze/batch', json={'transcripts': ['ok', 7]})
+    data = response.get_json()
+    print(f"Mixed batch: {response.status_code}, failed={data['failed']}")
+    assert response.status_code == 200 and data['count'] == 2 and data['failed'] == 1
+
+    response = client.post('/analyze/batch', json={'transcripts': 'not a list'})
+    assert response.status_code == 400
+
+    original = routes.analysis.MAX_BATCH_SIZE
+    routes.analysis.MAX_BATCH_SIZE = 3
+    try:
+        response = client.post('/analyze/batch', json={'transcripts': ['a', 'b', 'c', 'd']})
+        print(f"Oversized batch: {response.status_code} {response.get_json()['error']}")
+        assert response.status_code == 400
+        assert client.post('/analyze/batch', json={'transcripts': ['a', 'b', 'c']}).status_code == 200
+    finally:
+        routes.analysis.MAX_BATCH_SIZE = original
+
+
+if __name__ == "__main__":
+    test_mixed_batch()
+    test_batch_endpoint_limits()
+    print("\n✅ Batch analysis tests passed")
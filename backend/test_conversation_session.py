@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+"""
+Test script for incremental conversation-flow sessions
+Recomputes the previous whole-history trends and summary after every
+appended message and checks the running counters of ConversationSession
+agree, checks the online confidence mean/variance against numpy, and
+covers expiry and LRU eviction in ConversationSessionStore.
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from processing.multimodal_emoticon_analysis import MultimodalEmotionAnalyzer, ConversationSessionStore
+
+analyzer = MultimodalEmotionAnalyzer()
+
+CONVERSATION = [
+    "Having a rough morning 😞",
+    "But things are looking up! ☺️",
+    "no emoticons here",
+    "Just got some great news! 😊🎉",
+    "So excited I can barely contain myself! 😍🤩",
+    "wait what 😱",
+    "ugh never mind 😠😤",
+    "ok fine :)",
+    "😂😂😂",
+    "love you all ❤️",
+]
+
+
+def old_trends(timeline):
+    """The previous _analyze_emotional_trends over the whole timeline"""
+    if len(timeline) < 2:
+        return {'trend': 'insufficient_data', 'changes': 0}
+    emotions = [entry['emotion'] for entry in timeline]
+    confidences = [entry['confidence'] for entry in timeline]
+    changes = sum(1 for i in range(1, len(emotions)) if emotions[i] != emotions[i - 1])
+    if changes == 0:
+        trend = 'stable'
+    elif changes < len(emotions) * 0.3:
+        trend = 'mostly_stable'
+    elif changes < len(emotions) * 0.7:
+        trend = 'variable'
+    else:
+        trend = 'highly_variable'
+    half = len(confidences) // 2
+    avg_early = sum(confidences[:half]) / half
+    avg_late = sum(confidences[half:]) / (len(confidences) - half)
+    confidence_trend = 'increasing' if avg_late > avg_early else 'decreasing' if avg_late < avg_early else 'stable'
+    return {
+        'trend': trend,
+        'changes': changes,
+        'stability_score': 1 - (changes / max(len(emotions) - 1, 1)),
+        'confidence_trend': confidence_trend
+    }
+
+
+def old_summary(analyses, trends):
+    """The previous _summarize_conversation over every message analysis"""
+    total_messages = len(analyses)
+    moods = [a['analysis']['summary']['overall_mood'] for a in analyses]
+    positive_count = sum(1 for mood in moods if mood in ['Positive', 'Very Positive'])
+    negative_count = sum(1 for mood in moods if mood in ['Negative', 'Very Negative'])
+    summary = {
+        'total_messages': str(total_messages),
+        'emotional_stability': trends['trend'],
+        'overall_tone': 'Positive' if positive_count > negative_count else 'Negative' if negative_count > positive_count else 'Mixed'
+    }
+    if trends['changes'] > total_messages * 0.5:
+        summary['conversation_flow'] = "Highly dynamic conversation with frequent emotional shifts"
+    elif trends['changes'] > total_messages * 0.2:
+        summary['conversation_flow'] = "Moderately dynamic with some emotional variation"
+    else:
+        summary['conversation_flow'] = "Stable emotional tone throughout conversation"
+    return summary
+
+
+def test_session_matches_whole_history():
+    print("💬 Testing running counters against whole-history recomputation\n")
+    print("=" * 50)
+
+    session = analyzer.start_conversation()
+    analyses = []
+    for message in CONVERSATION:
+        analyses.append(session.append(message)['message'])
+        trends = session.trends()
+        expected = old_trends(session.timeline)
+        print(f"{len(analyses):>2} messages: {trends['trend']:<16} changes={trends['changes']} {trends.get('confidence_trend', '')}")
+        assert {key: trends[key] for key in expected} == expected, (trends, expected)
+        assert session.summary() == old_summary(analyses, trends)
+
+    confidences = [entry['confidence'] for entry in session.timeline]
+    assert np.isclose(trends['confidence_mean'], np.mean(confidences))
+    assert np.isclose(trends['confidence_variance'], np.var(confidences))
+
+    # The batch API is a loop over a session
+    flow = analyzer.analyze_conversation_flow(CONVERSATION)
+    assert flow['emotion_timeline'] == session.timeline
+    assert flow['trends'] == trends
+    assert flow['conversation_summary'] == session.summary()
+
+
+def test_recent_window():
+    print("\n🪟 Testing the recent-trend window\n")
+    print("=" * 50)
+
+    session = analyzer.start_conversation()
+    session.window = 3
+    for message in CONVERSATION:
+        session.append(message)
+    recent = session.recent_timeline()
+    print(f"Recent timeline: {[entry['emotion'] for entry in recent]}")
+    assert recent == session.timeline[-3:]
+
+
+def test_session_store_expiry_and_eviction():
+    print("\n🗃️ Testing session expiry and LRU eviction\n")
+    print("=" * 50)
+
+    store = ConversationSessionStore(analyzer, max_sessions=2, ttl=0.2)
+    first, second = store.create(), store.create()
+    store.get(first)                 # second is now least recently used
+    third = store.create()
+    assert store.get(second) is None, "least recently used session was not evicted"
+    assert store.get(first) is not None and store.get(third) is not None
+
+    time.sleep(0.3)
+    assert store.get(first) is None and store.get(third) is None, "idle sessions did not expire"
+    assert store.delete(first) is False
+
+
+if __name__ == "__main__":
+    test_session_matches_whole_history()
+    test_recent_window()
+    test_session_store_expiry_and_eviction()
+    print("\n✅ Conversation session tests passed")
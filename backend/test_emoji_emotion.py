@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+"""
+Test script for emoji tone in the emotion analyzer
+The emoji lexicon's categories are reported in emoji_analysis but must not
+change the text or primary emotion: the expected values below are what the
+analyzer returned before emojis were resolved through the shared lexicon.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from processing.robust_emotion_analysis import analyze_emotion_robust
+from processing.emoji_lexicon import emoji_lexicon, map_meaning_to_emotion
+
+# text -> (primary emotion, confidence) from the analyzer without emoji tone
+BASELINE = {
+    "Oh great… SO excited lol 😂": ('excited', 0.95),
+    "Yeah right…🙄": ('neutral', 0.4),
+    "I love this 😍❤️": ('happy', 0.87),
+    "party time 🎉🥳 let's go": ('joy', 0.65),
+    "ugh gross 🤮": ('sadness', 0.65),
+    "wow 😱 really?": ('surprise', 0.53),
+}
+
+
+def test_emoji_tone_does_not_change_primary_emotion():
+    print("😂 Testing that emoji tone is reported, not voted\n")
+    print("=" * 50)
+
+    for text, (emotion, confidence) in BASELINE.items():
+        result = analyze_emotion_robust(text=text)
+        primary = result['multimodal_analysis']
+        print(f"{text!r:<32} {primary['primary_emotion']:<9} emoji tone: {result['emoji_analysis']['tone']}")
+        assert primary['primary_emotion'] == emotion, (text, primary)
+        assert round(primary['confidence'], 2) == confidence, (text, primary)
+        assert result['text_analysis']['emotion'] == emotion
+        assert primary['emoji_influence'] is False
+
+    # Emojis are still detected and described
+    tone = analyze_emotion_robust(text="Oh great… SO excited lol 😂")['emoji_analysis']
+    assert tone['tone'] == 'laughing' and '😂' in tone['details']
+
+
+def test_dataset_emotion_labels():
+    print("\n🏷️ Testing dataset emoji emotion labels\n")
+    print("=" * 50)
+
+    assert map_meaning_to_emotion("Tears of joy, laughing hard") == 'joy'
+    assert map_meaning_to_emotion("Crying, feeling down") == 'sadness'
+    assert map_meaning_to_emotion("Mad, annoyed") == 'anger'
+    assert map_meaning_to_emotion("Just okay") == 'neutral'
+    # Curated emojis keep their curated category
+    assert emoji_lexicon.lookup('🙄').emotion == 'disgust'
+
+
+if __name__ == "__main__":
+    test_emoji_tone_does_not_change_primary_emotion()
+    test_dataset_emotion_labels()
+    print("\n✅ Emoji emotion tests passed")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+"""
+Test script for the emoticon tokenizer
+Compares the one-pass emoticon/emoji-sequence tokenizer with the previous
+count-every-map-entry extraction on fixed texts, and pins the cases it was
+meant to change: nested emoticons counted twice, emoji written without
+their variation selector, and the order emoticons are listed in.
+"""
+
+import sys
+import os
+from collections import Counter
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from processing.emoticon_analysis import EmoticonEmotionAnalyzer
+
+analyzer = EmoticonEmotionAnalyzer()
+
+# Texts on which the old and new extraction must find the same emoticons
+AGREEING_TEXTS = [
+    "I'm feeling great today! 😊",
+    "So excited! 😀😃😄🎉",
+    "Feeling down today 😢😞 :(",
+    "Old school style :) :D XD",
+    "This is so annoying! 😠😤😠",
+    ":-) hi </3",
+    "nice 👍🏽 dunno 🤷‍♀️",
+    "No emoticons in this sentence at all.",
+    "",
+]
+
+
+def old_extract(text):
+    """The previous extraction: every map entry longest first, counted with str.count"""
+    found = []
+    for emoticon in sorted(analyzer.emoticon_map, key=len, reverse=True):
+        if emoticon in text:
+            found.extend([emoticon] * text.count(emoticon))
+    return found
+
+
+def test_matches_old_extraction():
+    print("🙂 Testing the tokenizer against the old extraction\n")
+    print("=" * 50)
+
+    for text in AGREEING_TEXTS:
+        found = analyzer._extract_emoticons(text)
+        print(f"{text!r:<36} -> {found}")
+        assert Counter(found) == Counter(old_extract(text)), (text, old_extract(text), found)
+        if found:
+            # Same scores; only the summation order differs
+            new_scores = analyzer.analyze_text(text)['emotion_scores']
+            old_scores = analyzer._calculate_emotion_scores(old_extract(text))
+            assert new_scores.keys() == old_scores.keys()
+            assert all(abs(new_scores[e] - old_scores[e]) < 1e-9 for e in old_scores), (new_scores, old_scores)
+
+
+def test_intended_differences():
+    print("\n🔀 Testing the deliberate changes from the old extraction\n")
+    print("=" * 50)
+
+    cases = [
+        # A nested text emoticon is one token, not the long one plus the short one
+        (">:( no", ['>:(']),
+        # A heart without the variation selector still counts
+        ("love ❤ you", ['❤️']),
+        # Text order
+        ("😢 then 😊", ['😢', '😊']),
+    ]
+    for text, expected in cases:
+        found = analyzer._extract_emoticons(text)
+        print(f"{text!r:<20} old {old_extract(text)}  new {found}")
+        assert found == expected, (text, expected, found)
+
+
+if __name__ == "__main__":
+    test_matches_old_extraction()
+    test_intended_differences()
+    print("\n✅ Emoticon tokenizer tests passed")
@@ -3,13 +3,94 @@
 Test script to verify emotion detection improvements
 """
 
+import re
 import sys
 import os
 sys.path.append(os.path.dirname(__file__))
 
-from processing.robust_emotion_analysis import analyze_emotion_robust
+from processing.robust_emotion_analysis import analyze_emotion_robust, robust_analyzer
 from routes.analysis import enhance_emotion_analysis
 
+
+def old_pattern_scores(text_lower, emotion_patterns):
+    """
+    The per-emotion/per-category loops _score_emotion_patterns replaced
+    (without the exclamation, caps and emoji bonuses, which are added later).
+    Returns per-emotion scores and hit counts per category.
+    """
+    scores, hits = {}, {}
+    for emotion, patterns in emotion_patterns.items():
+        score = 0
+        counts = {'keywords': 0, 'phrases': 0, 'personal': 0, 'intensity': 0}
+        for keyword in patterns['keywords']:
+            if keyword in text_lower:
+                counts['keywords'] += 1
+                if re.search(r'\b' + re.escape(keyword) + r'\b', text_lower):
+                    score += 5
+                else:
+                    score += 2
+        for phrase in patterns['phrases']:
+            if phrase in text_lower:
+                counts['phrases'] += 1
+                score += 12
+        keywords = patterns['keywords']
+        personal_indicators = (
+            [f"i'm {k}" for k in keywords[:8]] + [f"i am {k}" for k in keywords[:8]] +
+            [f"feeling {k}" for k in keywords[:8]] + [f"i feel {k}" for k in keywords[:8]] +
+            [f"i'm so {k}" for k in keywords[:5]] + [f"really {k}" for k in keywords[:5]] +
+            [f"very {k}" for k in keywords[:5]]
+        )
+        for personal in personal_indicators:
+            if personal in text_lower:
+                counts['personal'] += 1
+                score += 15
+        for keyword in keywords:
+            if keyword in text_lower:
+                for intensity in patterns['intensity_words']:
+                    for pattern in [f"{intensity} {keyword}", f"i'm {intensity} {keyword}", f"feel {intensity} {keyword}",
+                                    f"{keyword} {intensity}", f"so {intensity} {keyword}", f"really {intensity} {keyword}"]:
+                        if pattern in text_lower:
+                            counts['intensity'] += 1
+                            score += 8
+        scores[emotion] = score
+        hits[emotion] = counts
+    return scores, hits
+
+
+def test_pattern_table_matches_old_loops():
+    """The single-scan pattern table scores exactly like the old nested loops"""
+    print("🧮 Testing pattern scores against the old per-category loops\n")
+    print("=" * 50)
+
+    texts = [
+        # "i'm so happy" is a phrase, a personal statement and (via "so happy") an intensity pattern
+        "i'm so happy!",
+        "so happy and so happy again",
+        "i am really excited, can't wait",
+        "really really angry, i'm so frustrated and fed up",
+        "feeling down, i feel sad and lonely",
+        "unhappy, disappointed, let down... such a disappointment",
+        "wow that's amazing, so surprised",
+        "i'm curious, very interesting, makes me wonder",
+        "that's disgusting, so gross, ew",
+        "it is fine according to the standard",
+        "madness in the sadness of content",   # keywords inside other words
+        "i'm scared and nervous, totally terrified",
+        "",
+    ]
+    analyzer = robust_analyzer
+    duplicated = [pattern for pattern, entries in analyzer._emotion_pattern_table.items()
+                  if len({category for _, category, _ in entries}) > 1]
+    assert "i'm so happy" in duplicated, "expected a pattern listed under two categories"
+
+    for text in texts:
+        scores, hits = analyzer._score_emotion_patterns(text)
+        expected_scores, expected_hits = old_pattern_scores(text, analyzer.emotion_patterns)
+        top = max(scores, key=scores.get) if any(scores.values()) else 'none'
+        print(f"{text!r:<58} top={top} ({scores.get(top, 0)})")
+        assert scores == expected_scores, (text, scores, expected_scores)
+        assert hits == expected_hits, (text, hits, expected_hits)
+
 def test_emotion_detection():
     """Test emotion detection with various phrases"""
     
@@ -99,5 +180,6 @@ def test_specific_case():
     print(f"✓ Correct!" if actual_enhanced == 'happy' else "✗ Incorrect")
 
 if __name__ == "__main__":
+    test_pattern_table_matches_old_loops()
     test_specific_case()
     test_emotion_detection()
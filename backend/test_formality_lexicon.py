@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+"""
+Test script for the compiled formality lexicon
+Checks that the single-scan FormalityLexicon finds exactly the indicators
+(and weights) the previous per-category re.search loops found, on fixed
+texts chosen around word boundaries, duplicate entries and substrings.
+"""
+
+import sys
+import os
+import re
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from processing.formality_analysis import formality_analyzer, analyze_formality
+
+TEXTS = [
+    "Dear Sir, I am writing to request the attached report. Furthermore, please be advised of the deadline.",
+    "i trust this finds you well. thank you for your time and consideration.",
+    "lol ngl that was lowkey fire, u gotta see it bruh!!!",
+    "Let's circle back on the deliverables and leverage our synergy going forward.",
+    "I'm gonna be like, totally late, you know?",
+    "We can't and won't; it's not ok. Um, well, basically yeah.",
+    "Subsequently the committee's analysis, notwithstanding objections, was approved.",
+    "hellooo sooo tired rn... wanna grab food? idk tbh",
+    "The leverageable KPIs were re-aligned (per stakeholder input).",
+    "",
+    "SO excited!!! this is AMAZING 😂🔥",
+    "nevertheless",
+]
+
+
+def old_lexicon_matches(analyzer, text_lower):
+    """The per-category loops the lexicon replaced, as (style, weight, indicator)"""
+    def word(term):
+        return re.search(r'\b' + re.escape(term) + r'\b', text_lower)
+
+    def phrase(term):
+        return term in text_lower
+
+    formal, informal, casual, professional = (
+        analyzer.formal_patterns, analyzer.informal_patterns,
+        analyzer.casual_patterns, analyzer.professional_patterns
+    )
+    checks = [
+        ('formal', formal['academic_words'], word, 4, "Academic word: '{term}'"),
+        ('formal', formal['formal_phrases'], phrase, 6, "Formal phrase: '{term}'"),
+        ('formal', formal['formal_structures'], lambda p: re.search(p, text_lower, re.IGNORECASE), 5, "Formal structure detected"),
+        ('informal', informal['contractions'], word, 3, "Contraction: '{term}'"),
+        ('informal', informal['informal_phrases'], phrase, 4, "Informal phrase: '{term}'"),
+        ('informal', informal['filler_words'], word, 2, "Filler word: '{term}'"),
+        ('casual', casual['slang_words'], word, 5, "Slang: '{term}'"),
+        ('casual', casual['internet_slang'], word, 6, "Internet slang: '{term}'"),
+        ('casual', casual['intensifiers'], phrase, 4, "Casual intensifier: '{term}'"),
+        ('professional', professional['business_terms'], word, 5, "Business term: '{term}'"),
+        ('professional', professional['corporate_phrases'], phrase, 6, "Corporate phrase: '{term}'"),
+    ]
+    hits = []
+    for style, terms, found, weight, label in checks:
+        for term in terms:
+            if found(term):
+                hits.append((style, weight, label.format(term=term)))
+    return hits
+
+
+def by_style(hits):
+    grouped = {}
+    for style, weight, indicator in hits:
+        grouped.setdefault(style, []).append((weight, indicator))
+    return grouped
+
+
+def test_lexicon_matches_old_loops():
+    print("📚 Testing the formality lexicon against the old loops\n")
+    print("=" * 50)
+
+    for text in TEXTS:
+        text_lower = text.lower()
+        expected = by_style(old_lexicon_matches(formality_analyzer, text_lower))
+        found = by_style(formality_analyzer.lexicon.match(text_lower))
+        print(f"{text[:45]!r:<48} {sum(len(v) for v in found.values())} indicators")
+        # Indicator order within each style is what the response lists
+        assert found == expected, f"{text!r}:\n  old {expected}\n  new {found}"
+
+
+def test_fixed_formality_levels():
+    print("\n🎩 Testing formality levels of fixed texts\n")
+    print("=" * 50)
+
+    for text, level in [
+        (TEXTS[0], 'formal'),
+        (TEXTS[2], 'casual'),
+    ]:
+        result = analyze_formality(text)
+        print(f"{text[:45]!r:<48} {result['formality_level']}")
+        assert level in result['formality_level'].lower(), result['formality_level']
+
+
+if __name__ == "__main__":
+    test_lexicon_matches_old_loops()
+    test_fixed_formality_levels()
+    print("\n✅ Formality lexicon tests passed")
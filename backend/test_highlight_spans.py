@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+"""
+Test script for span-based highlighting
+Checks how overlapping and touching spans merge, that the rule-based sarcasm
+highlighter marks only the positions its searches matched (not every other
+occurrence of the same words), and the rendered HTML and JSON spans.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from processing.highlight_spans import find_segment_spans, merge_spans, render_spans, spans_to_json
+from processing.sarcasm_detection import sarcasm_detector, SARCASM_HIGHLIGHT_OPEN
+from processing.text_context import Span
+
+
+def marked(text, spans):
+    return [text[start:end] for start, end in spans]
+
+
+def test_merge_spans():
+    print("🧮 Testing span merging\n")
+    print("=" * 50)
+
+    # Overlapping and nested spans become one; input order does not matter
+    assert merge_spans([(6, 12), (0, 8), (2, 4)]) == [Span(0, 12)]
+    # Touching spans are joined, separated ones are kept apart
+    assert merge_spans([(0, 5), (5, 9), (10, 12)]) == [Span(0, 9), Span(10, 12)]
+    # Duplicates and empty spans
+    assert merge_spans([(3, 7), (3, 7), (8, 8), (9, 4)]) == [Span(3, 7)]
+    assert merge_spans([]) == []
+
+
+def test_render_and_json():
+    print("\n🖍️ Testing rendering and JSON spans\n")
+    print("=" * 50)
+
+    text = "Oh great, now I'm stuck"
+    spans = merge_spans([(3, 8), (3, 23), (14, 17)])
+    html = render_spans(text, spans, '<b>', '</b>')
+    print(html)
+    assert html == "Oh <b>great, now I'm stuck</b>"
+    assert render_spans(text, merge_spans([(0, 2), (3, 8)]), '[', ']') == "[Oh] [great], now I'm stuck"
+    assert render_spans(text, [], '<b>', '</b>') == text
+    assert spans_to_json(spans) == [[3, 23]]
+    assert spans_to_json([]) == []
+
+    # Segments reported without offsets (the LLM) are located word-bounded and case-insensitively
+    found = find_segment_spans("Great, great. Greatly GREAT", ["great", "great", "", None])
+    assert marked("Great, great. Greatly GREAT", found) == ["Great", "great", "GREAT"]
+
+
+def test_rule_based_marks_matched_positions():
+    print("\n🎯 Testing that only matched positions are highlighted\n")
+    print("=" * 50)
+
+    cases = [
+        # "great" matched next to "broken"; its repeats are not separate findings
+        ("great great great, the printer is broken", ["great"]),
+        # Only the first "love" was checked against "working"
+        ("I love working late, and love my cat", ["love"]),
+        # The phrase is marked where it matched, the plain "perfect" is not
+        ("This is absolutely perfect, perfect.", ["absolutely perfect", "absolutely"]),
+        # Exclamations are marked at the exclamation only
+        ("Perfect! It crashed. Perfect weather though", ["Perfect"]),
+    ]
+    for text, segments in cases:
+        result = sarcasm_detector.highlight_sarcastic_text(text, use_llm=False)
+        print(f"{text[:40]!r:<44} -> {marked(text, result['spans'])}")
+        assert result['sarcastic_segments'] == segments, result['sarcastic_segments']
+        assert len(result['spans']) == 1, result['spans']
+        assert result['highlighted_text'].count(SARCASM_HIGHLIGHT_OPEN) == 1
+
+    # Every match of a phrase is marked, and overlapping findings render once
+    text = "Just great. Oh wonderful, just great"
+    result = sarcasm_detector.highlight_sarcastic_text(text, use_llm=False)
+    assert marked(text, result['spans']) == ["Just great", "Oh wonderful", "just great"]
+    assert result['highlighted_text'] == render_spans(text, [Span(*span) for span in result['spans']], SARCASM_HIGHLIGHT_OPEN, '</span>')
+
+    # A word only found inside a longer word is listed but not marked
+    text = "What a lovely crash, my computer is broken"
+    result = sarcasm_detector.highlight_sarcastic_text(text, use_llm=False)
+    assert "love" in result['sarcastic_segments'] and result['spans'] == []
+    assert result['highlighted_text'] == text
+
+
+if __name__ == "__main__":
+    test_merge_spans()
+    test_render_and_json()
+    test_rule_based_marks_matched_positions()
+    print("\n✅ Highlight span tests passed")
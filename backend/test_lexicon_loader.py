@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+"""
+Test script for the lexicon loader
+Checks that the csv-module parser reads lexicons the way pandas did, and
+that the binary cache is reused when the source is untouched, reused after
+a touch that leaves the content unchanged (sha256), and discarded when the
+content changes or the cache directory is not private.
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+import processing.lexicon_loader as lexicon_loader
+from processing.lexicon_loader import load_table
+
+CSV = (
+    "﻿term,meaning,example\n"
+    "no cap,\"no lie, for real\",\"she said \"\"no cap\"\"\"\n"
+    "\n"
+    "bet,okay\n"
+    "rizz,charisma,w rizz,extra cell\n"
+    "   ,   ,   \n"
+    "sus,suspicious,that's sus\n"
+)
+
+
+def old_read(path):
+    """How the analyzers read lexicons before: pandas, cells as text, missing cells empty"""
+    df = pd.read_csv(path, dtype=str, keep_default_na=False, skip_blank_lines=True, on_bad_lines='skip', engine='python').fillna('')
+    return [dict(row) for _, row in df.iterrows() if any(str(cell).strip() for cell in row)]
+
+
+def write(path, text):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(text)
+
+
+class ParseCounter:
+    """Counts CSV parses behind load_table"""
+
+    def __init__(self):
+        self.calls = 0
+        self.original = lexicon_loader.parse_csv
+
+    def __call__(self, data):
+        self.calls += 1
+        return self.original(data)
+
+
+def test_matches_pandas():
+    print("📄 Testing the csv parser against pandas\n")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'slang.csv')
+        write(path, CSV)
+        table = lexicon_loader.parse_csv(open(path, 'rb').read())
+        print(f"Columns: {table.columns}")
+        for record in table.records():
+            print(f"  {record}")
+        assert table.columns == ('term', 'meaning', 'example')
+        # pandas drops the row with an extra cell; the csv parser truncates it
+        expected = [row for row in old_read(path)]
+        found = [record for record in table.records() if record['term'] != 'rizz']
+        assert found == expected, (found, expected)
+        assert table.records()[2] == {'term': 'rizz', 'meaning': 'charisma', 'example': 'w rizz'}
+
+    # The real datasets load with the same rows pandas reads
+    for name in ('slang.csv', 'genz_emojis.csv'):
+        path = lexicon_loader.dataset_path(name)
+        if not os.path.exists(path):
+            print(f"⚠️ {name} not available, skipping")
+            continue
+        expected = old_read(path)
+        table = load_table(name)
+        print(f"{name}: {len(table.rows)} rows (pandas: {len(expected)})")
+        # pandas names an unnamed index column 'Unnamed: 0'; the analyzers only read named columns
+        named = [column for column in table.columns if column]
+        assert [[record[c] for c in named] for record in table.records()] == \
+            [[row[c] for c in named] for row in expected]
+
+
+def test_cache_invalidation():
+    print("\n🗄️ Testing binary cache reuse and invalidation\n")
+    print("=" * 50)
+
+    original_dir, original_parse = lexicon_loader.LEXICON_CACHE_DIR, lexicon_loader.parse_csv
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'lexicon.csv')
+        write(source, CSV)
+        lexicon_loader.LEXICON_CACHE_DIR = os.path.join(tmp, 'cache')
+        counter = lexicon_loader.parse_csv = ParseCounter()
+
+        def load_fresh():
+            # A new worker: nothing in the per-process table memo
+            lexicon_loader._tables.clear()
+            return load_table(source)
+
+        try:
+            first = load_fresh()
+            assert counter.calls == 1 and os.path.exists(lexicon_loader._cache_path(source))
+
+            # Untouched source: served from the cache without reading the CSV
+            assert load_fresh() == first and counter.calls == 1
+            print("Untouched source: cache hit")
+
+            # Touched but identical (e.g. a fresh checkout): the sha256 matches
+            stat = os.stat(source)
+            os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+            assert load_fresh() == first and counter.calls == 1
+            print("Touched, same content: reused by sha256")
+
+            # Same size, new content and mtime: parsed again
+            write(source, CSV.replace('bet,okay', 'bet,sure'))
+            os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000_000))
+            changed = load_fresh()
+            assert counter.calls == 2
+            assert changed.records()[1]['meaning'] == 'sure'
+            print("Changed content: parsed again")
+
+            # The rewritten cache now serves the new content
+            assert load_fresh() == changed and counter.calls == 2
+
+            # A cache written by another cache layout version is ignored
+            lexicon_loader.LEXICON_CACHE_VERSION += 1
+            try:
+                load_fresh()
+                assert counter.calls == 3
+            finally:
+                lexicon_loader.LEXICON_CACHE_VERSION -= 1
+
+            # A cache directory others can write to is never trusted
+            os.chmod(lexicon_loader.LEXICON_CACHE_DIR, 0o777)
+            load_fresh()
+            load_fresh()
+            assert counter.calls == 5, "cache in a shared directory was used"
+            print("Shared cache directory: ignored")
+        finally:
+            lexicon_loader.LEXICON_CACHE_DIR = original_dir
+            lexicon_loader.parse_csv = original_parse
+            lexicon_loader._tables.clear()
+
+
+if __name__ == "__main__":
+    test_matches_pandas()
+    test_cache_invalidation()
+    print("\n✅ Lexicon loader tests passed")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+
+"""
+Test script for the LLM response cache
+Starts a local stub of the chat completions API, points the OpenAI client at
+it and checks that repeated and concurrent identical requests only reach the
+API once, that coalesced callers stop waiting after a timeout, and that the
+SQLite tier is only used from a private directory.
+"""
+
+import sys
+import os
+import json
+import time
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+STUB_CALLS = []
+
+class StubCompletionsHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        STUB_CALLS.append(body)
+        time.sleep(0.3)  # Slow enough for concurrent requests to overlap
+
+        content = json.dumps({
+            "simplified_text": "The bus is late again, which is annoying.",
+            "key_explanations": [],
+            "cultural_notes": [],
+            "word_substitutions": {},
+            "sarcastic_segments": ["great"],
+            "confidence": 0.9
+        })
+        payload = json.dumps({
+            "id": "stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        }).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+def test_llm_cache():
+    print("🧠 Testing LLM Response Cache\n")
+    print("=" * 50)
+
+    try:
+        import openai  # noqa: F401
+    except ImportError:
+        print("⚠️ OpenAI package not installed, skipping")
+        return
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubCompletionsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ['OPENAI_API_KEY'] = 'stub-key'
+    os.environ['OPENAI_API_BASE'] = f"http://127.0.0.1:{server.server_port}/v1"
+    os.environ['LLM_CACHE_DB'] = 'off'
+
+    from processing.sarcasm_detection import sarcasm_detector
+    from processing.llm_cache import llm_cache
+
+    text = "Oh great, the bus is late again"
+
+    # Concurrent identical requests share one in-flight call
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: sarcasm_detector.highlight_sarcastic_text(text), range(8)))
+    print(f"Concurrent requests: 8, API calls: {len(STUB_CALLS)}")
+    assert len(STUB_CALLS) == 1, "concurrent requests were not coalesced"
+    assert all(result['sarcastic_segments'] == ["great"] for result in results)
+
+    # Repeated requests are answered from the cache
+    sarcasm_detector.highlight_sarcastic_text(text)
+    print(f"Repeated request, API calls: {len(STUB_CALLS)}")
+    assert len(STUB_CALLS) == 1, "repeated request was not cached"
+
+    # A different input is a cache miss
+    sarcasm_detector.highlight_sarcastic_text("Perfect! My computer crashed again")
+    print(f"New text, API calls: {len(STUB_CALLS)}")
+    assert len(STUB_CALLS) == 2
+
+    # Combined mode: simplification and highlighting share one completion
+    os.environ['COMBINED_LLM_ANALYSIS'] = '1'
+    from processing.text_simplification import text_simplifier
+    combined_text = "Oh great, another Monday"
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        simplified = pool.submit(text_simplifier.simplify_text, combined_text)
+        highlighted = pool.submit(sarcasm_detector.highlight_sarcastic_text, combined_text)
+        simplified, highlighted = simplified.result(), highlighted.result()
+    print(f"Combined mode, API calls: {len(STUB_CALLS)}")
+    assert len(STUB_CALLS) == 3, "combined mode should make a single call"
+    assert simplified['method'] == 'llm_powered' and highlighted['sarcastic_segments'] == ["great"]
+
+    print(f"\nCache stats: {llm_cache.stats()}")
+    print("✅ LLM cache test passed")
+    server.shutdown()
+
+def test_single_flight_timeout():
+    print("\n⌛ Testing the coalesced-caller timeout\n")
+    print("=" * 50)
+
+    from processing.llm_cache import SingleFlight
+
+    flight = SingleFlight()
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        leader = pool.submit(flight.do, 'key', lambda: release.wait(5) and 'answer')
+        time.sleep(0.1)  # Let the leader register its call
+        started = time.monotonic()
+        try:
+            flight.do('key', lambda: 'not called', timeout=0.2)
+        except FutureTimeoutError:
+            print(f"Follower gave up after {time.monotonic() - started:.2f}s")
+        else:
+            raise AssertionError("follower should time out while the leader hangs")
+        release.set()
+        assert leader.result() == ('answer', False)
+
+    # Once the leader is done the key is free again
+    assert flight.do('key', lambda: 'fresh', timeout=0.2) == ('fresh', False)
+
+
+def test_private_cache_dir():
+    print("\n🔒 Testing the cache directory ownership check\n")
+    print("=" * 50)
+
+    from processing.llm_cache import _private_cache_dir
+
+    with tempfile.TemporaryDirectory() as tmp:
+        private = os.path.join(tmp, 'private')
+        assert _private_cache_dir(private)
+        assert os.stat(private).st_mode & 0o777 == 0o700
+
+        shared = os.path.join(tmp, 'shared')
+        os.makedirs(shared)
+        os.chmod(shared, 0o777)
+        assert not _private_cache_dir(shared), "world-writable directory was trusted"
+
+        # A path that cannot be a directory is not usable either
+        blocker = os.path.join(tmp, 'file')
+        open(blocker, 'w').close()
+        assert not _private_cache_dir(blocker)
+
+
+if __name__ == "__main__":
+    test_llm_cache()
+    test_single_flight_timeout()
+    test_private_cache_dir()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+
+"""
+Test script for lazy imports and the model registry
+Checks that a lazily imported module behaves like the eagerly imported one
+once touched, that analyzer modules no longer import TensorFlow, librosa or
+OpenCV at import time, and that each registered model loads exactly once
+even under concurrent first use, with failures recorded instead of retried.
+Also checks that every analyzer shares one ModelPredictor per trained model
+where each used to load its own copy, and that it predicts like the model
+it wraps.
+"""
+
+import sys
+import os
+import tempfile
+import threading
+import time
+import importlib
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+import processing.model_registry as model_registry_module
+from processing.model_registry import (
+    LazyModule, ModelRegistry, lazy_import, lazy_import_times,
+    model_registry, load_predictor, AUDIO_EMOTION_MODEL, FACIAL_EMOTION_MODEL
+)
+
+HEAVY_MODULES = ('tensorflow', 'librosa', 'cv2')
+
+
+def test_lazy_module_matches_eager_import():
+    print("💤 Testing lazy imports\n")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, 'lazy_probe_module.py'), 'w') as f:
+            f.write("IMPORTED = True\n\ndef double(x):\n    return 2 * x\n")
+        sys.path.insert(0, tmp)
+        try:
+            module = lazy_import('lazy_probe_module')
+            assert isinstance(module, LazyModule) and not module.is_loaded
+            assert 'lazy_probe_module' not in sys.modules, "imported before first use"
+            print(f"Before use: {module!r}")
+
+            # First attribute access imports it; afterwards it behaves like the real module
+            assert module.double(21) == 42
+            eager = importlib.import_module('lazy_probe_module')
+            assert module.double is eager.double and module.IMPORTED is eager.IMPORTED
+            assert module.is_loaded and 'lazy_probe_module' in lazy_import_times
+            print(f"After use: {module!r}")
+
+            # Once imported, lazy_import hands out the real module
+            assert lazy_import('lazy_probe_module') is eager
+        finally:
+            sys.path.remove(tmp)
+            sys.modules.pop('lazy_probe_module', None)
+
+    # A missing module only fails when it is used
+    missing = lazy_import('module_that_does_not_exist')
+    try:
+        missing.anything
+    except ImportError:
+        pass
+    else:
+        raise AssertionError("using a missing lazy module should raise ImportError")
+
+
+def test_analyzers_defer_heavy_imports():
+    print("\n🪶 Testing that analyzer imports stay light\n")
+    print("=" * 50)
+
+    already = [name for name in HEAVY_MODULES if name in sys.modules]
+    if already:
+        print(f"⚠️ {already} imported by an earlier test, skipping")
+        return
+
+    import processing.robust_emotion_analysis  # noqa: F401
+    import processing.facial_analysis  # noqa: F401
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    print(f"Heavy modules imported: {loaded or 'none'}")
+    assert not loaded
+
+
+def test_registry_loads_once():
+    print("\n📦 Testing one load per model under concurrent first use\n")
+    print("=" * 50)
+
+    registry = ModelRegistry()
+    calls = []
+
+    def slow_loader():
+        calls.append(threading.get_ident())
+        time.sleep(0.2)
+        return object()
+
+    registry.register('model', slow_loader)
+    assert registry.is_registered('model') and not registry.is_loaded('model')
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        models = list(pool.map(lambda _: registry.get('model'), range(8)))
+    print(f"8 concurrent callers, loader calls: {len(calls)}")
+    assert len(calls) == 1
+    assert all(model is models[0] for model in models)
+
+    # Re-registering a loaded model keeps the loaded value
+    registry.register('model', lambda: 'replacement')
+    assert registry.get('model') is models[0]
+
+    status = registry.status()['models']['model']
+    assert status['loaded'] and status['error'] is None and status['load_seconds'] >= 0.2
+
+
+def test_registry_records_failures():
+    print("\n💥 Testing failed loads\n")
+    print("=" * 50)
+
+    registry = ModelRegistry()
+    calls = []
+
+    def broken_loader():
+        calls.append(1)
+        raise FileNotFoundError("Model file not found: missing.h5")
+
+    registry.register('broken', broken_loader)
+    assert registry.get('broken') is None
+    assert registry.get('broken') is None
+    print(f"Status: {registry.status()['models']['broken']}")
+    assert len(calls) == 1, "failed loader was retried"
+    assert 'missing.h5' in registry.status()['models']['broken']['error']
+
+    # A failed model can be registered again with a working loader
+    registry.register('broken', lambda: 'fixed')
+    assert registry.get('broken') == 'fixed'
+
+
+def test_warm_up():
+    print("\n🔥 Testing warm-up\n")
+    print("=" * 50)
+
+    registry = ModelRegistry()
+    registry.register('a', lambda: 'model a')
+    registry.register('b', lambda: 'model b')
+    registry.warm_up(['a'], background=False)
+    assert registry.is_loaded('a') and not registry.is_loaded('b')
+
+    registry.warm_up().join(timeout=5)
+    assert registry.is_loaded('b')
+
+
+class FakeModel:
+    """Keras-like model that notices overlapping predict calls"""
+
+    def __init__(self, path):
+        self.path = path
+        self.active = 0
+        self.overlaps = 0
+
+    def predict(self, inputs, verbose=0):
+        self.active += 1
+        if self.active > 1:
+            self.overlaps += 1
+        time.sleep(0.01)
+        self.active -= 1
+        return np.asarray(inputs, dtype=float) * 2
+
+    def get_weights(self):
+        return [np.zeros((10, 10), dtype=np.float32), np.zeros(10, dtype=np.float32)]
+
+
+class FakeKeras:
+    """Stands in for tensorflow.keras; counts model loads"""
+
+    def __init__(self):
+        self.loads = []
+        self.models = self
+
+    def load_model(self, path):
+        self.loads.append(os.path.basename(path))
+        return FakeModel(path)
+
+
+def test_analyzers_share_one_predictor():
+    print("\n🤝 Testing one shared predictor per trained model\n")
+    print("=" * 50)
+
+    from processing.robust_emotion_analysis import RobustEmotionAnalyzer, robust_analyzer
+    from processing.facial_analysis import FacialFeatureAnalyzer
+    import complete_multimodal_analysis
+    import multimodal_analysis
+
+    saved = dict(model_registry._entries)
+    saved_keras, saved_dir = model_registry_module.keras, model_registry_module.MODELS_DIR
+    fake_keras = FakeKeras()
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ('audio.h5', 'facial.h5'):
+            open(os.path.join(tmp, name), 'w').close()
+        with open(os.path.join(tmp, 'audio_encoder.pkl'), 'wb') as f:
+            pickle.dump(['angry', 'happy', 'neutral', 'sad'], f)
+
+        model_registry_module.keras = fake_keras
+        model_registry_module.MODELS_DIR = tmp
+        model_registry._entries.pop(AUDIO_EMOTION_MODEL, None)
+        model_registry._entries.pop(FACIAL_EMOTION_MODEL, None)
+        model_registry.register(AUDIO_EMOTION_MODEL, lambda: load_predictor(
+            AUDIO_EMOTION_MODEL, 'audio.h5', ['missing.pkl', 'audio_encoder.pkl']))
+        model_registry.register(FACIAL_EMOTION_MODEL, lambda: load_predictor(
+            FACIAL_EMOTION_MODEL, 'facial.h5', ['missing.pkl']))
+        try:
+            audio = model_registry.get(AUDIO_EMOTION_MODEL)
+            complete = complete_multimodal_analysis.MultimodalEmotionAnalyzer()
+            legacy = multimodal_analysis.MultimodalEmotionAnalyzer()
+            legacy.load_models()
+            facial = FacialFeatureAnalyzer()
+            facial.load_model()
+
+            # Previously each of these loaded its own copy of the model
+            assert robust_analyzer.audio_model is audio and RobustEmotionAnalyzer().audio_model is audio
+            assert complete.audio_model is audio and legacy.audio_model is audio
+            assert complete.facial_model is legacy.facial_model is facial.model
+            print(f"Model loads: {fake_keras.loads}")
+            assert sorted(fake_keras.loads) == ['audio.h5', 'facial.h5']
+
+            # The encoder comes from the first file that loads; none means each analyzer's fallback
+            assert audio.encoder == ['angry', 'happy', 'neutral', 'sad']
+            assert robust_analyzer.audio_encoder is audio.encoder
+            assert complete.facial_model.encoder is None
+            assert list(complete.facial_encoder.classes_) == sorted(complete.facial_emotions)
+            assert audio.memory_bytes == 440 + len(pickle.dumps(audio.encoder))
+
+            # Predictions are the wrapped model's, and concurrent calls are serialized
+            inputs = np.arange(4.0)
+            assert np.array_equal(audio.predict(inputs), audio.model.predict(inputs))
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(lambda _: audio.predict(inputs), range(16)))
+            assert audio.model.overlaps == 0, "predict calls overlapped"
+
+            status = model_registry.status()
+            assert status['models'][AUDIO_EMOTION_MODEL]['memory_bytes'] == audio.memory_bytes
+        finally:
+            model_registry_module.keras, model_registry_module.MODELS_DIR = saved_keras, saved_dir
+            model_registry._entries.clear()
+            model_registry._entries.update(saved)
+
+
+if __name__ == "__main__":
+    test_lazy_module_matches_eager_import()
+    test_analyzers_defer_heavy_imports()
+    test_registry_loads_once()
+    test_registry_records_failures()
+    test_warm_up()
+    test_analyzers_share_one_predictor()
+    print("\n✅ Model registry tests passed")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+"""
+Test script for the compiled phrase matcher
+Covers quoted terms, punctuation at word boundaries, ignored apostrophes,
+glued punctuation and leftmost-longest selection of overlapping matches.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from processing.phrase_matcher import PhraseMatcher
+
+
+def phrases(matcher, text):
+    return [match.phrase for match in matcher.find(text)]
+
+
+def test_quoting_and_punctuation():
+    print("🔤 Testing quoting and punctuation boundaries\n")
+    print("=" * 50)
+
+    matcher = PhraseMatcher(['lol', 'fr', 'im', 'don'], ignore_chars="'’")
+    cases = {
+        "he said 'lol' ok": ['lol'],
+        "he said ‘lol’ ok": ['lol'],
+        '"lol"': ['lol'],
+        '(lol)': ['lol'],
+        'lol, fr!': ['lol', 'fr'],
+        'lol...': ['lol'],
+        "i'm here": ['im'],
+        "i don't know": [],       # "don" is glued to the t after the ignored apostrophe
+        'lolol': [],
+        'trolololol': [],
+    }
+    for text, expected in cases.items():
+        found = phrases(matcher, text)
+        print(f"{text!r:>28} -> {found}")
+        assert found == expected, f"{text!r}: expected {expected}, got {found}"
+
+
+def test_glue_chars():
+    print("\n🔗 Testing glued punctuation\n")
+    print("=" * 50)
+
+    plain = PhraseMatcher(['km', 'b/c'])
+    glued = PhraseMatcher(['km', 'b/c', 'e'], glue_chars='/-')
+    cases = [
+        (plain, 'going 60 km/h', ['km']),
+        (glued, 'going 60 km/h', []),
+        (glued, 'send an e-mail', []),
+        (glued, 'ran 5 km - tired', ['km']),
+        (glued, 'no b/c it rained', ['b/c']),
+    ]
+    for matcher, text, expected in cases:
+        found = phrases(matcher, text)
+        print(f"{text!r:>28} -> {found}")
+        assert found == expected, f"{text!r}: expected {expected}, got {found}"
+
+
+def test_leftmost_longest():
+    print("\n📐 Testing leftmost-longest overlap resolution\n")
+    print("=" * 50)
+
+    matcher = PhraseMatcher(['no', 'no cap', 'cap', 'hits', 'hits different', 'abc', 'bcd'], word_boundaries=False)
+    cases = {
+        'no cap': ['no cap'],
+        'that hits different': ['hits different'],
+        'abcd': ['abc'],
+        'no  cap': ['no cap'],    # whitespace runs collapse
+    }
+    for text, expected in cases.items():
+        found = phrases(matcher, text)
+        print(f"{text!r:>28} -> {found}")
+        assert found == expected, f"{text!r}: expected {expected}, got {found}"
+
+    # Offsets index into the original text even after whitespace collapsing
+    match = matcher.find('so  no   cap')[0]
+    assert (match.start, match.end) == (4, 12), (match.start, match.end)
+
+    # find_all keeps every overlapping candidate
+    assert sorted(m.phrase for m in matcher.find_all('abcd')) == ['abc', 'bcd']
+
+
+if __name__ == "__main__":
+    test_quoting_and_punctuation()
+    test_glue_chars()
+    test_leftmost_longest()
+    print("\n✅ Phrase matcher tests passed")
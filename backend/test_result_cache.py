@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+"""
+Test script for the analysis result cache
+Checks TTL expiry, LRU eviction, invalidation when a versioned dataset
+changes, that cached values cannot be modified through the objects handed
+out, and that namespaces must be identifiers.
+"""
+
+import sys
+import os
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import processing.result_cache as result_cache
+from processing.result_cache import ResultCache
+
+
+def test_ttl_expiry():
+    print("⏳ Testing TTL expiry\n")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResultCache('ttl_test', ttl=0.2, db_path=os.path.join(tmp, 'cache.sqlite3'))
+        cache.set('key', {'tone': 'Happy'})
+        assert cache.get('key') == {'tone': 'Happy'}
+        time.sleep(0.3)
+        # Expired in both tiers, so the shared copy cannot bring it back either
+        assert cache.get('key') is None
+        stats = cache.stats()
+        print(f"Stats: {stats}")
+        assert stats['hits'] == 1 and stats['misses'] == 1 and stats['entries'] == 0
+
+
+def test_lru_eviction():
+    print("\n🧹 Testing LRU eviction\n")
+    print("=" * 50)
+
+    cache = ResultCache('lru_test', max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')        # 'b' is now the least recently used
+    cache.set('c', 3)
+    print(f"After inserting c: a={cache.get('a')} b={cache.get('b')} c={cache.get('c')}")
+    assert cache.get('a') == 1 and cache.get('b') is None and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_shared_tier_survives_restart():
+    print("\n🗄️ Testing the shared SQLite tier\n")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'cache.sqlite3')
+        ResultCache('shared_test', db_path=db_path).set('key', {'slang': ['no cap']})
+        # A second worker (a fresh instance) finds it in the shared tier
+        other = ResultCache('shared_test', db_path=db_path)
+        assert other.get('key') == {'slang': ['no cap']}
+        assert other.stats()['shared_hits'] == 1
+        other.invalidate()
+        assert ResultCache('shared_test', db_path=db_path).get('key') is None
+
+
+def test_fingerprint_invalidation():
+    print("\n🔁 Testing invalidation when a dataset changes\n")
+    print("=" * 50)
+
+    original = result_cache.VERSIONED_PATHS
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset = os.path.join(tmp, 'slang.csv')
+        with open(dataset, 'w') as f:
+            f.write("term,meaning\nno cap,no lie\n")
+        result_cache.VERSIONED_PATHS = [dataset]
+        try:
+            cache = ResultCache('version_test', version_ttl=0)
+            old_key = cache.key_for('no cap fr')
+            cache.set(old_key, {'slang': ['no cap']})
+            assert cache.get(old_key) is not None
+
+            with open(dataset, 'a') as f:
+                f.write("fr,for real\n")
+            new_key = cache.key_for('no cap fr')
+            print(f"Key before: {old_key[:12]}  after: {new_key[:12]}")
+            assert new_key != old_key
+            assert cache.get(old_key) is None, "in-process tier kept results of the old dataset"
+            assert cache.stats()['invalidations'] == 1
+        finally:
+            result_cache.VERSIONED_PATHS = original
+
+    # Analyzer source code is part of the fingerprint as well
+    assert result_cache.code_fingerprint() != result_cache.code_fingerprint(os.path.join(tmp, '*.py'))
+
+
+def test_values_are_copied():
+    print("\n📋 Testing that cached values are copies\n")
+    print("=" * 50)
+
+    cache = ResultCache('copy_test')
+    value = {'slang': {'no cap': 'no lie'}}
+    cache.set('key', value)
+    value['slang']['extra'] = 'added after caching'
+
+    first = cache.get('key')
+    first['slang']['mutated'] = 'by the first caller'
+    second = cache.get('key')
+    print(f"Second hit: {second}")
+    assert second == {'slang': {'no cap': 'no lie'}}
+
+
+def test_namespace_validation():
+    print("\n🏷️ Testing namespace validation\n")
+    print("=" * 50)
+
+    for namespace in ('x" (key TEXT); DROP TABLE analyze; --', 'with space', '1abc', '', None):
+        try:
+            ResultCache(namespace)
+        except ValueError:
+            continue
+        raise AssertionError(f"namespace {namespace!r} should be rejected")
+    assert ResultCache('analyze_v2').namespace == 'analyze_v2'
+
+
+if __name__ == "__main__":
+    test_ttl_expiry()
+    test_lru_eviction()
+    test_shared_tier_survives_restart()
+    test_fingerprint_invalidation()
+    test_values_are_copied()
+    test_namespace_validation()
+    print("\n✅ Result cache tests passed")
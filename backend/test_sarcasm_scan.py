@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+
+"""
+Test script for the shared sarcasm scan
+Checks that SarcasmDetector.analyze(), which runs every check from one
+automaton scan, returns what the previous per-pattern substring and regex
+loops returned: detection (confidence, reasons, type), the rule-based
+sarcastic segments, the highlighted HTML and the sarcastic_spans exposed by
+get_comprehensive_sarcasm_analysis, on fixed texts and a generated corpus.
+Highlighting marks the positions the searches matched, where the old re.sub
+pass marked every occurrence of a matched segment.
+"""
+
+import sys
+import os
+import re
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from processing.sarcasm_detection import sarcasm_detector, get_comprehensive_sarcasm_analysis, SARCASM_HIGHLIGHT_OPEN
+
+TEXTS = [
+    "I work 40 hours just to be poor",
+    "Love working for peanuts",
+    "Great job, can't even afford groceries",
+    "Oh wonderful, exactly what I wanted",
+    "This is just perfect",
+    "Yeah right, that'll work",
+    "Living the dream here",
+    "Perfect! My computer crashed again",
+    "Great, now I'm stuck",
+    "great great great, the printer is broken",
+    "Perfect, just perfect. Another error.",
+    "I love overtime. I LOVE it. Love, love, love overtime!",
+    "Oh joy... the rent is due and I'm broke",
+    "So happy my code failed again!",
+    "Wonderful!! It broke AGAIN!!!",
+    "I'm really excited about the new project, it starts tomorrow.",
+    "Thank you for your help with the report.",
+    "The weather is nice today.",
+    "Great, now great. Just great!",
+    "lovely weather; greatly appreciated",
+    "İ love being overworked and underpaid, great",
+    "Oh   wonderful,, just   peachy, the paycheck to paycheck life",
+    "",
+    "   ",
+]
+
+FRAGMENTS = [
+    "great", "Great!", "PERFECT!", "perfect", "wonderful", "amazing!", "love", "Love!", "enjoy", "adore",
+    "just great", "now great", "oh wonderful", "yeah right", "of course", "obviously", "so happy", "very excited",
+    "totally", "really brilliant", "living the dream", "work 40 hours", "just to be poor", "broke", "poor",
+    "can't afford", "no money", "bills", "debt", "rent", "overtime", "unpaid", "working late", "free",
+    "computer", "crashed", "broken", "stuck", "i'm stuck", "problem", "issue", "error", "failed", "freeze",
+    "again", "still", "always", "as usual", "yet again", "every time", "the meeting", "my boss", "today",
+    "lovely", "greatly", "workers", "hours", "job pays nothing", "minimum wage rich", "fantastic broken again",
+]
+JOINERS = [" ", " ", ", ", ". ", "! ", "... ", " - ", "\n"]
+
+
+def corpus(count=400, seed=11):
+    rng = random.Random(seed)
+    texts = list(TEXTS)
+    for _ in range(count):
+        words = [rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 8))]
+        text = words[0]
+        for word in words[1:]:
+            text += rng.choice(JOINERS) + word
+        if rng.random() < 0.2:
+            text = text.capitalize()
+        elif rng.random() < 0.1:
+            text = text.upper()
+        texts.append(text)
+    return texts
+
+
+def old_detect(detector, text):
+    """The per-pattern detection loops the shared scan replaced (without highlighting)"""
+    text_lower = text.lower().strip()
+    reasons = []
+    confidence = 0.0
+    sarcasm_type = None
+
+    def contains_any(terms):
+        return any(term in text_lower for term in terms)
+
+    phrase_matches = [phrase for phrase in detector.sarcasm_phrases if phrase in text_lower]
+    if phrase_matches:
+        confidence += 0.8
+        reasons.extend([f"Sarcastic phrase detected: '{phrase}'" for phrase in phrase_matches])
+        sarcasm_type = "explicit_phrase"
+
+    score = 0.0
+    if contains_any(detector.positive_words_negative_context) and contains_any(detector.economic_hardship_terms):
+        score += 0.5
+    if "love" in text_lower and contains_any(["poor", "broke", "struggling"]):
+        score += 0.3
+    if "great" in text_lower and contains_any(["can't afford", "no money", "broke"]):
+        score += 0.3
+    if score > 0:
+        confidence += score * 1.2
+        reasons.append("Positive words used in negative context (contradiction pattern)")
+        sarcasm_type = sarcasm_type or "contradiction"
+
+    score = 0.0
+    for pattern in [("work", "40", "poor"), ("work", "hours", "broke"), ("job", "pays", "nothing"),
+                    ("minimum", "wage", "rich"), ("paycheck", "paycheck", "wealthy")]:
+        if all(word in text_lower for word in pattern):
+            score += 0.4
+            break
+    if "work" in text_lower and "40" in text_lower and "poor" in text_lower:
+        score += 0.6
+    if "work" in text_lower and "hours" in text_lower and contains_any(["poor", "broke", "struggling"]):
+        score += 0.5
+    if score > 0:
+        confidence += score * 1.1
+        reasons.append("Economic hardship expressed with positive language")
+        sarcasm_type = sarcasm_type or "economic"
+
+    score = 0.0
+    negative_words = [
+        "crashed", "broken", "stuck", "problem", "issue", "error", "failed",
+        "trouble", "wrong", "bad", "terrible", "awful", "hate", "annoying",
+        "frustrated", "angry", "upset", "disappointed", "again", "still",
+        "always", "never works", "not working", "stopped", "freeze", "lag"
+    ]
+    for pattern in [r'(Perfect|Great|Wonderful|Amazing|Fantastic|Brilliant|Excellent|Awesome)!',
+                    r'(perfect|great|wonderful|amazing|fantastic|brilliant|excellent|awesome)!']:
+        for match in re.finditer(pattern, text):
+            window = text[max(0, match.start() - 80):min(len(text), match.start() + 80)].lower()
+            if any(word in window for word in negative_words):
+                score += 0.6
+                break
+    if score > 0:
+        confidence += score * 1.3
+        reasons.append("Positive words with exclamation marks in negative context")
+        sarcasm_type = sarcasm_type or "exclamation"
+
+    score = 0.0
+    positive_words = ["great", "perfect", "wonderful", "amazing", "fantastic", "excellent", "brilliant", "awesome"]
+    positive_count = sum(1 for word in positive_words if word in text_lower)
+    if positive_count >= 3:
+        score += 0.4
+    elif positive_count >= 2:
+        score += 0.3
+    for word in positive_words:
+        if re.search(r'\b' + word + r'\b.*\b' + word + r'\b', text_lower):
+            score += 0.3
+            break
+    if score > 0:
+        confidence += score
+        reasons.append("Repetitive positive language suggesting sarcasm")
+        sarcasm_type = sarcasm_type or "repetitive"
+
+    temporal = ["again", "still", "always", "every time", "once again", "yet again", "as usual"]
+    if contains_any(temporal) and contains_any(positive_words + ["love"]):
+        confidence += 0.5
+        reasons.append("Timing-based sarcasm detected (again, still, always)")
+        sarcasm_type = sarcasm_type or "temporal"
+
+    score = 0.0
+    negative_context = ["problem", "issue", "broken", "crashed", "failed", "error", "stuck", "trouble", "wrong", "bad"]
+    for intensifier in ["so", "very", "really", "extremely", "absolutely", "totally", "completely"]:
+        for positive in positive_words + ["happy", "thrilled", "excited"]:
+            if f"{intensifier} {positive}" in text_lower and contains_any(negative_context):
+                score += 0.4
+                break
+    if score > 0:
+        confidence += score
+        reasons.append("Emotional escalation pattern detected")
+        sarcasm_type = sarcasm_type or "escalation"
+
+    confidence = min(confidence, 1.0)
+    return {
+        'sarcasm_detected': confidence >= 0.4,
+        'confidence': confidence,
+        'reasons': reasons,
+        'sarcasm_type': sarcasm_type
+    }
+
+
+def is_word_at(text, start, end):
+    """Regex \\b on both sides of text[start:end]"""
+    return not (start > 0 and re.match(r'\w', text[start - 1])) and not (end < len(text) and re.match(r'\w', text[end]))
+
+
+def old_segments(detector, text):
+    """
+    The rule-based highlighter's per-phrase and per-word searches, in order.
+    Returns the segments and the word-bounded positions those searches matched.
+    """
+    text_lower = text.lower()
+    segments = []
+    found = []
+
+    for phrase in detector.sarcasm_phrases:
+        flexible_phrase = re.escape(phrase.lower()).replace(r'\ ', r'[\s,]*')
+        for match in re.finditer(r'\b' + flexible_phrase + r'\b', text_lower):
+            cleaned = re.sub(r'^[^\w]+|[^\w]+$', '', text[match.start():match.end()])
+            if cleaned:
+                start = match.start() + text[match.start():match.end()].find(cleaned)
+                found.append((start, start + len(cleaned)))
+            if cleaned and cleaned not in segments:
+                segments.append(cleaned)
+
+    for pos_word, neg_contexts in detector._positive_negative_patterns:
+        if pos_word in text_lower:
+            pos_index = text_lower.find(pos_word)
+            for neg_word in neg_contexts:
+                if neg_word in text_lower and abs(pos_index - text_lower.find(neg_word)) < 100:
+                    match = re.compile(re.escape(pos_word), re.IGNORECASE).search(
+                        text, pos_index - 5, pos_index + len(pos_word) + 5)
+                    if match and is_word_at(text, *match.span()):
+                        found.append(match.span())
+                    if match and match.group(0) not in segments:
+                        segments.append(match.group(0))
+                    break
+
+    indicators = ["crashed", "broken", "stuck", "problem", "issue", "error", "failed", "trouble"]
+    for pattern in [r'(Perfect|Great|Wonderful|Amazing|Fantastic|Brilliant|Excellent|Love|Awesome)!',
+                    r'(perfect|great|wonderful|amazing|fantastic|brilliant|excellent|love|awesome)!']:
+        for match in re.finditer(pattern, text):
+            before = text[max(0, match.start() - 50):match.start()].lower()
+            after = text[match.start():min(len(text), match.start() + 50)].lower()
+            if any(indicator in before or indicator in after for indicator in indicators):
+                if is_word_at(text, *match.span(1)):
+                    found.append(match.span(1))
+                if match.group(1) not in segments:
+                    segments.append(match.group(1))
+    return segments, found
+
+
+def union(text, ranges):
+    """Disjoint [start, end] spans covering the given ranges, touching ones joined"""
+    covered = [False] * len(text)
+    for start, end in ranges:
+        covered[start:end] = [True] * (end - start)
+    spans, start = [], None
+    for index, flag in enumerate(covered + [False]):
+        if flag and start is None:
+            start = index
+        elif not flag and start is not None:
+            spans.append([start, index])
+            start = None
+    return spans
+
+
+def old_spans(text, segments):
+    """Where the old re.sub pass wrapped the segments: every word-bounded, case-insensitive occurrence"""
+    return union(text, [match.span() for segment in set(segments)
+                        for match in re.finditer(r'\b' + re.escape(segment) + r'\b', text, re.IGNORECASE)])
+
+
+def old_highlighting(text, segments):
+    """The old per-segment re.sub pass, longest segment first"""
+    html = text
+    for segment in sorted(set(segments), key=len, reverse=True):
+        pattern = re.compile(r'\b' + re.escape(segment) + r'\b', re.IGNORECASE)
+        html = pattern.sub(lambda match: SARCASM_HIGHLIGHT_OPEN + match.group(0) + '</span>', html)
+    return html
+
+
+def render(text, spans):
+    html, position = '', 0
+    for start, end in spans:
+        html += text[position:start] + SARCASM_HIGHLIGHT_OPEN + text[start:end] + '</span>'
+        position = end
+    return html + text[position:]
+
+
+def test_analyze_matches_old_loops():
+    print("🎭 Testing the shared sarcasm scan against the per-pattern loops\n")
+    print("=" * 50)
+
+    texts = corpus()
+    detected = nested = repeated = 0
+    for text in texts:
+        detection, highlighting = sarcasm_detector.analyze(text, use_llm=False)
+        comprehensive = get_comprehensive_sarcasm_analysis(text, use_llm=False)
+        if not text.strip():
+            assert detection['sarcasm_detected'] is False and highlighting['spans'] == []
+            assert comprehensive['sarcastic_spans'] == []
+            continue
+
+        expected = old_detect(sarcasm_detector, text)
+        for key, value in expected.items():
+            assert detection[key] == value, (text, key, detection[key], value)
+        detected += expected['sarcasm_detected']
+
+        segments, found = old_segments(sarcasm_detector, text)
+        # Only the positions the searches matched are marked; the old pass marked
+        # every other occurrence of a segment as well
+        spans = union(text, found) if len(text.lower()) == len(text) else old_spans(text, segments)
+        assert highlighting['sarcastic_segments'] == segments, (text, highlighting['sarcastic_segments'], segments)
+        assert highlighting['method'] == 'rule_based' and highlighting['confidence'] == (0.7 if segments else 0.0)
+        assert highlighting['spans'] == spans, (text, highlighting['spans'], spans)
+        assert highlighting['highlighted_text'] == render(text, spans)
+        covered = old_spans(text, segments)
+        assert all(any(a <= start and end <= b for a, b in covered) for start, end in spans), text
+        # Otherwise the HTML is unchanged, unless the old pass wrapped overlapping segments twice
+        old_html = old_highlighting(text, segments)
+        if spans != covered:
+            repeated += 1
+        elif old_html.count(SARCASM_HIGHLIGHT_OPEN) == len(spans):
+            assert highlighting['highlighted_text'] == old_html, text
+        else:
+            nested += 1
+        assert detection['highlighted_text'] == (highlighting['highlighted_text'] if detection['sarcasm_detected'] else text)
+
+        assert comprehensive['sarcastic_spans'] == spans
+        assert comprehensive['sarcastic_segments'] == segments
+        assert comprehensive['highlighted_text'] == highlighting['highlighted_text']
+        assert comprehensive['confidence'] == expected['confidence'] and comprehensive['reasons'] == expected['reasons']
+    print(f"{len(texts)} texts, {detected} sarcastic, {nested} with overlapping segments, "
+          f"{repeated} with segments repeated elsewhere: same results as the per-pattern loops")
+
+
+def test_detect_sarcasm_matches_analyze():
+    print("\n🔁 Testing detect_sarcasm and highlight_sarcastic_text against analyze\n")
+    print("=" * 50)
+
+    for text in TEXTS:
+        detection, highlighting = sarcasm_detector.analyze(text, use_llm=False)
+        assert sarcasm_detector.detect_sarcasm(text, use_llm=False) == detection, text
+        assert sarcasm_detector.highlight_sarcastic_text(text, use_llm=False) == highlighting, text
+
+
+if __name__ == "__main__":
+    test_analyze_matches_old_loops()
+    test_detect_sarcasm_matches_analyze()
+    print("\n✅ Sarcasm scan tests passed")
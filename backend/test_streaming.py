@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+
+"""
+Test script for streaming transcription
+Drives the /stream endpoints with synthetic tone/pause PCM and a stub
+transcriber: start -> chunk -> status -> finish or cancel, chunks that end
+mid-sample, the per-chunk size limit, session expiry and the
+STREAM_MAX_SESSIONS limit, and that app.py serves /stream/* unless
+STREAMING_ENABLED=0 (the multi-worker gunicorn command). Also checks that the frame levels a session
+keeps between chunks equal a full recomputation over the pending audio.
+"""
+
+import sys
+import os
+import io
+import time
+import importlib
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from flask import Flask
+
+import routes.streaming as streaming
+from processing.audio_decode import DecodedAudio
+from processing.audio_segmentation import frame_energies
+from processing.streaming_transcription import StreamingSession, StreamingSessions
+
+RATE = 16000
+# The stub "recognizes" each utterance by its length: tones of 1, 2 and 3 seconds
+WORDS = {1: 'hello', 2: 'there', 3: 'friend'}
+PARTS = [('pause', 1), ('tone', 1), ('pause', 1), ('tone', 2), ('pause', 1), ('tone', 3), ('pause', 1.5)]
+
+
+def stub_transcribe(audio):
+    return WORDS.get(int(audio.duration), '')
+
+
+def recording_pcm(parts=PARTS):
+    samples = []
+    for index, (kind, seconds) in enumerate(parts):
+        count = int(seconds * RATE)
+        if kind == 'tone':
+            samples.append(0.5 * 32767 * np.sin(2 * np.pi * 440 * np.arange(count) / RATE))
+        else:
+            samples.append(np.random.default_rng(index).normal(0, 30, count))
+    return np.concatenate(samples).astype('<i2').tobytes()
+
+
+def chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class StreamingApp:
+    """Test client over the streaming routes with a stub transcriber and analysis"""
+
+    def __init__(self, **session_options):
+        self.sessions = StreamingSessions(transcribe=stub_transcribe, **session_options)
+
+    def __enter__(self):
+        self.saved = (streaming.streaming_sessions, streaming.analyze_transcript, streaming.STREAM_MAX_CHUNK_BYTES)
+        streaming.streaming_sessions = self.sessions
+        streaming.analyze_transcript = lambda transcript: {'analyzed': transcript}
+        app = Flask(__name__)
+        app.register_blueprint(streaming.streaming_routes)
+        return app.test_client()
+
+    def __exit__(self, *exc):
+        streaming.streaming_sessions, streaming.analyze_transcript, streaming.STREAM_MAX_CHUNK_BYTES = self.saved
+
+
+def start(client, **body):
+    response = client.post('/stream/start', json=body)
+    return response.status_code, response.get_json()
+
+
+def test_session_lifecycle():
+    print("🎙️ Testing start -> chunk -> status -> finish\n")
+    print("=" * 50)
+
+    with StreamingApp() as client:
+        status, body = start(client)
+        assert status == 200 and body['sample_rate'] == RATE and body['format'] == 's16le'
+        session_id = body['session_id']
+
+        # 0.1 s chunks with an odd byte count, so most end mid-sample
+        for chunk in chunks(recording_pcm(), 3201):
+            response = client.post(f'/stream/{session_id}/chunk', data=chunk)
+            assert response.status_code == 200, response.get_json()
+        interim = response.get_json()
+        print(f"After the last chunk: {interim['transcript']!r} (+{interim['pending_segments']} pending)")
+
+        # Polling picks up segments that finished transcribing between chunks
+        time.sleep(0.2)
+        polled = client.get(f'/stream/{session_id}').get_json()
+        assert polled['duration'] == round(len(recording_pcm()) // 2 / RATE, 2)
+        assert polled['transcript'] == 'hello there friend' and polled['pending_segments'] == 0
+        assert [segment['text'] for segment in polled['segments']] == ['hello', 'there', 'friend']
+
+        finished = client.post(f'/stream/{session_id}/finish').get_json()
+        print(f"Final: {finished['transcript']!r}")
+        assert finished['transcript'] == 'hello there friend'
+        assert finished['analysis'] == {'analyzed': 'hello there friend'}
+        assert 1.0 - 0.3 < finished['segments'][0]['start'] < 1.0 and finished['segments'][-1]['end'] <= 9.5
+
+        # A finished session is gone
+        assert client.get(f'/stream/{session_id}').status_code == 404
+        assert client.post(f'/stream/{session_id}/finish').status_code == 404
+
+
+def test_chunking_does_not_change_the_transcript():
+    print("\n🧩 Testing odd-sized chunks against one whole chunk\n")
+    print("=" * 50)
+
+    data = recording_pcm()
+    whole = StreamingSession(RATE, stub_transcribe)
+    whole.add_chunk(data)
+    expected = whole.finish()
+
+    for size in (1, 333, 4001, 48000):
+        session = StreamingSession(RATE, stub_transcribe)
+        # Single bytes are slow; feed them only for the first second
+        pieces = chunks(data[:RATE * 2], 1) + chunks(data[RATE * 2:], 333) if size == 1 else chunks(data, size)
+        for piece in pieces:
+            session.add_chunk(piece)
+            # Levels kept between chunks equal a recomputation over the pending audio
+            usable = len(session._pending) - len(session._pending) % 2
+            assert np.array_equal(session._pending_levels, frame_energies(DecodedAudio(bytes(session._pending[:usable]), RATE)))
+        result = session.finish()
+        print(f"{size:>5}-byte chunks: {result['transcript']!r}")
+        assert result['transcript'] == expected['transcript'] == 'hello there friend'
+        assert result['duration'] == expected['duration']
+
+
+def test_cancel_and_silence():
+    print("\n🛑 Testing cancel and silent streams\n")
+    print("=" * 50)
+
+    with StreamingApp() as client:
+        _, body = start(client)
+        session_id = body['session_id']
+        client.post(f'/stream/{session_id}/chunk', data=recording_pcm()[:RATE])
+        assert client.delete(f'/stream/{session_id}').get_json() == {'status': 'cancelled', 'session_id': session_id}
+        assert client.delete(f'/stream/{session_id}').status_code == 404
+        assert client.post(f'/stream/{session_id}/chunk', data=b'\x00\x00').status_code == 404
+
+        # Nothing recognized: an error instead of an empty analysis
+        _, body = start(client)
+        silence = recording_pcm([('pause', 2)])
+        client.post(f"/stream/{body['session_id']}/chunk", data=silence)
+        response = client.post(f"/stream/{body['session_id']}/finish")
+        assert response.status_code == 500 and 'analysis' not in response.get_json()
+
+        assert start(client, sample_rate='fast')[0] == 400
+        assert start(client, sample_rate=96000)[0] == 400
+        assert client.get('/stream/unknown').status_code == 404
+
+
+def test_chunk_size_limit():
+    print("\n📏 Testing the per-chunk size limit\n")
+    print("=" * 50)
+
+    with StreamingApp() as client:
+        streaming.STREAM_MAX_CHUNK_BYTES = 1000
+        _, body = start(client)
+        session_id = body['session_id']
+
+        response = client.post(f'/stream/{session_id}/chunk', data=b'\x00' * 1001)
+        print(f"1001 bytes: {response.status_code} {response.get_json()['error']}")
+        assert response.status_code == 413
+        assert client.post(f'/stream/{session_id}/chunk', data=b'\x00' * 1000).status_code == 200
+
+        # Without a Content-Length (chunked transfer) the body is read only up to the limit
+        for size, expected in ((1001, 413), (1000, 200)):
+            response = client.post(
+                f'/stream/{session_id}/chunk', input_stream=io.BytesIO(b'\x00' * size),
+                environ_overrides={'wsgi.input_terminated': True}
+            )
+            assert response.status_code == expected, (size, response.status_code)
+
+        # Rejected chunks were not added to the session
+        assert client.get(f'/stream/{session_id}').get_json()['duration'] == round(2000 / 2 / RATE, 2)
+
+
+def test_expiry_and_session_limit():
+    print("\n⏱️ Testing session expiry and STREAM_MAX_SESSIONS\n")
+    print("=" * 50)
+
+    with StreamingApp(ttl=0.3, max_sessions=2) as client:
+        first, second = start(client)[1]['session_id'], start(client)[1]['session_id']
+        status, body = start(client)
+        print(f"Third stream: {status} {body['error']}")
+        assert status == 503
+
+        # Closing one frees a slot
+        client.delete(f'/stream/{first}')
+        third = start(client)[1]['session_id']
+
+        # Idle sessions expire; requests keep a session alive
+        for _ in range(3):
+            time.sleep(0.15)
+            assert client.get(f'/stream/{third}').status_code == 200
+        assert client.get(f'/stream/{second}').status_code == 404, "idle session did not expire"
+        assert start(client)[0] == 200
+
+
+def test_app_serves_streaming_unless_disabled():
+    print("\n🔌 Testing STREAMING_ENABLED in app.py\n")
+    print("=" * 50)
+
+    original = os.environ.get('STREAMING_ENABLED')
+    try:
+        served = {}
+        for value in ('', '1', '0', 'false'):
+            if value:
+                os.environ['STREAMING_ENABLED'] = value
+            else:
+                os.environ.pop('STREAMING_ENABLED', None)
+            assert streaming.streaming_enabled() == (value in ('', '1'))
+            if served is None:
+                continue
+            try:
+                import app
+                app = importlib.reload(app)
+            except ImportError as e:
+                print(f"⚠️ {e}, skipping the app check")
+                served = None
+                continue
+            served[value] = '/stream/start' in {rule.rule for rule in app.app.url_map.iter_rules()}
+        print(f"/stream/start registered: {served}")
+        assert all(served[value] == (value in ('', '1')) for value in served or {})
+    finally:
+        if original is None:
+            os.environ.pop('STREAMING_ENABLED', None)
+        else:
+            os.environ['STREAMING_ENABLED'] = original
+
+
+if __name__ == "__main__":
+    test_session_lifecycle()
+    test_chunking_does_not_change_the_transcript()
+    test_cancel_and_silence()
+    test_chunk_size_limit()
+    test_expiry_and_session_limit()
+    test_app_serves_streaming_unless_disabled()
+    print("\n✅ Streaming tests passed")
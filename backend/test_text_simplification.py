@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+"""
+Test script for the rule-based text simplifier
+Compares the single-pass ReplacementEngine with the previous table-by-table
+re.sub rewriting on fixed texts, and pins the cases where the old rewriting
+was knowingly changed (terms found inside longer words or inside the
+meanings substituted for earlier terms).
+"""
+
+import sys
+import os
+import re
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from processing.text_simplification import (
+    IDIOM_REPLACEMENTS, SLANG_REPLACEMENTS, CULTURAL_REFERENCES, WORD_REPLACEMENTS, text_simplifier
+)
+
+# Texts on which the old and new rewriting must agree exactly
+AGREEING_TEXTS = [
+    "Break a leg tonight, it's a piece of cake!",
+    "That slaps, no cap. Lowkey the best show this year.",
+    "Stop gaslighting me, you absolute boomer.",
+    "We will utilize the data. Furthermore, we must commence now.",
+    "It's raining cats and dogs and I'm under the weather.",
+    "Don't spill the beans when it hit the fan.",
+    "That's sus fam, touch grass.",
+    "Nothing to change here at all.",
+    "",
+]
+
+
+def old_rewrite(text):
+    """The previous rewriting: each table in turn, longest entries first, re-scanning the rewritten text"""
+    simplified = text
+    substitutions = {}
+    for table in (IDIOM_REPLACEMENTS, SLANG_REPLACEMENTS):
+        for term, meaning in sorted(table.items(), key=lambda x: len(x[0]), reverse=True):
+            if term.lower() in simplified.lower():
+                pattern = re.escape(term) if ' ' in term else r'\b' + re.escape(term) + r'\b'
+                simplified = re.sub(pattern, meaning, simplified, flags=re.IGNORECASE)
+                substitutions[term] = meaning
+    for ref, (meaning, _) in sorted(CULTURAL_REFERENCES.items(), key=lambda x: len(x[0]), reverse=True):
+        if ref.lower() in simplified.lower():
+            simplified = re.sub(re.escape(ref), meaning, simplified, flags=re.IGNORECASE)
+            substitutions[ref] = meaning
+    for difficult, simple in WORD_REPLACEMENTS.items():
+        if difficult in simplified.lower():
+            simplified = simplified.replace(difficult, simple)
+            simplified = simplified.replace(difficult.capitalize(), simple.capitalize())
+            substitutions[difficult] = simple
+    return simplified, substitutions
+
+
+def test_matches_old_rewriting():
+    print("✏️ Testing the replacement engine against the old rewriting\n")
+    print("=" * 50)
+
+    for text in AGREEING_TEXTS:
+        expected_text, expected_subs = old_rewrite(text)
+        result = text_simplifier._fallback_simplification(text)
+        print(f"{text[:40]!r:<44} -> {result['simplified_text'][:60]!r}")
+        assert result['simplified_text'] == expected_text, (text, expected_text, result['simplified_text'])
+        assert result['word_substitutions'] == expected_subs, (text, expected_subs, result['word_substitutions'])
+
+
+def test_intended_differences():
+    print("\n🔀 Testing the deliberate changes from the old rewriting\n")
+    print("=" * 50)
+
+    cases = [
+        # 'bet' and 'king' were listed as substitutions without being replaced
+        ("I felt betrayed at work while working", "I felt betrayed at work while working", {}),
+        # Cultural references matched inside words: 'simp' in 'simplify'
+        ("Nothing to simplify.", "Nothing to simplify.", {}),
+        # 'subsequently' used to become 'nextly'
+        ("Subsequently we left.", "Subsequently we left.", {}),
+        # 'stan' used to be found inside the meaning of 'say less'
+        ("Say less.", "I understand completely.", {'say less': 'I understand completely'}),
+    ]
+    for text, simplified, substitutions in cases:
+        old_text, old_subs = old_rewrite(text)
+        result = text_simplifier._fallback_simplification(text)
+        print(f"{text!r:<44} old {old_text!r} {sorted(old_subs)}")
+        print(f"{'':<44} new {result['simplified_text']!r} {sorted(result['word_substitutions'])}")
+        assert result['simplified_text'] == simplified
+        assert result['word_substitutions'] == substitutions
+
+
+def test_explanations_in_text_order():
+    print("\n📝 Testing explanations and cultural notes\n")
+    print("=" * 50)
+
+    result = text_simplifier._fallback_simplification("That's fire but she's such a karen; break a leg.")
+    for explanation in result['key_explanations']:
+        print(f"  {explanation}")
+    assert result['key_explanations'][:3] == [
+        "'that's fire' is modern slang meaning 'that's really good'",
+        "'karen' means 'entitled, demanding person'",
+        "'break a leg' is an idiom that means 'good luck'",
+    ]
+    assert result['cultural_notes'] == ["'karen': Internet slang for a specific type of behavior"]
+    assert "Semicolons (;) are used to connect related ideas" in result['key_explanations']
+
+
+if __name__ == "__main__":
+    test_matches_old_rewriting()
+    test_intended_differences()
+    test_explanations_in_text_order()
+    print("\n✅ Text simplification tests passed")
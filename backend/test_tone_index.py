@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+"""
+Test script for the sparse tone index
+Checks that the inverted-index top-k search returns exactly what a dense
+cosine-similarity argmax/argsort would, on random data and on the real tone
+model, and that an invalid TONE_NEIGHBORS setting cannot break lookups.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+from processing.tone_index import ToneIndex
+
+
+def dense_top_k(vectors, query, k):
+    """Reference: cosine similarity against every row, ties to the lower row"""
+    scores = (vectors @ query.T).toarray().ravel()
+    order = np.lexsort((np.arange(len(scores)), -scores))
+    return [(int(row), float(scores[row])) for row in order[:k] if scores[row] > 0]
+
+
+def test_random_vectors_match_dense():
+    print("🧮 Testing sparse top-k against dense cosine\n")
+    print("=" * 50)
+
+    rng = np.random.default_rng(7)
+    # Quantized weights so that ties actually happen
+    vectors = sparse.random(400, 60, density=0.08, random_state=rng, data_rvs=lambda n: rng.integers(1, 4, n).astype(float))
+    vectors = normalize(sparse.csr_matrix(vectors))
+    index = ToneIndex(vectors, [f"label{i % 7}" for i in range(400)])
+
+    queries = normalize(sparse.csr_matrix(sparse.random(200, 60, density=0.1, random_state=rng)))
+    for k in (1, 3, 10):
+        for i in range(queries.shape[0]):
+            query = queries.getrow(i)
+            expected = dense_top_k(vectors, query, k)
+            found = [(n.row, n.score) for n in index.search(query, k)]
+            assert [row for row, _ in found] == [row for row, _ in expected], (k, i, found, expected)
+            assert np.allclose([s for _, s in found], [s for _, s in expected])
+    print("200 queries x k in (1, 3, 10) agree with the dense argsort")
+
+    # search_batch is row-by-row search
+    assert index.search_batch(queries[:5], k=3) == [index.search(queries.getrow(i), k=3) for i in range(5)]
+
+
+def test_tone_model_matches_dense():
+    print("\n🎭 Testing the tone model index against dense argmax\n")
+    print("=" * 50)
+
+    from processing.tone_model import get_tone_model
+    model = get_tone_model()
+    if model is None:
+        print("⚠️ Tone dataset not available, skipping")
+        return
+
+    vectors = sparse.csr_matrix(model.vectors)
+    index = ToneIndex(vectors, model.labels)
+    texts = [
+        "Thank you so much, this is wonderful work",
+        "Be careful, this could go wrong very quickly",
+        "Please find the schedule for next week attached",
+        "You always blame me for everything",
+        "Let's keep going, we can do this together",
+    ]
+    for text, query in zip(texts, model.vectorizer.transform(texts)):
+        expected = dense_top_k(vectors, query, 1)
+        found = index.search(query, k=1)
+        print(f"{text[:40]:<42} -> {found[0].label if found else None}")
+        assert [n.row for n in found] == [row for row, _ in expected]
+
+
+def test_invalid_tone_neighbors():
+    print("\n🚫 Testing TONE_NEIGHBORS validation\n")
+    print("=" * 50)
+
+    from processing.audio_analysis import _parse_tone_neighbors
+    assert _parse_tone_neighbors('5') == 5
+    for value in ('0', '-3', 'abc', '', None):
+        assert _parse_tone_neighbors(value) == 1, value
+
+    index = ToneIndex(normalize(sparse.csr_matrix(np.eye(3))), ['a', 'b', 'c'])
+    try:
+        index.search(sparse.csr_matrix([[1.0, 0, 0]]), k=0)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("k=0 should be rejected")
+
+
+if __name__ == "__main__":
+    test_random_vectors_match_dense()
+    test_tone_model_matches_dense()
+    test_invalid_tone_neighbors()
+    print("\n✅ Tone index tests passed")
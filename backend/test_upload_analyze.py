@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+"""
+Test script for /upload-and-analyze
+The route used to POST the transcript to http://localhost:5002/analyze and
+return that response as its "analysis". It now calls the same pipeline in
+process; this checks the payload still equals what /analyze returns for the
+transcript, that no HTTP request is made, and that the basic fallback
+is used when the pipeline raises. Transcription is stubbed, so no speech
+recognizer or network is needed, but the route module still needs
+speech_recognition installed to import.
+"""
+
+import sys
+import os
+import io
+import wave
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from flask import Flask
+
+TRANSCRIPTS = [
+    "I'm so excited about this, no cap it's fire 🔥",
+    "Oh great, another Monday. Just what I needed.",
+    "Dear Sir, I would like to request a meeting at your earliest convenience.",
+]
+
+
+def wav_bytes(seconds=1.0):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(16000)
+        wav_file.writeframes(np.zeros(int(16000 * seconds), dtype='<i2').tobytes())
+    return buffer.getvalue()
+
+
+def load_routes():
+    """(upload module, analysis module), or None when the audio stack is not installed"""
+    try:
+        import routes.upload as upload
+        import routes.analysis as analysis
+    except ImportError as e:
+        print(f"⚠️ {e}, skipping")
+        return None
+    return upload, analysis
+
+
+class NoHTTP:
+    """Replaces requests.post; the route must not call back into the server"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, url, *args, **kwargs):
+        self.calls.append(url)
+        raise AssertionError(f"unexpected HTTP request to {url}")
+
+
+def make_client(upload, analysis):
+    app = Flask(__name__)
+    app.register_blueprint(upload.upload_routes)
+    app.register_blueprint(analysis.analysis_routes)
+    return app.test_client()
+
+
+def post_upload(client, name='clip.wav'):
+    return client.post('/upload-and-analyze', data={'file': (io.BytesIO(wav_bytes()), name)},
+                       content_type='multipart/form-data')
+
+
+def test_matches_analyze_endpoint():
+    print("📤 Testing /upload-and-analyze against /analyze\n")
+    print("=" * 50)
+
+    routes = load_routes()
+    if routes is None:
+        return
+    upload, analysis = routes
+    import requests
+    from processing.analysis_service import analysis_cache
+
+    saved = (upload.transcribe_audio, upload.UPLOAD_FOLDER, requests.post)
+    no_http = NoHTTP()
+    with tempfile.TemporaryDirectory() as tmp:
+        upload.UPLOAD_FOLDER = tmp
+        requests.post = no_http
+        try:
+            client = make_client(upload, analysis)
+            for transcript in TRANSCRIPTS:
+                upload.transcribe_audio = lambda audio, transcript=transcript: {
+                    'transcript': transcript, 'success': True, 'method': 'stub'
+                }
+                # What the old route returned: the /analyze response, wrapped
+                analysis_cache.invalidate()
+                expected = client.post('/analyze', json={'transcript': transcript}).get_json()
+                analysis_cache.invalidate()
+                response = post_upload(client)
+                assert response.status_code == 200, response.get_json()
+                body = response.get_json()
+                print(f"{transcript[:40]!r:<44} keys={len(body['analysis'])}")
+                assert set(body) == {'filename', 'transcript', 'analysis'}
+                assert body['filename'] == 'clip.wav' and body['transcript'] == transcript
+                assert body['analysis'] == expected
+
+            # The upload is saved; nothing else (converted WAVs, chunks) is written
+            assert os.listdir(tmp) == ['clip.wav']
+            assert no_http.calls == []
+        finally:
+            upload.transcribe_audio, upload.UPLOAD_FOLDER, requests.post = saved
+
+
+def test_fallback_and_errors():
+    print("\n🛟 Testing the basic fallback and transcription errors\n")
+    print("=" * 50)
+
+    routes = load_routes()
+    if routes is None:
+        return
+    upload, analysis = routes
+
+    saved = (upload.transcribe_audio, upload.UPLOAD_FOLDER, upload.analyze_transcript)
+    with tempfile.TemporaryDirectory() as tmp:
+        upload.UPLOAD_FOLDER = tmp
+        try:
+            client = make_client(upload, analysis)
+            upload.transcribe_audio = lambda audio: {'transcript': TRANSCRIPTS[0], 'success': True}
+
+            def broken(transcript):
+                raise RuntimeError("pipeline down")
+            upload.analyze_transcript = broken
+            body = post_upload(client).get_json()
+            print(f"Fallback keys: {sorted(body['analysis'])}")
+            assert body['recommendation'] == 'Basic analysis used due to error'
+            assert set(body['analysis']) == {'tone', 'slang', 'robust_emotion'}
+
+            upload.transcribe_audio = lambda audio: {'error': 'no speech', 'suggestion': 'try again'}
+            response = post_upload(client)
+            assert response.status_code == 500 and response.get_json() == {'error': 'no speech', 'filename': 'clip.wav'}
+
+            assert post_upload(client, 'notes.txt').status_code == 400
+        finally:
+            upload.transcribe_audio, upload.UPLOAD_FOLDER, upload.analyze_transcript = saved
+
+
+if __name__ == "__main__":
+    test_matches_analyze_endpoint()
+    test_fallback_and_errors()
+    print("\n✅ Upload and analyze tests passed")